@@ -0,0 +1,85 @@
+"""Latency of BM25 top-k strategies against a full ranking.
+
+Usage::
+
+    python benchmarks/bm25_topk.py --sizes 10000 50000 100000 --k 15
+
+The corpus is synthetic Zipf-distributed text, so a few terms appear in
+most chunks ("common") and most terms appear in very few ("rare").
+"ranking" is the full :meth:`BM25Index.score_tokens` result; the other
+columns are :meth:`BM25Index.score_top_k` with each strategy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from ragkit.config.retrieval_schema import BM25Algorithm, LexicalSearchConfig
+from ragkit.retrieval.lexical_engine import BM25Index
+
+
+def _build(size: int, vocab: int, length: int, seed: int) -> BM25Index:
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, vocab + 1)
+    weights /= weights.sum()
+    index = BM25Index(LexicalSearchConfig(remove_stopwords=False, stemming=False))
+    words = rng.choice(vocab, size=(size, length), p=weights)
+    for row in range(size):
+        index.add_document(f"c{row}", " ".join(f"w{word}" for word in words[row]), {"doc_id": f"d{row}"})
+    index.merge()
+    return index
+
+
+def _time(fn, queries: list[list[str]]) -> float:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--length", type=int, default=60, help="tokens per chunk")
+    parser.add_argument("--k", type=int, default=15)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed + 1)
+    query_sets = {
+        "common": [[f"w{t}" for t in rng.integers(0, 10, 3)] for _ in range(args.queries)],
+        "rare": [[f"w{t}" for t in rng.integers(2000, 20000, 3)] for _ in range(args.queries)],
+        "mixed": [
+            [f"w{rng.integers(0, 10)}", f"w{rng.integers(10, 200)}", f"w{rng.integers(2000, 20000)}"]
+            for _ in range(args.queries)
+        ],
+    }
+    params = (BM25Algorithm.BM25, 1.5, 0.75, 0.5)
+
+    for size in args.sizes:
+        started = time.perf_counter()
+        index = _build(size, args.vocab, args.length, args.seed)
+        print(f"\n{size} chunks, {index.num_unique_terms} terms (built in {time.perf_counter() - started:.1f} s)")
+        for name, queries in query_sets.items():
+            ranking = _time(lambda q, index=index: index.score_tokens(q, *params)[: args.k], queries)
+            columns = [f"ranking {ranking:8.2f} ms"]
+            for strategy in ("exhaustive", "maxscore", "auto"):
+                latency = _time(
+                    lambda q, index=index, strategy=strategy: index.score_top_k(q, *params, args.k, strategy=strategy),
+                    queries,
+                )
+                columns.append(f"{strategy} {latency:8.2f} ms")
+            scored = statistics.median(index.score_top_k(q, *params, args.k)[1] for q in queries)
+            print(f"  {name:<7} " + "   ".join(columns) + f"   chunks scored {scored:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
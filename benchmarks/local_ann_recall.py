@@ -0,0 +1,102 @@
+"""Recall@k and latency of the local store's IVF index against exact search.
+
+Usage::
+
+    python benchmarks/local_ann_recall.py --points 50000 --dims 384 --nprobe 4 8 16 32
+
+Data is a synthetic Gaussian mixture (clustered like real embeddings);
+queries are perturbed corpus points. Exact search over the same store is
+the ground truth.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from ragkit.config.vector_store_schema import LocalIndexConfig, LocalIndexType, VectorStoreConfig
+from ragkit.storage.base import LocalJsonVectorStore, VectorPoint
+
+
+def _synthetic(points: int, dims: int, clusters: int, spread: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    if clusters <= 0:
+        # No structure at all: the worst case for any coarse quantizer.
+        return rng.normal(size=(points, dims)).astype(np.float32)
+    centers = rng.normal(size=(clusters, dims)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=points)
+    return centers[labels] + spread * rng.normal(size=(points, dims)).astype(np.float32)
+
+
+def _store(index: LocalIndexConfig) -> LocalJsonVectorStore:
+    config = VectorStoreConfig(mode="memory", collection_name="bench", local_index=index)
+    return LocalJsonVectorStore(config)
+
+
+async def _fill(store: LocalJsonVectorStore, data: np.ndarray, batch: int = 4096) -> None:
+    await store.initialize(data.shape[1])
+    for start in range(0, data.shape[0], batch):
+        await store.upsert(
+            [
+                VectorPoint(id=str(start + offset), vector=row.tolist(), payload={"doc_id": str(start + offset)})
+                for offset, row in enumerate(data[start : start + batch])
+            ]
+        )
+
+
+async def _run_queries(store: LocalJsonVectorStore, queries: np.ndarray, k: int) -> tuple[list[list[str]], float]:
+    results: list[list[str]] = []
+    latencies: list[float] = []
+    for query in queries:
+        vector = query.tolist()
+        started = time.perf_counter()
+        hits = await store.search(vector, k)
+        latencies.append(time.perf_counter() - started)
+        results.append([point.id for point, _ in hits])
+    return results, statistics.median(latencies) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--dims", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=1000, help="0 for unstructured Gaussian data")
+    parser.add_argument("--spread", type=float, default=1.0, help="cluster noise; higher overlaps more")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = _synthetic(args.points, args.dims, args.clusters, args.spread, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    queries = data[rng.choice(args.points, args.queries, replace=False)]
+    queries = queries + 0.5 * args.spread * rng.normal(size=queries.shape).astype(np.float32)
+
+    exact = _store(LocalIndexConfig(index_type=LocalIndexType.EXACT))
+    await _fill(exact, data)
+    truth, exact_ms = await _run_queries(exact, queries, args.k)
+
+    ivf = _store(LocalIndexConfig(index_type=LocalIndexType.IVF, nlist=args.nlist, min_points=0))
+    await _fill(ivf, data)
+    started = time.perf_counter()
+    await ivf.search(queries[0].tolist(), args.k)
+    train_s = time.perf_counter() - started
+
+    print(f"points={args.points} dims={args.dims} k={args.k} queries={args.queries}")
+    print(f"exact           median {exact_ms:7.2f} ms")
+    print(f"ivf training    {train_s:7.2f} s (nlist={ivf._ivf.centroids.shape[0]})")
+    for nprobe in args.nprobe:
+        ivf.config.local_index.nprobe = nprobe
+        found, ivf_ms = await _run_queries(ivf, queries, args.k)
+        recall = statistics.mean(len(set(a) & set(b)) / len(b) for a, b in zip(found, truth))
+        print(f"ivf nprobe={nprobe:<4} median {ivf_ms:7.2f} ms  recall@{args.k} {recall:.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -50,6 +50,9 @@ export function DashboardPanels() {
         <p className="text-xs text-gray-500">
           Réussis: {status?.docs_succeeded ?? 0} · Avertissements: {status?.docs_warnings ?? 0} · Échecs: {status?.docs_failed ?? 0}
         </p>
+        <p className="text-xs text-gray-500">
+          Chunks réutilisés: {status?.chunks_reused ?? 0} · Chunks vectorisés: {status?.chunks_embedded ?? 0}
+        </p>
         <div className="flex gap-2 mt-2 flex-wrap">
           <Button onClick={() => void start(false)}>Lancer l'ingestion</Button>
           <Button variant="outline" onClick={() => void start(true)}>Ingestion incrémentale</Button>
@@ -78,6 +78,9 @@ export function SourceAddDialog({ isOpen, onClose, onAdd, editingSource, sourceT
                     user_agent: "LOKO-RAG/1.0",
                     request_delay_ms: 0,
                     timeout_seconds: 30,
+                    max_concurrent_requests: 8,
+                    max_connections_per_host: 2,
+                    use_sitemap: true,
                 };
             case "rss_feed":
                 return {
@@ -201,6 +201,16 @@ export function WebUrlForm({ config, onChange }: WebUrlFormProps) {
                     />
                     <label htmlFor="robots" className="text-sm text-gray-700 dark:text-gray-300">Respecter robots.txt</label>
                 </div>
+                <div className="flex items-center gap-2 mt-6">
+                    <input
+                        type="checkbox"
+                        id="sitemap"
+                        checked={config.use_sitemap !== false}
+                        onChange={(e) => onChange({ ...config, use_sitemap: e.target.checked })}
+                        className="rounded border-gray-300 text-blue-600 focus:ring-blue-500"
+                    />
+                    <label htmlFor="sitemap" className="text-sm text-gray-700 dark:text-gray-300">Utiliser sitemap.xml pour detecter les changements</label>
+                </div>
                 <div>
                     <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">User-Agent</label>
                     <input
@@ -214,7 +224,7 @@ export function WebUrlForm({ config, onChange }: WebUrlFormProps) {
 
             <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
                 <div>
-                    <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">Delai entre requetes (ms)</label>
+                    <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">Delai entre requetes par hote (ms)</label>
                     <input
                         type="number"
                         min="0"
@@ -234,6 +244,29 @@ export function WebUrlForm({ config, onChange }: WebUrlFormProps) {
                     />
                 </div>
             </div>
+
+            <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
+                <div>
+                    <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">Requetes simultanees</label>
+                    <input
+                        type="number"
+                        min="1"
+                        value={config.max_concurrent_requests || 8}
+                        onChange={(e) => onChange({ ...config, max_concurrent_requests: parseInt(e.target.value) || 8 })}
+                        className="block w-full rounded-md border-gray-300 dark:border-gray-600 dark:bg-gray-800 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm"
+                    />
+                </div>
+                <div>
+                    <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">Connexions par hote</label>
+                    <input
+                        type="number"
+                        min="1"
+                        value={config.max_connections_per_host || 2}
+                        onChange={(e) => onChange({ ...config, max_connections_per_host: parseInt(e.target.value) || 2 })}
+                        className="block w-full rounded-md border-gray-300 dark:border-gray-600 dark:bg-gray-800 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm"
+                    />
+                </div>
+            </div>
         </div>
     );
 }
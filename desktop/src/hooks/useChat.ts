@@ -11,6 +11,7 @@ export interface ChatPayload {
     doc_types: string[];
     languages: string[];
     categories: string[];
+    source_ids: string[];
   };
   include_debug?: boolean;
 }
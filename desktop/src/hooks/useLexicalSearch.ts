@@ -28,13 +28,21 @@ export interface LexicalDebugInfo {
   tokenization_latency_ms: number;
   search_latency_ms: number;
   total_latency_ms: number;
-  results_from_index: number;
-  results_after_threshold: number;
+  chunks_scored: number;
+  top_k_after_threshold: number;
   index_stats: {
     documents: number;
     unique_terms: number;
     size_bytes: number;
   };
+  tokenizer_cache?: {
+    stem_hits: number;
+    stem_misses: number;
+    stem_hit_rate: number;
+    query_hits: number;
+    query_misses: number;
+    query_hit_rate: number;
+  };
 }
 
 export interface LexicalSearchResponse {
@@ -52,6 +60,7 @@ export interface LexicalSearchFilters {
   doc_types: string[];
   languages: string[];
   categories: string[];
+  source_ids: string[];
 }
 
 export interface LexicalSearchPayload {
@@ -6,6 +6,7 @@ export interface SemanticSearchFilters {
   doc_types: string[];
   languages: string[];
   categories: string[];
+  source_ids: string[];
 }
 
 export interface SemanticSearchConfig {
@@ -29,7 +30,7 @@ const defaultConfig: SemanticSearchConfig = {
   mmr_enabled: false,
   mmr_lambda: 0.5,
   default_filters_enabled: false,
-  default_filters: { doc_ids: [], doc_types: [], languages: [], categories: [] },
+  default_filters: { doc_ids: [], doc_types: [], languages: [], categories: [], source_ids: [] },
   prefetch_multiplier: 3,
   debug_default: false,
 };
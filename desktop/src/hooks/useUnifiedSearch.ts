@@ -8,6 +8,7 @@ export interface UnifiedSearchFilters {
   doc_types: string[];
   languages: string[];
   categories: string[];
+  source_ids: string[];
 }
 
 export interface UnifiedSearchPayload {
@@ -298,7 +298,7 @@ export function Chat() {
       conversation_id: urlId || undefined,
       search_type: searchMode,
       alpha: searchMode === "hybrid" ? alphaOverride : undefined,
-      filters: { doc_ids: [], doc_types: [], languages: [], categories: [] },
+      filters: { doc_ids: [], doc_types: [], languages: [], categories: [], source_ids: [] },
       include_debug: debugMode,
     };
     const q = query.trim();
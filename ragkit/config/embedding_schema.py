@@ -20,6 +20,11 @@ class CacheBackend(str, Enum):
     DISK = "disk"
 
 
+class CacheDtype(str, Enum):
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+
+
 class TruncationStrategy(str, Enum):
     START = "start"
     END = "end"
@@ -41,10 +46,16 @@ class EmbeddingConfig(BaseModel):
 
     dimensions: int | None = Field(default=None, ge=64, le=4096)
     batch_size: int = Field(default=100, ge=1, le=2048)
+    # Input tokens per request; 0 uses the provider's documented limit, if any.
+    batch_max_tokens: int = Field(default=0, ge=0, le=1_000_000)
     normalize: bool = True
 
     cache_enabled: bool = True
     cache_backend: CacheBackend = CacheBackend.DISK
+    cache_max_entries: int = Field(default=4096, ge=0, le=1_000_000)
+    cache_max_mb: int = Field(default=64, ge=1, le=4096)
+    cache_disk_max_mb: int = Field(default=1024, ge=16, le=65536)
+    cache_disk_dtype: CacheDtype = CacheDtype.FLOAT32
 
     timeout: int = Field(default=30, ge=5, le=120)
     max_retries: int = Field(default=3, ge=0, le=10)
@@ -113,3 +124,8 @@ class CacheStats(BaseModel):
     size_mb: float
     backend: str
     model_id: str | None = None
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    max_entries: int | None = None
+    max_mb: float | None = None
@@ -3,9 +3,31 @@
 from __future__ import annotations
 
 from enum import Enum
+from typing import Any
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
+# SearchFilters field -> chunk payload keys holding the value it matches (first non-empty wins).
+FILTER_PAYLOAD_KEYS: dict[str, tuple[str, ...]] = {
+    "doc_ids": ("doc_id",),
+    "doc_types": ("doc_type", "file_type"),
+    "languages": ("doc_language", "language"),
+    "categories": ("category",),
+    "source_ids": ("source_id",),
+}
+
+
+def payload_value(payload: dict[str, Any], keys: tuple[str, ...]) -> str | None:
+    """First non-blank value among ``keys`` of a chunk payload, as text."""
+    for key in keys:
+        value = payload.get(key)
+        if value is None:
+            continue
+        text = str(value).strip()
+        if text:
+            return text
+    return None
+
 
 class SearchFilters(BaseModel):
     """Metadata filters available in chat search APIs."""
@@ -14,12 +36,17 @@ class SearchFilters(BaseModel):
     doc_types: list[str] = Field(default_factory=list)
     languages: list[str] = Field(default_factory=list)
     categories: list[str] = Field(default_factory=list)
+    source_ids: list[str] = Field(default_factory=list)
 
-    @field_validator("doc_ids", "doc_types", "languages", "categories")
+    @field_validator("doc_ids", "doc_types", "languages", "categories", "source_ids")
     @classmethod
     def strip_values(cls, values: list[str]) -> list[str]:
         return [value.strip() for value in values if value and value.strip()]
 
+    def active(self) -> dict[str, list[str]]:
+        """Fields that restrict results, with their accepted values."""
+        return {name: getattr(self, name) for name in FILTER_PAYLOAD_KEYS if getattr(self, name)}
+
 
 class SemanticSearchConfig(BaseModel):
     enabled: bool = True
@@ -266,9 +293,12 @@ class LexicalDebugInfo(BaseModel):
     tokenization_latency_ms: int
     search_latency_ms: int
     total_latency_ms: int
-    results_from_index: int
-    results_after_threshold: int
+    # Replace results_from_index/results_after_threshold, which counted every matching chunk:
+    # top-k pruning no longer scores them all.
+    chunks_scored: int
+    top_k_after_threshold: int
     index_stats: dict[str, int]
+    tokenizer_cache: dict[str, float] = Field(default_factory=dict)
 
 
 class LexicalSearchResponseAPI(BaseModel):
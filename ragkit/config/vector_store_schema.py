@@ -32,6 +32,20 @@ class HNSWConfig(BaseModel):
     ef_search: int = Field(default=128, ge=1, le=512)
 
 
+class LocalIndexType(str, Enum):
+    EXACT = "exact"
+    IVF = "ivf"
+
+
+class LocalIndexConfig(BaseModel):
+    """Search index of the embedded local store (ignored by Qdrant/Chroma)."""
+
+    index_type: LocalIndexType = LocalIndexType.EXACT
+    nlist: int = Field(default=0, ge=0, le=65536)  # 0 = about sqrt(collection size)
+    nprobe: int = Field(default=16, ge=1, le=4096)
+    min_points: int = Field(default=20000, ge=0)  # exact search below this size
+
+
 class VectorStoreConfig(BaseModel):
     provider: VectorStoreProvider = VectorStoreProvider.QDRANT
     mode: VectorStoreMode = VectorStoreMode.PERSISTENT
@@ -39,6 +53,7 @@ class VectorStoreConfig(BaseModel):
     collection_name: str = Field(default="loko_default", pattern=r"^[a-z0-9_-]{1,63}$")
     distance_metric: DistanceMetric = DistanceMetric.COSINE
     hnsw: HNSWConfig = Field(default_factory=HNSWConfig)
+    local_index: LocalIndexConfig = Field(default_factory=LocalIndexConfig)
     snapshot_retention: int = Field(default=5, ge=1, le=30)
 
     @field_validator("path")
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Any
 
+# Documents fetched at once by the default :meth:`BaseConnector.fetch_documents_content`.
+_BULK_FETCH_CONCURRENCY = 8
+
 
 @dataclass
 class ConnectorDocument:
@@ -84,6 +88,10 @@ class BaseConnector(ABC):
         Secrets retrieved from the system keyring, or ``None``.
     """
 
+    lists_for_changes: bool = True
+    """Whether :meth:`detect_changes` compares a full :meth:`list_documents`
+    with *known_hashes*; connectors reading a change feed set it to ``False``."""
+
     def __init__(
         self,
         source_id: str,
@@ -137,6 +145,34 @@ class BaseConnector(ABC):
     # Optional overrides
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def diff_listing(
+        docs: list[ConnectorDocument],
+        known_hashes: dict[str, str],
+    ) -> ConnectorChangeDetection:
+        """The delta between a full listing and *known_hashes*."""
+        current_ids = {doc.id for doc in docs}
+        return ConnectorChangeDetection(
+            added=[doc for doc in docs if doc.id not in known_hashes],
+            modified=[doc for doc in docs if doc.id in known_hashes and doc.content_hash != known_hashes[doc.id]],
+            removed_ids=[doc_id for doc_id in known_hashes if doc_id not in current_ids],
+        )
+
+    async def count_documents(self) -> int:
+        """Number of documents in the source; connectors that can count without listing override it."""
+        return len(await self.list_documents())
+
+    async def fetch_documents_content(self, doc_ids: list[str]) -> dict[str, str | Exception]:
+        """Text of several documents; a document that could not be fetched maps to its exception."""
+        semaphore = asyncio.Semaphore(_BULK_FETCH_CONCURRENCY)
+
+        async def fetch(doc_id: str) -> str:
+            async with semaphore:
+                return await self.fetch_document_content(doc_id)
+
+        results = await asyncio.gather(*(fetch(doc_id) for doc_id in doc_ids), return_exceptions=True)
+        return dict(zip(doc_ids, results))
+
     def supported_file_types(self) -> list[str]:
         """File extensions this connector can handle (informational)."""
         return []
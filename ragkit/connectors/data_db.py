@@ -0,0 +1,57 @@
+"""Small SQLite stores kept in the app data directory.
+
+File hashes, web crawl state and SQL sync marks each live in their own
+database file. :class:`DataDb` holds what they share (the path, a lock
+serializing access from worker threads, connections) and
+:func:`open_data_db` keeps one process-wide instance per file, reopened
+when the data directory changes.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from ragkit.desktop import settings_store
+
+logger = logging.getLogger(__name__)
+
+
+class DataDb:
+    """A SQLite file whose tables are created by :meth:`_create_tables`."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as con:
+            self._create_tables(con)
+
+    def _create_tables(self, con: sqlite3.Connection) -> None:
+        raise NotImplementedError
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.path))
+
+
+DataDbT = TypeVar("DataDbT", bound=DataDb)
+
+_OPEN: dict[str, Any] = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def open_data_db(name: str, factory: Callable[[Path], DataDbT]) -> DataDbT | None:
+    """Process-wide ``factory(<data dir>/<name>)``, or ``None`` if it cannot be opened."""
+    path = settings_store.get_data_dir() / name
+    with _OPEN_LOCK:
+        db = _OPEN.get(name)
+        if db is None or db.path != path:
+            try:
+                db = _OPEN[name] = factory(path)
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning("%s unavailable: %s", name, exc)
+                return None
+        return db
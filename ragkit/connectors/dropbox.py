@@ -17,7 +17,7 @@ from ragkit.connectors.base import (
 )
 from ragkit.connectors.credentials import CredentialManager
 from ragkit.connectors.registry import register_connector
-from ragkit.desktop import documents
+from ragkit.desktop import parsed_cache
 from ragkit.desktop.models import SourceType
 
 try:  # optional dependency
@@ -35,6 +35,9 @@ logger = logging.getLogger(__name__)
 class DropboxConnector(BaseConnector):
     """Connector for Dropbox API."""
 
+    # Changes come from the Dropbox list_folder cursor.
+    lists_for_changes = False
+
     def __init__(self, source_id: str, config: dict[str, Any], credential: dict[str, Any] | None = None) -> None:
         super().__init__(source_id, config, credential)
         self._doc_cache: dict[str, FileMetadata] = {}
@@ -259,7 +262,7 @@ class DropboxConnector(BaseConnector):
             tmp.write(data)
             tmp_path = Path(tmp.name)
         try:
-            parsed = documents._extract_content(tmp_path)
+            parsed = parsed_cache.extract_content(tmp_path, hashlib.sha256(data).hexdigest())
             return parsed.text
         finally:
             try:
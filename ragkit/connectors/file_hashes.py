@@ -0,0 +1,76 @@
+"""Persistent content-hash cache for local files.
+
+Change detection needs a SHA-256 of every file in a source, but most
+files are unchanged between scans. Digests are stored in SQLite keyed by
+absolute path and reused while the file's size and ``st_mtime_ns`` still
+match; only new or touched files are read again, in fixed-size blocks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+
+from ragkit.connectors.data_db import DataDb, open_data_db
+
+_BLOCK_SIZE = 1024 * 1024
+_SQL_BATCH = 500
+
+
+def sha256_file(path: Path, block_size: int = _BLOCK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while block := handle.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileHashCache(DataDb):
+    def _create_tables(self, con: sqlite3.Connection) -> None:
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            )
+            """
+        )
+
+    def hash_files(self, files: list[tuple[Path, os.stat_result]]) -> list[str]:
+        """Digest of each ``(path, stat)``, reading only files whose stat changed."""
+        keys = [str(path) for path, _ in files]
+        known: dict[str, tuple[int, int, str]] = {}
+        with self._lock, self._connect() as con:
+            for start in range(0, len(keys), _SQL_BATCH):
+                chunk = keys[start : start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                for path, size, mtime_ns, digest in con.execute(
+                    f"SELECT path, size, mtime_ns, sha256 FROM file_hashes WHERE path IN ({placeholders})", chunk
+                ):
+                    known[path] = (size, mtime_ns, digest)
+
+        digests: list[str] = []
+        updates: list[tuple[str, int, int, str]] = []
+        for key, (path, stat) in zip(keys, files):
+            cached = known.get(key)
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                digests.append(cached[2])
+                continue
+            digest = sha256_file(path)
+            digests.append(digest)
+            updates.append((key, stat.st_size, stat.st_mtime_ns, digest))
+
+        if updates:
+            with self._lock, self._connect() as con:
+                con.executemany(
+                    "INSERT OR REPLACE INTO file_hashes(path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)", updates
+                )
+        return digests
+
+
+def file_hash_cache() -> FileHashCache | None:
+    return open_data_db("file_hashes.db", FileHashCache)
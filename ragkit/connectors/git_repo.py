@@ -32,6 +32,9 @@ logger = logging.getLogger(__name__)
 class GitRepoConnector(BaseConnector):
     """Clone and index files from a Git repository."""
 
+    # Changes come from the files touched by the last pull.
+    lists_for_changes = False
+
     def __init__(self, source_id: str, config: dict[str, Any], credential: dict[str, Any] | None = None) -> None:
         super().__init__(source_id, config, credential)
         self._doc_cache: dict[str, ConnectorDocument] = {}
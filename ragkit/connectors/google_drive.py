@@ -17,7 +17,7 @@ from ragkit.connectors.base import (
 )
 from ragkit.connectors.credentials import CredentialManager
 from ragkit.connectors.registry import register_connector
-from ragkit.desktop import documents
+from ragkit.desktop import parsed_cache
 from ragkit.desktop.models import SourceType
 
 try:  # optional dependencies
@@ -325,7 +325,7 @@ class GoogleDriveConnector(BaseConnector):
             tmp.write(data)
             tmp_path = Path(tmp.name)
         try:
-            parsed = documents._extract_content(tmp_path)
+            parsed = parsed_cache.extract_content(tmp_path, hashlib.sha256(data).hexdigest())
             return parsed.text
         finally:
             try:
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import os
+from collections.abc import Iterable
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from ragkit.connectors.base import (
     BaseConnector,
@@ -12,14 +16,31 @@ from ragkit.connectors.base import (
     ConnectorDocument,
     ConnectorValidationResult,
 )
+from ragkit.connectors.file_hashes import file_hash_cache, sha256_file
 from ragkit.connectors.registry import register_connector
 from ragkit.desktop import documents
 from ragkit.desktop.models import SourceType
 
+if TYPE_CHECKING:
+    from ragkit.desktop.parsing_executor import ParsingExecutor
+
 
 @register_connector(SourceType.LOCAL_DIRECTORY)
 class LocalDirectoryConnector(BaseConnector):
-    """Scans and extracts text from a local file system directory."""
+    """Scans and extracts text from a local file system directory.
+
+    Each scan refreshes a ``doc_id -> document`` index, so resolving a
+    document for ``fetch_document_content`` does not walk the tree again.
+    When ``parsing_executor`` is set, files are parsed in its worker processes
+    and through its parsed-content cache.
+    """
+
+    def __init__(self, source_id: str, config: dict[str, Any], credential: dict[str, Any] | None = None) -> None:
+        super().__init__(source_id, config, credential)
+        self._index: dict[str, ConnectorDocument] | None = None
+        self._scan_lock = asyncio.Lock()
+        self._scans = 0
+        self.parsing_executor: ParsingExecutor | None = None
 
     @property
     def _root(self) -> Path:
@@ -72,32 +93,58 @@ class LocalDirectoryConnector(BaseConnector):
         return await self.validate_config()
 
     async def list_documents(self) -> list[ConnectorDocument]:
+        async with self._scan_lock:
+            return await self._rescan()
+
+    async def _rescan(self) -> list[ConnectorDocument]:
+        docs = await asyncio.to_thread(self._scan)
+        self._index = {doc.id: doc for doc in docs}
+        self._scans += 1
+        return docs
+
+    async def list_paths(self, relative_paths: Iterable[str]) -> list[ConnectorDocument]:
+        """Documents at or below ``relative_paths`` of the source, without scanning the rest of it.
+
+        The documents join the scan index, so they can be fetched without a full rescan.
+        """
+        relative_paths = list(relative_paths)
+        async with self._scan_lock:
+            docs = await asyncio.to_thread(self._scan, relative_paths)
+            if self._index is None:
+                self._index = {}
+            self._index.update((doc.id, doc) for doc in docs)
+        return docs
+
+    def _scan(self, relative_paths: list[str] | None = None) -> list[ConnectorDocument]:
         root = self._root
         if not root.exists() or not root.is_dir():
             return []
 
         selected_extensions = {documents._normalize_extension(ext) for ext in self._file_types}
-        result = []
+        files: list[tuple[Path, os.stat_result]] = []
 
-        for file_path in documents._iter_files(
-            root,
-            recursive=self._recursive,
-            excluded_dirs=self._excluded_dirs,
-            exclusion_patterns=self._exclusion_patterns,
-            max_file_size_mb=self._max_file_size_mb,
-        ):
+        filters = (self._recursive, self._excluded_dirs, self._exclusion_patterns, self._max_file_size_mb)
+        if relative_paths is None:
+            candidates = documents._iter_files(root, *filters)
+        else:
+            candidates = documents._iter_files_under(root, relative_paths, *filters)
+        for file_path in candidates:
             ext = documents._normalize_extension(file_path.suffix)
             if ext not in selected_extensions:
                 continue
+            files.append((file_path, file_path.stat()))
 
-            rel_path = file_path.relative_to(root).as_posix()
-            stat = file_path.stat()
-            # We use an empty content string here, it will be fetched on demand.
-            # The hash is based on the file contents exactly as `detect_changes` did previously.
-            content_hash = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        # Unchanged files (same size and mtime) reuse their stored digest instead of being re-read.
+        hash_cache = file_hash_cache()
+        if hash_cache is not None:
+            hashes = hash_cache.hash_files(files)
+        else:
+            hashes = [sha256_file(file_path) for file_path, _ in files]
 
+        result = []
+        for (file_path, stat), content_hash in zip(files, hashes):
+            rel_path = file_path.relative_to(root).as_posix()
             doc_id = hashlib.sha256(f"{self.source_id}:{rel_path}".encode("utf-8")).hexdigest()
-
             result.append(
                 ConnectorDocument(
                     id=doc_id,
@@ -106,7 +153,7 @@ class LocalDirectoryConnector(BaseConnector):
                     content="",
                     content_type="text",
                     file_path=rel_path,
-                    file_type=ext,
+                    file_type=documents._normalize_extension(file_path.suffix),
                     file_size_bytes=stat.st_size,
                     last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat(),
                     content_hash=content_hash,
@@ -116,15 +163,22 @@ class LocalDirectoryConnector(BaseConnector):
         return result
 
     async def fetch_document_content(self, doc_id: str) -> str:
-        # Given a doc_id, we need to find the corresponding file.
-        # Since list_documents reads all files anyway (to compute hashes),
-        # we can just call it to resolve the path.
-        docs = await self.list_documents()
-        for doc in docs:
-            if doc.id == doc_id and doc.file_path:
-                file_path = self._root / doc.file_path
-                parsed = documents._extract_content(file_path)
-                return parsed.text
+        # Resolve through the index of the last scan; rescan once for ids it does not know yet.
+        scans = self._scans
+        doc = self._index.get(doc_id) if self._index is not None else None
+        if doc is None:
+            async with self._scan_lock:
+                # Concurrent fetches share one rescan rather than each walking the tree.
+                if self._scans == scans:
+                    await self._rescan()
+            doc = (self._index or {}).get(doc_id)
+        if doc is not None and doc.file_path:
+            file_path = self._root / doc.file_path
+            if self.parsing_executor is not None:
+                return (await self.parsing_executor.parse(file_path, doc.content_hash or None)).text
+            # Parsing is CPU-bound; keep the event loop free for other pipeline stages.
+            parsed = await asyncio.to_thread(documents._extract_content, file_path)
+            return parsed.text
 
         raise FileNotFoundError(f"Document ID {doc_id} not found in source.")
 
@@ -132,25 +186,7 @@ class LocalDirectoryConnector(BaseConnector):
         self,
         known_hashes: dict[str, str],
     ) -> ConnectorChangeDetection:
-        current_docs = await self.list_documents()
-        current_by_id = {doc.id: doc for doc in current_docs}
-
-        added = []
-        modified = []
-
-        for doc in current_docs:
-            if doc.id not in known_hashes:
-                added.append(doc)
-            elif doc.content_hash != known_hashes[doc.id]:
-                modified.append(doc)
-
-        removed_ids = [doc_id for doc_id in known_hashes if doc_id not in current_by_id]
-
-        return ConnectorChangeDetection(
-            added=added,
-            modified=modified,
-            removed_ids=removed_ids,
-        )
+        return self.diff_listing(await self.list_documents(), known_hashes)
 
     def supported_file_types(self) -> list[str]:
         return list(documents.SUPPORTED_FILE_TYPES)
@@ -19,7 +19,7 @@ from ragkit.connectors.base import (
 )
 from ragkit.connectors.credentials import CredentialManager
 from ragkit.connectors.registry import register_connector
-from ragkit.desktop import documents
+from ragkit.desktop import parsed_cache
 from ragkit.desktop.models import SourceType
 
 
@@ -30,6 +30,9 @@ logger = logging.getLogger(__name__)
 class OneDriveConnector(BaseConnector):
     """Connector for OneDrive and SharePoint libraries."""
 
+    # Changes come from the Graph delta link once one is stored.
+    lists_for_changes = False
+
     GRAPH_BASE = "https://graph.microsoft.com/v1.0"
 
     def __init__(self, source_id: str, config: dict[str, Any], credential: dict[str, Any] | None = None) -> None:
@@ -277,7 +280,7 @@ class OneDriveConnector(BaseConnector):
             tmp.write(data)
             tmp_path = Path(tmp.name)
         try:
-            parsed = documents._extract_content(tmp_path)
+            parsed = parsed_cache.extract_content(tmp_path, hashlib.sha256(data).hexdigest())
             return parsed.text
         finally:
             try:
@@ -0,0 +1,151 @@
+"""Per-run connector session.
+
+An ingestion run used to build a new connector for change detection, another
+to count documents and a third to fetch content, each listing the source
+again; web and SQL connectors even re-crawled or re-queried on their first
+fetch because their document cache was empty. A :class:`ConnectorSession`
+creates each connector once and keeps the first listing of every source as
+a snapshot, which change detection, counting and fetching then share.
+
+Once the run has planned its fetches, content is read per source in windows
+of ``_FETCH_WINDOW`` documents through
+:meth:`~ragkit.connectors.base.BaseConnector.fetch_documents_content`, so
+connectors with a bulk path (one SQL query, one crawl) use it while the
+pipeline still asks for one document at a time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from ragkit.connectors.base import BaseConnector, ConnectorChangeDetection, ConnectorDocument
+from ragkit.connectors.local_directory import LocalDirectoryConnector
+from ragkit.connectors.registry import create_connector
+from ragkit.desktop.models import SourceEntry
+
+logger = logging.getLogger(__name__)
+
+CredentialLookup = Callable[[SourceEntry], "dict[str, Any] | None"]
+
+# Planned documents of one source fetched by a single bulk call.
+_FETCH_WINDOW = 16
+
+
+class ConnectorSession:
+    """Connectors of the given sources, each listing its source at most once."""
+
+    def __init__(self, sources: list[SourceEntry], credential: CredentialLookup | None = None) -> None:
+        self.sources = {source.id: source for source in sources}
+        self._credential = credential
+        self._connectors: dict[str, BaseConnector] = {}
+        self._snapshots: dict[str, dict[str, ConnectorDocument]] = {}
+        self._seen: dict[str, ConnectorDocument] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._planned: dict[str, list[str]] = {}
+        self._plan_position: dict[str, int] = {}
+        self._fetches: dict[str, asyncio.Task[dict[str, str | Exception]]] = {}
+        self.listings = 0
+
+    def connector(self, source_id: str) -> BaseConnector:
+        connector = self._connectors.get(source_id)
+        if connector is None:
+            source = self.sources[source_id]
+            credential = self._credential(source) if self._credential is not None else None
+            connector = create_connector(source.type, source.id, source.config, credential)
+            self._connectors[source_id] = connector
+        return connector
+
+    def connectors(self) -> list[BaseConnector]:
+        """Connectors created so far."""
+        return list(self._connectors.values())
+
+    async def snapshot(self, source_id: str) -> list[ConnectorDocument]:
+        """Every document of the source, listed on the first call only."""
+        lock = self._locks.setdefault(source_id, asyncio.Lock())
+        async with lock:
+            if source_id not in self._snapshots:
+                docs = await self.connector(source_id).list_documents()
+                self.listings += 1
+                self._snapshots[source_id] = {doc.id: doc for doc in docs}
+                self._seen.update(self._snapshots[source_id])
+        return list(self._snapshots[source_id].values())
+
+    async def count(self, source_id: str) -> int:
+        if source_id in self._snapshots:
+            return len(self._snapshots[source_id])
+        connector = self.connector(source_id)
+        # Connectors that detect changes without a listing are not made to list just to be counted.
+        if not connector.lists_for_changes:
+            return await connector.count_documents()
+        return len(await self.snapshot(source_id))
+
+    async def detect_changes(self, source_id: str, known_hashes: dict[str, str]) -> ConnectorChangeDetection:
+        connector = self.connector(source_id)
+        if connector.lists_for_changes:
+            return connector.diff_listing(await self.snapshot(source_id), known_hashes)
+        delta = await connector.detect_changes(known_hashes)
+        self._seen.update((doc.id, doc) for doc in [*delta.added, *delta.modified])
+        return delta
+
+    async def detect_path_changes(
+        self,
+        source_id: str,
+        relative_paths: set[str],
+        known_hashes: dict[str, str],
+    ) -> ConnectorChangeDetection:
+        """Changes below ``relative_paths`` of a local directory, whose other files are not scanned.
+
+        ``known_hashes`` must only hold the documents below those paths.
+        """
+        connector = self.connector(source_id)
+        if not isinstance(connector, LocalDirectoryConnector):
+            raise TypeError(f"Source {source_id} is not a local directory.")
+        docs = await connector.list_paths(sorted(relative_paths))
+        self._seen.update((doc.id, doc) for doc in docs)
+        return connector.diff_listing(docs, known_hashes)
+
+    async def document(self, source_id: str, doc_id: str) -> ConnectorDocument | None:
+        """The document as listed or reported changed during this session."""
+        doc = self._seen.get(doc_id)
+        if doc is None:
+            await self.snapshot(source_id)
+            doc = self._seen.get(doc_id)
+        return doc
+
+    def plan_fetches(self, documents: list[tuple[str, str]]) -> None:
+        """``(source_id, doc_id)`` pairs :meth:`fetch_content` will be asked for, roughly in this order."""
+        self._planned = {}
+        self._plan_position = {}
+        for source_id, doc_id in documents:
+            planned = self._planned.setdefault(source_id, [])
+            self._plan_position[doc_id] = len(planned)
+            planned.append(doc_id)
+
+    async def fetch_content(self, source_id: str, doc_id: str) -> str:
+        """Text of a document; a planned one is fetched in bulk with the next planned ones of its source."""
+        fetch = self._fetches.pop(doc_id, None)
+        if fetch is None:
+            position = self._plan_position.pop(doc_id, None)
+            if position is None:
+                return await self.connector(source_id).fetch_document_content(doc_id)
+            window = [doc_id]
+            for planned in self._planned[source_id][position + 1 :]:
+                if len(window) == _FETCH_WINDOW:
+                    break
+                if self._plan_position.pop(planned, None) is not None:
+                    window.append(planned)
+            fetch = asyncio.ensure_future(self.fetch_many(source_id, window))
+            # Documents whose turn never comes (cancelled run) must not leave an unretrieved exception.
+            fetch.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._fetches.update((planned, fetch) for planned in window[1:])
+        # A caller that times out must not cancel the fetch the other documents of the window wait on.
+        result = (await asyncio.shield(fetch))[doc_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def fetch_many(self, source_id: str, doc_ids: list[str]) -> dict[str, str | Exception]:
+        return await self.connector(source_id).fetch_documents_content(doc_ids)
@@ -1,12 +1,21 @@
-"""Connector for SQL databases (PostgreSQL/MySQL/SQLite)."""
+"""Connector for SQL databases (PostgreSQL/MySQL/SQLite).
+
+Rows are streamed from a server-side cursor in batches of ``_FETCH_BATCH``
+rather than loaded at once. With an ``incremental_column``, change detection
+only reads the rows at or above the source's high-water mark (see
+:mod:`ragkit.connectors.sql_sync_state`) and finds deleted rows with a query
+returning nothing but the ids.
+"""
 
 from __future__ import annotations
 
 import asyncio
 import hashlib
+import json
 import logging
 import re
 import sqlite3
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -28,11 +37,15 @@ from ragkit.connectors.base import (
     ConnectorValidationResult,
 )
 from ragkit.connectors.registry import register_connector
+from ragkit.connectors.sql_sync_state import SyncState, sql_sync_state
 from ragkit.desktop.models import SourceType
 
 
 logger = logging.getLogger(__name__)
 
+# Rows read from the cursor at a time.
+_FETCH_BATCH = 500
+
 
 @register_connector(SourceType.SQL_DATABASE)
 class SqlDatabaseConnector(BaseConnector):
@@ -41,6 +54,9 @@ class SqlDatabaseConnector(BaseConnector):
     def __init__(self, source_id: str, config: dict[str, Any], credential: dict[str, Any] | None = None) -> None:
         super().__init__(source_id, config, credential)
         self._doc_cache: dict[str, ConnectorDocument] = {}
+        self._present_ids: set[str] | None = None
+        # Incremental sources read a window of rows and an id listing instead of every row.
+        self.lists_for_changes = self._incremental_column() is None
 
     # ------------------------------------------------------------------
     # Config helpers
@@ -136,56 +152,15 @@ class SqlDatabaseConnector(BaseConnector):
                 logger.warning("SqlDatabaseConnector validation failed: %s", validation.errors)
             return []
 
-        db_type = self._db_type()
-        rows: list[dict[str, Any]] = []
-        if db_type == "sqlite":
-            rows = await asyncio.to_thread(self._fetch_sqlite_rows)
-        else:
-            rows = await self._fetch_remote_rows()
-
         documents: list[ConnectorDocument] = []
         self._doc_cache = {}
-        max_rows = self._max_rows()
-        id_col = self._id_column()
-        content_col = self._content_column()
-        title_col = self._title_column()
-        metadata_cols = self._metadata_columns()
-        incremental_col = self._incremental_column()
-
-        for row in rows[:max_rows]:
-            raw_id = row.get(id_col)
-            content = row.get(content_col)
-            if raw_id is None:
-                continue
-            raw_id_str = str(raw_id)
-            content_text = "" if content is None else str(content)
-            title = str(row.get(title_col)) if title_col and row.get(title_col) is not None else f"Row {raw_id_str}"
-
-            metadata = {col: row.get(col) for col in metadata_cols if col in row}
-            last_modified = row.get(incremental_col) if incremental_col and incremental_col in row else None
-            if not last_modified:
-                last_modified = datetime.now(timezone.utc).isoformat()
-
-            doc_id = hashlib.sha256(f"{self.source_id}:{raw_id_str}".encode("utf-8")).hexdigest()
-            content_hash = hashlib.sha256(content_text.encode("utf-8")).hexdigest()
-
-            doc = ConnectorDocument(
-                id=doc_id,
-                source_id=self.source_id,
-                title=title,
-                content=content_text,
-                content_type="text",
-                url=None,
-                file_path=raw_id_str,
-                file_type="sql",
-                file_size_bytes=len(content_text.encode("utf-8")),
-                last_modified=str(last_modified),
-                metadata=metadata,
-                content_hash=content_hash,
-            )
-            documents.append(doc)
-            self._doc_cache[doc_id] = doc
-
+        async for rows in self._stream_rows(self._apply_limit(self._query(), self._max_rows())):
+            for row in rows:
+                doc = self._row_document(row)
+                if doc is not None:
+                    documents.append(doc)
+                    self._doc_cache[doc.id] = doc
+        self._present_ids = {doc.id for doc in documents}
         return documents
 
     async def fetch_document_content(self, doc_id: str) -> str:
@@ -198,12 +173,63 @@ class SqlDatabaseConnector(BaseConnector):
                 return doc.content
         raise FileNotFoundError(f"Document ID {doc_id} not found in SQL source.")
 
+    async def fetch_documents_content(self, doc_ids: list[str]) -> dict[str, str | Exception]:
+        # Rows not seen yet are resolved by a single new run of the query.
+        if any(doc_id not in self._doc_cache for doc_id in doc_ids):
+            await self.list_documents()
+        return {
+            doc_id: self._doc_cache[doc_id].content
+            if doc_id in self._doc_cache
+            else FileNotFoundError(f"Document ID {doc_id} not found in SQL source.")
+            for doc_id in doc_ids
+        }
+
+    async def count_documents(self) -> int:
+        if self._present_ids is None:
+            if not (await self.validate_config()).valid:
+                return 0
+            self._present_ids = await self._read_present_ids()
+        return len(self._present_ids)
+
     async def detect_changes(self, known_hashes: dict[str, str]) -> ConnectorChangeDetection:
-        docs = await self.list_documents()
-        current_by_id = {doc.id: doc for doc in docs}
+        incremental_col = self._incremental_column()
+        if incremental_col is None or not (await self.validate_config()).valid:
+            return self.diff_listing(await self.list_documents(), known_hashes)
+
+        store = sql_sync_state()
+        query_key = self._query_key()
+        state = await asyncio.to_thread(store.load, self.source_id, query_key) if store is not None else SyncState()
+
+        present = await self._read_present_ids()
+        self._present_ids = present
+        # The last window counts as ingested once the registry holds its rows or they are gone.
+        if all(
+            known_hashes.get(doc_id) == content_hash or doc_id not in present
+            for doc_id, content_hash in state.pending.items()
+        ):
+            if state.next_mark is not None:
+                state.mark = state.next_mark
+            state.pending = {}
+
+        query, params = self._window_query(state.mark)
+        docs, next_mark = await self._read_window(query, params, present, state.mark)
+        read = {doc.id for doc in docs}
+        if any(doc_id not in known_hashes and doc_id not in read for doc_id in present):
+            # Rows below the mark that were never ingested: the mark cannot be trusted, read everything.
+            docs, next_mark = await self._read_window(self._base_query(), (), present, None)
+
         added = [doc for doc in docs if doc.id not in known_hashes]
         modified = [doc for doc in docs if doc.id in known_hashes and doc.content_hash != known_hashes[doc.id]]
-        removed_ids = [doc_id for doc_id in known_hashes if doc_id not in current_by_id]
+        removed_ids = [doc_id for doc_id in known_hashes if doc_id not in present]
+        for doc in [*added, *modified]:
+            self._doc_cache[doc.id] = doc
+
+        state.pending = {doc.id: doc.content_hash for doc in [*added, *modified]}
+        state.next_mark = next_mark
+        if not state.pending:
+            state.mark = next_mark
+        if store is not None:
+            await asyncio.to_thread(store.save, self.source_id, query_key, state)
         return ConnectorChangeDetection(added=added, modified=modified, removed_ids=removed_ids)
 
     def supported_file_types(self) -> list[str]:
@@ -247,30 +273,147 @@ class SqlDatabaseConnector(BaseConnector):
                 return None
             return [desc[0] for desc in cur.description]
 
-    def _fetch_sqlite_rows(self) -> list[dict[str, Any]]:
+    def _row_document(self, row: dict[str, Any]) -> ConnectorDocument | None:
+        raw_id = row.get(self._id_column())
+        if raw_id is None:
+            return None
+        raw_id_str = str(raw_id)
+        content = row.get(self._content_column())
+        content_text = "" if content is None else str(content)
+        title_col = self._title_column()
+        title = str(row.get(title_col)) if title_col and row.get(title_col) is not None else f"Row {raw_id_str}"
+
+        metadata = {col: row.get(col) for col in self._metadata_columns() if col in row}
+        incremental_col = self._incremental_column()
+        last_modified = row.get(incremental_col) if incremental_col and incremental_col in row else None
+        if not last_modified:
+            last_modified = datetime.now(timezone.utc).isoformat()
+
+        return ConnectorDocument(
+            id=self._doc_id(raw_id_str),
+            source_id=self.source_id,
+            title=title,
+            content=content_text,
+            content_type="text",
+            url=None,
+            file_path=raw_id_str,
+            file_type="sql",
+            file_size_bytes=len(content_text.encode("utf-8")),
+            last_modified=str(last_modified),
+            metadata=metadata,
+            content_hash=hashlib.sha256(content_text.encode("utf-8")).hexdigest(),
+        )
+
+    def _doc_id(self, raw_id: str) -> str:
+        return hashlib.sha256(f"{self.source_id}:{raw_id}".encode("utf-8")).hexdigest()
+
+    def _query_key(self) -> str:
+        """Identity of the rows the high-water mark refers to; another query starts from scratch."""
+        parts = [
+            self._db_type(),
+            self._sqlite_path() or "",
+            str(self.config.get("host") or ""),
+            str(self.config.get("database") or ""),
+            self._query(),
+            self._id_column(),
+            self._content_column(),
+            self._incremental_column() or "",
+        ]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    async def _read_present_ids(self) -> set[str]:
+        """Document ids of the rows the query currently returns, without reading their content."""
+        id_col = self._quote(self._id_column())
+        query = f"SELECT ragkit_rows.{id_col} FROM ({self._base_query()}) AS ragkit_rows LIMIT {self._max_rows()}"
+        present: set[str] = set()
+        async for rows in self._stream_rows(query):
+            for row in rows:
+                raw_id = next(iter(row.values()), None)
+                if raw_id is not None:
+                    present.add(self._doc_id(str(raw_id)))
+        return present
+
+    async def _read_window(
+        self,
+        query: str,
+        params: tuple[Any, ...],
+        present: set[str],
+        mark: Any,
+    ) -> tuple[list[ConnectorDocument], Any]:
+        """Documents of the rows ``query`` returns among ``present``, and the largest incremental value seen."""
+        incremental_col = self._incremental_column()
+        docs: list[ConnectorDocument] = []
+        next_mark = mark
+        async for rows in self._stream_rows(query, params):
+            for row in rows:
+                doc = self._row_document(row)
+                if doc is None or doc.id not in present:
+                    continue
+                docs.append(doc)
+                value = row.get(incremental_col) if incremental_col else None
+                if value is not None:
+                    try:
+                        if next_mark is None or value > next_mark:
+                            next_mark = value
+                    except TypeError:
+                        logger.warning("Incomparable values in incremental column %s: %r", incremental_col, value)
+        return docs, next_mark
+
+    def _window_query(self, mark: Any) -> tuple[str, tuple[Any, ...]]:
+        """The query restricted to rows at or above ``mark``, with the condition evaluated by the database.
+
+        Rows at the mark are read again: a row updated to the same incremental
+        value as the mark would otherwise never be seen. Unchanged ones are
+        filtered out by their hash.
+        """
+        if mark is None:
+            return self._base_query(), ()
+        column = self._quote(self._incremental_column() or "")
+        placeholder = {"sqlite": "?", "postgresql": "$1"}.get(self._db_type(), "%s")
+        base = self._base_query()
+        if self._db_type() == "mysql":
+            # aiomysql interpolates parameters with %, so literal ones in the user query are escaped.
+            base = base.replace("%", "%%")
+        query = f"SELECT * FROM ({base}) AS ragkit_rows WHERE ragkit_rows.{column} >= {placeholder}"
+        return query, (mark,)
+
+    def _quote(self, identifier: str) -> str:
+        if self._db_type() == "mysql":
+            return "`" + identifier.replace("`", "``") + "`"
+        return '"' + identifier.replace('"', '""') + '"'
+
+    async def _stream_rows(self, query: str, params: tuple[Any, ...] = ()) -> AsyncIterator[list[dict[str, Any]]]:
+        """Rows of ``query`` in batches of ``_FETCH_BATCH``, read from a server-side cursor."""
+        db_type = self._db_type()
+        if db_type == "sqlite":
+            stream = self._stream_sqlite_rows(query, params)
+        elif db_type == "postgresql" and asyncpg is not None:
+            stream = self._stream_postgres_rows(query, params)
+        elif db_type == "mysql" and aiomysql is not None:
+            stream = self._stream_mysql_rows(query, params)
+        else:
+            return
+        async for rows in stream:
+            yield rows
+
+    async def _stream_sqlite_rows(self, query: str, params: tuple[Any, ...]) -> AsyncIterator[list[dict[str, Any]]]:
         sqlite_path = self._sqlite_path()
         if not sqlite_path:
-            return []
-        query = self._apply_limit(self._query(), self._max_rows())
-        with sqlite3.connect(sqlite_path) as con:
+            return
+
+        def open_cursor() -> tuple[sqlite3.Connection, sqlite3.Cursor]:
+            con = sqlite3.connect(sqlite_path, check_same_thread=False)
             con.row_factory = sqlite3.Row
-            cur = con.execute(query)
-            return [dict(row) for row in cur.fetchall()]
+            return con, con.execute(query, params)
 
-    async def _fetch_remote_rows(self) -> list[dict[str, Any]]:
-        db_type = self._db_type()
-        if db_type == "postgresql":
-            if asyncpg is None:
-                return []
-            return await self._fetch_postgres_rows()
-        if db_type == "mysql":
-            if aiomysql is None:
-                return []
-            return await self._fetch_mysql_rows()
-        return []
-
-    async def _fetch_postgres_rows(self) -> list[dict[str, Any]]:
-        query = self._apply_limit(self._query(), self._max_rows())
+        con, cur = await asyncio.to_thread(open_cursor)
+        try:
+            while rows := await asyncio.to_thread(cur.fetchmany, _FETCH_BATCH):
+                yield [dict(row) for row in rows]
+        finally:
+            con.close()
+
+    async def _stream_postgres_rows(self, query: str, params: tuple[Any, ...]) -> AsyncIterator[list[dict[str, Any]]]:
         cred = self.credential or {}
         conn = await asyncpg.connect(
             user=cred.get("username"),
@@ -280,13 +423,15 @@ class SqlDatabaseConnector(BaseConnector):
             database=self.config.get("database"),
         )
         try:
-            records = await conn.fetch(query)
-            return [dict(record) for record in records]
+            # asyncpg cursors only exist within a transaction.
+            async with conn.transaction():
+                cursor = await conn.cursor(query, *params)
+                while records := await cursor.fetch(_FETCH_BATCH):
+                    yield [dict(record) for record in records]
         finally:
             await conn.close()
 
-    async def _fetch_mysql_rows(self) -> list[dict[str, Any]]:
-        query = self._apply_limit(self._query(), self._max_rows())
+    async def _stream_mysql_rows(self, query: str, params: tuple[Any, ...]) -> AsyncIterator[list[dict[str, Any]]]:
         cred = self.credential or {}
         conn = await aiomysql.connect(
             user=cred.get("username"),
@@ -296,14 +441,19 @@ class SqlDatabaseConnector(BaseConnector):
             db=self.config.get("database"),
         )
         try:
-            async with conn.cursor(aiomysql.DictCursor) as cur:
-                await cur.execute(query)
-                return list(await cur.fetchall())
+            # An unbuffered cursor keeps the result set on the server between batches.
+            async with conn.cursor(aiomysql.SSDictCursor) as cur:
+                await cur.execute(query, params or None)
+                while rows := await cur.fetchmany(_FETCH_BATCH):
+                    yield list(rows)
         finally:
             conn.close()
 
+    def _base_query(self) -> str:
+        return self._query().rstrip().rstrip(";")
+
     def _apply_limit(self, query: str, limit: int | None) -> str:
         base = query.rstrip().rstrip(";")
         if limit is None:
             return base
-        return f"SELECT * FROM ({base}) LIMIT {int(limit)}"
+        return f"SELECT * FROM ({base}) AS ragkit_rows LIMIT {int(limit)}"
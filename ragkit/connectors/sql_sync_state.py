@@ -0,0 +1,121 @@
+"""Persistent high-water marks of incremental SQL sources.
+
+A SQL source with an ``incremental_column`` only reads the rows whose value
+in that column is at or above the source's mark. The mark must not pass rows that
+were reported as changed but never ingested, yet change detection also runs
+for previews and auto-ingestion polls. So the rows of the last window are
+kept as *pending* with their hash, and the mark only moves to the end of the
+window once the ingestion registry holds those hashes.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from ragkit.connectors.data_db import DataDb, open_data_db
+
+logger = logging.getLogger(__name__)
+
+
+def encode_mark(value: Any) -> dict[str, str] | None:
+    """A column value as JSON that :func:`decode_mark` turns back into the same type."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return {"type": "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {"type": "date", "value": value.isoformat()}
+    if isinstance(value, bool):
+        return {"type": "int", "value": str(int(value))}
+    if isinstance(value, int):
+        return {"type": "int", "value": str(value)}
+    if isinstance(value, float):
+        return {"type": "float", "value": repr(value)}
+    if isinstance(value, Decimal):
+        return {"type": "decimal", "value": str(value)}
+    return {"type": "str", "value": str(value)}
+
+
+def decode_mark(encoded: dict[str, str] | None) -> Any:
+    if not encoded:
+        return None
+    kind, value = encoded.get("type"), encoded.get("value", "")
+    if kind == "datetime":
+        return datetime.fromisoformat(value)
+    if kind == "date":
+        return date.fromisoformat(value)
+    if kind == "int":
+        return int(value)
+    if kind == "float":
+        return float(value)
+    if kind == "decimal":
+        return Decimal(value)
+    return value
+
+
+@dataclass
+class SyncState:
+    mark: Any = None
+    """Every row below it has been ingested; ``None`` before the first sync."""
+    next_mark: Any = None
+    """The end of the last window, adopted once ``pending`` is ingested."""
+    pending: dict[str, str] = field(default_factory=dict)
+    """``doc_id -> content_hash`` of the rows the last window reported as changed."""
+
+
+class SqlSyncState(DataDb):
+    def _create_tables(self, con: sqlite3.Connection) -> None:
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sql_sync_state (
+                source_id TEXT PRIMARY KEY,
+                query_key TEXT NOT NULL,
+                mark TEXT,
+                next_mark TEXT,
+                pending TEXT NOT NULL
+            )
+            """
+        )
+
+    def load(self, source_id: str, query_key: str) -> SyncState:
+        """State of the source, or a fresh one when it was recorded for another query."""
+        with self._lock, self._connect() as con:
+            row = con.execute(
+                "SELECT query_key, mark, next_mark, pending FROM sql_sync_state WHERE source_id = ?",
+                (source_id,),
+            ).fetchone()
+        if row is None or row[0] != query_key:
+            return SyncState()
+        try:
+            return SyncState(
+                mark=decode_mark(json.loads(row[1]) if row[1] else None),
+                next_mark=decode_mark(json.loads(row[2]) if row[2] else None),
+                pending=json.loads(row[3]),
+            )
+        except (ValueError, TypeError) as exc:
+            logger.warning("Ignoring unreadable SQL sync state of %s: %s", source_id, exc)
+            return SyncState()
+
+    def save(self, source_id: str, query_key: str, state: SyncState) -> None:
+        mark, next_mark = encode_mark(state.mark), encode_mark(state.next_mark)
+        with self._lock, self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO sql_sync_state(source_id, query_key, mark, next_mark, pending) VALUES (?, ?, ?, ?, ?)",
+                (
+                    source_id,
+                    query_key,
+                    json.dumps(mark) if mark else None,
+                    json.dumps(next_mark) if next_mark else None,
+                    json.dumps(state.pending),
+                ),
+            )
+
+
+def sql_sync_state() -> SqlSyncState | None:
+    return open_data_db("sql_sync_state.db", SqlSyncState)
@@ -0,0 +1,124 @@
+"""Persistent crawl state of web sources.
+
+For every page a web source crawled, the validators the server sent
+(``ETag``, ``Last-Modified``), the hash of the extracted content, its title
+and its outgoing links are kept in SQLite. The next crawl sends them back as
+``If-None-Match``/``If-Modified-Since``; a ``304 Not Modified`` page is then
+neither downloaded nor parsed, and the crawl continues from its stored links.
+
+The state of a source is recorded under a key of the settings its content
+hashes depend on; once they change, the stored state is ignored so that
+every page is extracted again.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import dataclass, field
+
+from ragkit.connectors.data_db import DataDb, open_data_db
+
+
+@dataclass
+class PageState:
+    url: str
+    content_hash: str
+    etag: str | None = None
+    last_modified: str | None = None
+    """The ``Last-Modified`` header as sent by the server."""
+    title: str | None = None
+    outlinks: list[str] = field(default_factory=list)
+    size: int = 0
+    checked_at: str = ""
+    """ISO-8601 time the page was last downloaded or confirmed unchanged."""
+
+
+class WebCrawlState(DataDb):
+    def _create_tables(self, con: sqlite3.Connection) -> None:
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_state (
+                source_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                title TEXT,
+                outlinks TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                checked_at TEXT NOT NULL,
+                PRIMARY KEY (source_id, url)
+            )
+            """
+        )
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_sources (
+                source_id TEXT PRIMARY KEY,
+                state_key TEXT NOT NULL
+            )
+            """
+        )
+
+    def load(self, source_id: str, state_key: str) -> dict[str, PageState]:
+        """Stored pages of the source, or none when they were crawled under another ``state_key``."""
+        with self._lock, self._connect() as con:
+            recorded = con.execute("SELECT state_key FROM crawl_sources WHERE source_id = ?", (source_id,)).fetchone()
+            if recorded is None or recorded[0] != state_key:
+                return {}
+            rows = con.execute(
+                "SELECT url, etag, last_modified, content_hash, title, outlinks, size, checked_at "
+                "FROM crawl_state WHERE source_id = ?",
+                (source_id,),
+            ).fetchall()
+        return {
+            url: PageState(
+                url=url,
+                etag=etag,
+                last_modified=last_modified,
+                content_hash=content_hash,
+                title=title,
+                outlinks=json.loads(outlinks),
+                size=size,
+                checked_at=checked_at,
+            )
+            for url, etag, last_modified, content_hash, title, outlinks, size, checked_at in rows
+        }
+
+    def replace(self, source_id: str, pages: list[PageState], state_key: str) -> None:
+        """Store ``pages`` as the whole state of the source; pages the crawl no longer reached are dropped."""
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM crawl_state WHERE source_id = ?", (source_id,))
+            con.execute(
+                "INSERT OR REPLACE INTO crawl_sources(source_id, state_key) VALUES (?, ?)",
+                (source_id, state_key),
+            )
+            con.executemany(
+                "INSERT OR REPLACE INTO crawl_state"
+                "(source_id, url, etag, last_modified, content_hash, title, outlinks, size, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        source_id,
+                        page.url,
+                        page.etag,
+                        page.last_modified,
+                        page.content_hash,
+                        page.title,
+                        json.dumps(page.outlinks),
+                        page.size,
+                        page.checked_at,
+                    )
+                    for page in pages
+                ],
+            )
+
+    def clear(self, source_id: str) -> None:
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM crawl_state WHERE source_id = ?", (source_id,))
+            con.execute("DELETE FROM crawl_sources WHERE source_id = ?", (source_id,))
+
+
+def web_crawl_state() -> WebCrawlState | None:
+    return open_data_db("web_crawl_state.db", WebCrawlState)
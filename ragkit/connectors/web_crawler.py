@@ -0,0 +1,349 @@
+"""Concurrent, polite crawling for :class:`~ragkit.connectors.web_url.WebUrlConnector`.
+
+Pages are fetched by ``concurrency`` workers sharing one FIFO frontier, so a
+site is still crawled breadth first. Each host has its own connection limit
+and a minimum spacing between requests, the larger of the configured delay
+and its robots.txt ``Crawl-delay``; robots.txt itself is fetched once per
+host however many workers reach it at the same time. Every page is parsed
+once, for both its text and its links, off the event loop.
+
+Given the :class:`~ragkit.connectors.web_crawl_state.PageState` of the
+previous crawl, pages are requested conditionally; a ``304 Not Modified``
+page keeps its stored hash and the crawl continues from its stored links.
+Pages whose sitemap ``lastmod`` is older than their last check are not
+requested at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import xml.etree.ElementTree as ET
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from ragkit.connectors.web_crawl_state import PageState
+
+logger = logging.getLogger(__name__)
+
+# Sitemaps read per host, counting those listed by sitemap indexes.
+_MAX_SITEMAPS = 20
+
+# ``(html, url) -> (title, content, links)``
+PageParser = Callable[[str, str], "tuple[str | None, str, list[str]]"]
+# ``(client, url, headers) -> response``, ``None`` for pages that are skipped.
+PageFetcher = Callable[[Any, str, "dict[str, str] | None"], Awaitable[Any]]
+
+
+@dataclass
+class CrawledPage:
+    url: str
+    depth: int
+    title: str | None
+    content: str
+    """Empty when the page was not downloaded because it had not changed."""
+    state: PageState
+    """What the next crawl needs to know about the page."""
+    response: Any = None
+    """The ``httpx.Response`` the page was downloaded with, if it was."""
+
+    @property
+    def not_modified(self) -> bool:
+        return self.response is None
+
+
+def host_key(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+
+class _HostSlots:
+    def __init__(self, connections: int) -> None:
+        self.semaphore = asyncio.Semaphore(connections)
+        self.lock = asyncio.Lock()
+        self.next_at = 0.0
+
+
+class HostThrottle:
+    """At most ``connections_per_host`` requests in flight per host, started at least ``delay`` apart."""
+
+    def __init__(self, connections_per_host: int, delay_seconds: float) -> None:
+        self.connections_per_host = max(1, connections_per_host)
+        self.delay_seconds = max(0.0, delay_seconds)
+        self._hosts: dict[str, _HostSlots] = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str, delay_seconds: float | None = None) -> AsyncIterator[None]:
+        slots = self._hosts.get(host)
+        if slots is None:
+            slots = self._hosts[host] = _HostSlots(self.connections_per_host)
+        delay = self.delay_seconds if delay_seconds is None else max(self.delay_seconds, delay_seconds)
+        loop = asyncio.get_running_loop()
+        async with slots.semaphore:
+            async with slots.lock:
+                wait = slots.next_at - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                slots.next_at = loop.time() + delay
+            yield
+
+
+class RobotsCache:
+    """robots.txt of each host, fetched on first use; a host without one allows everything."""
+
+    def __init__(self, user_agent: str) -> None:
+        self.user_agent = user_agent
+        self._parsers: dict[str, RobotFileParser | None] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def parser(self, client: Any, url: str) -> RobotFileParser | None:
+        host = host_key(url)
+        if host in self._parsers:
+            return self._parsers[host]
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            if host not in self._parsers:
+                self._parsers[host] = await self._load(client, host)
+        return self._parsers[host]
+
+    async def _load(self, client: Any, host: str) -> RobotFileParser | None:
+        try:
+            response = await client.get(f"{host}/robots.txt")
+        except Exception:  # pragma: no cover - network failures
+            return None
+        if response.status_code >= 400:
+            return None
+        parser = RobotFileParser()
+        parser.parse(response.text.splitlines())
+        return parser
+
+    async def allowed(self, client: Any, url: str) -> bool:
+        parser = await self.parser(client, url)
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    async def crawl_delay(self, client: Any, url: str) -> float | None:
+        parser = await self.parser(client, url)
+        if parser is None:
+            return None
+        delay = parser.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+
+class WebCrawler:
+    """Breadth-first crawl from seed URLs with ``concurrency`` workers.
+
+    ``accept(url)`` decides whether a URL is fetched at all and
+    ``follow(url)`` whether a discovered link enters the frontier; ``fetch``
+    returns the response of an HTML page, a ``304`` response, or ``None`` to
+    skip it. ``known`` is the state of the previous crawl by URL and
+    ``lastmods`` the sitemap modification times by URL.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        fetch: PageFetcher,
+        parse: PageParser,
+        accept: Callable[[str], bool],
+        follow: Callable[[str], bool],
+        max_pages: int,
+        max_depth: int,
+        concurrency: int,
+        throttle: HostThrottle,
+        robots: RobotsCache | None = None,
+        known: dict[str, PageState] | None = None,
+        lastmods: dict[str, datetime] | None = None,
+    ) -> None:
+        self.client = client
+        self._fetch = fetch
+        self._parse = parse
+        self._accept = accept
+        self._follow = follow
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = max(1, concurrency)
+        self.throttle = throttle
+        self.robots = robots
+        self.known = known or {}
+        self.lastmods = lastmods or {}
+        self.requests = 0
+        self.not_modified = 0
+        self.skipped = 0
+
+    async def crawl(self, seeds: list[str]) -> list[CrawledPage]:
+        """Crawled pages in breadth-first order, whatever order they were fetched in."""
+        # A URL's position is the path of link indexes leading to it from a seed.
+        frontier: deque[tuple[tuple[int, ...], str, int]] = deque()
+        seen: set[str] = set()
+
+        def enqueue(position: tuple[int, ...], url: str, depth: int) -> None:
+            if url not in seen:
+                seen.add(url)
+                frontier.append((position, url, depth))
+
+        for index, url in enumerate(seeds):
+            enqueue((index,), url, 0)
+
+        pages: list[tuple[tuple[int, ...], CrawledPage]] = []
+        in_flight = 0
+        changed = asyncio.Condition()
+
+        async def next_url() -> tuple[tuple[int, ...], str, int] | None:
+            nonlocal in_flight
+            async with changed:
+                while True:
+                    # Pages in flight may still fail, so they only reserve their share of max_pages.
+                    if len(pages) >= self.max_pages:
+                        return None
+                    if frontier and len(pages) + in_flight < self.max_pages:
+                        in_flight += 1
+                        return frontier.popleft()
+                    if not in_flight:
+                        return None
+                    await changed.wait()
+
+        async def worker() -> None:
+            nonlocal in_flight
+            while (item := await next_url()) is not None:
+                position, url, depth = item
+                page: CrawledPage | None = None
+                links: list[str] = []
+                try:
+                    page, links = await self._visit(url, depth)
+                except Exception as exc:  # pragma: no cover - defensive
+                    logger.warning("Failed to crawl %s: %s", url, exc)
+                async with changed:
+                    in_flight -= 1
+                    if page is not None and len(pages) < self.max_pages:
+                        pages.append((position, page))
+                        if depth < self.max_depth:
+                            for index, link in enumerate(links):
+                                if self._follow(link):
+                                    enqueue((*position, index), link, depth + 1)
+                    changed.notify_all()
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return [page for _, page in sorted(pages, key=lambda item: (len(item[0]), item[0]))]
+
+    async def _visit(self, url: str, depth: int) -> tuple[CrawledPage | None, list[str]]:
+        if not self._accept(url):
+            return None, []
+        crawl_delay = None
+        if self.robots is not None:
+            if not await self.robots.allowed(self.client, url):
+                return None, []
+            crawl_delay = await self.robots.crawl_delay(self.client, url)
+
+        known = self.known.get(url)
+        if known is not None and _unchanged_since(self.lastmods.get(url), known.checked_at):
+            self.skipped += 1
+            return self._unchanged(url, depth, known, known.checked_at), known.outlinks
+        headers: dict[str, str] = {}
+        if known is not None:
+            if known.etag:
+                headers["If-None-Match"] = known.etag
+            if known.last_modified:
+                headers["If-Modified-Since"] = known.last_modified
+
+        async with self.throttle.slot(host_key(url), crawl_delay):
+            self.requests += 1
+            response = await self._fetch(self.client, url, headers or None)
+        if response is None:
+            return None, []
+        checked_at = datetime.now(timezone.utc).isoformat()
+        if response.status_code == 304:
+            if known is None:
+                return None, []
+            self.not_modified += 1
+            return self._unchanged(url, depth, known, checked_at), known.outlinks
+
+        title, content, links = await asyncio.to_thread(self._parse, response.text, url)
+        state = PageState(
+            url=url,
+            content_hash=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            title=title,
+            outlinks=links,
+            size=len(response.content or b""),
+            checked_at=checked_at,
+        )
+        page = CrawledPage(url=url, depth=depth, title=title, content=content, state=state, response=response)
+        return page, links
+
+    @staticmethod
+    def _unchanged(url: str, depth: int, known: PageState, checked_at: str) -> CrawledPage:
+        state = dataclasses.replace(known, checked_at=checked_at)
+        return CrawledPage(url=url, depth=depth, title=known.title, content="", state=state)
+
+
+def _unchanged_since(lastmod: datetime | None, checked_at: str) -> bool:
+    """Whether a sitemap ``lastmod`` predates the last time the page was checked."""
+    if lastmod is None or not checked_at:
+        return False
+    try:
+        return lastmod <= datetime.fromisoformat(checked_at)
+    except ValueError:
+        return False
+
+
+def _parse_lastmod(value: str) -> datetime | None:
+    """The ``lastmod`` as an aware datetime; a bare date stands for the end of that day.
+
+    A page edited later on the day it was checked must not compare as unchanged.
+    """
+    value = value.strip()
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        pass
+    else:
+        return datetime.combine(day + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+async def sitemap_lastmods(client: Any, host: str, robots: RobotFileParser | None = None) -> dict[str, datetime]:
+    """``lastmod`` of every URL in the sitemaps of ``host``, as listed by robots.txt or at ``/sitemap.xml``."""
+    pending = deque((robots.site_maps() if robots is not None else None) or [f"{host}/sitemap.xml"])
+    lastmods: dict[str, datetime] = {}
+    read = 0
+    while pending and read < _MAX_SITEMAPS:
+        sitemap_url = pending.popleft()
+        read += 1
+        try:
+            response = await client.get(sitemap_url)
+            if response.status_code >= 400:
+                continue
+            root = ET.fromstring(response.content)
+        except Exception as exc:  # pragma: no cover - network or malformed XML
+            logger.debug("Ignoring sitemap %s: %s", sitemap_url, exc)
+            continue
+        is_index = root.tag.endswith("sitemapindex")
+        for entry in root:
+            loc = lastmod = None
+            for child in entry:
+                if child.tag.endswith("loc") and child.text:
+                    loc = child.text.strip()
+                elif child.tag.endswith("lastmod") and child.text:
+                    lastmod = _parse_lastmod(child.text)
+            if not loc:
+                continue
+            if is_index:
+                pending.append(loc)
+            elif lastmod is not None:
+                lastmods[loc] = lastmod
+    return lastmods
@@ -5,11 +5,11 @@ from __future__ import annotations
 import asyncio
 import fnmatch
 import hashlib
+import json
 import logging
 from datetime import datetime, timezone
-from typing import Any, Iterable
+from typing import Any
 from urllib.parse import urljoin, urldefrag, urlparse
-from urllib.robotparser import RobotFileParser
 
 try:
     import httpx
@@ -34,6 +34,8 @@ from ragkit.connectors.base import (
     ConnectorValidationResult,
 )
 from ragkit.connectors.registry import register_connector
+from ragkit.connectors.web_crawl_state import web_crawl_state
+from ragkit.connectors.web_crawler import CrawledPage, HostThrottle, RobotsCache, WebCrawler, host_key, sitemap_lastmods
 from ragkit.desktop.models import SourceType
 
 
@@ -42,12 +44,20 @@ logger = logging.getLogger(__name__)
 
 @register_connector(SourceType.WEB_URL)
 class WebUrlConnector(BaseConnector):
-    """Crawl and extract documents from web pages."""
+    """Crawl and extract documents from web pages.
+
+    ``max_concurrent_requests`` pages are fetched at once, with at most
+    ``max_connections_per_host`` of them and one request every
+    ``request_delay_ms`` per host.
+
+    The crawl state of each page is persisted, so the next crawl sends
+    conditional requests; the content of a page that was not modified is
+    only downloaded again if it is fetched.
+    """
 
     def __init__(self, source_id: str, config: dict[str, Any], credential: dict[str, Any] | None = None) -> None:
         super().__init__(source_id, config, credential)
         self._doc_cache: dict[str, ConnectorDocument] = {}
-        self._robots_cache: dict[str, RobotFileParser | None] = {}
 
     # ------------------------------------------------------------------
     # Config helpers
@@ -88,6 +98,32 @@ class WebUrlConnector(BaseConnector):
     def _timeout_seconds(self) -> float:
         return max(1.0, float(self.config.get("timeout_seconds", 30)))
 
+    def _max_concurrent_requests(self) -> int:
+        return max(1, int(self.config.get("max_concurrent_requests", 8)))
+
+    def _max_connections_per_host(self) -> int:
+        return max(1, int(self.config.get("max_connections_per_host", 2)))
+
+    def _use_sitemap(self) -> bool:
+        return bool(self.config.get("use_sitemap", True))
+
+    def _state_key(self) -> str:
+        """Identity of how pages are turned into content; stored hashes are only valid under the same one."""
+        parser = "lxml" if _LXML_AVAILABLE else "html.parser"
+        return hashlib.sha256(json.dumps([self._extract_mode(), parser]).encode("utf-8")).hexdigest()
+
+    def _client(self) -> "httpx.AsyncClient":
+        concurrency = self._max_concurrent_requests()
+        return httpx.AsyncClient(
+            timeout=self._timeout_seconds(),
+            headers={"User-Agent": self._user_agent()},
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    def _throttle(self) -> HostThrottle:
+        return HostThrottle(self._max_connections_per_host(), self._request_delay_ms() / 1000)
+
     # ------------------------------------------------------------------
     # BaseConnector implementation
     # ------------------------------------------------------------------
@@ -143,97 +179,116 @@ class WebUrlConnector(BaseConnector):
                 logger.warning("WebUrlConnector validation failed: %s", validation.errors)
             return []
 
-        seed_urls = self._urls()
+        seed_urls = [self._normalize_url(url) for url in self._urls()]
         allowed_domains = {urlparse(url).netloc.lower() for url in seed_urls}
         include_patterns = self._include_patterns()
         exclude_patterns = self._exclude_patterns()
 
-        seen: set[str] = set()
-        queue: list[tuple[str, int]] = [(url, 0) for url in seed_urls]
-        documents: list[ConnectorDocument] = []
-        self._doc_cache = {}
-
-        async with httpx.AsyncClient(
-            timeout=self._timeout_seconds(),
-            headers={"User-Agent": self._user_agent()},
-            follow_redirects=True,
-        ) as client:
-            while queue and len(documents) < self._max_pages():
-                current_url, depth = queue.pop(0)
-                normalized_url = self._normalize_url(current_url)
-                if normalized_url in seen:
-                    continue
-                seen.add(normalized_url)
-
-                if not self._is_allowed_url(normalized_url, allowed_domains, include_patterns, exclude_patterns):
-                    continue
-
-                if self._respect_robots():
-                    if not await self._allowed_by_robots(client, normalized_url):
-                        continue
+        def follow(link: str) -> bool:
+            return not self._same_domain_only() or urlparse(link).netloc.lower() in allowed_domains
+
+        state_store = web_crawl_state()
+        state_key = self._state_key()
+        known = await asyncio.to_thread(state_store.load, self.source_id, state_key) if state_store is not None else {}
+        robots = RobotsCache(self._user_agent()) if self._respect_robots() else None
+
+        async with self._client() as client:
+            lastmods = {}
+            if known and self._use_sitemap():
+                for host in sorted({host_key(url) for url in seed_urls}):
+                    parser = await robots.parser(client, host) if robots is not None else None
+                    lastmods.update(await sitemap_lastmods(client, host, parser))
+            crawler = WebCrawler(
+                client,
+                fetch=self._fetch_url,
+                parse=self._parse_page,
+                accept=lambda url: self._is_allowed_url(url, allowed_domains, include_patterns, exclude_patterns),
+                follow=follow,
+                max_pages=self._max_pages(),
+                max_depth=self._crawl_depth(),
+                concurrency=self._max_concurrent_requests(),
+                throttle=self._throttle(),
+                robots=robots,
+                known=known,
+                lastmods=lastmods,
+            )
+            pages = await crawler.crawl(seed_urls)
+        logger.info(
+            "Crawled %d pages of source %s: %d requests, %d not modified, %d unchanged in sitemap",
+            len(pages),
+            self.source_id,
+            crawler.requests,
+            crawler.not_modified,
+            crawler.skipped,
+        )
+        if state_store is not None:
+            await asyncio.to_thread(state_store.replace, self.source_id, [page.state for page in pages], state_key)
+
+        documents = [self._document(page) for page in pages]
+        self._doc_cache = {doc.id: doc for doc in documents}
+        return documents
 
-                response = await self._fetch_url(client, normalized_url)
+    def _document(self, page: CrawledPage) -> ConnectorDocument:
+        state = page.state
+        last_modified_iso = self._parse_http_date(state.last_modified) if state.last_modified else None
+        return ConnectorDocument(
+            id=hashlib.sha256(f"{self.source_id}:{page.url}".encode("utf-8")).hexdigest(),
+            source_id=self.source_id,
+            title=page.title or page.url,
+            content=page.content,
+            content_type=self._content_type(),
+            url=page.url,
+            file_path=None,
+            file_type="html",
+            file_size_bytes=state.size,
+            last_modified=last_modified_iso or state.checked_at or datetime.now(timezone.utc).isoformat(),
+            metadata={"etag": state.etag, "not_modified": page.not_modified},
+            content_hash=state.content_hash,
+        )
+
+    async def _download(self, docs: list[ConnectorDocument]) -> dict[str, str | Exception]:
+        """Content of pages the last crawl found unchanged and therefore did not download."""
+        if not docs:
+            return {}
+        throttle = self._throttle()
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests())
+
+        async with self._client() as client:
+
+            async def download(doc: ConnectorDocument) -> str:
+                async with semaphore, throttle.slot(host_key(doc.url or "")):
+                    response = await self._fetch_url(client, doc.url or "")
                 if response is None:
-                    continue
-
-                html = response.text
-                title, content = self._extract_content(html, normalized_url)
-                content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
-
-                doc_id = hashlib.sha256(f"{self.source_id}:{normalized_url}".encode("utf-8")).hexdigest()
-                last_modified = response.headers.get("last-modified")
-                last_modified_iso = self._parse_http_date(last_modified) if last_modified else None
-
-                document = ConnectorDocument(
-                    id=doc_id,
-                    source_id=self.source_id,
-                    title=title or normalized_url,
-                    content=content,
-                    content_type=self._content_type(),
-                    url=normalized_url,
-                    file_path=None,
-                    file_type="html",
-                    file_size_bytes=len(response.content or b""),
-                    last_modified=last_modified_iso or datetime.now(timezone.utc).isoformat(),
-                    metadata={"etag": response.headers.get("etag")},
-                    content_hash=content_hash,
-                )
-                documents.append(document)
-                self._doc_cache[doc_id] = document
-
-                if depth < self._crawl_depth():
-                    links = self._extract_links(html, normalized_url)
-                    for link in links:
-                        if link in seen:
-                            continue
-                        if self._same_domain_only() and urlparse(link).netloc.lower() not in allowed_domains:
-                            continue
-                        queue.append((link, depth + 1))
-
-                delay_ms = self._request_delay_ms()
-                if delay_ms:
-                    await asyncio.sleep(delay_ms / 1000)
+                    raise FileNotFoundError(f"Page {doc.url} could not be downloaded.")
+                _title, content, _links = await asyncio.to_thread(self._parse_page, response.text, doc.url or "")
+                doc.content = content
+                doc.metadata["not_modified"] = False
+                return content
 
-        return documents
+            results = await asyncio.gather(*(download(doc) for doc in docs), return_exceptions=True)
+        return {doc.id: result for doc, result in zip(docs, results)}
 
     async def fetch_document_content(self, doc_id: str) -> str:
-        cached = self._doc_cache.get(doc_id)
-        if cached is not None:
-            return cached.content
-
-        docs = await self.list_documents()
-        for doc in docs:
-            if doc.id == doc_id:
-                return doc.content
-        raise FileNotFoundError(f"Document ID {doc_id} not found in web source.")
+        result = (await self.fetch_documents_content([doc_id]))[doc_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def fetch_documents_content(self, doc_ids: list[str]) -> dict[str, str | Exception]:
+        # Pages not seen yet are resolved by a single new crawl.
+        if any(doc_id not in self._doc_cache for doc_id in doc_ids):
+            await self.list_documents()
+        found = [self._doc_cache[doc_id] for doc_id in doc_ids if doc_id in self._doc_cache]
+        downloaded = await self._download([doc for doc in found if doc.metadata.get("not_modified")])
+        return {
+            doc_id: downloaded.get(doc_id, self._doc_cache[doc_id].content)
+            if doc_id in self._doc_cache
+            else FileNotFoundError(f"Document ID {doc_id} not found in web source.")
+            for doc_id in doc_ids
+        }
 
     async def detect_changes(self, known_hashes: dict[str, str]) -> ConnectorChangeDetection:
-        docs = await self.list_documents()
-        current_by_id = {doc.id: doc for doc in docs}
-        added = [doc for doc in docs if doc.id not in known_hashes]
-        modified = [doc for doc in docs if doc.id in known_hashes and doc.content_hash != known_hashes[doc.id]]
-        removed_ids = [doc_id for doc_id in known_hashes if doc_id not in current_by_id]
-        return ConnectorChangeDetection(added=added, modified=modified, removed_ids=removed_ids)
+        return self.diff_listing(await self.list_documents(), known_hashes)
 
     def supported_file_types(self) -> list[str]:
         return ["html", "txt", "md"]
@@ -264,13 +319,21 @@ class WebUrlConnector(BaseConnector):
             return False
         return True
 
-    async def _fetch_url(self, client: "httpx.AsyncClient", url: str) -> "httpx.Response | None":
+    async def _fetch_url(
+        self,
+        client: "httpx.AsyncClient",
+        url: str,
+        headers: dict[str, str] | None = None,
+    ) -> "httpx.Response | None":
         try:
-            response = await client.get(url)
+            response = await client.get(url, headers=headers)
         except Exception as exc:  # pragma: no cover - network issues
             logger.warning("Failed to fetch %s: %s", url, exc)
             return None
 
+        if response.status_code == 304:
+            return response
+
         if response.status_code >= 400:
             logger.warning("Skipping %s (HTTP %s)", url, response.status_code)
             return None
@@ -281,37 +344,28 @@ class WebUrlConnector(BaseConnector):
 
         return response
 
-    async def _allowed_by_robots(self, client: "httpx.AsyncClient", url: str) -> bool:
-        if not self._respect_robots():
-            return True
-
-        parsed = urlparse(url)
-        domain_key = parsed.netloc.lower()
-        parser = self._robots_cache.get(domain_key)
-        if parser is None and domain_key not in self._robots_cache:
-            parser = await self._load_robots(client, parsed)
-            self._robots_cache[domain_key] = parser
-
-        if parser is None:
-            return True
-        return parser.can_fetch(self._user_agent(), url)
-
-    async def _load_robots(self, client: "httpx.AsyncClient", parsed: Any) -> RobotFileParser | None:
-        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-        try:
-            response = await client.get(robots_url)
-        except Exception:  # pragma: no cover - network failures
-            return None
-        if response.status_code >= 400:
-            return None
-        parser = RobotFileParser()
-        parser.parse(response.text.splitlines())
-        return parser
-
-    def _extract_links(self, html: str, base_url: str) -> Iterable[str]:
+    def _parse_page(self, html: str, url: str) -> tuple[str | None, str, list[str]]:
+        """Title, extracted content and outgoing links, from a single parse."""
         if BeautifulSoup is None:
-            return []
+            return None, "", []
         soup = BeautifulSoup(html, "lxml" if _LXML_AVAILABLE else "html.parser")
+        # Links are kept even beyond crawl_depth, for crawls that continue from an unchanged page.
+        links = self._extract_links(soup, url)
+        for tag in soup(["script", "style", "noscript"]):
+            tag.decompose()
+
+        title = None
+        if soup.title and soup.title.string:
+            title = soup.title.string.strip()
+
+        mode = self._extract_mode()
+        if mode == "html_clean":
+            return title, str(soup), links
+        if mode == "markdown":
+            return title, self._html_to_markdown(soup), links
+        return title, soup.get_text(" ", strip=True), links
+
+    def _extract_links(self, soup: Any, base_url: str) -> list[str]:
         links: list[str] = []
         for tag in soup.find_all("a", href=True):
             href = tag.get("href")
@@ -326,24 +380,6 @@ class WebUrlConnector(BaseConnector):
             links.append(absolute)
         return links
 
-    def _extract_content(self, html: str, url: str) -> tuple[str | None, str]:
-        if BeautifulSoup is None:
-            return None, ""
-        soup = BeautifulSoup(html, "lxml" if _LXML_AVAILABLE else "html.parser")
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
-
-        title = None
-        if soup.title and soup.title.string:
-            title = soup.title.string.strip()
-
-        mode = self._extract_mode()
-        if mode == "html_clean":
-            return title, str(soup)
-        if mode == "markdown":
-            return title, self._html_to_markdown(soup)
-        return title, soup.get_text(" ", strip=True)
-
     def _html_to_markdown(self, soup: Any) -> str:
         lines: list[str] = []
         for tag in soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6", "p", "li"]):
@@ -8,7 +8,8 @@ from ragkit.config.embedding_schema import EmbeddingConfig, EmbeddingProvider, E
 from ragkit.config.manager import config_manager
 from ragkit.desktop.models import SettingsPayload
 from ragkit.desktop.profiles import build_full_config
-from ragkit.embedding.cache import BaseEmbeddingCache, create_cache
+from ragkit.config.embedding_schema import CacheBackend
+from ragkit.embedding.cache import BaseEmbeddingCache, create_cache, disk_cache, query_cache
 from ragkit.embedding.catalog import MODEL_CATALOG
 from ragkit.embedding.engine import EmbeddingEngine, cosine_similarity
 from ragkit.embedding.environment import detect_environment
@@ -62,8 +63,16 @@ def _api_key_name(provider: EmbeddingProvider, query: bool = False) -> str:
 
 
 def _get_cache(config: EmbeddingConfig) -> BaseEmbeddingCache:
+    """The cache EmbeddingEngine writes to for this backend, so stats match real traffic."""
     global _CACHE
-    if _CACHE is None:
+    if config.cache_backend == CacheBackend.DISK:
+        cache = disk_cache(config.cache_disk_dtype, config.cache_disk_max_mb)
+        if cache is not None:
+            _CACHE = cache
+            return _CACHE
+    if config.cache_backend == CacheBackend.MEMORY:
+        _CACHE = query_cache()
+    elif _CACHE is None:
         _CACHE = create_cache(config.cache_backend)
     return _CACHE
 
@@ -164,17 +173,10 @@ async def test_embedding(payload: EmbeddingTestRequest) -> EmbeddingTestResult:
     cfg = _get_current_config()
     api_key = secrets_manager.retrieve(_api_key_name(cfg.provider))
     engine = EmbeddingEngine(cfg, api_key=api_key)
-    model_id = engine.model_id
-    cache = _get_cache(cfg)
 
     def get_or_embed(text: str):
-        if cfg.cache_enabled:
-            cached = cache.get(text, model_id)
-            if cached is not None:
-                return cached, 1
+        # The engine consults the memory/disk caches itself when cache_enabled is set.
         out = engine.embed_text(text)
-        if cfg.cache_enabled:
-            cache.put(text, model_id, out.vector)
         return out.vector, out.latency_ms
 
     vector_a, latency_a = get_or_embed(payload.text_a)
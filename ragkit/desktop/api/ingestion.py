@@ -26,6 +26,7 @@ from ragkit.desktop.models import (
     SourceConfig,
 )
 from ragkit.desktop.profiles import build_full_config
+from ragkit.desktop.resource_registry import resources
 from ragkit.storage.base import create_vector_store
 
 logger = logging.getLogger(__name__)
@@ -242,6 +243,7 @@ async def restore_ingestion_version(version: str):
     settings = settings_store.load_settings()
     store = create_vector_store(VectorStoreConfig.model_validate(settings.vector_store or {}))
     await store.restore_snapshot(version)
+    resources.invalidate_stores()
     return {"success": True}
 
 
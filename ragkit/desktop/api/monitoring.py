@@ -24,6 +24,7 @@ from ragkit.config.monitoring_schema import (
     QueryMetrics,
     ServiceHealth,
 )
+from ragkit.config.embedding_schema import CacheStats
 from ragkit.config.vector_store_schema import VectorStoreConfig
 from ragkit.desktop import documents
 from ragkit.desktop.ingestion_runtime import runtime
@@ -36,6 +37,7 @@ from ragkit.desktop.monitoring_service import (
 )
 from ragkit.desktop.rerank_service import get_rerank_config, resolve_reranker
 from ragkit.desktop.settings_store import load_settings
+from ragkit.embedding.cache import query_cache
 from ragkit.embedding.engine import EmbeddingEngine
 from ragkit.monitoring.alerts import AlertEvaluator
 from ragkit.monitoring.health_checker import HealthChecker
@@ -139,6 +141,7 @@ async def _resolve_ingestion_stats() -> IngestionStats:
 
     try:
         vector_cfg = VectorStoreConfig.model_validate(settings.vector_store or {})
+        # A store of its own: stats must not initialize the collection, nor leave every payload cached in the warm one.
         store = create_vector_store(vector_cfg)
         stats = await store.collection_stats()
         total_chunks = int(stats.vectors_count)
@@ -273,6 +276,11 @@ async def dashboard_latency(hours: int = Query(default=24, ge=1, le=24 * 30)) ->
     return LatencyBreakdown.model_validate(payload)
 
 
+@router.get("/dashboard/embedding-cache", response_model=CacheStats)
+async def dashboard_embedding_cache() -> CacheStats:
+    return query_cache().stats()
+
+
 @router.get("/dashboard/alerts")
 async def dashboard_alerts():
     logger = get_query_logger()
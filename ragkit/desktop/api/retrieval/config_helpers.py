@@ -7,11 +7,13 @@ from pathlib import Path
 from typing import Any
 
 from ragkit.config.retrieval_schema import (
+    FILTER_PAYLOAD_KEYS,
     HybridSearchConfig,
     LexicalSearchConfig,
     SearchFilters,
     SearchType,
     SemanticSearchConfig,
+    payload_value,
 )
 from ragkit.config.vector_store_schema import GeneralSettings
 from ragkit.desktop.profiles import build_full_config
@@ -21,7 +23,6 @@ from ragkit.storage.base import VectorPoint
 
 _LEXICAL_INDEX: BM25Index | None = None
 _LEXICAL_INDEX_MTIME: float | None = None
-_LEXICAL_INDEX_FILE = "bm25_index.json"
 _TEXT_PREVIEW_SIZE = 300
 
 
@@ -209,45 +210,17 @@ def merge_filters(default_filters: SearchFilters, runtime_filters: SearchFilters
         return default_values
 
     return SearchFilters(
-        doc_ids=merge_values(default_filters.doc_ids, runtime_filters.doc_ids),
-        doc_types=merge_values(default_filters.doc_types, runtime_filters.doc_types),
-        languages=merge_values(default_filters.languages, runtime_filters.languages),
-        categories=merge_values(default_filters.categories, runtime_filters.categories),
+        **{
+            name: merge_values(getattr(default_filters, name), getattr(runtime_filters, name))
+            for name in FILTER_PAYLOAD_KEYS
+        }
     )
 
 
-def payload_value(payload: dict[str, Any], keys: tuple[str, ...]) -> str | None:
-    for key in keys:
-        value = payload.get(key)
-        if value is None:
-            continue
-        text = str(value).strip()
-        if text:
-            return text
-    return None
-
-
 def match_filters(point_payload: dict[str, Any], filters: SearchFilters) -> bool:
-    if filters.doc_ids:
-        doc_id = payload_value(point_payload, ("doc_id",))
-        if doc_id not in set(filters.doc_ids):
+    for name, values in filters.active().items():
+        if payload_value(point_payload, FILTER_PAYLOAD_KEYS[name]) not in set(values):
             return False
-
-    if filters.doc_types:
-        doc_type = payload_value(point_payload, ("doc_type", "file_type"))
-        if doc_type not in set(filters.doc_types):
-            return False
-
-    if filters.languages:
-        language = payload_value(point_payload, ("doc_language", "language"))
-        if language not in set(filters.languages):
-            return False
-
-    if filters.categories:
-        category = payload_value(point_payload, ("category",))
-        if category not in set(filters.categories):
-            return False
-
     return True
 
 
@@ -285,7 +258,7 @@ def bm25_index_dir() -> Path:
 
 
 def bm25_index_path() -> Path:
-    return bm25_index_dir() / _LEXICAL_INDEX_FILE
+    return BM25Index.index_path(bm25_index_dir())
 
 
 def bm25_index_mtime() -> float | None:
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import re
 import time
 from typing import Any
@@ -18,10 +19,9 @@ from ragkit.config.retrieval_schema import (
     LexicalSearchResultItem,
 )
 from ragkit.config.vector_store_schema import VectorStoreConfig
+from ragkit.desktop.resource_registry import resources
 from ragkit.desktop.settings_store import load_settings
-from ragkit.embedding.engine import EmbeddingEngine
 from ragkit.retrieval import BM25Index, LexicalSearchEngine
-from ragkit.storage.base import create_vector_store
 
 from .config_helpers import (
     bm25_index_dir,
@@ -129,13 +129,14 @@ async def execute_lexical_search(payload: LexicalSearchQuery) -> LexicalSearchRe
             tokenization_latency_ms=raw.tokenization_latency_ms,
             search_latency_ms=raw.search_latency_ms,
             total_latency_ms=raw.total_latency_ms,
-            results_from_index=raw.results_from_index,
-            results_after_threshold=raw.results_after_threshold,
+            chunks_scored=raw.chunks_scored,
+            top_k_after_threshold=raw.top_k_after_threshold,
             index_stats={
                 "documents": index.num_documents,
                 "unique_terms": index.num_unique_terms,
                 "size_bytes": BM25Index.index_size_bytes(bm25_index_dir()),
             },
+            tokenizer_cache=raw.tokenizer_cache,
         )
 
     return LexicalSearchResponseAPI(
@@ -199,10 +200,9 @@ async def lexical_index_rebuild() -> dict[str, Any]:
     settings = load_settings()
     vector_config = VectorStoreConfig.model_validate(settings.vector_store or {})
     embedding_config = EmbeddingConfig.model_validate(settings.embedding or {})
-    embedder = EmbeddingEngine(embedding_config)
-    store = create_vector_store(vector_config)
+    embedder = resources.embedder(embedding_config)
     try:
-        await store.initialize(embedder.resolve_dimensions())
+        store = await resources.vector_store(vector_config, embedder.resolve_dimensions())
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
@@ -219,7 +219,7 @@ async def lexical_index_rebuild() -> dict[str, Any]:
             metadata=payload,
             language=payload_value(payload, ("doc_language", "language")),
         )
-    rebuilt.save(bm25_index_dir())
+    await asyncio.to_thread(rebuilt.save, bm25_index_dir())
     set_lexical_index(rebuilt)
 
     return {
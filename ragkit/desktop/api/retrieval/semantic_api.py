@@ -17,9 +17,9 @@ from ragkit.config.retrieval_schema import (
     SemanticSearchResponse,
 )
 from ragkit.config.vector_store_schema import VectorStoreConfig
+from ragkit.desktop.resource_registry import resources
 from ragkit.desktop.settings_store import load_settings
-from ragkit.embedding.engine import EmbeddingEngine, cosine_similarity
-from ragkit.storage.base import create_vector_store
+from ragkit.embedding.engine import cosine_similarity
 
 from .config_helpers import (
     RankedPoint,
@@ -125,20 +125,24 @@ async def execute_semantic_search(payload: SearchQuery) -> SemanticSearchRespons
     candidate_count = max(top_k * max(config.prefetch_multiplier, 1), top_k)
 
     embedding_started = time.perf_counter()
-    embedder = EmbeddingEngine(query_embed_cfg)
+    embedder = resources.embedder(query_embed_cfg)
     embed_output = embedder.embed_text(payload.query)
     embedding_latency_ms = max(1, int((time.perf_counter() - embedding_started) * 1000))
 
-    store = create_vector_store(vec_cfg)
     query_dims = len(embed_output.vector)
     try:
-        await store.initialize(query_dims)
+        store = await resources.vector_store(vec_cfg, query_dims)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
+    effective_filters = payload.filters or SearchFilters()
+    if config.default_filters_enabled:
+        effective_filters = merge_filters(config.default_filters, payload.filters)
+
     search_started = time.perf_counter()
     try:
-        raw_results = await store.search(embed_output.vector, candidate_count)
+        # Filters are pushed down to the store so the candidates are all eligible.
+        raw_results = await store.search(embed_output.vector, candidate_count, effective_filters)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     search_latency_ms = max(1, int((time.perf_counter() - search_started) * 1000))
@@ -156,10 +160,6 @@ async def execute_semantic_search(payload: SearchQuery) -> SemanticSearchRespons
     thresholded = [item for item in ranked if item.normalized_score >= threshold]
     results_after_threshold = len(thresholded)
 
-    effective_filters = payload.filters or SearchFilters()
-    if config.default_filters_enabled:
-        effective_filters = merge_filters(config.default_filters, payload.filters)
-
     filtered = [item for item in thresholded if match_filters(item.point.payload or {}, effective_filters)]
     results_after_filters = len(filtered)
 
@@ -23,12 +23,11 @@ from ragkit.config.retrieval_schema import (
 )
 from ragkit.config.vector_store_schema import VectorStoreConfig
 from ragkit.desktop.rerank_service import get_rerank_config, resolve_reranker
+from ragkit.desktop.resource_registry import resources
 from ragkit.desktop.settings_store import load_settings
-from ragkit.embedding.engine import EmbeddingEngine
 from ragkit.retrieval.hybrid_engine import HybridSearchEngine
 from ragkit.retrieval.reranker.base import RerankCandidate
 from ragkit.retrieval.search_router import SearchRouter
-from ragkit.storage.base import create_vector_store
 
 from .config_helpers import (
     HybridSourceCandidate,
@@ -604,10 +603,9 @@ async def search_filter_values(field: str = Query(..., pattern="^(doc_type|langu
     settings = load_settings()
     embed_cfg = EmbeddingConfig.model_validate(settings.embedding or {})
     vec_cfg = VectorStoreConfig.model_validate(settings.vector_store or {})
-    store = create_vector_store(vec_cfg)
-    embedder = EmbeddingEngine(embed_cfg)
+    embedder = resources.embedder(embed_cfg)
     try:
-        await store.initialize(embedder.resolve_dimensions())
+        store = await resources.vector_store(vec_cfg, embedder.resolve_dimensions())
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     points = await store.all_points()
@@ -625,10 +623,9 @@ async def chat_ready():
     settings = load_settings()
     embed_cfg = EmbeddingConfig.model_validate(settings.embedding or {})
     vec_cfg = VectorStoreConfig.model_validate(settings.vector_store or {})
-    store = create_vector_store(vec_cfg)
-    embedder = EmbeddingEngine(embed_cfg)
+    embedder = resources.embedder(embed_cfg)
     try:
-        await store.initialize(embedder.resolve_dimensions())
+        store = await resources.vector_store(vec_cfg, embedder.resolve_dimensions())
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     stats = await store.collection_stats()
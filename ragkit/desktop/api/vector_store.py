@@ -5,8 +5,8 @@ from fastapi import APIRouter, HTTPException
 from ragkit.config.embedding_schema import EmbeddingConfig
 from ragkit.config.vector_store_schema import VectorStoreConfig
 from ragkit.desktop.profiles import build_full_config
+from ragkit.desktop.resource_registry import resources
 from ragkit.desktop.settings_store import load_settings, save_settings
-from ragkit.embedding.engine import EmbeddingEngine
 from ragkit.storage.base import create_vector_store
 
 router = APIRouter(prefix="/api/vector-store", tags=["vector-store"])
@@ -58,11 +58,10 @@ async def test_vector_store_connection():
 @router.get("/collection/stats")
 async def get_collection_stats():
     settings = load_settings()
-    store = create_vector_store(_default_config())
     embed_cfg = EmbeddingConfig.model_validate(settings.embedding or {})
-    dims = EmbeddingEngine(embed_cfg).resolve_dimensions()
+    dims = resources.embedder(embed_cfg).resolve_dimensions()
     try:
-        await store.initialize(dims)
+        store = await resources.vector_store(_default_config(), dims)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     return (await store.collection_stats()).model_dump(mode="json")
@@ -72,4 +71,5 @@ async def get_collection_stats():
 async def delete_collection():
     store = create_vector_store(_default_config())
     await store.delete_collection()
+    resources.invalidate_stores()
     return {"success": True}
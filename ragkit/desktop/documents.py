@@ -3,13 +3,17 @@
 from __future__ import annotations
 
 from collections import Counter, defaultdict
+from collections.abc import Iterable
+from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import datetime, timezone
 import fnmatch
 import hashlib
 import json
+import logging
 from pathlib import Path
 import re
+import threading
 import unicodedata
 
 from .models import (
@@ -26,6 +30,7 @@ from .models import (
 )
 from .analysis_progress import AnalysisProgress
 from ragkit.connectors.base import ConnectorDocument
+from ragkit.ingestion.near_duplicates import NearDuplicateIndex
 
 import os
 
@@ -56,6 +61,8 @@ except ImportError:
 
 import mimetypes
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class ParsedContent:
     text: str
@@ -70,6 +77,10 @@ class ParsedContent:
     parser_engine: str | None = None
     ocr_applied: bool = False
 
+
+# Bump when a parser's output changes, so cached ParsedContent from older parsers is not reused.
+PARSER_VERSION = 1
+
 SUPPORTED_DISPLAY_NAMES = {
     "pdf": "PDF",
     "docx": "Word",
@@ -243,70 +254,92 @@ def analyze_documents(config: IngestionConfig) -> tuple[list[DocumentInfo], list
     parsed_documents: list[DocumentInfo] = []
     errors: list[str] = []
     seen_hashes: set[str] = set()
-    seen_token_sets: list[set[str]] = []
+    near_duplicates = NearDuplicateIndex(config.preprocessing.deduplication_threshold)
 
     progress = AnalysisProgress.get_instance()
     progress.start(total=len(files))
 
-    for file_path in files:
-        try:
-            progress.update(current_file=file_path.name)
-            parsed = _extract_content(file_path)
-            preprocessed = _preprocess_text(parsed.text, config)
-            if _is_duplicate(preprocessed, config, seen_hashes, seen_token_sets):
-                continue
-
-            relative_path = file_path.relative_to(root).as_posix()
-            file_type = _normalize_extension(file_path.suffix)
-            detected_language = _detect_language(preprocessed) if config.preprocessing.language_detection else None
-            title, description = _derive_title_description(preprocessed, file_path.stem, parsed.title)
-            keywords = _extract_keywords(preprocessed)
-
-            # Apply user-defined metadata overrides
-            overrides = config.source.metadata_overrides.get(relative_path.replace("\\", "/"), {})
-            final_title = overrides.get("title", title)
-            final_author = overrides.get("author", parsed.author)
-            final_description = overrides.get("description", description)
-            final_category = overrides.get("category", None)
-            final_domain = overrides.get("domain", None)
-
-            parsed_documents.append(
-                DocumentInfo(
-                    id=hashlib.sha256(relative_path.encode("utf-8")).hexdigest(),
-                    filename=file_path.name,
-                    file_path=relative_path,
-                    file_type=file_type,
-                    file_size_bytes=file_path.stat().st_size,
-                    page_count=parsed.page_count,
-                    language=detected_language,
-                    last_modified=datetime.fromtimestamp(
-                        file_path.stat().st_mtime, tz=timezone.utc
-                    ).isoformat(),
-                    encoding=parsed.encoding,
-                    word_count=len(re.findall(r"\w+", preprocessed)),
-                    title=final_title,
-                    author=final_author,
-                    description=final_description,
-                    keywords=keywords,
-                    creation_date=parsed.creation_date,
-                    mime_type=mimetypes.guess_type(file_path)[0],
-                    ingested_at=datetime.now(timezone.utc).isoformat(),
-                    char_count=len(parsed.text),
-                    has_tables=parsed.has_tables,
-                    has_images=parsed.has_images,
-                    has_code=parsed.has_code,
-                    parser_engine=parsed.parser_engine,
-                    ocr_applied=parsed.ocr_applied,
-                    tags=keywords,
-                    category=final_category,
-                    domain=final_domain,
-                    text_preview=parsed.text[:500] if parsed.text else None,
+    from .parsed_cache import parsed_content_cache
+    from .parsing_executor import ParsingExecutor
+
+    pipeline = config.pipeline
+    executor = ParsingExecutor(
+        min(pipeline.parse_workers, len(files)),
+        pipeline.parse_timeout_seconds,
+        cache=parsed_content_cache(pipeline.parsed_cache_max_mb),
+    )
+    try:
+        # Files finish in any order; results are consumed in scan order so deduplication matches a serial run.
+        parsed_files = executor.parse_all(files, on_done=lambda path, _result: progress.update(current_file=path.name))
+        for file_path, parsed in parsed_files:
+            try:
+                if isinstance(parsed, BaseException):
+                    raise parsed
+                preprocessed = _preprocess_text(parsed.text, config)
+                relative_path = file_path.relative_to(root).as_posix()
+                doc_id = hashlib.sha256(relative_path.encode("utf-8")).hexdigest()
+                if _is_duplicate(preprocessed, config, seen_hashes, near_duplicates, doc_id):
+                    continue
+
+                file_type = _normalize_extension(file_path.suffix)
+                detected_language = _detect_language(preprocessed) if config.preprocessing.language_detection else None
+                title, description = _derive_title_description(preprocessed, file_path.stem, parsed.title)
+                keywords = _extract_keywords(preprocessed)
+
+                # Apply user-defined metadata overrides
+                overrides = config.source.metadata_overrides.get(relative_path.replace("\\", "/"), {})
+                final_title = overrides.get("title", title)
+                final_author = overrides.get("author", parsed.author)
+                final_description = overrides.get("description", description)
+                final_category = overrides.get("category", None)
+                final_domain = overrides.get("domain", None)
+
+                parsed_documents.append(
+                    DocumentInfo(
+                        id=doc_id,
+                        filename=file_path.name,
+                        file_path=relative_path,
+                        file_type=file_type,
+                        file_size_bytes=file_path.stat().st_size,
+                        page_count=parsed.page_count,
+                        language=detected_language,
+                        last_modified=datetime.fromtimestamp(
+                            file_path.stat().st_mtime, tz=timezone.utc
+                        ).isoformat(),
+                        encoding=parsed.encoding,
+                        word_count=len(re.findall(r"\w+", preprocessed)),
+                        title=final_title,
+                        author=final_author,
+                        description=final_description,
+                        keywords=keywords,
+                        creation_date=parsed.creation_date,
+                        mime_type=mimetypes.guess_type(file_path)[0],
+                        ingested_at=datetime.now(timezone.utc).isoformat(),
+                        char_count=len(parsed.text),
+                        has_tables=parsed.has_tables,
+                        has_images=parsed.has_images,
+                        has_code=parsed.has_code,
+                        parser_engine=parsed.parser_engine,
+                        ocr_applied=parsed.ocr_applied,
+                        tags=keywords,
+                        category=final_category,
+                        domain=final_domain,
+                        text_preview=parsed.text[:500] if parsed.text else None,
+                    )
                 )
-            )
-        except Exception as exc:
-            errors.append(f"Failed to analyze {file_path.name}: {exc}")
-            progress.docs_failed += 1
-    
+            except Exception as exc:
+                errors.append(f"Failed to analyze {file_path.name}: {exc}")
+                progress.docs_failed += 1
+    finally:
+        executor.close()
+    if executor.cache is not None:
+        logger.info(
+            "Parsed content cache: %d hits, %d misses (%.1f%% hit rate)",
+            executor.cache_hits,
+            executor.cache_misses,
+            executor.cache_hit_rate() * 100,
+        )
+
     progress.status = "completed"
     return parsed_documents, errors
 
@@ -316,12 +349,18 @@ def process_connector_document(
     text: str,
     config: IngestionConfig,
     seen_hashes: set[str],
-    seen_token_sets: list[set[str]],
+    near_duplicates: NearDuplicateIndex,
+    dedup_lock: threading.Lock | None = None,
 ) -> DocumentInfo | None:
-    """Processes raw text from a connector into a rich DocumentInfo."""
+    """Processes raw text from a connector into a rich DocumentInfo.
+
+    ``dedup_lock`` guards the shared deduplication state when documents are
+    processed from several threads at once.
+    """
     preprocessed = _preprocess_text(text, config)
-    if _is_duplicate(preprocessed, config, seen_hashes, seen_token_sets):
-        return None
+    with dedup_lock or nullcontext():
+        if _is_duplicate(preprocessed, config, seen_hashes, near_duplicates, doc.id):
+            return None
 
     file_type = _normalize_extension(doc.file_type or "txt")
     detected_language = _detect_language(preprocessed) if config.preprocessing.language_detection else None
@@ -379,7 +418,11 @@ def get_document_text(config: IngestionConfig, document: DocumentInfo) -> str:
     """Load and preprocess full text for a document metadata entry."""
     source_root = Path(config.source.path).expanduser()
     file_path = source_root / document.file_path
-    parsed = _extract_content(file_path)
+    from .parsed_cache import extract_content, parsed_content_cache
+
+    # Chunking previews re-read the same document for every setting tried.
+    parsed_content_cache(config.pipeline.parsed_cache_max_mb)
+    parsed = extract_content(file_path)
     return _preprocess_text(parsed.text, config)
 
 
@@ -415,6 +458,43 @@ def _iter_files(
     excluded_dirs: list[str],
     exclusion_patterns: list[str],
     max_file_size_mb: int | None,
+):
+    iterator = root.rglob("*") if recursive else root.glob("*")
+    yield from _filter_files(root, iterator, recursive, excluded_dirs, exclusion_patterns, max_file_size_mb)
+
+
+def _iter_files_under(
+    root: Path,
+    relative_paths: Iterable[str],
+    recursive: bool,
+    excluded_dirs: list[str],
+    exclusion_patterns: list[str],
+    max_file_size_mb: int | None,
+):
+    """Files of ``root`` at or below ``relative_paths``, selected exactly as :func:`_iter_files` would."""
+
+    def candidates():
+        for relative in relative_paths:
+            path = root / relative
+            if path.is_dir() and not path.is_symlink():
+                yield from path.rglob("*") if recursive else path.glob("*")
+            else:
+                yield path
+
+    seen: set[Path] = set()
+    for path in _filter_files(root, candidates(), recursive, excluded_dirs, exclusion_patterns, max_file_size_mb):
+        if path not in seen:
+            seen.add(path)
+            yield path
+
+
+def _filter_files(
+    root: Path,
+    paths: Iterable[Path],
+    recursive: bool,
+    excluded_dirs: list[str],
+    exclusion_patterns: list[str],
+    max_file_size_mb: int | None,
 ):
     root_resolved = root.resolve()
     norm_root = root.as_posix().lower().rstrip("/")
@@ -440,9 +520,8 @@ def _iter_files(
         else:
             excluded.add(_normalize_relative_path(value))
     max_size_bytes = max_file_size_mb * 1024 * 1024 if max_file_size_mb else None
-    iterator = root.rglob("*") if recursive else root.glob("*")
 
-    for path in iterator:
+    for path in paths:
         if path.is_symlink():
             continue
         if not path.is_file():
@@ -455,6 +534,8 @@ def _iter_files(
         relative = path.relative_to(root)
         relative_str = relative.as_posix()
 
+        if not recursive and len(relative.parts) > 1:
+            continue
         if path.name.startswith("~$"):
             continue
         if _is_excluded(relative_str, excluded):
@@ -513,10 +594,10 @@ def _is_duplicate(
     text: str,
     config: IngestionConfig,
     seen_hashes: set[str],
-    seen_token_sets: list[set[str]],
+    near_duplicates: NearDuplicateIndex,
+    doc_id: str,
 ) -> bool:
     strategy = config.preprocessing.deduplication_strategy.value
-    threshold = config.preprocessing.deduplication_threshold
     if not text:
         return True
     if strategy == "none":
@@ -532,19 +613,8 @@ def _is_duplicate(
     current_tokens = set(re.findall(r"\w+", text.lower()))
     if not current_tokens:
         return False
-    for existing in seen_token_sets:
-        score = _jaccard_similarity(existing, current_tokens)
-        if score >= threshold:
-            return True
-    seen_token_sets.append(current_tokens)
-    return False
-
-
-def _jaccard_similarity(left: set[str], right: set[str]) -> float:
-    union = left | right
-    if not union:
-        return 0.0
-    return len(left & right) / len(union)
+    # Jaccard similarity of the word sets, estimated from MinHash signatures.
+    return near_duplicates.check_and_add(doc_id, current_tokens)
 
 
 def _detect_language(text: str) -> str | None:
@@ -0,0 +1,93 @@
+"""Bounded, staged asyncio pipeline used by the ingestion runtime.
+
+Each stage owns a pool of worker coroutines reading from a bounded queue,
+so a slow stage (embedding) applies back-pressure to the ones before it
+instead of letting parsed documents pile up in memory. A handler returns
+the item to hand it to the next stage, or ``None`` when it has finished
+with it (skipped, cancelled). Handler exceptions are reported through
+``on_error`` and only drop that one item.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+_DONE: Any = object()
+
+
+@dataclass
+class PipelineStage(Generic[T]):
+    name: str
+    handler: Callable[[T], Awaitable[T | None]]
+    workers: int = 1
+
+
+async def run_pipeline(
+    items: Iterable[T],
+    stages: Sequence[PipelineStage[T]],
+    *,
+    queue_size: int,
+    on_error: Callable[[T, str, Exception], Awaitable[None]],
+    wait_ready: Callable[[], Awaitable[Any]] | None = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> None:
+    """Push ``items`` through ``stages`` and return once every worker has exited.
+
+    ``wait_ready`` is awaited before each item enters a stage (pause support);
+    once ``should_stop`` returns true no new item is started and items still in
+    flight are dropped at their next stage boundary.
+    """
+    if not stages:
+        return
+    queues: list[asyncio.Queue] = [asyncio.Queue(maxsize=max(1, queue_size)) for _ in stages]
+
+    async def gate() -> bool:
+        if wait_ready is not None:
+            await wait_ready()
+        return not should_stop()
+
+    async def feed() -> None:
+        for item in items:
+            if not await gate():
+                break
+            await queues[0].put(item)
+
+    async def work(index: int) -> None:
+        stage = stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(queues) else None
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            if not await gate():
+                continue
+            try:
+                result = await stage.handler(item)
+            except Exception as exc:
+                await on_error(item, stage.name, exc)
+                continue
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+
+    async def run_stage(index: int, upstream: Awaitable[None]) -> None:
+        workers = [asyncio.create_task(work(index)) for _ in range(max(1, stages[index].workers))]
+        try:
+            await upstream
+            for _ in workers:
+                await queues[index].put(_DONE)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    # Stage i is closed once stage i-1 has drained, so shutdown cascades in order.
+    upstream: Awaitable[None] = feed()
+    for index in range(len(stages)):
+        upstream = run_stage(index, upstream)
+    await upstream
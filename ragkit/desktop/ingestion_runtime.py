@@ -7,8 +7,11 @@ import hashlib
 import json
 import logging
 import sqlite3
+import threading
 import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 
 from ragkit.chunking.engine import create_chunker
@@ -17,28 +20,66 @@ from ragkit.config.embedding_schema import EmbeddingConfig, EmbeddingProvider
 from ragkit.config.retrieval_schema import LexicalSearchConfig
 from ragkit.config.vector_store_schema import GeneralSettings, IngestionMode, VectorStoreConfig
 from ragkit.desktop import documents
+from ragkit.desktop.ingestion_pipeline import PipelineStage, run_pipeline
+from ragkit.desktop.parsed_cache import parsed_content_cache
+from ragkit.desktop.parsing_executor import ParsingExecutor
 from ragkit.desktop.models import (
     ChangeDetectionResult,
+    DocumentInfo,
     IngestionChange,
     IngestionHistoryEntry,
     IngestionLogEntry,
     IngestionProgress,
     SettingsPayload,
     SourceEntry,
+    SourceType,
 )
 from ragkit.desktop.profiles import build_full_config
+from ragkit.desktop.resource_registry import resources
 from ragkit.desktop import settings_store
-from ragkit.embedding.engine import EmbeddingEngine
+from ragkit.embedding.batcher import EmbeddingBatcher, request_token_budget
+from ragkit.embedding.engine import EmbeddingEngine, EmbedOutput
+from ragkit.ingestion.file_watcher import DirectoryWatcher, DirtyPaths, FileWatcherState
+from ragkit.ingestion.near_duplicates import NearDuplicateIndex
 from ragkit.connectors.base import ConnectorDocument
+from ragkit.connectors.local_directory import LocalDirectoryConnector
 from ragkit.connectors.credentials import CredentialManager
-from ragkit.connectors.registry import create_connector
+from ragkit.connectors.session import ConnectorSession
 from ragkit.desktop.migration import migrate_settings_to_multi_sources
-from ragkit.retrieval.lexical_engine import BM25Index
-from ragkit.storage.base import VectorPoint, create_vector_store
+from ragkit.retrieval.lexical_engine import BM25Index, wait_for_merges
+from ragkit.storage.base import BaseVectorStore, VectorPoint, create_vector_store
+from ragkit.storage.write_buffer import BufferedVectorStore
 
 
 logger = logging.getLogger(__name__)
 
+# Watched sources are checked this often; sources that cannot be watched are polled every 30 seconds.
+_AUTO_TICK_SECONDS = 5
+_AUTO_POLL_SECONDS = 30
+
+_REGISTRY_UPSERT_SQL = (
+    "INSERT OR REPLACE INTO ingestion_registry(doc_id,source_id,file_path,file_hash,file_size,last_modified,chunk_count,ingestion_version,ingested_at) VALUES(?,?,?,?,?,?,?,?,?)"
+)
+
+
+def _is_below(file_path: str, relative_paths: set[str]) -> bool:
+    """Whether ``file_path`` is one of ``relative_paths`` or lies in one of them."""
+    return any(file_path == path or file_path.startswith(f"{path}/") for path in relative_paths)
+
+
+@dataclass
+class _DocumentJob:
+    """One document travelling through the ingestion pipeline stages."""
+
+    index: int
+    change: IngestionChange
+    raw_doc: ConnectorDocument | None = None
+    text: str = ""
+    doc: DocumentInfo | None = None
+    chunks: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+
+
 class IngestionRuntime:
     def __init__(self) -> None:
         self.progress = IngestionProgress()
@@ -49,10 +90,13 @@ class IngestionRuntime:
         self._pause = asyncio.Event()
         self._pause.set()
         self._cancelled = False
-        self._pending_auto_trigger_at: float | None = None
-        self._last_auto_signature: str | None = None
+        # Local directories are watched for events; other sources are polled for changes.
+        self._watch_state = FileWatcherState()
+        self._poll_state = FileWatcherState()
+        self._watcher: DirectoryWatcher | None = None
+        self._next_auto_poll_at = 0.0
+        self._auto_dirty: DirtyPaths | None = None
         self._registry = settings_store.get_data_dir() / "ingestion_registry.db"
-        self._pending_docs_by_id: dict[str, ConnectorDocument] = {}
         self._credential_manager = CredentialManager()
         self._db_ready = False
         try:
@@ -64,6 +108,7 @@ class IngestionRuntime:
         self,
         settings: SettingsPayload,
         source_ids: list[str] | None = None,
+        session: ConnectorSession | None = None,
     ) -> int:
         sources = self._resolve_sources(settings)
         if source_ids:
@@ -72,16 +117,14 @@ class IngestionRuntime:
         if not sources:
             return 0
 
+        # Within an ingestion run the session already listed every source during change detection.
+        session = session or ConnectorSession(sources, self._get_credential)
         count = 0
         for source in sources:
             if not source.enabled:
                 continue
             try:
-                credential = self._get_credential(source)
-                connector = create_connector(source.type, source.id, source.config, credential)
-                # the list_documents is usually reasonably fast (e.g., local FS scan or one API call)
-                docs = await connector.list_documents()
-                count += len(docs)
+                count += await session.count(source.id)
             except Exception as e:
                 logger.error("Failed to fast-count documents for source %s: %s", source.name, e)
         return count
@@ -123,16 +166,29 @@ class IngestionRuntime:
                     docs_failed INTEGER DEFAULT 0,
                     duration_seconds REAL,
                     is_incremental BOOLEAN DEFAULT 0,
-                    config_snapshot TEXT
+                    config_snapshot TEXT,
+                    chunks_reused INTEGER DEFAULT 0,
+                    chunks_embedded INTEGER DEFAULT 0
                 )
                 """
             )
+            cols = {row[1] for row in con.execute("PRAGMA table_info(ingestion_history)").fetchall()}
+            for column in ("chunks_reused", "chunks_embedded"):
+                if column not in cols:
+                    con.execute(f"ALTER TABLE ingestion_history ADD COLUMN {column} INTEGER DEFAULT 0")
         self._db_ready = True
 
     def _ensure_db_ready(self) -> None:
         if not self._db_ready:
             self._ensure_db()
 
+    def _write_registry(self, statements: list[tuple[str, tuple]]) -> None:
+        if not statements:
+            return
+        with sqlite3.connect(self._registry) as con:
+            for sql, params in statements:
+                con.execute(sql, params)
+
     def _now(self) -> str:
         return datetime.now(timezone.utc).isoformat()
 
@@ -180,6 +236,9 @@ class IngestionRuntime:
     def _bm25_index_dir(self) -> Path:
         return settings_store.get_data_dir() / "bm25_index"
 
+    def _near_duplicates_path(self) -> Path:
+        return settings_store.get_data_dir() / "near_duplicates.npz"
+
     def _resolve_lexical_config(self, settings: SettingsPayload) -> LexicalSearchConfig:
         retrieval_payload = settings.retrieval if isinstance(settings.retrieval, dict) else {}
         lexical_payload = retrieval_payload.get("lexical", {}) if isinstance(retrieval_payload, dict) else {}
@@ -241,83 +300,147 @@ class IngestionRuntime:
     async def _embed_document_chunks(
         self,
         *,
-        embedder: EmbeddingEngine,
+        batcher: EmbeddingBatcher,
         texts: list[str],
+        tokens: list[int] | None = None,
         started: float,
     ) -> list:
         if not texts:
             return []
 
         outputs: list = []
-        batch_size = self._effective_embedding_batch_size(embedder)
+        batch_size = batcher.batch_size
         for offset in range(0, len(texts), batch_size):
             await self._pause.wait()
             if self._cancelled:
                 break
-            batch = texts[offset : offset + batch_size]
-            batch_outputs = await asyncio.to_thread(embedder.embed_texts, batch)
+            # Slices share provider requests with other documents' chunks.
+            batch_tokens = tokens[offset : offset + batch_size] if tokens is not None else None
+            batch_outputs = await batcher.embed(texts[offset : offset + batch_size], batch_tokens)
             outputs.extend(batch_outputs)
             self.progress.elapsed_seconds = time.perf_counter() - started
             await self.publish("progress", self.progress.model_dump(mode="json"))
         return outputs
 
+    async def _reusable_vectors(
+        self,
+        store: BaseVectorStore,
+        embedder: EmbeddingEngine,
+        doc_id: str,
+        texts: list[str],
+        from_store: bool,
+    ) -> list[list[float] | None]:
+        """Vectors the current embedding model already produced for ``texts``, else ``None``.
+
+        With ``from_store``, the document's points still in the collection are
+        looked up first; chunks that were stored by another model never match.
+        Remaining texts are looked up in the embedding cache.
+        """
+        namespace = embedder.cache_namespace
+        known: dict[str, list[float]] = {}
+        if from_store:
+            for point in await store.points_by_doc_id(doc_id):
+                payload = point.payload or {}
+                text = payload.get("chunk_text")
+                if text and point.vector and payload.get("embedding_model") == namespace:
+                    known[str(text)] = point.vector
+        missing = [text for text in texts if text not in known]
+        if missing:
+            known.update(await asyncio.to_thread(embedder.cached_vectors, missing))
+        return [known.get(text) for text in texts]
+
     async def _auto_ingestion_loop(self) -> None:
         while True:
             try:
-                # Run settings load in thread to avoid any I/O blocking
-                settings = await asyncio.to_thread(settings_store.load_settings)
-                general_settings = self._resolve_general_settings(settings)
-
-                if general_settings.ingestion_mode != IngestionMode.AUTOMATIC:
-                    self._pending_auto_trigger_at = None
-                    self._last_auto_signature = None
-                    await asyncio.sleep(30)
-                    continue
-
-                if self._task and not self._task.done():
-                    await asyncio.sleep(30)
-                    continue
-
-                # detect_changes is async and reads metadata or APIs.
-                changes = await self.detect_changes(settings)
-                signature = "|".join(sorted(f"{change.type}:{change.path}" for change in changes.changes))
-                now = time.monotonic()
-
-                if not signature:
-                    self._pending_auto_trigger_at = None
-                    self._last_auto_signature = None
-                    await asyncio.sleep(30)
-                    continue
-
-                if signature != self._last_auto_signature:
-                    self._last_auto_signature = signature
-                    self._pending_auto_trigger_at = now + max(general_settings.auto_ingestion_delay, 5)
-                    await asyncio.sleep(30)
-                    continue
-
-                if self._pending_auto_trigger_at and now >= self._pending_auto_trigger_at:
-                    self.logs.append(
-                        IngestionLogEntry(
-                            timestamp=self._now(),
-                            level="info",
-                            message="Auto ingestion déclenchée après délai de stabilisation.",
-                        )
-                    )
-                    await self.start(incremental=True)
-                    self._pending_auto_trigger_at = None
-                    self._last_auto_signature = None
+                await self._auto_ingestion_tick()
             except Exception:
                 logger.exception("Auto-ingestion loop error")
-                await asyncio.sleep(30)
-                continue
+            await asyncio.sleep(_AUTO_TICK_SECONDS)
 
-            await asyncio.sleep(30)
+    def _stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        self._watch_state.take()
+        self._poll_state.reset()
+
+    async def _auto_ingestion_tick(self) -> None:
+        # Run settings load in thread to avoid any I/O blocking
+        settings = await asyncio.to_thread(settings_store.load_settings)
+        general_settings = self._resolve_general_settings(settings)
+        if general_settings.ingestion_mode != IngestionMode.AUTOMATIC:
+            self._stop_watching()
+            return
+
+        delay = max(general_settings.auto_ingestion_delay, 5)
+        self._watch_state.debounce_seconds = self._poll_state.debounce_seconds = delay
+        sources = [source for source in self._resolve_sources(settings) if source.enabled]
+        if self._watcher is None:
+            self._watcher = DirectoryWatcher(self._watch_state, poll_interval=_AUTO_POLL_SECONDS)
+        roots = {
+            source.id: (source.config.get("path", ""), bool(source.config.get("recursive", True)))
+            for source in sources
+            if source.type == SourceType.LOCAL_DIRECTORY and source.config.get("path")
+        }
+        await asyncio.to_thread(self._watcher.sync, roots)
+        watched = self._watcher.sources
+
+        if self._task and not self._task.done():
+            return
+        if self._auto_dirty is not None:
+            # Paths of a run that did not complete are looked at again.
+            if self.progress.status != "completed":
+                for source_id, paths in self._auto_dirty.items():
+                    for path in paths if paths is not None else [None]:
+                        self._watch_state.mark(source_id, path)
+            self._auto_dirty = None
+
+        dirty: DirtyPaths = {}
+        if self._watch_state.poll().ready_to_trigger:
+            dirty = {source_id: paths for source_id, paths in self._watch_state.take().items() if source_id in watched}
+        if dirty:
+            # Only the dirty paths are scanned; a source queued for a full rescan is listed entirely.
+            changes = await self.detect_changes(settings, list(dirty), dirty_paths=dirty)
+            if not changes.changes:
+                dirty = {}
+
+        polled = [source.id for source in sources if source.id not in watched]
+        polled_ready = False
+        now = time.monotonic()
+        if polled and now >= self._next_auto_poll_at:
+            self._next_auto_poll_at = now + _AUTO_POLL_SECONDS
+            # detect_changes is async and reads metadata or APIs.
+            changes = await self.detect_changes(settings, polled)
+            signature = "|".join(sorted(f"{change.type}:{change.path}" for change in changes.changes))
+            polled_ready = self._poll_state.observe(signature).ready_to_trigger
+
+        if not dirty and not polled_ready:
+            return
+        self.logs.append(
+            IngestionLogEntry(
+                timestamp=self._now(),
+                level="info",
+                message="Auto ingestion déclenchée après délai de stabilisation.",
+            )
+        )
+        source_ids = list(dirty) + (polled if polled_ready else [])
+        await self.start(incremental=True, source_ids=source_ids, dirty_paths=dirty)
+        self._auto_dirty = dirty
+        if polled_ready:
+            self._poll_state.reset()
 
     async def detect_changes(
         self,
         settings: SettingsPayload | None = None,
         source_ids: list[str] | None = None,
+        session: ConnectorSession | None = None,
+        dirty_paths: DirtyPaths | None = None,
     ) -> ChangeDetectionResult:
+        """Changes of the active sources since the last ingestion.
+
+        A local directory source with a set of ``dirty_paths`` is only scanned
+        at and below those paths, as reported by the file watcher.
+        """
         settings = settings or settings_store.load_settings()
         sources = self._resolve_sources(settings)
         active_sources = [source for source in sources if source.enabled]
@@ -348,21 +471,27 @@ class IngestionRuntime:
         
         changes: list[IngestionChange] = []
         all_removed_ids: set[str] = set()
-        self._pending_docs_by_id = {}
+        session = session or ConnectorSession(active_sources, self._get_credential)
         
         for source in active_sources:
             try:
-                credential = self._get_credential(source)
-                connector = create_connector(source.type, source.id, source.config, credential)
-                delta = await connector.detect_changes(known_hashes_by_source.get(source.id, {}))
+                known_hashes = known_hashes_by_source.get(source.id, {})
+                paths = (dirty_paths or {}).get(source.id)
+                if paths is not None:
+                    known_hashes = {
+                        doc_id: file_hash
+                        for doc_id, file_hash in known_hashes.items()
+                        if _is_below(previous[doc_id]["file_path"], paths)
+                    }
+                    delta = await session.detect_path_changes(source.id, paths, known_hashes)
+                else:
+                    delta = await session.detect_changes(source.id, known_hashes)
                 
                 for doc in delta.added:
                     path = doc.file_path or doc.url or doc.title
-                    self._pending_docs_by_id[doc.id] = doc
                     changes.append(IngestionChange(type="added", path=path, file_size=doc.file_size_bytes, last_modified=doc.last_modified, doc_id=doc.id, source_id=source.id))
                 for doc in delta.modified:
                     path = doc.file_path or doc.url or doc.title
-                    self._pending_docs_by_id[doc.id] = doc
                     changes.append(IngestionChange(type="modified", path=path, file_size=doc.file_size_bytes, last_modified=doc.last_modified, doc_id=doc.id, source_id=source.id))
                 all_removed_ids.update(delta.removed_ids)
             except Exception as e:
@@ -380,7 +509,12 @@ class IngestionRuntime:
             removed=len(all_removed_ids),
         )
 
-    async def start(self, incremental: bool = False, source_ids: list[str] | None = None) -> dict:
+    async def start(
+        self,
+        incremental: bool = False,
+        source_ids: list[str] | None = None,
+        dirty_paths: DirtyPaths | None = None,
+    ) -> dict:
         self.ensure_background_tasks()
         if self._task and not self._task.done():
             return {"version": self.progress.version, "status": self.progress.status}
@@ -391,7 +525,9 @@ class IngestionRuntime:
         self.progress.status = "running"
         self.progress.is_incremental = incremental
         self.progress.phase = "queued"
-        self._task = asyncio.create_task(self._run(incremental=incremental, source_ids=source_ids))
+        self._task = asyncio.create_task(
+            self._run(incremental=incremental, source_ids=source_ids, dirty_paths=dirty_paths)
+        )
         return {"version": self.progress.version, "status": "running"}
 
     async def pause(self) -> dict:
@@ -418,7 +554,12 @@ class IngestionRuntime:
             return "v1"
         return f"v{int(row[0].lstrip('v')) + 1}"
 
-    async def _run(self, incremental: bool, source_ids: list[str] | None = None) -> None:
+    async def _run(
+        self,
+        incremental: bool,
+        source_ids: list[str] | None = None,
+        dirty_paths: DirtyPaths | None = None,
+    ) -> None:
         self.ensure_background_tasks()
         settings = await asyncio.to_thread(settings_store.load_settings)
         if not settings.ingestion:
@@ -451,6 +592,7 @@ class IngestionRuntime:
         docs_skipped = 0
         history_open = False
         stats_chunks = 0
+        parsing_executor: ParsingExecutor | None = None
 
         self.progress = IngestionProgress(status="running", version=version, is_incremental=incremental, phase="scanning")
         self.logs = [IngestionLogEntry(timestamp=started_at, level="info", message=f"Ingestion {version} démarrée")]
@@ -461,10 +603,26 @@ class IngestionRuntime:
             vec_cfg = VectorStoreConfig.model_validate(settings.vector_store or {})
             lexical_cfg = self._resolve_lexical_config(settings)
             bm25_index = BM25Index(lexical_cfg)
+            threshold = settings.ingestion.preprocessing.deduplication_threshold
             if incremental:
+                # A merge committed after loading would make this run's save rewrite the whole index.
+                await asyncio.to_thread(wait_for_merges, self._bm25_index_dir())
                 bm25_index.load(self._bm25_index_dir())
-            store = create_vector_store(vec_cfg)
-            embedder = EmbeddingEngine(emb_cfg)
+                # Documents indexed by earlier runs still count as originals.
+                near_duplicates = NearDuplicateIndex.load(self._near_duplicates_path(), threshold)
+            else:
+                near_duplicates = NearDuplicateIndex(threshold)
+            # Registry rows are only committed once the vectors they describe have been
+            # flushed, so a crash mid-run never marks a document as indexed too early.
+            registry_writes: list[tuple[str, tuple]] = []
+
+            async def commit_registry() -> None:
+                batch = registry_writes[:]
+                registry_writes.clear()
+                await asyncio.to_thread(self._write_registry, batch)
+
+            store = BufferedVectorStore(create_vector_store(vec_cfg), on_flush=commit_registry)
+            embedder = resources.embedder(emb_cfg)
             chunker = create_chunker(chunk_cfg)
 
             dims = await asyncio.to_thread(embedder.resolve_dimensions)
@@ -490,7 +648,9 @@ class IngestionRuntime:
                 await store.delete_collection()
                 await store.initialize(dims)
 
-            changes = await self.detect_changes(settings, source_ids=source_ids)
+            # One connector per source for the whole run; each source is listed once.
+            session = ConnectorSession(active_sources, self._get_credential)
+            changes = await self.detect_changes(settings, source_ids=source_ids, session=session, dirty_paths=dirty_paths)
             registry_before = self._load_registry()
             
             docs_added = changes.added
@@ -498,16 +658,21 @@ class IngestionRuntime:
             docs_removed = changes.removed
 
             removed_ids = [change.doc_id for change in changes.changes if change.type == "removed" and change.doc_id]
+            # A changed document is compared with the others again, never with its previous version;
+            # an "added" one may also have an entry left by a run cancelled before registering it.
+            for change in changes.changes:
+                if change.doc_id:
+                    near_duplicates.remove(change.doc_id)
             
             # Keep index in sync when files were removed
             for doc_id in removed_ids:
                 await store.delete_by_doc_id(doc_id)
                 bm25_index.remove_document_chunks(doc_id)
-                with sqlite3.connect(self._registry) as con:
-                    con.execute("DELETE FROM ingestion_registry WHERE doc_id = ?", (doc_id,))
+                registry_writes.append(("DELETE FROM ingestion_registry WHERE doc_id = ?", (doc_id,)))
 
             # Process added and modified
             to_process = [c for c in changes.changes if c.type in {"added", "modified"} and c.source_id and c.doc_id]
+            session.plan_fetches([(change.source_id, change.doc_id) for change in to_process])
             
             with sqlite3.connect(self._registry) as con:
                 con.execute(
@@ -516,236 +681,327 @@ class IngestionRuntime:
                 )
             history_open = True
 
-            # We need connectors dict to avoid re-instantiating them for each file
-            connectors = {}
             source_by_id = {source.id: source for source in active_sources}
+            pipeline_cfg = settings.ingestion.pipeline
+            # Local files are parsed in worker processes; the pool starts with the first document.
+            parsing_executor = ParsingExecutor(
+                pipeline_cfg.parse_workers,
+                pipeline_cfg.parse_timeout_seconds,
+                cache=parsed_content_cache(pipeline_cfg.parsed_cache_max_mb),
+            )
             for source in active_sources:
-                credential = self._get_credential(source)
-                connectors[source.id] = create_connector(source.type, source.id, source.config, credential)
+                connector = session.connector(source.id)
+                if isinstance(connector, LocalDirectoryConnector):
+                    connector.parsing_executor = parsing_executor
 
-            doc_times: list[float] = []
-            last_elapsed = 0.0
             self.progress.doc_total = len(to_process)
-            source_docs_count = await self._count_source_documents_fast(settings, source_ids=source_ids)
-            
-            seen_hashes: set[str] = set()
-            seen_token_sets: list[set[str]] = []
-
-            for idx, change in enumerate(to_process, start=1):
-                await self._pause.wait()
-                if self._cancelled:
-                    break
+            # Sources scanned by dirty paths are not listed again; their size follows from the registry.
+            partial = {source_id for source_id, paths in (dirty_paths or {}).items() if paths is not None}
+            source_docs_count = sum(1 for info in registry_before.values() if info.get("source_id") in partial)
+            for change in changes.changes:
+                if change.source_id in partial and change.type in {"added", "removed"}:
+                    source_docs_count += 1 if change.type == "added" else -1
+            listed_ids = [source.id for source in active_sources if source.id not in partial]
+            if listed_ids:
+                source_docs_count += await self._count_source_documents_fast(settings, source_ids=listed_ids, session=session)
+            batcher = EmbeddingBatcher(
+                embedder.embed_texts,
+                batch_size=self._effective_embedding_batch_size(embedder),
+                max_tokens=request_token_budget(emb_cfg),
+                max_wait_seconds=pipeline_cfg.embed_max_wait_ms / 1000,
+                max_concurrency=pipeline_cfg.embed_workers,
+            )
 
-                self.progress.doc_index = idx
+            seen_hashes: set[str] = set()
+            dedup_lock = threading.Lock()
+            docs_done = 0
+
+            async def document_done(job: _DocumentJob) -> None:
+                nonlocal docs_done
+                docs_done += 1
+                elapsed = time.perf_counter() - started
+                self.progress.doc_index = docs_done
+                self.progress.elapsed_seconds = elapsed
+                # Documents overlap in the pipeline, so the rate is measured over the whole run.
+                self.progress.estimated_remaining_seconds = max((len(to_process) - docs_done) * elapsed / docs_done, 0)
+
+                if source_docs_count > 0:
+                    # total_documents_indexed reflects the state of the whole collection
+                    # but we want a live progress of coverage.
+                    # We use the registry or a quick count to approximate if needed,
+                    # but here we can just update it based on history + current progress.
+                    current_indexed = self.progress.docs_succeeded + (len(registry_before) - docs_removed - docs_modified)
+                    self.progress.coverage_percent = round((current_indexed / source_docs_count) * 100, 2)
+
+                await self.publish("progress", self.progress.model_dump(mode="json"))
+
+            async def parse_document(job: _DocumentJob) -> _DocumentJob | None:
+                nonlocal docs_skipped
+                change = job.change
                 self.progress.current_doc = change.path
+                self.progress.phase = "parsing"
                 try:
-                    self.progress.phase = "parsing"
-                    try:
-                        connector = connectors.get(change.source_id)
-                        if not connector:
-                            raise RuntimeError(f"Connector non trouvé pour la source {change.source_id}")
-                            
-                        text = await asyncio.wait_for(
-                            connector.fetch_document_content(change.doc_id),
-                            timeout=300
-                        )
-                        
-                        raw_doc = self._pending_docs_by_id.get(change.doc_id)
-                        if raw_doc is None:
-                            try:
-                                docs = await connector.list_documents()
-                                raw_doc = next((doc for doc in docs if doc.id == change.doc_id), None)
-                            except Exception:
-                                raw_doc = None
-                        if raw_doc is None:
-                            raw_doc = ConnectorDocument(
-                                id=change.doc_id,
-                                source_id=change.source_id or "",
-                                title=change.path or "Document",
-                                content="",
-                                content_type="text",
-                                url=change.path if change.path and change.path.startswith("http") else None,
-                                file_path=None if change.path and change.path.startswith("http") else change.path,
-                                file_type=None,
-                                file_size_bytes=change.file_size or 0,
-                                last_modified=change.last_modified or "",
-                            )
+                    if change.source_id not in session.sources:
+                        raise RuntimeError(f"Connector non trouvé pour la source {change.source_id}")
+
+                    job.text = await asyncio.wait_for(
+                        session.fetch_content(change.source_id, change.doc_id),
+                        timeout=300
+                    )
 
-                        doc = await asyncio.wait_for(
-                            asyncio.to_thread(documents.process_connector_document, raw_doc, text, settings.ingestion, seen_hashes, seen_token_sets),
-                            timeout=60
+                    try:
+                        raw_doc = await session.document(change.source_id, change.doc_id)
+                    except Exception:
+                        raw_doc = None
+                    if raw_doc is None:
+                        raw_doc = ConnectorDocument(
+                            id=change.doc_id,
+                            source_id=change.source_id or "",
+                            title=change.path or "Document",
+                            content="",
+                            content_type="text",
+                            url=change.path if change.path and change.path.startswith("http") else None,
+                            file_path=None if change.path and change.path.startswith("http") else change.path,
+                            file_type=None,
+                            file_size_bytes=change.file_size or 0,
+                            last_modified=change.last_modified or "",
                         )
-                        if doc:
-                            source_entry = source_by_id.get(change.source_id or "")
-                            if source_entry:
-                                doc.source_id = source_entry.id
-                                doc.source_type = source_entry.type.value
-                                doc.source_name = source_entry.name
-                                if raw_doc.url and not doc.original_url:
-                                    doc.original_url = raw_doc.url
-                        
-                        if not doc:
-                            # Deduplicated
-                            docs_skipped += 1
-                            self.logs.append(
-                                IngestionLogEntry(
-                                    timestamp=self._now(),
-                                    level="info",
-                                    message=f"{change.path} (ignoré, doublon)",
-                                )
+                    job.raw_doc = raw_doc
+
+                    doc = await asyncio.wait_for(
+                        asyncio.to_thread(
+                            documents.process_connector_document,
+                            raw_doc,
+                            job.text,
+                            settings.ingestion,
+                            seen_hashes,
+                            near_duplicates,
+                            dedup_lock,
+                        ),
+                        timeout=60
+                    )
+                    if doc:
+                        source_entry = source_by_id.get(change.source_id or "")
+                        if source_entry:
+                            doc.source_id = source_entry.id
+                            doc.source_type = source_entry.type.value
+                            doc.source_name = source_entry.name
+                            if raw_doc.url and not doc.original_url:
+                                doc.original_url = raw_doc.url
+
+                    if not doc:
+                        # Deduplicated
+                        docs_skipped += 1
+                        self.logs.append(
+                            IngestionLogEntry(
+                                timestamp=self._now(),
+                                level="info",
+                                message=f"{change.path} (ignoré, doublon)",
                             )
-                            continue
-                            
-                        self.progress.phase = "chunking"
-                        chunks = await asyncio.wait_for(
-                            asyncio.to_thread(
-                                chunker.chunk,
-                                text,
-                                {"doc_id": doc.id, "doc_path": doc.file_path, "doc_title": doc.title or doc.filename, "source_id": doc.source_id},
-                            ),
-                            timeout=300
-                        )
-                        self.progress.phase = "embedding"
-                        outputs = await asyncio.wait_for(
-                            self._embed_document_chunks(
-                                embedder=embedder,
-                                texts=[chunk.content for chunk in chunks],
-                                started=started,
-                            ),
-                            timeout=1800  # Give embedding up to 30 mins just in case of huge files on CPU
-                        )
-                    except asyncio.TimeoutError as exc:
-                        raise RuntimeError("Le traitement du document a pris trop de temps et a été annulé.") from exc
-
-                    if self._cancelled:
-                        break
-                    if len(outputs) != len(chunks):
-                        raise RuntimeError(
-                            f"Embedding output mismatch: {len(outputs)} embeddings for {len(chunks)} chunks."
                         )
+                        await document_done(job)
+                        return None
+                    job.doc = doc
+
+                    self.progress.phase = "chunking"
+                    job.chunks = await asyncio.wait_for(
+                        asyncio.to_thread(
+                            chunker.chunk,
+                            job.text,
+                            {"doc_id": doc.id, "doc_path": doc.file_path, "doc_title": doc.title or doc.filename, "source_id": doc.source_id},
+                        ),
+                        timeout=300
+                    )
+                except asyncio.TimeoutError as exc:
+                    raise RuntimeError("Le traitement du document a pris trop de temps et a été annulé.") from exc
+                return job
+
+            async def embed_document(job: _DocumentJob) -> _DocumentJob | None:
+                self.progress.phase = "embedding"
+                texts = [chunk.content for chunk in job.chunks]
+                # Unchanged chunks of a modified document keep their stored vectors.
+                reused = await self._reusable_vectors(
+                    store, embedder, job.doc.id, texts, from_store=incremental and job.change.type == "modified"
+                )
+                missing = [i for i, vector in enumerate(reused) if vector is None]
+                try:
+                    embedded = await asyncio.wait_for(
+                        self._embed_document_chunks(
+                            batcher=batcher,
+                            texts=[texts[i] for i in missing],
+                            tokens=[job.chunks[i].tokens for i in missing],
+                            started=started,
+                        ),
+                        timeout=1800  # Give embedding up to 30 mins just in case of huge files on CPU
+                    )
+                except asyncio.TimeoutError as exc:
+                    raise RuntimeError("Le traitement du document a pris trop de temps et a été annulé.") from exc
 
-                    self.progress.phase = "storing"
-                    # For modified documents (or full re-index runs), remove all previous
-                    # chunks first so obsolete chunks do not remain in the index.
-                    if (not incremental) or (change.type == "modified"):
-                        await store.delete_by_doc_id(doc.id)
-                        bm25_index.remove_document_chunks(doc.id)
-
-                    points = [
-                        VectorPoint(
-                            id=hashlib.sha256(f"{doc.id}:{i}:{chunk.content}".encode("utf-8")).hexdigest(),
-                            vector=outputs[i].vector,
-                            payload={
-                                "doc_id": doc.id,
-                                "doc_title": doc.title or doc.filename,
-                                "filename": doc.filename,
-                                "doc_path": doc.file_path,
-                                "doc_type": doc.file_type,
-                                "doc_language": doc.language,
-                                "source_id": doc.source_id,
-                                "source_type": doc.source_type,
-                                "source_name": doc.source_name,
-                                "original_url": doc.original_url,
-                                "category": doc.category,
-                                "keywords": list(doc.keywords),
-                                "tags": list(doc.tags),
-                                "page_number": doc.page_count,
-                                "chunk_index": i,
-                                "chunk_total": len(chunks),
-                                "chunk_text": chunk.content,
-                                "chunk_tokens": chunk.tokens,
-                                "ingestion_version": version,
-                                "ingested_at": self._now(),
-                            },
-                        )
-                        for i, chunk in enumerate(chunks)
-                    ]
-                    await store.upsert(points)
-
-                    for point in points:
-                        payload = dict(point.payload or {})
-                        bm25_index.add_document(
-                            doc_id=point.id,
-                            text=str(payload.get("chunk_text") or ""),
-                            metadata=payload,
-                            language=doc.language,
-                        )
+                if self._cancelled:
+                    return None
+                if len(embedded) != len(missing):
+                    raise RuntimeError(
+                        f"Embedding output mismatch: {len(embedded)} embeddings for {len(missing)} chunks."
+                    )
+                computed = iter(embedded)
+                job.outputs = [
+                    EmbedOutput(vector=vector, latency_ms=0) if vector is not None else next(computed)
+                    for vector in reused
+                ]
+                self.progress.chunks_reused += len(texts) - len(missing)
+                self.progress.chunks_embedded += len(missing)
+                return job
+
+            async def store_document(job: _DocumentJob) -> None:
+                doc, chunks, outputs, change = job.doc, job.chunks, job.outputs, job.change
+                self.progress.phase = "storing"
+                # For modified documents (or full re-index runs), remove all previous
+                # chunks first so obsolete chunks do not remain in the index.
+                if (not incremental) or (change.type == "modified"):
+                    await store.delete_by_doc_id(doc.id)
+                    bm25_index.remove_document_chunks(doc.id)
+
+                points = [
+                    VectorPoint(
+                        id=hashlib.sha256(f"{doc.id}:{i}:{chunk.content}".encode("utf-8")).hexdigest(),
+                        vector=outputs[i].vector,
+                        payload={
+                            "doc_id": doc.id,
+                            "doc_title": doc.title or doc.filename,
+                            "filename": doc.filename,
+                            "doc_path": doc.file_path,
+                            "doc_type": doc.file_type,
+                            "doc_language": doc.language,
+                            "source_id": doc.source_id,
+                            "source_type": doc.source_type,
+                            "source_name": doc.source_name,
+                            "original_url": doc.original_url,
+                            "category": doc.category,
+                            "keywords": list(doc.keywords),
+                            "tags": list(doc.tags),
+                            "page_number": doc.page_count,
+                            "chunk_index": i,
+                            "chunk_total": len(chunks),
+                            "chunk_text": chunk.content,
+                            "chunk_tokens": chunk.tokens,
+                            "embedding_model": embedder.cache_namespace,
+                            "ingestion_version": version,
+                            "ingested_at": self._now(),
+                        },
+                    )
+                    for i, chunk in enumerate(chunks)
+                ]
+                await store.upsert(points)
+
+                for point in points:
+                    payload = dict(point.payload or {})
+                    bm25_index.add_document(
+                        doc_id=point.id,
+                        text=str(payload.get("chunk_text") or ""),
+                        metadata=payload,
+                        language=doc.language,
+                    )
 
-                    # Store connector-provided content hash for change detection
+                # Store connector-provided content hash for change detection
+                file_hash = ""
+                if job.raw_doc and getattr(job.raw_doc, "content_hash", ""):
+                    file_hash = job.raw_doc.content_hash
+                registry_writes.append(
+                    (
+                        _REGISTRY_UPSERT_SQL,
+                        (doc.id, doc.source_id, doc.file_path or doc.original_url or "", file_hash, doc.file_size_bytes, doc.last_modified, len(chunks), version, self._now()),
+                    )
+                )
+                self.progress.docs_succeeded += 1
+                self.progress.total_chunks += len(chunks)
+                self.logs.append(
+                    IngestionLogEntry(timestamp=self._now(), level="success", message=f"{doc.filename} — {len(chunks)} chunks")
+                )
+                await document_done(job)
+
+            async def document_failed(job: _DocumentJob, stage: str, exc: Exception) -> None:
+                self.progress.docs_failed += 1
+                change, doc, raw_doc = job.change, job.doc, job.raw_doc
+                doc_label = change.path or "Document"
+                if doc:
+                    doc_label = doc.filename or doc_label
+                self.logs.append(
+                    IngestionLogEntry(
+                        timestamp=self._now(),
+                        level="error",
+                        message=f"{doc_label} — échec: {exc}",
+                    )
+                )
+                # Register failed docs with chunk_count=0 so they are not
+                # detected as "added" on the next change-detection scan,
+                # which would cause an infinite auto-ingestion loop.
+                try:
                     file_hash = ""
-                    if "raw_doc" in locals() and raw_doc and getattr(raw_doc, "content_hash", ""):
+                    if raw_doc and getattr(raw_doc, "content_hash", ""):
                         file_hash = raw_doc.content_hash
-                    with sqlite3.connect(self._registry) as con:
-                        con.execute(
-                            "INSERT OR REPLACE INTO ingestion_registry(doc_id,source_id,file_path,file_hash,file_size,last_modified,chunk_count,ingestion_version,ingested_at) VALUES(?,?,?,?,?,?,?,?,?)",
-                            (doc.id, doc.source_id, doc.file_path or doc.original_url or "", file_hash, doc.file_size_bytes, doc.last_modified, len(chunks), version, self._now()),
-                        )
-                    self.progress.docs_succeeded += 1
-                    self.progress.total_chunks += len(chunks)
-                    self.logs.append(
-                        IngestionLogEntry(timestamp=self._now(), level="success", message=f"{doc.filename} — {len(chunks)} chunks")
-                    )
-                except Exception as exc:  # pragma: no cover - defensive at runtime
-                    self.progress.docs_failed += 1
-                    doc_label = change.path or "Document"
-                    if "doc" in locals() and doc:
-                        doc_label = doc.filename or doc_label
-                    self.logs.append(
-                        IngestionLogEntry(
-                            timestamp=self._now(),
-                            level="error",
-                            message=f"{doc_label} — échec: {exc}",
+                    if doc:
+                        doc_id = doc.id
+                        source_id = doc.source_id
+                        file_path = doc.file_path or doc.original_url or ""
+                        file_size = doc.file_size_bytes
+                        last_modified = doc.last_modified
+                    else:
+                        doc_id = change.doc_id or ""
+                        source_id = change.source_id
+                        file_path = change.path or ""
+                        file_size = change.file_size or 0
+                        last_modified = change.last_modified or self._now()
+                    registry_writes.append(
+                        (
+                            _REGISTRY_UPSERT_SQL,
+                            (doc_id, source_id, file_path, file_hash, file_size, last_modified, 0, version, self._now()),
                         )
                     )
-                    # Register failed docs with chunk_count=0 so they are not
-                    # detected as "added" on the next change-detection scan,
-                    # which would cause an infinite auto-ingestion loop.
-                    try:
-                        file_hash = ""
-                        if "raw_doc" in locals() and raw_doc and getattr(raw_doc, "content_hash", ""):
-                            file_hash = raw_doc.content_hash
-                        if "doc" in locals() and doc:
-                            doc_id = doc.id
-                            source_id = doc.source_id
-                            file_path = doc.file_path or doc.original_url or ""
-                            file_size = doc.file_size_bytes
-                            last_modified = doc.last_modified
-                        else:
-                            doc_id = change.doc_id or ""
-                            source_id = change.source_id
-                            file_path = change.path or ""
-                            file_size = change.file_size or 0
-                            last_modified = change.last_modified or self._now()
-                        with sqlite3.connect(self._registry) as con:
-                            con.execute(
-                                "INSERT OR REPLACE INTO ingestion_registry(doc_id,source_id,file_path,file_hash,file_size,last_modified,chunk_count,ingestion_version,ingested_at) VALUES(?,?,?,?,?,?,?,?,?)",
-                                (doc_id, source_id, file_path, file_hash, file_size, last_modified, 0, version, self._now()),
-                            )
-                    except Exception:
-                        pass
-                finally:
-                    elapsed = time.perf_counter() - started
-                    dt = max(elapsed - last_elapsed, 0.0)
-                    last_elapsed = elapsed
-                    doc_times.append(dt)
-                    self.progress.elapsed_seconds = elapsed
-                    avg = (sum(doc_times) / len(doc_times)) if doc_times else 0.0
-                    self.progress.estimated_remaining_seconds = max((len(to_process) - idx) * avg, 0)
-                    
-                    if source_docs_count > 0:
-                        # total_documents_indexed reflects the state of the whole collection
-                        # but we want a live progress of coverage.
-                        # We use the registry or a quick count to approximate if needed,
-                        # but here we can just update it based on history + current progress.
-                        current_indexed = self.progress.docs_succeeded + (len(registry_before) - docs_removed - docs_modified)
-                        self.progress.coverage_percent = round((current_indexed / source_docs_count) * 100, 2)
-
-                    await self.publish("progress", self.progress.model_dump(mode="json"))
+                except Exception:
+                    pass
+                await document_done(job)
+
+            # Parsing, embedding and storing overlap across documents; a single writer
+            # keeps the vector store and BM25 index updates sequential.
+            await run_pipeline(
+                (_DocumentJob(index=idx, change=change) for idx, change in enumerate(to_process, start=1)),
+                [
+                    PipelineStage("parsing", parse_document, pipeline_cfg.parse_workers),
+                    PipelineStage("embedding", embed_document, pipeline_cfg.embed_pending_docs),
+                    PipelineStage("storing", store_document, 1),
+                ],
+                queue_size=pipeline_cfg.queue_size,
+                on_error=document_failed,
+                wait_ready=self._pause.wait,
+                should_stop=lambda: self._cancelled,
+            )
+            await batcher.flush()
+            logger.info("Embedded %d texts in %d provider requests", batcher.texts, batcher.requests)
+            logger.info(
+                "Chunks: %d reused, %d embedded", self.progress.chunks_reused, self.progress.chunks_embedded
+            )
+            stem_stats = bm25_index.preprocessor.cache_stats()
+            logger.info(
+                "BM25 stem cache: %d hits, %d misses (%.1f%% hit rate)",
+                stem_stats["stem_hits"],
+                stem_stats["stem_misses"],
+                stem_stats["stem_hit_rate"] * 100,
+            )
+            if parsing_executor.cache is not None:
+                logger.info(
+                    "Parsed content cache: %d hits, %d misses (%.1f%% hit rate)",
+                    parsing_executor.cache_hits,
+                    parsing_executor.cache_misses,
+                    parsing_executor.cache_hit_rate() * 100,
+                )
 
             self.progress.phase = "finalizing"
+            await store.flush()
             stats = await store.collection_stats()
             stats_chunks = int(stats.vectors_count)
-            bm25_index.save(self._bm25_index_dir())
+            # Writes only this run's chunks as a new segment (or merges segments) off the event loop.
+            await asyncio.to_thread(bm25_index.save, self._bm25_index_dir())
+            await asyncio.to_thread(near_duplicates.save, self._near_duplicates_path())
             end_status = "cancelled" if self._cancelled else "completed"
             self.progress.status = end_status
             self.progress.elapsed_seconds = time.perf_counter() - started
@@ -753,7 +1009,7 @@ class IngestionRuntime:
             if history_open:
                 with sqlite3.connect(self._registry) as con:
                     con.execute(
-                        "UPDATE ingestion_history SET completed_at=?,status=?,total_chunks=?,duration_seconds=?,docs_added=?,docs_modified=?,docs_removed=?,docs_skipped=?,docs_failed=? WHERE version=?",
+                        "UPDATE ingestion_history SET completed_at=?,status=?,total_chunks=?,duration_seconds=?,docs_added=?,docs_modified=?,docs_removed=?,docs_skipped=?,docs_failed=?,chunks_reused=?,chunks_embedded=? WHERE version=?",
                         (
                             completed_at,
                             end_status,
@@ -764,12 +1020,22 @@ class IngestionRuntime:
                             docs_removed,
                             docs_skipped,
                             self.progress.docs_failed,
+                            self.progress.chunks_reused,
+                            self.progress.chunks_embedded,
                             version,
                         ),
                     )
             self.logs.append(IngestionLogEntry(timestamp=completed_at, level="info", message=f"Ingestion {version} {end_status}"))
+            # Searches must reopen the collection this run rewrote through its own store.
+            resources.invalidate_stores()
             await self.publish("complete", self.progress.model_dump(mode="json"))
         except Exception as exc:  # pragma: no cover - defensive at runtime
+            if "store" in locals():
+                # Keep the documents that did complete before the failure.
+                try:
+                    await store.flush()
+                except Exception:
+                    logger.warning("Failed to flush buffered vector store writes", exc_info=True)
             self.progress.status = "failed"
             self.progress.phase = "error"
             self.progress.elapsed_seconds = time.perf_counter() - started
@@ -784,7 +1050,7 @@ class IngestionRuntime:
             if history_open:
                 with sqlite3.connect(self._registry) as con:
                     con.execute(
-                        "UPDATE ingestion_history SET completed_at=?,status=?,total_chunks=?,duration_seconds=?,docs_added=?,docs_modified=?,docs_removed=?,docs_skipped=?,docs_failed=? WHERE version=?",
+                        "UPDATE ingestion_history SET completed_at=?,status=?,total_chunks=?,duration_seconds=?,docs_added=?,docs_modified=?,docs_removed=?,docs_skipped=?,docs_failed=?,chunks_reused=?,chunks_embedded=? WHERE version=?",
                         (
                             completed_at,
                             "failed",
@@ -795,15 +1061,21 @@ class IngestionRuntime:
                             docs_removed,
                             docs_skipped,
                             self.progress.docs_failed or 1,
+                            self.progress.chunks_reused,
+                            self.progress.chunks_embedded,
                             version,
                         ),
                     )
+            resources.invalidate_stores()
             await self.publish("complete", self.progress.model_dump(mode="json"))
+        finally:
+            if parsing_executor is not None:
+                await asyncio.to_thread(parsing_executor.close)
 
     def get_history(self, limit: int = 10) -> list[IngestionHistoryEntry]:
         with sqlite3.connect(self._registry) as con:
             rows = con.execute(
-                "SELECT version,started_at,completed_at,status,total_docs,total_chunks,docs_added,docs_modified,docs_removed,docs_skipped,docs_failed,duration_seconds,is_incremental FROM ingestion_history ORDER BY rowid DESC LIMIT ?",
+                "SELECT version,started_at,completed_at,status,total_docs,total_chunks,docs_added,docs_modified,docs_removed,docs_skipped,docs_failed,duration_seconds,is_incremental,chunks_reused,chunks_embedded FROM ingestion_history ORDER BY rowid DESC LIMIT ?",
                 (limit,),
             ).fetchall()
         return [
@@ -821,6 +1093,8 @@ class IngestionRuntime:
                 docs_failed=r[10] or 0,
                 duration_seconds=r[11],
                 is_incremental=bool(r[12]),
+                chunks_reused=r[13] or 0,
+                chunks_embedded=r[14] or 0,
             )
             for r in rows
         ]
@@ -150,6 +150,26 @@ class PreprocessingConfig(BaseModel):
     deduplication_threshold: float = Field(default=0.95, ge=0.0, le=1.0)
 
 
+class PipelineConfig(BaseModel):
+    """Concurrency of the staged ingestion pipeline (a single writer stores results).
+
+    ``parse_workers`` documents are parsed at once, each in its own worker
+    process (in-process when set to 1); a parser still running after
+    ``parse_timeout_seconds`` is killed. Parsed content is cached on disk, up
+    to ``parsed_cache_max_mb`` (0 disables the cache). ``embed_workers`` bounds
+    concurrent provider requests; up to ``embed_pending_docs`` documents share
+    those requests, their chunks batched together for at most ``embed_max_wait_ms``.
+    """
+
+    parse_workers: int = Field(default=4, ge=1, le=32)
+    parse_timeout_seconds: int = Field(default=120, ge=1, le=3600)
+    parsed_cache_max_mb: int = Field(default=512, ge=0, le=65536)
+    embed_workers: int = Field(default=2, ge=1, le=16)
+    embed_pending_docs: int = Field(default=32, ge=1, le=1024)
+    embed_max_wait_ms: int = Field(default=50, ge=0, le=5000)
+    queue_size: int = Field(default=8, ge=1, le=256)
+
+
 class SourceEntry(BaseModel):
     """Configuration d'une source individuelle dans la liste multi-sources."""
     id: str = Field(default_factory=lambda: str(uuid4()))
@@ -172,6 +192,7 @@ class IngestionConfig(BaseModel):
     sources: list[SourceEntry] = Field(default_factory=list)
     parsing: ParsingConfig = Field(default_factory=ParsingConfig)
     preprocessing: PreprocessingConfig = Field(default_factory=PreprocessingConfig)
+    pipeline: PipelineConfig = Field(default_factory=PipelineConfig)
 
 
 class SourceConfigPatch(BaseModel):
@@ -418,6 +439,8 @@ class IngestionProgress(BaseModel):
     docs_failed: int = 0
     docs_skipped: int = 0
     total_chunks: int = 0
+    chunks_reused: int = 0
+    chunks_embedded: int = 0
     coverage_percent: float = 0.0
 
 
@@ -435,6 +458,8 @@ class IngestionHistoryEntry(BaseModel):
     docs_failed: int = 0
     duration_seconds: float | None = None
     is_incremental: bool = False
+    chunks_reused: int = 0
+    chunks_embedded: int = 0
 
 
 class IngestionLogEntry(BaseModel):
@@ -0,0 +1,217 @@
+"""Persistent cache of parsed document content.
+
+Parsing a PDF or DOCX costs far more than reading it, and the same bytes are
+parsed again by every analysis, chunking preview and full re-ingestion. The
+cache stores each :class:`~ragkit.desktop.documents.ParsedContent` as
+zlib-compressed JSON in SQLite, keyed by the SHA-256 of the file's bytes and
+``documents.PARSER_VERSION``, so edited files and parser upgrades both miss.
+The least recently used entries are evicted once the stored blobs exceed
+``max_mb``; their size is tracked as entries are written and deleted.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ragkit.connectors.file_hashes import file_hash_cache, sha256_file
+from ragkit.desktop import documents, settings_store
+
+if TYPE_CHECKING:
+    from ragkit.desktop.documents import ParsedContent
+
+logger = logging.getLogger(__name__)
+
+_SQL_BATCH = 500
+
+
+def file_digests(paths: list[Path]) -> list[str]:
+    """SHA-256 of each file, reusing stored digests of files whose stat is unchanged."""
+    files = [(path, path.stat()) for path in paths]
+    hash_cache = file_hash_cache()
+    if hash_cache is not None:
+        return hash_cache.hash_files(files)
+    return [sha256_file(path) for path in paths]
+
+
+class ParsedContentCache:
+    def __init__(self, path: Path, max_mb: float = 512) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS parsed_content (
+              key TEXT PRIMARY KEY,
+              content BLOB NOT NULL,
+              size INTEGER NOT NULL,
+              last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_parsed_content_last_used ON parsed_content(last_used);
+            """
+        )
+        self._conn.commit()
+        self.bytes_used = self._total_size()
+
+    def _total_size(self) -> int:
+        return int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM parsed_content").fetchone()[0])
+
+    @staticmethod
+    def cache_key(digest: str) -> str:
+        return hashlib.sha256(f"{documents.PARSER_VERSION}::{digest}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(parsed: ParsedContent) -> bytes:
+        return zlib.compress(json.dumps(dataclasses.asdict(parsed), ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def _decode(blob: bytes) -> ParsedContent | None:
+        try:
+            return documents.ParsedContent(**json.loads(zlib.decompress(blob)))
+        except (zlib.error, ValueError, TypeError):
+            return None
+
+    def get_many(self, digests: list[str]) -> list[ParsedContent | None]:
+        keys = [self.cache_key(digest) for digest in digests]
+        found: dict[str, ParsedContent] = {}
+        with self._lock:
+            for start in range(0, len(keys), _SQL_BATCH):
+                chunk = keys[start : start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                for key, blob in self._conn.execute(
+                    f"SELECT key, content FROM parsed_content WHERE key IN ({placeholders})", chunk
+                ):
+                    parsed = self._decode(blob)
+                    if parsed is not None:
+                        found[key] = parsed
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE parsed_content SET last_used = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return [found.get(key) for key in keys]
+
+    def get(self, digest: str) -> ParsedContent | None:
+        return self.get_many([digest])[0]
+
+    def put(self, digest: str, parsed: ParsedContent) -> None:
+        blob = self._encode(parsed)
+        if len(blob) > self.max_bytes:
+            return
+        key = self.cache_key(digest)
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM parsed_content WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parsed_content(key, content, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self.bytes_used += len(blob) - (int(replaced[0]) if replaced else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        if self.bytes_used <= self.max_bytes:
+            return
+        # Another process may share the file: the running total is checked before entries are dropped.
+        self.bytes_used = self._total_size()
+        if self.bytes_used <= self.max_bytes:
+            return
+        # Trim to 90% so eviction does not run again on the very next file.
+        excess = self.bytes_used - int(self.max_bytes * 0.9)
+        victims: list[tuple[str]] = []
+        for key, size in self._conn.execute("SELECT key, size FROM parsed_content ORDER BY last_used ASC"):
+            victims.append((key,))
+            excess -= int(size)
+            self.bytes_used -= int(size)
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM parsed_content WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM parsed_content")
+            self._conn.commit()
+            self.bytes_used = 0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parsed_content"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": int(entries),
+                "size_mb": round(int(size) / (1024 * 1024), 3),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def extract(self, path: Path, digest: str | None = None) -> ParsedContent:
+        """``documents._extract_content(path)``, served from the cache when the bytes were parsed before."""
+        digest = digest or sha256_file(path)
+        parsed = self.get(digest)
+        if parsed is None:
+            parsed = documents._extract_content(path)
+            self.put(digest, parsed)
+        return parsed
+
+
+_CACHE: ParsedContentCache | None = None
+_CACHE_LOCK = threading.Lock()
+_MAX_MB = 512.0
+
+
+def parsed_content_cache(max_mb: float | None = None) -> ParsedContentCache | None:
+    """Process-wide cache in the app data directory, or ``None`` if disabled or it cannot be opened.
+
+    ``max_mb`` resizes the cache and is remembered for callers that pass nothing;
+    ``0`` disables it.
+    """
+    global _CACHE, _MAX_MB
+    path = settings_store.get_data_dir() / "parsed_content.db"
+    with _CACHE_LOCK:
+        if max_mb is not None:
+            _MAX_MB = float(max_mb)
+        if _MAX_MB <= 0:
+            return None
+        if _CACHE is None or _CACHE.path != path:
+            try:
+                _CACHE = ParsedContentCache(path, max_mb=_MAX_MB)
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning("Parsed content cache unavailable: %s", exc)
+                return None
+        _CACHE.max_bytes = int(_MAX_MB * 1024 * 1024)
+        return _CACHE
+
+
+def extract_content(path: Path, digest: str | None = None) -> ParsedContent:
+    """Parse ``path`` through the process-wide cache, or directly when it is unavailable."""
+    cache = parsed_content_cache()
+    if cache is None:
+        return documents._extract_content(path)
+    try:
+        return cache.extract(path, digest)
+    except sqlite3.Error as exc:
+        logger.warning("Parsed content cache failed for %s: %s", path, exc)
+        return documents._extract_content(path)
@@ -0,0 +1,291 @@
+"""Document parsing in worker processes.
+
+pypdf, python-docx and BeautifulSoup are pure Python, so parsing on threads
+keeps one core busy no matter how many files are queued. A
+:class:`ParsingExecutor` runs ``documents._extract_content`` in a
+``ProcessPoolExecutor`` instead; only the path goes to the worker and only
+the compact :class:`~ragkit.desktop.documents.ParsedContent` comes back.
+
+A pool cannot cancel one running task, so a file that exceeds the timeout
+is handled by killing the pool's processes and starting a fresh pool; the
+other files that were in flight are submitted again. With ``workers <= 1``
+files are parsed in the calling process, exactly as before, without
+timeouts.
+
+Given a :class:`~ragkit.desktop.parsed_cache.ParsedContentCache`, files whose
+bytes were parsed before are served from it and never reach a worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import TYPE_CHECKING, Union
+
+from ragkit.connectors.file_hashes import sha256_file
+from ragkit.desktop import documents, parsed_cache
+
+if TYPE_CHECKING:
+    from ragkit.desktop.documents import ParsedContent
+    from ragkit.desktop.parsed_cache import ParsedContentCache
+
+logger = logging.getLogger(__name__)
+
+# Parsed files waiting for an earlier, slower one, per worker, before submission pauses.
+_REORDER_WINDOW = 4
+# A file is retried once when its pool broke, since the crash may have been another file's.
+_MAX_ATTEMPTS = 2
+
+ParseResult = Union["ParsedContent", BaseException]
+
+
+class ParseTimeoutError(TimeoutError):
+    def __init__(self, path: Path, timeout: float):
+        super().__init__(f"Parsing {path.name} took more than {timeout:g}s and was stopped.")
+        self.path = path
+
+
+class ParsingExecutor:
+    """Parses files on a pool of ``workers`` processes.
+
+    ``parser`` defaults to ``documents._extract_content``; any replacement
+    must be a module-level function so workers can import it. ``cache``
+    entries are keyed by file digest and ``documents.PARSER_VERSION``, so a
+    cache only belongs with the default parser.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        timeout_seconds: float,
+        parser: Callable[[Path], ParsedContent] | None = None,
+        cache: ParsedContentCache | None = None,
+    ):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self._parser = parser
+        self.cache = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._generation = 0
+
+    def __enter__(self) -> ParsingExecutor:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    #  Pool lifecycle                                                      #
+    # ------------------------------------------------------------------ #
+
+    def _ensure_pool(self) -> tuple[ProcessPoolExecutor, int]:
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers do not inherit the event loop or locks held by other threads.
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool, self._generation
+
+    def _restart(self, generation: int) -> None:
+        """Kill the pool of ``generation``; a no-op if another caller already replaced it."""
+        with self._lock:
+            if generation != self._generation or self._pool is None:
+                return
+            pool, self._pool = self._pool, None
+            self._generation += 1
+        # The executor offers no way to stop a running call, so its processes are killed.
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._generation += 1
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @property
+    def parser(self) -> Callable[[Path], ParsedContent]:
+        return self._parser or documents._extract_content
+
+    def _submit(self, path: Path) -> tuple[Future, int]:
+        pool, generation = self._ensure_pool()
+        return pool.submit(self.parser, path), generation
+
+    # ------------------------------------------------------------------ #
+    #  Parsing                                                             #
+    # ------------------------------------------------------------------ #
+
+    def cache_hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    def _cached(self, digests: list[str]) -> list[ParsedContent | None]:
+        if self.cache is None:
+            return [None] * len(digests)
+        cached = self.cache.get_many(digests)
+        hits = sum(parsed is not None for parsed in cached)
+        self.cache_hits += hits
+        self.cache_misses += len(cached) - hits
+        return cached
+
+    def _store(self, digest: str | None, result: ParseResult) -> None:
+        if self.cache is not None and digest is not None and not isinstance(result, BaseException):
+            self.cache.put(digest, result)
+
+    async def parse(self, path: Path, digest: str | None = None) -> ParsedContent:
+        """Parse one file without blocking the event loop; ``digest`` is the SHA-256 of its bytes."""
+        if self.cache is not None:
+            if digest is None:
+                digest = await asyncio.to_thread(sha256_file, path)
+            cached = (await asyncio.to_thread(self._cached, [digest]))[0]
+            if cached is not None:
+                return cached
+        parsed = await self._parse(path)
+        await asyncio.to_thread(self._store, digest, parsed)
+        return parsed
+
+    async def _parse(self, path: Path) -> ParsedContent:
+        if self.workers <= 1:
+            return await asyncio.to_thread(self.parser, path)
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            future, generation = self._submit(path)
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+            except asyncio.TimeoutError:
+                self._restart(generation)
+                raise ParseTimeoutError(path, self.timeout_seconds) from None
+            except BrokenProcessPool:
+                stopped_by_other = generation != self._generation
+                self._restart(generation)
+                if attempt == _MAX_ATTEMPTS and not stopped_by_other:
+                    raise
+        raise BrokenProcessPool(f"Parsing {path.name} kept failing after the worker pool restarted.")
+
+    def parse_all(
+        self,
+        paths: Iterable[Path],
+        on_done: Callable[[Path, ParseResult], None] | None = None,
+        digests: list[str] | None = None,
+    ) -> Iterator[tuple[Path, ParseResult]]:
+        """Parse ``paths``, yielding ``(path, content or exception)`` in input order.
+
+        ``on_done`` is called as each file finishes, in completion order.
+        ``digests`` are the files' SHA-256, computed when a cache needs them;
+        a file that cannot be read to compute it yields the ``OSError``.
+        """
+        paths = list(paths)
+        # Digests of files reached but not stored yet.
+        pending: dict[int, str | None] = {}
+
+        def cached(index: int) -> ParseResult | None:
+            # Looked up as files are reached, so a large corpus is never held in memory at once.
+            if digests is not None:
+                digest = digests[index]
+            elif self.cache is not None:
+                try:
+                    digest = parsed_cache.file_digests([paths[index]])[0]
+                except OSError as exc:
+                    return exc
+            else:
+                return None
+            hit = self._cached([digest])[0]
+            if hit is None:
+                pending[index] = digest
+            return hit
+
+        def store(index: int, result: ParseResult) -> None:
+            self._store(pending.pop(index, None), result)
+
+        if self.workers <= 1:
+            for index, path in enumerate(paths):
+                result: ParseResult | None = cached(index)
+                if result is None:
+                    try:
+                        result = self.parser(path)
+                    except Exception as exc:
+                        result = exc
+                    store(index, result)
+                if on_done is not None:
+                    on_done(path, result)
+                yield path, result
+            return
+
+        running: dict[Future, tuple[int, float]] = {}
+        finished: dict[int, ParseResult] = {}
+        attempts = [0] * len(paths)
+        next_submit = next_yield = 0
+
+        def submit(index: int) -> None:
+            attempts[index] += 1
+            future, _ = self._submit(paths[index])
+            running[future] = (index, time.monotonic() + self.timeout_seconds)
+
+        def finish(index: int, result: ParseResult) -> None:
+            pending.pop(index, None)
+            finished[index] = result
+            if on_done is not None:
+                on_done(paths[index], result)
+
+        while next_yield < len(paths):
+            while (
+                next_submit < len(paths)
+                and len(running) < self.workers
+                and len(running) + len(finished) < self.workers * _REORDER_WINDOW
+            ):
+                hit = cached(next_submit)
+                if hit is not None:
+                    finish(next_submit, hit)
+                else:
+                    submit(next_submit)
+                next_submit += 1
+
+            done: set[Future] = set()
+            # With nothing running, everything submitted so far came from the cache.
+            if running:
+                earliest = min(deadline for _, deadline in running.values())
+                done, _ = wait(running, timeout=max(earliest - time.monotonic(), 0.0), return_when=FIRST_COMPLETED)
+            broken: list[int] = []
+            for future in done:
+                index, _ = running.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken.append(index)
+                    continue
+                except Exception as exc:
+                    result = exc
+                store(index, result)
+                finish(index, result)
+
+            now = time.monotonic()
+            expired = [future for future, (_, deadline) in running.items() if deadline <= now]
+            if expired or broken:
+                for future in expired:
+                    index, _ = running.pop(future)
+                    logger.warning("Stopping parser of %s after %ss", paths[index], self.timeout_seconds)
+                    finish(index, ParseTimeoutError(paths[index], self.timeout_seconds))
+                _, generation = self._ensure_pool()
+                self._restart(generation)
+                # Files that were still in flight are innocent of a timeout, but not necessarily of a crash.
+                retry = [index for index, _ in running.values()]
+                running.clear()
+                for index in broken + retry:
+                    if index in broken and attempts[index] >= _MAX_ATTEMPTS:
+                        finish(index, BrokenProcessPool(f"Parsing {paths[index].name} stopped its worker process."))
+                    else:
+                        submit(index)
+
+            while next_yield in finished:
+                yield paths[next_yield], finished.pop(next_yield)
+                next_yield += 1
@@ -0,0 +1,87 @@
+"""Process-wide warm vector store and embedder instances for desktop APIs.
+
+Building an ``EmbeddingEngine`` reloads local models and building a vector
+store reopens its collection, so request handlers share one instance per
+configuration instead. Instances are keyed by a hash of their config, and
+up to ``_MAX_INSTANCES`` of each kind stay warm: a separate query model
+lives next to the document model, and only the least recently used
+instance is evicted once settings changes produce new keys.
+``invalidate_stores()`` drops the stores once an ingestion run has rewritten
+the collection through its own store.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from pydantic import BaseModel
+
+from ragkit.config.embedding_schema import EmbeddingConfig
+from ragkit.config.vector_store_schema import VectorStoreConfig
+from ragkit.embedding.engine import EmbeddingEngine
+from ragkit.storage.base import BaseVectorStore, create_vector_store
+
+# Warm instances kept per kind; the document and query embedders need two.
+_MAX_INSTANCES = 4
+
+
+def config_key(config: BaseModel, *extra: str | None) -> str:
+    raw = json.dumps(config.model_dump(mode="json"), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256("\x1f".join([raw, *(value or "" for value in extra)]).encode("utf-8")).hexdigest()
+
+
+class ResourceRegistry:
+    """Thread-safe, bounded cache of warm embedders and vector stores."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._embedders: OrderedDict[str, EmbeddingEngine] = OrderedDict()
+        self._stores: OrderedDict[str, BaseVectorStore] = OrderedDict()
+        self._store_dimensions: dict[str, int] = {}
+
+    def embedder(self, config: EmbeddingConfig, api_key: str | None = None) -> EmbeddingEngine:
+        key = config_key(config, api_key)
+        with self._lock:
+            engine = self._embedders.get(key)
+            if engine is None:
+                engine = self._embedders[key] = EmbeddingEngine(config, api_key=api_key)
+                while len(self._embedders) > _MAX_INSTANCES:
+                    self._embedders.popitem(last=False)
+            self._embedders.move_to_end(key)
+            return engine
+
+    async def vector_store(self, config: VectorStoreConfig, dimensions: int) -> BaseVectorStore:
+        """Return an initialized store for ``config``.
+
+        ``initialize`` runs once per store and dimension count; concurrent first
+        calls may both run it, which every backend tolerates. ``ValueError``
+        from a dimension mismatch propagates and nothing is cached for it.
+        """
+        key = config_key(config)
+        with self._lock:
+            store = self._stores.get(key)
+            if store is None:
+                store = self._stores[key] = create_vector_store(config)
+                while len(self._stores) > _MAX_INSTANCES:
+                    evicted, _ = self._stores.popitem(last=False)
+                    self._store_dimensions.pop(evicted, None)
+            self._stores.move_to_end(key)
+            ready = self._store_dimensions.get(key) == dimensions
+        if not ready:
+            await store.initialize(dimensions)
+            with self._lock:
+                if self._stores.get(key) is store:
+                    self._store_dimensions[key] = dimensions
+        return store
+
+    def invalidate_stores(self) -> None:
+        """Forget vector stores only (collection rewritten, settings unchanged)."""
+        with self._lock:
+            self._stores = OrderedDict()
+            self._store_dimensions = {}
+
+
+resources = ResourceRegistry()
@@ -0,0 +1,145 @@
+"""Cross-document request batching for ingestion embeddings.
+
+Documents submit their chunk texts to a shared :class:`EmbeddingBatcher`,
+which packs texts from several documents into provider requests of up to
+``batch_size`` texts (and optionally a token budget), then routes each
+vector back to the caller that submitted it. A partially filled request
+is sent once it has waited ``max_wait_seconds``, so a lone small document
+is never held back for long. When a shared request fails, the texts of each
+caller are retried in a request of their own, so one bad text only fails
+the document it came from.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Sequence
+
+from ragkit.config.embedding_schema import EmbeddingConfig, EmbeddingProvider
+from ragkit.embedding.engine import EmbedOutput
+
+# Per-request input token limits documented by the providers that enforce one.
+_PROVIDER_TOKEN_BUDGETS: dict[EmbeddingProvider, int] = {
+    EmbeddingProvider.OPENAI: 300_000,
+    EmbeddingProvider.VOYAGEAI: 120_000,
+    EmbeddingProvider.MISTRAL: 16_384,
+}
+
+
+def request_token_budget(config: EmbeddingConfig) -> int | None:
+    """Token cap for one embedding request: ``batch_max_tokens`` or the provider limit."""
+    if config.batch_max_tokens:
+        return config.batch_max_tokens
+    return _PROVIDER_TOKEN_BUDGETS.get(config.provider)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class EmbeddingBatcher:
+    """Coalesce ``embed`` calls from concurrent documents into full provider requests."""
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[str]], list[EmbedOutput]],
+        *,
+        batch_size: int,
+        max_tokens: int | None = None,
+        max_wait_seconds: float = 0.05,
+        max_concurrency: int = 1,
+    ) -> None:
+        self._embed_batch = embed_batch
+        self.batch_size = max(1, batch_size)
+        self.max_tokens = max_tokens
+        self.max_wait_seconds = max(0.0, max_wait_seconds)
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        # ``(text, future, caller)``; ``caller`` groups the texts of one ``embed`` call.
+        self._pending: list[tuple[str, asyncio.Future, object]] = []
+        self._pending_tokens = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+        self.requests = 0
+        self.texts = 0
+
+    async def embed(self, texts: Sequence[str], tokens: Sequence[int] | None = None) -> list[EmbedOutput]:
+        """Embed ``texts`` (with optional known token counts), in order."""
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        caller = object()
+        futures: list[asyncio.Future] = []
+        for index, text in enumerate(texts):
+            count = tokens[index] if tokens is not None else estimate_tokens(text)
+            over_budget = self.max_tokens is not None and self._pending_tokens + count > self.max_tokens
+            if self._pending and over_budget:
+                self._dispatch()
+            future = loop.create_future()
+            self._pending.append((text, future, caller))
+            self._pending_tokens += count
+            futures.append(future)
+            if len(self._pending) >= self.batch_size:
+                self._dispatch()
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._dispatch)
+        return list(await asyncio.gather(*futures))
+
+    async def flush(self) -> None:
+        """Send whatever is pending and wait for all requests in flight."""
+        self._dispatch()
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: list[tuple[str, asyncio.Future, object]]) -> None:
+        async with self._semaphore:
+            # Callers that gave up (timeout, cancel) no longer need their texts embedded.
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                return
+            try:
+                outputs = await self._request(batch)
+            except Exception as exc:
+                callers: dict[object, list[tuple[str, asyncio.Future, object]]] = {}
+                for item in batch:
+                    callers.setdefault(item[2], []).append(item)
+                if len(callers) == 1:
+                    self._fail(batch, exc)
+                    return
+                for items in callers.values():
+                    try:
+                        self._resolve(items, await self._request(items))
+                    except Exception as caller_exc:
+                        self._fail(items, caller_exc)
+                return
+        self._resolve(batch, outputs)
+
+    async def _request(self, batch: list[tuple[str, asyncio.Future, object]]) -> list[EmbedOutput]:
+        self.requests += 1
+        self.texts += len(batch)
+        outputs = await asyncio.to_thread(self._embed_batch, [text for text, _, _ in batch])
+        if len(outputs) != len(batch):
+            raise RuntimeError(f"Embedding output mismatch: {len(outputs)} embeddings for {len(batch)} texts.")
+        return outputs
+
+    @staticmethod
+    def _resolve(batch: list[tuple[str, asyncio.Future, object]], outputs: list[EmbedOutput]) -> None:
+        for (_, future, _), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    @staticmethod
+    def _fail(batch: list[tuple[str, asyncio.Future, object]], exc: Exception) -> None:
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(exc)
@@ -1,88 +1,325 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import logging
 import sqlite3
 import threading
+import time
+from array import array
+from collections import OrderedDict
 from pathlib import Path
 
-from ragkit.config.embedding_schema import CacheBackend, CacheStats
+import numpy as np
+
+from ragkit.config.embedding_schema import CacheBackend, CacheDtype, CacheStats
+
+logger = logging.getLogger(__name__)
+
+_SQL_BATCH = 500  # keys per IN (...) query, below SQLite's variable limit
 
 
 class BaseEmbeddingCache:
+    hits = 0
+    misses = 0
+
     @staticmethod
     def cache_key(text: str, model_id: str) -> str:
         return hashlib.sha256(f"{model_id}::{text}".encode("utf-8")).hexdigest()
 
     def get(self, text: str, model_id: str) -> list[float] | None: ...
     def put(self, text: str, model_id: str, vector: list[float]) -> None: ...
+
+    def get_many(self, texts: list[str], model_id: str) -> list[list[float] | None]:
+        return [self.get(text, model_id) for text in texts]
+
+    def put_many(self, texts: list[str], model_id: str, vectors: list[list[float]]) -> None:
+        for text, vector in zip(texts, vectors):
+            self.put(text, model_id, vector)
+
     def clear(self) -> None: ...
     def stats(self, model_id: str | None = None) -> CacheStats: ...
 
 
 class MemoryEmbeddingCache(BaseEmbeddingCache):
-    def __init__(self) -> None:
-        self._store: dict[str, list[float]] = {}
+    """Thread-safe LRU bounded by entry count and by vector bytes.
+
+    Keys already embed the model id, so each model has its own namespace and
+    a model switch can only miss, never return another model's vector.
+    """
+
+    _ENTRY_OVERHEAD = 96  # key string + OrderedDict slot, roughly
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self._store: OrderedDict[str, array] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entry_size(self, vector: array) -> int:
+        return vector.itemsize * len(vector) + self._ENTRY_OVERHEAD
+
+    def resize(self, max_entries: int, max_bytes: int) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._store and (len(self._store) > self.max_entries or self.bytes_used > self.max_bytes):
+            _, vector = self._store.popitem(last=False)
+            self.bytes_used -= self._entry_size(vector)
+            self.evictions += 1
 
     def get(self, text: str, model_id: str) -> list[float] | None:
-        return self._store.get(self.cache_key(text, model_id))
+        key = self.cache_key(text, model_id)
+        with self._lock:
+            vector = self._store.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+        return vector.tolist()
 
     def put(self, text: str, model_id: str, vector: list[float]) -> None:
-        self._store[self.cache_key(text, model_id)] = vector
+        key = self.cache_key(text, model_id)
+        packed = array("d", vector)
+        with self._lock:
+            previous = self._store.pop(key, None)
+            if previous is not None:
+                self.bytes_used -= self._entry_size(previous)
+            self._store[key] = packed
+            self.bytes_used += self._entry_size(packed)
+            self._evict()
 
     def clear(self) -> None:
-        self._store.clear()
+        with self._lock:
+            self._store.clear()
+            self.bytes_used = 0
 
     def stats(self, model_id: str | None = None) -> CacheStats:
-        return CacheStats(entries=len(self._store), size_mb=0.0, backend="memory", model_id=model_id)
+        with self._lock:
+            return CacheStats(
+                entries=len(self._store),
+                size_mb=round(self.bytes_used / (1024 * 1024), 3),
+                backend="memory",
+                model_id=model_id,
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                max_entries=self.max_entries,
+                max_mb=round(self.max_bytes / (1024 * 1024), 3),
+            )
 
 
 class DiskEmbeddingCache(BaseEmbeddingCache):
+    """SQLite cache storing vectors as float32 (or float16) BLOBs.
+
+    Batch calls run in a single transaction, the database uses WAL, and the
+    least recently used rows are evicted once vectors exceed ``max_mb``. The
+    vector bytes are tracked in ``bytes_used`` as rows are written and
+    deleted, so a batch does not have to sum the whole table.
+    """
+
     DB_PATH = Path.home() / ".loko" / "cache" / "embeddings.db"
 
-    def __init__(self) -> None:
-        self.DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    def __init__(
+        self,
+        path: Path | None = None,
+        dtype: CacheDtype | str = CacheDtype.FLOAT32,
+        max_mb: float = 1024,
+    ) -> None:
+        self.path = Path(path) if path is not None else self.DB_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.dtype = np.dtype(CacheDtype(dtype).value)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
         self._lock = threading.Lock()
-        self._conn = sqlite3.connect(str(self.DB_PATH), check_same_thread=False)
-        self._conn.execute(
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self.bytes_used = self._total_size()
+
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)").fetchall()}
+        if columns and "dtype" not in columns:
+            # Pre-BLOB layout (JSON text vectors): a cache, so it is simply rebuilt.
+            self._conn.execute("DROP TABLE embeddings")
+        self._conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS embeddings (
               key TEXT PRIMARY KEY,
               model_id TEXT NOT NULL,
-              vector TEXT NOT NULL,
-              created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+              dtype TEXT NOT NULL,
+              vector BLOB NOT NULL,
+              size INTEGER NOT NULL,
+              created_at REAL NOT NULL,
+              last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_embeddings_model ON embeddings(model_id);
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used);
             """
         )
         self._conn.commit()
 
+    def _total_size(self) -> int:
+        return int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0])
+
+    def _stored_sizes(self, keys: list[str]) -> dict[str, int]:
+        sizes: dict[str, int] = {}
+        for start in range(0, len(keys), _SQL_BATCH):
+            chunk = keys[start : start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            for key, size in self._conn.execute(f"SELECT key, size FROM embeddings WHERE key IN ({placeholders})", chunk):
+                sizes[key] = int(size)
+        return sizes
+
+    def _encode(self, vector: list[float]) -> bytes:
+        return np.asarray(vector, dtype=self.dtype).tobytes()
+
+    @staticmethod
+    def _decode(blob: bytes, dtype: str) -> list[float]:
+        return np.frombuffer(blob, dtype=np.dtype(dtype)).astype(np.float64).tolist()
+
     def get(self, text: str, model_id: str) -> list[float] | None:
-        key = self.cache_key(text, model_id)
-        with self._lock:
-            cur = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,))
-            row = cur.fetchone()
-        return json.loads(row[0]) if row else None
+        return self.get_many([text], model_id)[0]
 
     def put(self, text: str, model_id: str, vector: list[float]) -> None:
-        key = self.cache_key(text, model_id)
+        self.put_many([text], model_id, [vector])
+
+    def get_many(self, texts: list[str], model_id: str) -> list[list[float] | None]:
+        keys = [self.cache_key(text, model_id) for text in texts]
+        found: dict[str, list[float]] = {}
+        now = time.time()
         with self._lock:
-            self._conn.execute(
-                "INSERT OR REPLACE INTO embeddings(key, model_id, vector) VALUES (?, ?, ?)",
-                (key, model_id, json.dumps(vector)),
+            for start in range(0, len(keys), _SQL_BATCH):
+                chunk = keys[start : start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, dtype, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, dtype, blob in rows:
+                    found[key] = self._decode(blob, dtype)
+            if found:
+                self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return [found.get(key) for key in keys]
+
+    def put_many(self, texts: list[str], model_id: str, vectors: list[list[float]]) -> None:
+        if not texts:
+            return
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            blob = self._encode(vector)
+            rows.append((self.cache_key(text, model_id), model_id, self.dtype.name, blob, len(blob), now, now))
+        # The last row of a repeated key is the one stored.
+        written = {row[0]: row[4] for row in rows}
+        with self._lock:
+            replaced = self._stored_sizes(list(written))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings(key, model_id, dtype, vector, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
             )
+            self.bytes_used += sum(written.values()) - sum(replaced.values())
+            self._evict()
             self._conn.commit()
 
+    def _evict(self) -> None:
+        if self.bytes_used <= self.max_bytes:
+            return
+        # Another process may share the file: the running total is checked before rows are dropped.
+        self.bytes_used = self._total_size()
+        if self.bytes_used <= self.max_bytes:
+            return
+        # Trim to 90% so eviction does not run again on the very next batch.
+        excess = self.bytes_used - int(self.max_bytes * 0.9)
+        victims: list[tuple[str]] = []
+        for key, size in self._conn.execute("SELECT key, size FROM embeddings ORDER BY last_used ASC"):
+            victims.append((key,))
+            excess -= int(size)
+            self.bytes_used -= int(size)
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def purge_model(self, model_id: str) -> int:
+        with self._lock:
+            freed = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM embeddings WHERE model_id = ?", (model_id,)
+            ).fetchone()[0]
+            deleted = self._conn.execute("DELETE FROM embeddings WHERE model_id = ?", (model_id,)).rowcount
+            self._conn.commit()
+            self.bytes_used -= int(freed)
+        return int(deleted)
+
     def clear(self) -> None:
         with self._lock:
             self._conn.execute("DELETE FROM embeddings")
             self._conn.commit()
+            self.bytes_used = 0
 
     def stats(self, model_id: str | None = None) -> CacheStats:
         with self._lock:
-            cur = self._conn.execute("SELECT COUNT(*) FROM embeddings")
+            if model_id:
+                cur = self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE model_id = ?", (model_id,))
+            else:
+                cur = self._conn.execute("SELECT COUNT(*) FROM embeddings")
             entries = int(cur.fetchone()[0])
-        size_mb = self.DB_PATH.stat().st_size / (1024 * 1024) if self.DB_PATH.exists() else 0.0
-        return CacheStats(entries=entries, size_mb=round(size_mb, 3), backend="disk", model_id=model_id)
+        files = [self.path, self.path.with_name(self.path.name + "-wal")]
+        size_mb = sum(f.stat().st_size for f in files if f.exists()) / (1024 * 1024)
+        return CacheStats(
+            entries=entries,
+            size_mb=round(size_mb, 3),
+            backend="disk",
+            model_id=model_id,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            max_mb=round(self.max_bytes / (1024 * 1024), 3),
+        )
+
+
+_QUERY_CACHE: MemoryEmbeddingCache | None = None
+_QUERY_CACHE_LOCK = threading.Lock()
+
+
+def query_cache() -> MemoryEmbeddingCache:
+    """Process-wide LRU used by :class:`~ragkit.embedding.engine.EmbeddingEngine`."""
+    global _QUERY_CACHE
+    with _QUERY_CACHE_LOCK:
+        if _QUERY_CACHE is None:
+            _QUERY_CACHE = MemoryEmbeddingCache()
+        return _QUERY_CACHE
+
+
+_DISK_CACHE: DiskEmbeddingCache | None = None
+
+
+def disk_cache(dtype: CacheDtype | str = CacheDtype.FLOAT32, max_mb: float = 1024) -> DiskEmbeddingCache | None:
+    """Process-wide disk cache, or ``None`` if the database cannot be opened."""
+    global _DISK_CACHE
+    with _QUERY_CACHE_LOCK:
+        if _DISK_CACHE is None:
+            try:
+                _DISK_CACHE = DiskEmbeddingCache(dtype=dtype, max_mb=max_mb)
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning("Embedding disk cache unavailable: %s", exc)
+                return None
+        _DISK_CACHE.dtype = np.dtype(CacheDtype(dtype).value)
+        _DISK_CACHE.max_bytes = int(max_mb * 1024 * 1024)
+        return _DISK_CACHE
 
 
 def create_cache(backend: CacheBackend) -> BaseEmbeddingCache:
@@ -11,7 +11,8 @@ import urllib.request
 from dataclasses import dataclass
 from typing import Any
 
-from ragkit.config.embedding_schema import ConnectionTestResult, EmbeddingConfig, EmbeddingProvider
+from ragkit.config.embedding_schema import CacheBackend, ConnectionTestResult, EmbeddingConfig, EmbeddingProvider
+from ragkit.embedding.cache import BaseEmbeddingCache, disk_cache, query_cache
 from ragkit.embedding.catalog import get_model_info
 
 
@@ -49,17 +50,80 @@ class EmbeddingEngine:
 
     When no API key is available and no local provider is configured, a
     deterministic hashed-lexical fallback is used.
+
+    With ``cache_enabled``, vectors are memoized in the process-wide LRU from
+    :func:`ragkit.embedding.cache.query_cache`, backed by the shared SQLite
+    cache when ``cache_backend`` is ``disk`` (or only in the ``cache`` passed
+    in), namespaced by :attr:`cache_namespace`.
     """
 
-    def __init__(self, config: EmbeddingConfig, api_key: str | None = None):
+    def __init__(
+        self,
+        config: EmbeddingConfig,
+        api_key: str | None = None,
+        cache: BaseEmbeddingCache | None = None,
+    ):
         self.config = config
         self.api_key = api_key
         self._st_model: Any = None  # lazy-loaded SentenceTransformer
+        self._cache = cache
 
     @property
     def model_id(self) -> str:
         return f"{self.config.provider}:{self.config.model}:{self.config.dimensions or 'default'}"
 
+    @property
+    def cache_namespace(self) -> str:
+        """Everything that changes the vector for a given text."""
+        source = "fallback" if self._uses_fallback() else "provider"
+        return f"{self.model_id}:{'norm' if self.config.normalize else 'raw'}:{source}"
+
+    def _uses_fallback(self) -> bool:
+        return self.config.provider in CLOUD_PROVIDERS and not self.api_key
+
+    def _cache_tiers(self) -> list[BaseEmbeddingCache]:
+        """Caches to consult, fastest first: the memory LRU, then the disk cache."""
+        if not self.config.cache_enabled:
+            return []
+        if self._cache is not None:
+            return [self._cache]
+        memory = query_cache()
+        max_bytes = self.config.cache_max_mb * 1024 * 1024
+        if (memory.max_entries, memory.max_bytes) != (self.config.cache_max_entries, max_bytes):
+            memory.resize(self.config.cache_max_entries, max_bytes)
+        tiers: list[BaseEmbeddingCache] = [memory]
+        if self.config.cache_backend == CacheBackend.DISK:
+            disk = disk_cache(self.config.cache_disk_dtype, self.config.cache_disk_max_mb)
+            if disk is not None:
+                tiers.append(disk)
+        return tiers
+
+    def _cached_vectors(self, texts: list[str], tiers: list[BaseEmbeddingCache]) -> dict[str, list[float]]:
+        """Look ``texts`` up tier by tier, promoting lower-tier hits upwards."""
+        namespace = self.cache_namespace
+        found: dict[str, list[float]] = {}
+        pending = texts
+        for level, cache in enumerate(tiers):
+            if not pending:
+                break
+            hits = {text: vector for text, vector in zip(pending, cache.get_many(pending, namespace)) if vector is not None}
+            if hits and level:
+                for upper in tiers[:level]:
+                    upper.put_many(list(hits), namespace, list(hits.values()))
+            found.update(hits)
+            pending = [text for text in pending if text not in hits]
+        return found
+
+    def cached_vectors(self, texts: list[str]) -> dict[str, list[float]]:
+        """Vectors of ``texts`` already in the cache, without calling the provider."""
+        tiers = self._cache_tiers()
+        return self._cached_vectors(list(dict.fromkeys(texts)), tiers) if tiers else {}
+
+    def _store_vectors(self, tiers: list[BaseEmbeddingCache], texts: list[str], vectors: list[list[float]]) -> None:
+        namespace = self.cache_namespace
+        for cache in tiers:
+            cache.put_many(texts, namespace, vectors)
+
     def resolve_dimensions(self) -> int:
         if self.config.dimensions:
             return self.config.dimensions
@@ -78,7 +142,34 @@ class EmbeddingEngine:
     # ------------------------------------------------------------------ #
 
     def embed_text(self, text: str) -> EmbedOutput:
-        """Embed a single text using the configured provider."""
+        """Embed a single text, served from the cache when possible."""
+        tiers = self._cache_tiers()
+        if not tiers:
+            return self._embed_text_uncached(text)
+        start = time.perf_counter()
+        cached = self._cached_vectors([text], tiers).get(text)
+        if cached is not None:
+            return EmbedOutput(vector=cached, latency_ms=max(1, int((time.perf_counter() - start) * 1000)))
+        output = self._embed_text_uncached(text)
+        self._store_vectors(tiers, [text], [output.vector])
+        return output
+
+    def embed_texts(self, texts: list[str]) -> list[EmbedOutput]:
+        """Embed multiple texts; only cache misses reach the provider, once per distinct text."""
+        tiers = self._cache_tiers()
+        if not tiers or not texts:
+            return self._embed_texts_uncached(texts)
+        distinct = list(dict.fromkeys(texts))
+        found = self._cached_vectors(distinct, tiers)
+        missing = [text for text in distinct if text not in found]
+        computed: dict[str, EmbedOutput] = {}
+        if missing:
+            outputs = self._embed_texts_uncached(missing)
+            self._store_vectors(tiers, missing, [output.vector for output in outputs])
+            computed = dict(zip(missing, outputs))
+        return [computed[text] if text in computed else EmbedOutput(vector=found[text], latency_ms=1) for text in texts]
+
+    def _embed_text_uncached(self, text: str) -> EmbedOutput:
         start = time.perf_counter()
         provider = self.config.provider
 
@@ -116,7 +207,7 @@ class EmbeddingEngine:
         latency = int((time.perf_counter() - start) * 1000)
         return EmbedOutput(vector=vector, latency_ms=max(1, latency))
 
-    def embed_texts(self, texts: list[str]) -> list[EmbedOutput]:
+    def _embed_texts_uncached(self, texts: list[str]) -> list[EmbedOutput]:
         """Embed multiple texts, using batch APIs when available."""
         if not texts:
             return []
@@ -126,7 +217,7 @@ class EmbeddingEngine:
         use_fallback = needs_api_key and not self.api_key
 
         if use_fallback:
-            return [self.embed_text(text) for text in texts]
+            return [self._embed_text_uncached(text) for text in texts]
 
         if provider == EmbeddingProvider.OLLAMA:
             results: list[EmbedOutput] = []
@@ -156,7 +247,7 @@ class EmbeddingEngine:
         elif provider == EmbeddingProvider.HUGGINGFACE:
             vectors = self._batch_huggingface(texts)
         else:
-            return [self.embed_text(text) for text in texts]
+            return [self._embed_text_uncached(text) for text in texts]
 
         latency = int((time.perf_counter() - start) * 1000)
         per_item = max(1, latency // len(texts))
@@ -384,7 +475,7 @@ class EmbeddingEngine:
 
         # Try to actually produce an embedding as the definitive test
         try:
-            test_output = self.embed_text("test connection")
+            test_output = self._embed_text_uncached("test connection")
             dims = len(test_output.vector)
             latency = int((time.perf_counter() - start) * 1000)
             return ConnectionTestResult(
@@ -1,9 +1,38 @@
-"""Lightweight file watcher state helper used by auto-ingestion mode."""
+"""File watching for auto-ingestion mode.
+
+:class:`DirectoryWatcher` reports file-system events under the roots of
+local directory sources, through ``watchdog`` (inotify, FSEvents or
+ReadDirectoryChangesW), as ``(source_id, relative_path)`` entries on the
+queue of a :class:`FileWatcherState`. The state collects them into the set
+of dirty paths per source and debounces them, so auto-ingestion only looks
+at files that actually changed instead of re-reading whole trees.
+
+Without ``watchdog``, or when the OS refuses another watch (e.g. the
+inotify watch limit), a source falls back to polling: its tree is walked
+every ``poll_interval`` seconds comparing size and mtime, and files are
+still never read.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import logging
+import os
+import queue
+import threading
 import time
 from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+# Event types that never change a file.
+_IGNORED_EVENTS = {"opened", "closed_no_write"}
 
 
 @dataclass
@@ -14,13 +43,26 @@ class WatchDecision:
     signature: str
 
 
+DirtyPaths = dict[str, "set[str] | None"]
+"""Changed paths relative to each source root; ``None`` when the whole source must be rescanned."""
+
+
 class FileWatcherState:
-    """Tracks change signatures and debounce timing for automatic ingestion."""
+    """Tracks change signatures and debounce timing for automatic ingestion.
+
+    Sources that are polled pass the signature of their detected changes to
+    :meth:`observe`. Watched sources push events on :attr:`events` from any
+    thread; :meth:`poll` collects them and :meth:`take` hands the dirty paths
+    over once no event arrived for ``debounce_seconds``.
+    """
 
     def __init__(self, debounce_seconds: int = 30) -> None:
         self.debounce_seconds = max(5, int(debounce_seconds))
         self._last_signature: str | None = None
         self._deadline: float | None = None
+        self.events: queue.SimpleQueue[tuple[str, str | None]] = queue.SimpleQueue()
+        self._dirty: DirtyPaths = {}
+        self._dirty_deadline: float | None = None
 
     def reset(self) -> None:
         self._last_signature = None
@@ -44,3 +86,205 @@ class FileWatcherState:
         stable = now >= self._deadline
         return WatchDecision(changed=False, stable=stable, ready_to_trigger=stable, signature=signature)
 
+    # ------------------------------------------------------------------ #
+    #  Watched sources                                                     #
+    # ------------------------------------------------------------------ #
+
+    def mark(self, source_id: str, relative_path: str | None = None) -> None:
+        """Queue a changed path of ``source_id``, or a full rescan of it when ``relative_path`` is ``None``."""
+        self.events.put((source_id, relative_path))
+
+    def poll(self) -> WatchDecision:
+        """Collect queued events; ready once the dirty paths went ``debounce_seconds`` without a new one."""
+        changed = False
+        while True:
+            try:
+                source_id, relative_path = self.events.get_nowait()
+            except queue.Empty:
+                break
+            changed = True
+            if relative_path is None:
+                self._dirty[source_id] = None
+            else:
+                paths = self._dirty.setdefault(source_id, set())
+                if paths is not None:
+                    paths.add(relative_path)
+
+        now = time.monotonic()
+        if changed:
+            self._dirty_deadline = now + self.debounce_seconds
+        if not self._dirty:
+            return WatchDecision(changed=False, stable=True, ready_to_trigger=False, signature="")
+        stable = self._dirty_deadline is not None and now >= self._dirty_deadline
+        return WatchDecision(changed=changed, stable=stable, ready_to_trigger=stable, signature=self._dirty_signature())
+
+    def take(self) -> DirtyPaths:
+        """The dirty paths collected so far, which are forgotten."""
+        dirty, self._dirty = self._dirty, {}
+        self._dirty_deadline = None
+        return dirty
+
+    def _dirty_signature(self) -> str:
+        digest = hashlib.sha256()
+        for source_id in sorted(self._dirty):
+            paths = self._dirty[source_id]
+            digest.update(f"{source_id}:{'*' if paths is None else len(paths)}|".encode("utf-8"))
+            for path in sorted(paths or ()):
+                digest.update(path.encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class _WatchedRoot:
+    root: Path
+    recursive: bool
+
+
+class _SourceEventHandler:
+    """``watchdog`` handler turning the events under one source root into dirty paths."""
+
+    def __init__(self, state: FileWatcherState, source_id: str, watched: _WatchedRoot) -> None:
+        self.state = state
+        self.source_id = source_id
+        self.watched = watched
+
+    def dispatch(self, event) -> None:
+        if event.event_type in _IGNORED_EVENTS:
+            return
+        # A directory's own mtime changes with every entry; the entries report themselves.
+        if event.is_directory and event.event_type == "modified":
+            return
+        for raw_path in (event.src_path, getattr(event, "dest_path", "")):
+            if raw_path:
+                self._mark(os.fsdecode(raw_path))
+
+    def _mark(self, path: str) -> None:
+        try:
+            relative = Path(path).relative_to(self.watched.root).as_posix()
+        except ValueError:
+            return
+        if relative == ".":
+            # The root itself was moved or deleted.
+            self.state.mark(self.source_id)
+        else:
+            self.state.mark(self.source_id, relative)
+
+
+class DirectoryWatcher:
+    """Watches the roots of local directory sources and feeds a :class:`FileWatcherState`.
+
+    Every newly watched source is queued for one full rescan, which catches
+    the changes made while it was not watched.
+    """
+
+    def __init__(self, state: FileWatcherState, poll_interval: float = 30.0, use_polling: bool = False) -> None:
+        self.state = state
+        self.poll_interval = poll_interval
+        self._use_polling = use_polling or Observer is None
+        self._observer = None
+        self._watches: dict[str, tuple[_WatchedRoot, object]] = {}
+        self._polled: dict[str, tuple[_WatchedRoot, dict[str, tuple[int, int]]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._poller: threading.Thread | None = None
+
+    @property
+    def sources(self) -> set[str]:
+        with self._lock:
+            return set(self._watches) | set(self._polled)
+
+    def sync(self, roots: dict[str, tuple[Path, bool]]) -> None:
+        """Watch exactly the ``source_id -> (root, recursive)`` given, keeping unchanged watches."""
+        wanted = {source_id: _WatchedRoot(Path(root).expanduser(), recursive) for source_id, (root, recursive) in roots.items()}
+        for source_id in self.sources:
+            if self._watched_root(source_id) != wanted.get(source_id):
+                self.unwatch(source_id)
+        for source_id, watched in wanted.items():
+            if source_id not in self.sources and watched.root.is_dir():
+                self._watch(source_id, watched)
+
+    def _watched_root(self, source_id: str) -> _WatchedRoot | None:
+        with self._lock:
+            entry = self._watches.get(source_id) or self._polled.get(source_id)
+        return entry[0] if entry else None
+
+    def _watch(self, source_id: str, watched: _WatchedRoot) -> None:
+        self.state.mark(source_id)
+        if not self._use_polling:
+            try:
+                if self._observer is None:
+                    self._observer = Observer()
+                    self._observer.daemon = True
+                    self._observer.start()
+                handler = _SourceEventHandler(self.state, source_id, watched)
+                watch = self._observer.schedule(handler, str(watched.root), recursive=watched.recursive)
+                with self._lock:
+                    self._watches[source_id] = (watched, watch)
+                return
+            except OSError as exc:
+                logger.warning("Cannot watch %s, polling it instead: %s", watched.root, exc)
+        snapshot = _stat_snapshot(watched)
+        with self._lock:
+            self._polled[source_id] = (watched, snapshot)
+            if self._poller is None:
+                self._stop.clear()
+                self._poller = threading.Thread(target=self._poll_loop, name="ragkit-file-poller", daemon=True)
+                self._poller.start()
+
+    def unwatch(self, source_id: str) -> None:
+        with self._lock:
+            entry = self._watches.pop(source_id, None)
+            self._polled.pop(source_id, None)
+        if entry is not None and self._observer is not None:
+            try:
+                self._observer.unschedule(entry[1])
+            except (KeyError, OSError):
+                pass
+
+    def stop(self) -> None:
+        with self._lock:
+            self._watches.clear()
+            self._polled.clear()
+            observer, self._observer = self._observer, None
+            poller, self._poller = self._poller, None
+        self._stop.set()
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=5)
+        if poller is not None:
+            poller.join(timeout=5)
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            with self._lock:
+                polled = list(self._polled.items())
+            for source_id, (watched, before) in polled:
+                try:
+                    after = _stat_snapshot(watched)
+                except OSError as exc:
+                    logger.warning("Polling %s failed: %s", watched.root, exc)
+                    continue
+                for relative in before.keys() | after.keys():
+                    if before.get(relative) != after.get(relative):
+                        self.state.mark(source_id, relative)
+                with self._lock:
+                    if source_id in self._polled:
+                        self._polled[source_id] = (watched, after)
+
+
+def _stat_snapshot(watched: _WatchedRoot) -> dict[str, tuple[int, int]]:
+    """``relative_path -> (size, mtime_ns)`` of the files under the root; contents are never read."""
+    snapshot: dict[str, tuple[int, int]] = {}
+    if not watched.root.is_dir():
+        return snapshot
+    for directory, dirnames, filenames in os.walk(watched.root):
+        if not watched.recursive:
+            dirnames.clear()
+        for filename in filenames:
+            path = Path(directory, filename)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path.relative_to(watched.root).as_posix()] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
@@ -0,0 +1,176 @@
+"""MinHash-LSH index for near-duplicate document detection.
+
+Each document is reduced to a MinHash signature of its word set: the
+fraction of positions where two signatures agree estimates the Jaccard
+similarity of the two sets. Signatures are split into ``bands`` of
+``rows`` values, and documents sharing any band land in the same bucket,
+so a lookup only compares the new document with the few documents it
+collides with instead of every document seen so far. The band layout is
+chosen for the Jaccard threshold, and candidates are kept only when their
+estimated similarity reaches it.
+
+The index is keyed by document id, so documents that change or disappear
+can be removed, and it is saved between incremental ingestion runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_HASH_CHUNK = 4096
+# A missed duplicate costs more than a spurious candidate, which the signature check rejects.
+_FALSE_POSITIVE_WEIGHT = 0.1
+_FALSE_NEGATIVE_WEIGHT = 0.9
+
+
+def _token_hashes(tokens: set[str]) -> np.ndarray:
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little") for token in tokens),
+        dtype=np.uint64,
+        count=len(tokens),
+    )
+
+
+def _optimal_bands(threshold: float, num_perm: int) -> tuple[int, int]:
+    """``(bands, rows)`` minimizing missed and spurious candidates around ``threshold``."""
+    below = np.linspace(0.0, threshold, 64)
+    above = np.linspace(threshold, 1.0, 64)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        # Probability that two sets of similarity s share at least one band.
+        false_positive = np.mean(1.0 - (1.0 - below**rows) ** bands) * threshold
+        false_negative = np.mean((1.0 - above**rows) ** bands) * (1.0 - threshold)
+        error = _FALSE_POSITIVE_WEIGHT * false_positive + _FALSE_NEGATIVE_WEIGHT * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateIndex:
+    """Documents seen so far, as MinHash signatures bucketed by LSH band."""
+
+    def __init__(self, threshold: float, num_perm: int = 128, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        self._signatures: dict[str, np.ndarray] = {}
+        self._buckets: list[defaultdict[bytes, set[str]]] = [defaultdict(set) for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    def signature(self, tokens: set[str]) -> np.ndarray:
+        hashes = _token_hashes(tokens)
+        signature = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        for start in range(0, hashes.size, _HASH_CHUNK):
+            block = hashes[start : start + _HASH_CHUNK, None]
+            permuted = ((block * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+            np.minimum(signature, permuted.min(axis=0), out=signature)
+        return signature.astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [signature[band * self.rows : (band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def query(self, signature: np.ndarray, exclude: str | None = None) -> str | None:
+        """Key of another indexed document whose estimated Jaccard similarity reaches the threshold.
+
+        ``exclude`` is the key of the document being checked, which never duplicates itself.
+        """
+        if self.threshold <= 0:
+            return next((key for key in self._signatures if key != exclude), None)
+        candidates: set[str] = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        candidates.discard(exclude)
+        for key in sorted(candidates):
+            if float(np.mean(self._signatures[key] == signature)) >= self.threshold:
+                return key
+        return None
+
+    def add(self, key: str, signature: np.ndarray) -> None:
+        self.remove(key)
+        self._signatures[key] = signature
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket[band_key].add(key)
+
+    def remove(self, key: str) -> bool:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return False
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            members = bucket.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del bucket[band_key]
+        return True
+
+    def check_and_add(self, key: str, tokens: set[str]) -> bool:
+        """Whether ``tokens`` nearly duplicate an indexed document; otherwise index them under ``key``."""
+        signature = self.signature(tokens)
+        if self.query(signature, exclude=key) is not None:
+            return True
+        self.add(key, signature)
+        return False
+
+    # ------------------------------------------------------------------ #
+    #  Persistence                                                         #
+    # ------------------------------------------------------------------ #
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        keys = list(self._signatures)
+        signatures = (
+            np.stack([self._signatures[key] for key in keys])
+            if keys
+            else np.zeros((0, self.num_perm), dtype=np.uint32)
+        )
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as handle:
+            np.savez(
+                handle,
+                keys=np.asarray(keys, dtype=np.str_),
+                signatures=signatures,
+                num_perm=np.asarray(self.num_perm),
+                seed=np.asarray(self.seed),
+            )
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, threshold: float, num_perm: int = 128, seed: int = 1) -> NearDuplicateIndex:
+        """The index saved at ``path``, or an empty one when it is missing or was built differently."""
+        index = cls(threshold, num_perm=num_perm, seed=seed)
+        if not path.exists():
+            return index
+        try:
+            with np.load(path) as data:
+                if int(data["num_perm"]) != num_perm or int(data["seed"]) != seed:
+                    return index
+                keys = data["keys"].tolist()
+                signatures = data["signatures"]
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Ignoring unreadable near-duplicate index %s: %s", path, exc)
+            return index
+        for key, signature in zip(keys, signatures):
+            index.add(str(key), signature)
+        return index
@@ -2,19 +2,53 @@
 
 from __future__ import annotations
 
+import functools
 import json
+import logging
 import math
 import re
+import threading
 import time
 from collections import Counter, defaultdict
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
-
-from ragkit.config.retrieval_schema import BM25Algorithm, LexicalSearchConfig, SearchFilters
-
-_INDEX_FILE = "bm25_index.json"
+from typing import Any, Literal
+
+import numpy as np
+
+from ragkit.config.retrieval_schema import (
+    FILTER_PAYLOAD_KEYS,
+    BM25Algorithm,
+    LexicalSearchConfig,
+    SearchFilters,
+    payload_value,
+)
+from ragkit.retrieval.postings import DeltaPostings, PostingsSegment, SegmentView
+from ragkit.retrieval.segments import SegmentDirectory, SegmentReader
+
+logger = logging.getLogger(__name__)
+
+_INITIAL_CAPACITY = 1024
+_MERGE_MIN_POSTINGS = 65536
+_MERGE_MIN_DEAD = 1024
+_BOUND_SLACK = 1.0 + 1e-9
+# Memoized stems per language, and whole-query tokenizations.
+_STEM_CACHE_SIZE = 100_000
+_QUERY_CACHE_SIZE = 1024
+# Saving schedules a background merge past this many segments or this share of deleted rows,
+# and rewrites the index itself once merges fall ``_MAX_SEGMENTS`` segments behind.
+_MAX_SEGMENTS = 8
+_MAX_DELETED_RATIO = 0.3
+# Accumulate into a dense score vector once postings reach 1/8 of the rows.
+_DENSE_MIN_COVERAGE = 8
+# Postings covering 1/4 of the live chunks make a term (or query) "broad" for top-k.
+_BROAD_MIN_COVERAGE = 4
+
+_FILTER_FIELDS = FILTER_PAYLOAD_KEYS
+
+TopKStrategy = Literal["auto", "exhaustive", "maxscore"]
 
 _FALLBACK_STOPWORDS: dict[str, set[str]] = {
     "english": {
@@ -124,15 +158,26 @@ def _utcnow_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _payload_value(payload: dict[str, Any], keys: tuple[str, ...]) -> str | None:
-    for key in keys:
-        value = payload.get(key)
-        if value is None:
-            continue
-        text = str(value).strip()
-        if text:
-            return text
-    return None
+def _hit_rate(hits: int, misses: int) -> float:
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+
+def _grow(values: np.ndarray, capacity: int, fill: Any) -> np.ndarray:
+    grown = np.full(capacity, fill, dtype=values.dtype)
+    grown[: values.size] = values
+    return grown
+
+
+def _preprocessing_key(config: LexicalSearchConfig) -> tuple:
+    return (
+        config.lowercase,
+        config.remove_stopwords,
+        config.stopwords_lang,
+        config.stemming,
+        config.stemmer_lang,
+        tuple(config.ngram_range),
+    )
 
 
 def _normalize_lang(language: str | None) -> str | None:
@@ -197,19 +242,34 @@ class LexicalSearchResponse:
     tokenization_latency_ms: int
     search_latency_ms: int
     total_latency_ms: int
-    results_from_index: int
-    results_after_threshold: int
+    chunks_scored: int
+    """Chunks whose score was computed; top-k pruning skips those that could not rank."""
+    top_k_after_threshold: int
+    """Of the top-k results, those scoring at least the threshold."""
+    tokenizer_cache: dict[str, float] = field(default_factory=dict)
 
 
 class TextPreprocessor:
-    """Tokenization + optional stopwords + optional stemming + optional n-grams."""
+    """Tokenization + optional stopwords + optional stemming + optional n-grams.
+
+    Stopword and stemmer resolution happens once per document language, and
+    stems are memoized per language in a bounded LRU: natural text reuses
+    the same few thousand words, so most tokens never reach the stemmer.
+    Queries can also go through a small whole-text cache
+    (:meth:`tokenize_query`).
+    """
 
     _token_pattern = re.compile(r"\b\w+\b", flags=re.UNICODE)
 
-    def __init__(self, config: LexicalSearchConfig):
+    def __init__(self, config: LexicalSearchConfig, query_cache_size: int = _QUERY_CACHE_SIZE):
         self.config = config
         self._stopwords_cache: dict[str, set[str]] = {}
         self._stemmer_cache: dict[str, Any] = {}
+        self._stem_functions: dict[str, Callable[[str], str]] = {}
+        self._pipelines: dict[str | None, tuple[set[str] | None, Callable[[str], str] | None]] = {}
+        self._query_tokens = (
+            functools.lru_cache(maxsize=query_cache_size)(self._tokenize_query) if query_cache_size > 0 else None
+        )
 
     def tokenize(self, text: str, language: str | None = None) -> list[str]:
         text = text or ""
@@ -220,18 +280,64 @@ class TextPreprocessor:
         if not tokens:
             return []
 
-        if self.config.remove_stopwords:
-            stopwords = self._resolve_stopwords(language)
-            if stopwords:
-                tokens = [token for token in tokens if token not in stopwords]
-
-        if self.config.stemming:
-            stemmer = self._resolve_stemmer(language)
-            if stemmer is not None:
-                tokens = [str(stemmer.stem(token)) for token in tokens]
+        stopwords, stem = self._pipeline(language)
+        if stem is not None:
+            tokens = [stem(token) for token in tokens if not stopwords or token not in stopwords]
+        elif stopwords:
+            tokens = [token for token in tokens if token not in stopwords]
 
         return self._apply_ngrams(tokens)
 
+    def tokenize_query(self, text: str, language: str | None = None) -> list[str]:
+        """:meth:`tokenize`, answered from the query cache for repeated queries."""
+        if self._query_tokens is None:
+            return self.tokenize(text, language)
+        return list(self._query_tokens(text, language))
+
+    def _tokenize_query(self, text: str, language: str | None) -> tuple[str, ...]:
+        return tuple(self.tokenize(text, language))
+
+    def cache_stats(self) -> dict[str, float]:
+        """Hits, misses and hit rates of the stem and query caches."""
+        stem_hits = stem_misses = 0
+        for stem in self._stem_functions.values():
+            info = stem.cache_info()
+            stem_hits, stem_misses = stem_hits + info.hits, stem_misses + info.misses
+        query_info = self._query_tokens.cache_info() if self._query_tokens is not None else None
+        query_hits = query_info.hits if query_info else 0
+        query_misses = query_info.misses if query_info else 0
+        return {
+            "stem_hits": stem_hits,
+            "stem_misses": stem_misses,
+            "stem_hit_rate": _hit_rate(stem_hits, stem_misses),
+            "query_hits": query_hits,
+            "query_misses": query_misses,
+            "query_hit_rate": _hit_rate(query_hits, query_misses),
+        }
+
+    def _pipeline(self, language: str | None) -> tuple[set[str] | None, Callable[[str], str] | None]:
+        """Stopwords and memoized stem function for a document language, resolved once."""
+        pipeline = self._pipelines.get(language)
+        if pipeline is None:
+            stopwords = self._resolve_stopwords(language) if self.config.remove_stopwords else None
+            stem = self._resolve_stem(language) if self.config.stemming else None
+            pipeline = self._pipelines[language] = (stopwords or None, stem)
+        return pipeline
+
+    def _resolve_stem(self, language: str | None) -> Callable[[str], str] | None:
+        stemmer = self._resolve_stemmer(language)
+        if stemmer is None:
+            return None
+        target_lang = self._resolve_target_language(self.config.stemmer_lang.value, language) or ""
+        stem = self._stem_functions.get(target_lang)
+        if stem is None:
+
+            def stem_token(token: str) -> str:
+                return str(stemmer.stem(token))
+
+            stem = self._stem_functions[target_lang] = functools.lru_cache(maxsize=_STEM_CACHE_SIZE)(stem_token)
+        return stem
+
     def _apply_ngrams(self, tokens: list[str]) -> list[str]:
         if not tokens:
             return []
@@ -290,44 +396,133 @@ class TextPreprocessor:
             return None
 
 
+@dataclass(frozen=True)
+class _BM25Params:
+    k1: float
+    b: float
+    delta: float
+    plus: bool
+    avgdl: float
+
+    @classmethod
+    def create(cls, algorithm: BM25Algorithm, k1: float, b: float, delta: float, avgdl: float) -> "_BM25Params":
+        return cls(k1, b, delta, algorithm == BM25Algorithm.BM25_PLUS, avgdl or 1.0)
+
+    def scores(self, tf, doc_len, idf: float, qf: int):
+        """BM25 contribution of a term, for scalars or element-wise over arrays."""
+        k1, b = self.k1, self.b
+        base = (tf * (k1 + 1.0)) / (tf + (k1 * (1.0 - b + (b * doc_len / self.avgdl))))
+        contribution = idf * (base + self.delta) if self.plus else idf * base
+        return contribution * qf
+
+
+@dataclass
+class _QueryTerm:
+    term: str
+    term_id: int
+    qf: int
+    idf: float
+    docs: np.ndarray
+    tfs: np.ndarray
+
+
 class BM25Index:
-    """In-memory BM25 index with JSON persistence."""
+    """In-memory BM25 index persisted as immutable on-disk segments.
+
+    Chunks and terms are interned to integer ids; postings are stored as
+    arrays (see :mod:`ragkit.retrieval.postings`). Removing a chunk only
+    tombstones its doc id, and additions go to a delta segment; both are
+    folded into the base segment by :meth:`merge`, which runs on its own
+    once enough churn has accumulated.
+
+    :meth:`load` memory-maps the segments of an index directory (see
+    :mod:`ragkit.retrieval.segments`) instead of rebuilding them, and
+    :meth:`save` back to that directory only writes what changed since.
+    """
 
     def __init__(self, config: LexicalSearchConfig):
         self.preprocessor = TextPreprocessor(config)
-        self._doc_lengths: dict[str, int] = {}
-        self._doc_term_freqs: dict[str, dict[str, int]] = {}
-        self._doc_texts: dict[str, str] = {}
-        self._doc_metadata: dict[str, dict[str, Any]] = {}
-        self._doc_languages: dict[str, str | None] = {}
-        self._postings: dict[str, dict[str, int]] = defaultdict(dict)
+        self._term_ids: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._base = PostingsSegment.empty()
+        self._views: list[SegmentView] = []
+        self._delta = DeltaPostings()
+        self._reset_documents()
+        self._readers: dict[int, SegmentReader] = {}
+        # Index directory and manifest generation the segment rows refer to.
+        self._source: tuple[Path, int] | None = None
         self.last_updated_at: str | None = None
         self.last_updated_version: str | None = None
 
+    def _reset_documents(self) -> None:
+        self._size = 0
+        self._lengths = np.zeros(_INITIAL_CAPACITY, dtype=np.int32)
+        self._alive = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        # Segment and row each chunk was loaded from or saved to; -1 while only in memory.
+        self._segment_ids = np.full(_INITIAL_CAPACITY, -1, dtype=np.int32)
+        self._segment_rows = np.zeros(_INITIAL_CAPACITY, dtype=np.int32)
+        self._chunk_ids: list[str] = []
+        self._doc_keys: list[str] = []
+        # Text, metadata and language of chunks that are not readable from a segment.
+        self._documents: list[tuple[str, dict[str, Any], str | None] | None] = []
+        self._row_by_chunk: dict[str, int] = {}
+        self._rows_by_doc: dict[str, set[int]] = defaultdict(set)
+        # Filterable payload values, interned per field; -1 where a chunk has none.
+        self._filter_values: dict[str, dict[str, int]] = {name: {} for name in _FILTER_FIELDS}
+        self._filter_codes = {name: np.full(_INITIAL_CAPACITY, -1, dtype=np.int32) for name in _FILTER_FIELDS}
+        self._live_count = 0
+        self._live_length_total = 0
+        self._dead_count = 0
+
+    def _reserve(self, rows: int) -> None:
+        capacity = self._lengths.size
+        if rows <= capacity:
+            return
+        capacity = max(_INITIAL_CAPACITY, rows, capacity * 2)
+        self._lengths = _grow(self._lengths, capacity, 0)
+        self._alive = _grow(self._alive, capacity, False)
+        self._segment_ids = _grow(self._segment_ids, capacity, -1)
+        self._segment_rows = _grow(self._segment_rows, capacity, 0)
+        for name, codes in self._filter_codes.items():
+            self._filter_codes[name] = _grow(codes, capacity, -1)
+
     @property
     def num_documents(self) -> int:
-        return len(self._doc_lengths)
+        return self._live_count
 
     @property
     def num_unique_terms(self) -> int:
-        return len(self._postings)
+        if self._dead_count:
+            # Terms only used by tombstoned documents do not count; the index is left as it is.
+            terms, docs, _ = self._triples()
+            return int(np.unique(terms[self._alive[docs]]).size) if docs.size else 0
+        used = [np.flatnonzero(np.diff(self._base.offsets))]
+        used.extend(view.global_ids[np.diff(view.segment.offsets) > 0] for view in self._views)
+        used.append(np.fromiter(self._delta.term_ids(), dtype=np.int64))
+        return int(np.unique(np.concatenate(used)).size)
 
     @property
     def avg_doc_length(self) -> float:
-        if not self._doc_lengths:
+        if not self._live_count:
             return 0.0
-        return sum(self._doc_lengths.values()) / len(self._doc_lengths)
+        return self._live_length_total / self._live_count
 
     def configure_preprocessor(self, config: LexicalSearchConfig) -> None:
-        self.preprocessor = TextPreprocessor(config)
+        # Searches pass their config every time; keep the warm caches unless tokenization changed.
+        if _preprocessing_key(config) == _preprocessing_key(self.preprocessor.config):
+            self.preprocessor.config = config
+        else:
+            self.preprocessor = TextPreprocessor(config)
 
     def clear(self) -> None:
-        self._doc_lengths.clear()
-        self._doc_term_freqs.clear()
-        self._doc_texts.clear()
-        self._doc_metadata.clear()
-        self._doc_languages.clear()
-        self._postings = defaultdict(dict)
+        self._term_ids = {}
+        self._terms = []
+        self._base = PostingsSegment.empty()
+        self._views = []
+        self._delta = DeltaPostings()
+        self._reset_documents()
+        self._readers = {}
+        self._source = None
         self._touch()
 
     def add_document(
@@ -337,53 +532,180 @@ class BM25Index:
         metadata: dict[str, Any] | None = None,
         language: str | None = None,
     ) -> None:
-        if doc_id in self._doc_term_freqs:
-            self.remove_document(doc_id)
-
         metadata = dict(metadata or {})
-        doc_language = language or _payload_value(metadata, ("doc_language", "language"))
+        doc_language = language or payload_value(metadata, ("doc_language", "language"))
         tokens = self.preprocessor.tokenize(text or "", doc_language)
-        frequencies = Counter(tokens)
-
-        self._doc_lengths[doc_id] = len(tokens)
-        self._doc_term_freqs[doc_id] = {term: int(count) for term, count in frequencies.items()}
-        self._doc_texts[doc_id] = text or ""
-        self._doc_metadata[doc_id] = metadata
-        self._doc_languages[doc_id] = doc_language
-
-        for term, count in self._doc_term_freqs[doc_id].items():
-            self._postings[term][doc_id] = count
+        self._add(doc_id, text or "", metadata, doc_language, Counter(tokens), len(tokens))
 
-        ingestion_version = _payload_value(metadata, ("ingestion_version",))
+        ingestion_version = payload_value(metadata, ("ingestion_version",))
         if ingestion_version:
             self.last_updated_version = ingestion_version
         self._touch()
 
+    def _intern(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self._terms)
+            self._terms.append(term)
+        return term_id
+
+    def _add(
+        self,
+        chunk_id: str,
+        text: str,
+        metadata: dict[str, Any],
+        language: str | None,
+        frequencies: dict[str, int],
+        length: int,
+    ) -> None:
+        if chunk_id in self._row_by_chunk:
+            self._tombstone(chunk_id)
+
+        row = self._size
+        self._reserve(row + 1)
+        self._size += 1
+        self._lengths[row] = length
+        self._alive[row] = True
+        self._segment_ids[row] = -1
+        self._chunk_ids.append(chunk_id)
+        # Payloads from ingestion carry the chunk text too; share one string object.
+        if metadata.get("chunk_text") == text:
+            metadata["chunk_text"] = text
+        doc_key = str(metadata.get("doc_id") or "")
+        self._doc_keys.append(doc_key)
+        self._documents.append((text, metadata, language))
+        self._row_by_chunk[chunk_id] = row
+        self._rows_by_doc[doc_key].add(row)
+        for name, keys in _FILTER_FIELDS.items():
+            value = payload_value(metadata, keys)
+            vocabulary = self._filter_values[name]
+            self._filter_codes[name][row] = -1 if value is None else vocabulary.setdefault(value, len(vocabulary))
+        self._live_count += 1
+        self._live_length_total += length
+
+        term_freqs = {self._intern(term): int(count) for term, count in frequencies.items()}
+        self._delta.add(row, term_freqs, length)
+        self._maybe_merge()
+
+    def _tombstone(self, chunk_id: str) -> bool:
+        row = self._row_by_chunk.pop(chunk_id, None)
+        if row is None:
+            return False
+        doc_key = self._doc_keys[row]
+        rows = self._rows_by_doc.get(doc_key)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                self._rows_by_doc.pop(doc_key, None)
+        self._alive[row] = False
+        self._live_count -= 1
+        self._live_length_total -= int(self._lengths[row])
+        self._dead_count += 1
+        self._documents[row] = None
+        return True
+
     def remove_document(self, doc_id: str) -> None:
-        frequencies = self._doc_term_freqs.pop(doc_id, None)
-        if frequencies:
-            for term in frequencies:
-                postings = self._postings.get(term)
-                if postings and doc_id in postings:
-                    postings.pop(doc_id, None)
-                    if not postings:
-                        self._postings.pop(term, None)
-
-        self._doc_lengths.pop(doc_id, None)
-        self._doc_texts.pop(doc_id, None)
-        self._doc_metadata.pop(doc_id, None)
-        self._doc_languages.pop(doc_id, None)
+        if self._tombstone(doc_id):
+            self._maybe_merge()
         self._touch()
 
     def remove_document_chunks(self, doc_id: str) -> int:
-        candidates = [
-            chunk_id
-            for chunk_id, payload in self._doc_metadata.items()
-            if str(payload.get("doc_id") or "") == str(doc_id)
-        ]
-        for chunk_id in candidates:
-            self.remove_document(chunk_id)
-        return len(candidates)
+        rows = list(self._rows_by_doc.get(str(doc_id), ()))
+        for row in rows:
+            self._tombstone(self._chunk_ids[row])
+        if rows:
+            self._maybe_merge()
+        self._touch()
+        return len(rows)
+
+    def _maybe_merge(self) -> None:
+        stored = self._base.num_postings + sum(view.num_postings for view in self._views)
+        delta_heavy = self._delta.num_postings > max(_MERGE_MIN_POSTINGS, stored // 4)
+        dead_heavy = self._dead_count > max(_MERGE_MIN_DEAD, self._size // 4)
+        if delta_heavy or dead_heavy:
+            self.merge()
+
+    def _triples(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(term id, row, tf)`` of every posting, tombstoned rows included."""
+        parts = [self._base.triples(), *(view.triples() for view in self._views), self._delta.triples()]
+        terms = np.concatenate([part[0] for part in parts]).astype(np.int64)
+        docs = np.concatenate([part[1] for part in parts]).astype(np.int64)
+        tfs = np.concatenate([part[2] for part in parts])
+        return terms, docs, tfs
+
+    def merge(self) -> None:
+        """Fold segments and the delta into one base and drop tombstoned documents and unused terms."""
+        terms, docs, tfs = self._triples()
+        live_rows = np.flatnonzero(self._alive[: self._size])
+        row_map = np.full(self._size, -1, dtype=np.int64)
+        row_map[live_rows] = np.arange(live_rows.size)
+        keep = self._alive[docs] if docs.size else np.zeros(0, dtype=bool)
+        terms, docs, tfs = terms[keep], row_map[docs[keep]], tfs[keep]
+
+        used_terms = np.unique(terms)
+        term_map = np.full(len(self._terms), -1, dtype=np.int64)
+        term_map[used_terms] = np.arange(used_terms.size)
+        self._terms = [self._terms[int(term_id)] for term_id in used_terms]
+        self._term_ids = {term: term_id for term_id, term in enumerate(self._terms)}
+        lengths = self._lengths[live_rows]
+        self._base = PostingsSegment.from_triples(term_map[terms], docs, tfs, len(self._terms), lengths)
+        self._views = []
+        self._delta = DeltaPostings()
+
+        size = int(live_rows.size)
+        segment_ids, segment_rows = self._segment_ids[live_rows], self._segment_rows[live_rows]
+        filter_values = self._filter_values
+        filter_codes = {name: codes[live_rows] for name, codes in self._filter_codes.items()}
+        chunk_ids = [self._chunk_ids[row] for row in live_rows.tolist()]
+        doc_keys = [self._doc_keys[row] for row in live_rows.tolist()]
+        documents = [self._documents[row] for row in live_rows.tolist()]
+        self._reset_documents()
+        self._reserve(size)
+        self._size = size
+        self._lengths[:size] = lengths
+        self._alive[:size] = True
+        self._segment_ids[:size] = segment_ids
+        self._segment_rows[:size] = segment_rows
+        self._filter_values = filter_values
+        for name, codes in filter_codes.items():
+            self._filter_codes[name][:size] = codes
+        self._chunk_ids, self._doc_keys, self._documents = chunk_ids, doc_keys, documents
+        for row, chunk_id in enumerate(chunk_ids):
+            self._row_by_chunk[chunk_id] = row
+            self._rows_by_doc[doc_keys[row]].add(row)
+        self._live_count = size
+        self._live_length_total = int(lengths.sum())
+
+    def _postings(self, term_id: int) -> tuple[np.ndarray, np.ndarray]:
+        # Base, view and delta rows are disjoint ascending ranges, so concatenation keeps docs sorted.
+        parts = [self._base.postings(term_id)]
+        parts.extend(view.postings(term_id) for view in self._views)
+        parts.append(self._delta.postings(term_id))
+        parts = [part for part in parts if part[0].size]
+        if len(parts) <= 1:
+            return parts[0] if parts else self._base.postings(term_id)
+        return np.concatenate([part[0] for part in parts]), np.concatenate([part[1] for part in parts])
+
+    def _term_bound(self, term_id: int) -> tuple[int, int]:
+        """Largest tf and shortest length over the term's postings, tombstones included."""
+        candidates = [self._base.bounds(term_id), *(view.bounds(term_id) for view in self._views)]
+        candidates.append(self._delta.bounds(term_id))
+        bounds = [value for value in candidates if value]
+        return max(value[0] for value in bounds), min(value[1] for value in bounds)
+
+    def _document(self, row: int) -> tuple[str, dict[str, Any], str | None]:
+        document = self._documents[row]
+        if document is None:
+            document = self._readers[int(self._segment_ids[row])].document(int(self._segment_rows[row]))
+        return document
+
+    def get_document(self, chunk_id: str) -> tuple[str, dict[str, Any]]:
+        """Text and metadata of an indexed chunk (empty if unknown)."""
+        row = self._row_by_chunk.get(chunk_id)
+        if row is None:
+            return "", {}
+        text, metadata, _ = self._document(row)
+        return text, metadata
 
     def score_tokens(
         self,
@@ -394,77 +716,364 @@ class BM25Index:
         delta: float,
         filters: SearchFilters | None = None,
     ) -> list[tuple[str, float, dict[str, int]]]:
+        """Every chunk matching a query term, best first (ties by insertion order)."""
         if not query_tokens or self.num_documents == 0:
             return []
-
-        query_tf = Counter(query_tokens)
-        n_docs = max(self.num_documents, 1)
-        avgdl = self.avg_doc_length or 1.0
-        scores: dict[str, float] = {}
-        matched_terms: dict[str, dict[str, int]] = defaultdict(dict)
-
-        candidate_docs: set[str] = set()
-        for term in query_tf:
-            postings = self._postings.get(term)
-            if postings:
-                candidate_docs.update(postings.keys())
-        if not candidate_docs:
+        params = _BM25Params.create(algorithm, k1, b, delta, self.avg_doc_length)
+        terms = self._query_terms(query_tokens, filters)
+        if not terms:
             return []
 
-        for term, qf in query_tf.items():
-            postings = self._postings.get(term)
-            if not postings:
-                continue
+        rows, scores = self._accumulate(terms, params)
+        order = np.lexsort((rows, -scores))
+        matched_terms: dict[int, dict[str, int]] = defaultdict(dict)
+        for term in terms:
+            for row, tf in zip(term.docs.tolist(), term.tfs.tolist()):
+                matched_terms[row][term.term] = tf
+        return [
+            (self._chunk_ids[row], score, matched_terms[row])
+            for row, score in zip(rows[order].tolist(), scores[order].tolist())
+        ]
 
-            df = len(postings)
+    def score_top_k(
+        self,
+        query_tokens: list[str],
+        algorithm: BM25Algorithm,
+        k1: float,
+        b: float,
+        delta: float,
+        top_k: int,
+        filters: SearchFilters | None = None,
+        strategy: TopKStrategy = "auto",
+    ) -> tuple[list[tuple[str, float, dict[str, int]]], int]:
+        """The first ``top_k`` entries of :meth:`score_tokens`, and how many chunks were scored.
+
+        Two strategies give identical results. ``"exhaustive"`` scores every
+        posting of every query term into one score vector and selects the
+        top k with ``argpartition``; it wins for broad queries whose postings
+        cover a good part of the corpus. ``"maxscore"`` prunes: see
+        :meth:`_maxscore_top_k`. ``"auto"`` prunes only broad queries that
+        also have a narrow term.
+        """
+        if not query_tokens or self.num_documents == 0 or top_k <= 0:
+            return [], 0
+        params = _BM25Params.create(algorithm, k1, b, delta, self.avg_doc_length)
+        terms = self._query_terms(query_tokens, filters)
+        if not terms:
+            return [], 0
+
+        if strategy == "auto":
+            # Pruning pays off when a narrow term seeds few candidates for the broad ones to probe.
+            sizes = [term.docs.size for term in terms]
+            broad = sum(sizes) * _BROAD_MIN_COVERAGE >= self._live_count
+            narrowest = min(sizes) * _BROAD_MIN_COVERAGE >= self._live_count
+            strategy = "maxscore" if broad and not narrowest else "exhaustive"
+        if strategy == "maxscore":
+            rows, scores, scored = self._maxscore_top_k(terms, params, top_k)
+        else:
+            rows, scores = self._accumulate(terms, params)
+            scored = rows.size
+            if rows.size > top_k:
+                # Keep everything tied with the k-th score so row order can break the tie.
+                kth = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+                keep = scores >= kth
+                rows, scores = rows[keep], scores[keep]
+
+        best = np.lexsort((rows, -scores))[:top_k]
+        results: list[tuple[str, float, dict[str, int]]] = []
+        for row, score in zip(rows[best].tolist(), scores[best].tolist()):
+            matched: dict[str, int] = {}
+            for term in terms:
+                index = int(np.searchsorted(term.docs, row))
+                if index < term.docs.size and term.docs[index] == row:
+                    matched[term.term] = int(term.tfs[index])
+            results.append((self._chunk_ids[row], score, matched))
+        return results, int(scored)
+
+    def _query_terms(self, query_tokens: list[str], filters: SearchFilters | None) -> list[_QueryTerm]:
+        """Live, filter-passing postings of each distinct query term, in query order."""
+        n_docs = max(self.num_documents, 1)
+        mask = self._filter_mask(filters)
+        alive = self._alive[: self._size]
+        terms: list[_QueryTerm] = []
+        for term, qf in Counter(query_tokens).items():
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                continue
+            docs, tfs = self._postings(term_id)
+            live = alive[docs]
+            df = int(np.count_nonzero(live))
             if df == 0:
                 continue
             idf = math.log(1.0 + ((n_docs - df + 0.5) / (df + 0.5)))
+            keep = live if mask is None else mask[docs]
+            terms.append(_QueryTerm(term, term_id, qf, idf, docs[keep].astype(np.int64), tfs[keep]))
+        return terms
+
+    def _filter_mask(self, filters: SearchFilters | None) -> np.ndarray | None:
+        """Rows that are live and pass ``filters``, or ``None`` when nothing is filtered."""
+        wanted = filters.active() if filters is not None else {}
+        if not wanted:
+            return None
+        mask = self._alive[: self._size].copy()
+        for name, values in wanted.items():
+            vocabulary = self._filter_values[name]
+            codes = [vocabulary[value] for value in values if value in vocabulary]
+            mask &= np.isin(self._filter_codes[name][: self._size], codes)
+        return mask
+
+    def _accumulate(self, terms: list[_QueryTerm], params: _BM25Params) -> tuple[np.ndarray, np.ndarray]:
+        """Rows matching any term (ascending) and their scores, summed in query order."""
+        lengths = np.maximum(self._lengths[: self._size], 1)
+        postings = sum(term.docs.size for term in terms)
+        if postings * _DENSE_MIN_COVERAGE >= self._size:
+            scores = np.zeros(self._size, dtype=np.float64)
+            hit = np.zeros(self._size, dtype=bool)
+            for term in terms:
+                scores[term.docs] += params.scores(term.tfs, lengths[term.docs], term.idf, term.qf)
+                hit[term.docs] = True
+            rows = np.flatnonzero(hit)
+            return rows, scores[rows]
+
+        docs = np.concatenate([term.docs for term in terms])
+        values = np.concatenate(
+            [params.scores(term.tfs, lengths[term.docs], term.idf, term.qf) for term in terms]
+        )
+        rows, inverse = np.unique(docs, return_inverse=True)
+        # bincount adds weights in input order, i.e. term by term in query order.
+        return rows, np.bincount(inverse, weights=values, minlength=rows.size)
+
+    def _maxscore_top_k(
+        self, terms: list[_QueryTerm], params: _BM25Params, top_k: int
+    ) -> tuple[np.ndarray, np.ndarray, int]:
+        """Top-k candidates and their scores, with MaxScore pruning.
+
+        Terms are processed term-at-a-time, highest score bound first, with
+        each term's postings scored as a vector. Once the bounds of the terms
+        left can no longer lift an unseen chunk above the current k-th best
+        partial score, only existing candidates are scored, and candidates
+        that can no longer reach it are dropped. Final scores are summed in
+        query order, exactly as :meth:`_accumulate` does.
+        """
+        lengths = np.maximum(self._lengths[: self._size], 1)
+        bounds: list[float] = []
+        for term in terms:
+            max_tf, min_len = self._term_bound(term.term_id)
+            bounds.append(params.scores(max_tf, max(min_len, 1), term.idf, term.qf))
+
+        order = sorted(range(len(terms)), key=lambda position: -bounds[position])
+        remaining = [0.0] * (len(order) + 1)
+        for step in range(len(order) - 1, -1, -1):
+            remaining[step] = remaining[step + 1] + bounds[order[step]]
+
+        candidates = np.zeros(0, dtype=np.int64)
+        partial = np.zeros(0, dtype=np.float64)
+        contributions: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        scored = 0
+        for step, position in enumerate(order):
+            term = terms[position]
+            threshold = self._kth_largest(partial, top_k)
+            # Bounds are compared with a little slack so float rounding never prunes a tie.
+            if threshold is None or remaining[step] * _BOUND_SLACK >= threshold:
+                values = params.scores(term.tfs, lengths[term.docs], term.idf, term.qf)
+                merged = np.union1d(candidates, term.docs)
+                merged_partial = np.zeros(merged.size, dtype=np.float64)
+                merged_partial[np.searchsorted(merged, candidates)] = partial
+                merged_partial[np.searchsorted(merged, term.docs)] += values
+                candidates, partial = merged, merged_partial
+                contributions[position] = (term.docs, values)
+                scored = candidates.size
+                continue
 
-            for doc_id in candidate_docs:
-                tf = postings.get(doc_id)
-                if not tf:
-                    continue
-
-                payload = self._doc_metadata.get(doc_id, {})
-                if filters is not None and not self._matches_filters(payload, filters):
-                    continue
-
-                doc_len = max(self._doc_lengths.get(doc_id, 0), 1)
-                denominator = tf + (k1 * (1.0 - b + (b * doc_len / avgdl)))
-                if denominator <= 0:
-                    continue
-
-                base = (tf * (k1 + 1.0)) / denominator
-                if algorithm == BM25Algorithm.BM25_PLUS:
-                    contribution = idf * (base + delta)
-                else:
-                    contribution = idf * base
-
-                scores[doc_id] = scores.get(doc_id, 0.0) + (contribution * qf)
-                matched_terms[doc_id][term] = matched_terms[doc_id].get(term, 0) + int(tf)
+            hits = np.searchsorted(term.docs, candidates)
+            found = hits < term.docs.size
+            found[found] = term.docs[hits[found]] == candidates[found]
+            hit_docs = candidates[found]
+            values = params.scores(term.tfs[hits[found]], lengths[hit_docs], term.idf, term.qf)
+            partial[found] += values
+            contributions[position] = (hit_docs, values)
+            keep = (partial + remaining[step + 1]) * _BOUND_SLACK >= threshold
+            candidates, partial = candidates[keep], partial[keep]
+
+        totals = np.zeros(candidates.size, dtype=np.float64)
+        for position in range(len(terms)):
+            docs, values = contributions[position]
+            index = np.searchsorted(docs, candidates)
+            found = index < docs.size
+            found[found] = docs[index[found]] == candidates[found]
+            totals[found] = totals[found] + values[index[found]]
+        return candidates, totals, scored
 
-        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
-        return [(doc_id, score, matched_terms.get(doc_id, {})) for doc_id, score in ranked]
+    @staticmethod
+    def _kth_largest(values: np.ndarray, k: int) -> float | None:
+        if values.size < k:
+            return None
+        return float(np.partition(values, values.size - k)[values.size - k])
 
     def save(self, directory: Path) -> Path:
+        """Persist the index under ``directory`` and return its manifest path.
+
+        Saving back to the directory the index was loaded from (or last saved
+        to) only writes the chunks added since as a new segment, plus a new
+        deletion bitmap for each segment that lost chunks; past
+        ``_MAX_SEGMENTS`` segments or too many deleted rows, the segments are
+        merged in the background (see :func:`merge_segments`). Everything is
+        rewritten as one segment instead when the directory changed under
+        the index.
+        """
         directory.mkdir(parents=True, exist_ok=True)
-        index_file = directory / _INDEX_FILE
-        payload = {
-            "schema_version": 1,
-            "doc_lengths": self._doc_lengths,
-            "doc_term_freqs": self._doc_term_freqs,
-            "doc_texts": self._doc_texts,
-            "doc_metadata": self._doc_metadata,
-            "doc_languages": self._doc_languages,
+        merges = _merges_of(directory)
+        with merges.lock:
+            manifest_path, merge_due = self._save(SegmentDirectory(directory), merges.reserved)
+        if merge_due:
+            merges.schedule()
+        return manifest_path
+
+    def _save(self, files: SegmentDirectory, reserved: set[int]) -> tuple[Path, bool]:
+        directory = files.directory
+        manifest = files.read_manifest()
+        generation = int(manifest.get("generation", 0)) if manifest else 0
+        incremental = manifest is not None and self._source == (directory.resolve(), generation)
+        segments = [dict(entry) for entry in manifest.get("segments", [])] if incremental else []
+
+        size = self._size
+        live = self._alive[:size]
+        segment_ids = self._segment_ids[:size]
+        for entry in segments:
+            deleted = np.ones(int(entry["rows"]), dtype=bool)
+            deleted[self._segment_rows[:size][live & (segment_ids == int(entry["id"]))]] = False
+            count = int(np.count_nonzero(deleted))
+            if count != int(entry.get("deleted", 0)):
+                files.write_deletes(int(entry["id"]), generation + 1, deleted)
+                entry.update(deletes=generation + 1, deleted=count)
+
+        rows = np.flatnonzero(live & (segment_ids < 0)) if incremental else np.flatnonzero(live)
+        total_rows = sum(int(entry["rows"]) for entry in segments) + int(rows.size)
+        deleted_rows = sum(int(entry.get("deleted", 0)) for entry in segments)
+        count = len(segments) + (1 if rows.size else 0)
+        merge_due = count > _MAX_SEGMENTS or deleted_rows > total_rows * _MAX_DELETED_RATIO
+        if merge_due and count > 2 * _MAX_SEGMENTS:
+            # Background merges are not keeping up (or keep being invalidated): rewrite now.
+            segments, rows, merge_due = [], np.flatnonzero(live), False
+
+        if rows.size:
+            segment_id = files.next_segment_id(manifest, reserved)
+            self._write_segment(files, segment_id, rows)
+            segments.append({"id": segment_id, "rows": int(rows.size), "deletes": None, "deleted": 0})
+        manifest = {
+            "generation": generation + 1,
+            "segments": segments,
             "last_updated_version": self.last_updated_version,
             "last_updated_at": self.last_updated_at,
         }
-        index_file.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-        return index_file
+        files.write_manifest(manifest)
+        files.remove_unreferenced(manifest, keep=reserved)
+
+        # Chunks just written are read back from their segment from now on.
+        if rows.size:
+            reader = files.open_segment(segments[-1])
+            self._readers[reader.id] = reader
+            self._segment_ids[rows] = reader.id
+            self._segment_rows[rows] = np.arange(rows.size)
+            for row in rows.tolist():
+                self._documents[row] = None
+        referenced = {int(entry["id"]) for entry in segments}
+        self._readers = {key: reader for key, reader in self._readers.items() if key in referenced}
+        self._source = (directory.resolve(), generation + 1)
+        return files.manifest_path, merge_due
+
+    def _write_segment(self, files: SegmentDirectory, segment_id: int, rows: np.ndarray) -> None:
+        local_rows = np.full(self._size, -1, dtype=np.int64)
+        local_rows[rows] = np.arange(rows.size)
+        terms, docs, tfs = self._triples()
+        keep = local_rows[docs] >= 0
+        terms, docs, tfs = terms[keep], local_rows[docs[keep]], tfs[keep]
+        used_terms = np.unique(terms)
+        term_map = np.full(len(self._terms), -1, dtype=np.int64)
+        term_map[used_terms] = np.arange(used_terms.size)
+        lengths = self._lengths[rows]
+        files.write_segment(
+            segment_id,
+            terms=[self._terms[term_id] for term_id in used_terms.tolist()],
+            postings=PostingsSegment.from_triples(term_map[terms], docs, tfs, used_terms.size, lengths),
+            lengths=lengths,
+            chunk_ids=[self._chunk_ids[row] for row in rows.tolist()],
+            doc_keys=[self._doc_keys[row] for row in rows.tolist()],
+            filter_values={name: list(values) for name, values in self._filter_values.items()},
+            codes=np.stack([self._filter_codes[name][rows] for name in self._filter_values], axis=1),
+            stored_lines=(self._stored_line(row) for row in rows.tolist()),
+        )
+
+    def _stored_line(self, row: int) -> bytes:
+        if self._documents[row] is None:
+            # Already on disk: copy the record byte for byte.
+            return self._readers[int(self._segment_ids[row])].stored_line(int(self._segment_rows[row]))
+        text, metadata, language = self._documents[row]
+        return json.dumps({"text": text, "metadata": metadata, "language": language}, ensure_ascii=False).encode("utf-8")
 
     def load(self, directory: Path) -> bool:
-        index_file = directory / _INDEX_FILE
+        files = SegmentDirectory(directory)
+        manifest = files.read_manifest()
+        if manifest is None:
+            return self._load_legacy(files.legacy_path)
+        try:
+            readers = [files.open_segment(entry) for entry in manifest.get("segments", [])]
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Cannot open BM25 index in %s: %s", directory, exc)
+            return False
+
+        self.clear()
+        for reader in readers:
+            self._attach(reader)
+        self._source = (directory.resolve(), int(manifest.get("generation", 0)))
+        self.last_updated_version = manifest.get("last_updated_version")
+        self.last_updated_at = manifest.get("last_updated_at")
+        return True
+
+    def _attach(self, reader: SegmentReader) -> None:
+        offset, count = self._size, reader.rows
+        if offset == 0:
+            # The first segment's term ids become the index's own, so its postings are used as they are.
+            self._terms = list(reader.terms)
+            self._term_ids = {term: term_id for term_id, term in enumerate(self._terms)}
+            self._base = reader.postings
+        else:
+            global_ids = np.fromiter((self._intern(term) for term in reader.terms), dtype=np.int64, count=len(reader.terms))
+            self._views.append(SegmentView(reader.postings, global_ids, offset))
+
+        alive = ~reader.deleted
+        lengths = np.asarray(reader.lengths)
+        end = offset + count
+        self._reserve(end)
+        self._lengths[offset:end] = lengths
+        self._alive[offset:end] = alive
+        self._segment_ids[offset:end] = reader.id
+        self._segment_rows[offset:end] = np.arange(count)
+        for name in self._filter_codes:
+            # Columns added after the segment was written have no values for its rows.
+            self._filter_codes[name][offset:end] = -1
+        for column, (name, values) in enumerate(reader.filter_values.items()):
+            if name not in self._filter_codes:
+                continue
+            vocabulary = self._filter_values[name]
+            # Local code -1 (no value) indexes the trailing -1.
+            remap = np.array([vocabulary.setdefault(value, len(vocabulary)) for value in values] + [-1], dtype=np.int32)
+            self._filter_codes[name][offset:end] = remap[reader.codes[:, column]]
+        self._chunk_ids.extend(reader.chunk_ids)
+        self._doc_keys.extend(reader.doc_keys)
+        self._documents.extend([None] * count)
+        for row in np.flatnonzero(alive).tolist():
+            self._row_by_chunk[reader.chunk_ids[row]] = offset + row
+            self._rows_by_doc[reader.doc_keys[row]].add(offset + row)
+        live = int(np.count_nonzero(alive))
+        self._size = end
+        self._live_count += live
+        self._live_length_total += int(lengths[alive].sum())
+        self._dead_count += count - live
+        self._readers[reader.id] = reader
+
+    def _load_legacy(self, index_file: Path) -> bool:
+        """Read a ``bm25_index.json`` written before segments; the next save converts it."""
         if not index_file.exists():
             return False
 
@@ -473,62 +1082,148 @@ class BM25Index:
         except (json.JSONDecodeError, OSError):
             return False
 
-        self._doc_lengths = {str(k): int(v) for k, v in dict(payload.get("doc_lengths", {})).items()}
-        self._doc_term_freqs = {
-            str(doc_id): {str(term): int(tf) for term, tf in dict(freqs).items()}
-            for doc_id, freqs in dict(payload.get("doc_term_freqs", {})).items()
-        }
-        self._doc_texts = {str(k): str(v) for k, v in dict(payload.get("doc_texts", {})).items()}
-        self._doc_metadata = {
-            str(k): dict(v) if isinstance(v, dict) else {}
-            for k, v in dict(payload.get("doc_metadata", {})).items()
-        }
-        self._doc_languages = {
-            str(k): (str(v) if v is not None else None)
-            for k, v in dict(payload.get("doc_languages", {})).items()
-        }
+        doc_term_freqs = dict(payload.get("doc_term_freqs", {}))
+        doc_texts = dict(payload.get("doc_texts", {}))
+        doc_metadata = dict(payload.get("doc_metadata", {}))
+        doc_languages = dict(payload.get("doc_languages", {}))
+        self.clear()
+        for chunk_id, length in dict(payload.get("doc_lengths", {})).items():
+            chunk_id = str(chunk_id)
+            metadata = doc_metadata.get(chunk_id)
+            language = doc_languages.get(chunk_id)
+            self._add(
+                chunk_id,
+                str(doc_texts.get(chunk_id, "")),
+                dict(metadata) if isinstance(metadata, dict) else {},
+                str(language) if language is not None else None,
+                {str(term): int(tf) for term, tf in dict(doc_term_freqs.get(chunk_id, {})).items()},
+                int(length),
+            )
+        self.merge()
         self.last_updated_version = payload.get("last_updated_version")
         self.last_updated_at = payload.get("last_updated_at")
-
-        self._postings = defaultdict(dict)
-        for doc_id, freqs in self._doc_term_freqs.items():
-            for term, tf in freqs.items():
-                self._postings[term][doc_id] = int(tf)
         return True
 
     @staticmethod
-    def index_size_bytes(directory: Path) -> int:
-        index_file = directory / _INDEX_FILE
-        if not index_file.exists():
-            return 0
-        return index_file.stat().st_size
+    def index_path(directory: Path) -> Path:
+        """File whose modification time changes whenever the index in ``directory`` is saved."""
+        files = SegmentDirectory(directory)
+        if not files.manifest_path.exists() and files.legacy_path.exists():
+            return files.legacy_path
+        return files.manifest_path
 
     @staticmethod
-    def _matches_filters(payload: dict[str, Any], filters: SearchFilters) -> bool:
-        if filters.doc_ids:
-            doc_id = _payload_value(payload, ("doc_id",))
-            if doc_id not in set(filters.doc_ids):
-                return False
+    def index_size_bytes(directory: Path) -> int:
+        return SegmentDirectory(directory).size_bytes()
 
-        if filters.doc_types:
-            doc_type = _payload_value(payload, ("doc_type", "file_type"))
-            if doc_type not in set(filters.doc_types):
-                return False
+    def _touch(self) -> None:
+        self.last_updated_at = _utcnow_iso()
 
-        if filters.languages:
-            language = _payload_value(payload, ("doc_language", "language"))
-            if language not in set(filters.languages):
-                return False
 
-        if filters.categories:
-            category = _payload_value(payload, ("category",))
-            if category not in set(filters.categories):
-                return False
+class _DirectoryMerges:
+    """Background merge state of one index directory.
 
-        return True
+    Saves hold ``lock`` throughout; a merge only holds it to reserve the id
+    of its segment and to commit, and writes the merged segment in between.
+    """
 
-    def _touch(self) -> None:
-        self.last_updated_at = _utcnow_iso()
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.reserved: set[int] = set()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self) -> None:
+        with self.lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=merge_segments, args=(self.directory,), name="bm25-segment-merge", daemon=True
+            )
+            self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return thread is None or not thread.is_alive()
+
+
+_MERGES: dict[Path, _DirectoryMerges] = {}
+_MERGES_LOCK = threading.Lock()
+
+
+def _merges_of(directory: Path) -> _DirectoryMerges:
+    key = directory.resolve()
+    with _MERGES_LOCK:
+        merges = _MERGES.get(key)
+        if merges is None:
+            merges = _MERGES[key] = _DirectoryMerges(key)
+        return merges
+
+
+def wait_for_merges(directory: Path, timeout: float | None = None) -> bool:
+    """Wait for a background merge of ``directory``; ``False`` if one is still running after ``timeout``."""
+    return _merges_of(directory).wait(timeout)
+
+
+def merge_segments(directory: Path) -> bool:
+    """Rewrite the live rows of an index directory's segments as one segment.
+
+    Segments saved while the merge runs are kept after the merged one. The
+    merge is abandoned, and left to the next save to schedule again, if rows
+    of the merged segments were deleted meanwhile.
+    """
+    merges = _merges_of(directory)
+    files = SegmentDirectory(merges.directory)
+    with merges.lock:
+        manifest = files.read_manifest()
+        if manifest is None:
+            return False
+        merged = [dict(entry) for entry in manifest.get("segments", [])]
+        if len(merged) < 2 and not any(int(entry.get("deleted", 0)) for entry in merged):
+            return False
+        generation = int(manifest.get("generation", 0))
+        segment_id = files.next_segment_id(manifest, merges.reserved)
+        merges.reserved.add(segment_id)
+
+    committed = False
+    try:
+        index = BM25Index(LexicalSearchConfig())
+        if not index.load(merges.directory) or index._source != (merges.directory, generation):
+            return False
+        rows = np.flatnonzero(index._alive[: index._size])
+        index._write_segment(files, segment_id, rows)
+        with merges.lock:
+            current = files.read_manifest()
+            if current is None:
+                return False
+            entries = {int(entry["id"]): entry for entry in current.get("segments", [])}
+            if any(entries.get(int(entry["id"])) != entry for entry in merged):
+                return False
+            merged_ids = {int(entry["id"]) for entry in merged}
+            manifest = {
+                **current,
+                "generation": int(current.get("generation", 0)) + 1,
+                "segments": [
+                    {"id": segment_id, "rows": int(rows.size), "deletes": None, "deleted": 0},
+                    *(entry for entry in current.get("segments", []) if int(entry["id"]) not in merged_ids),
+                ],
+            }
+            files.write_manifest(manifest)
+            committed = True
+            merges.reserved.discard(segment_id)
+            files.remove_unreferenced(manifest, keep=merges.reserved)
+        return True
+    except (OSError, ValueError) as exc:
+        logger.warning("Merging BM25 segments in %s failed: %s", merges.directory, exc)
+        return False
+    finally:
+        if not committed:
+            with merges.lock:
+                merges.reserved.discard(segment_id)
+                SegmentDirectory._remove(files.segment_path(segment_id))
+                SegmentDirectory._remove(files.segment_path(segment_id).with_name(f"seg_{segment_id:06d}.tmp"))
 
 
 class LexicalSearchEngine:
@@ -550,24 +1245,25 @@ class LexicalSearchEngine:
         self.index.configure_preprocessor(config)
 
         tok_started_at = time.perf_counter()
-        query_tokens = self.index.preprocessor.tokenize(query)
+        query_tokens = self.index.preprocessor.tokenize_query(query)
         tokenization_latency_ms = int((time.perf_counter() - tok_started_at) * 1000)
 
         search_started_at = time.perf_counter()
-        raw_results = self.index.score_tokens(
+        effective_top_k = max(top_k or config.top_k, 1)
+        raw_results, scored = self.index.score_top_k(
             query_tokens=query_tokens,
             algorithm=config.algorithm,
             k1=config.bm25_k1,
             b=config.bm25_b,
             delta=config.bm25_delta,
+            top_k=effective_top_k,
             filters=filters,
         )
         search_latency_ms = int((time.perf_counter() - search_started_at) * 1000)
 
         score_threshold = config.threshold if threshold is None else threshold
         filtered = [item for item in raw_results if item[1] >= score_threshold]
-        effective_top_k = max(top_k or config.top_k, 1)
-        final = filtered[:effective_top_k]
+        final = filtered
 
         results = [self._to_result(doc_id, score, matched_terms) for doc_id, score, matched_terms in final]
         total_latency_ms = int((time.perf_counter() - started_at) * 1000)
@@ -580,13 +1276,13 @@ class LexicalSearchEngine:
             tokenization_latency_ms=max(tokenization_latency_ms, 1),
             search_latency_ms=max(search_latency_ms, 1),
             total_latency_ms=max(total_latency_ms, 1),
-            results_from_index=len(raw_results),
-            results_after_threshold=len(filtered),
+            chunks_scored=scored,
+            top_k_after_threshold=len(filtered),
+            tokenizer_cache=self.index.preprocessor.cache_stats(),
         )
 
     def _to_result(self, doc_id: str, score: float, matched_terms: dict[str, int]) -> BM25SearchResult:
-        text = self.index._doc_texts.get(doc_id, "")
-        metadata = self.index._doc_metadata.get(doc_id, {})
+        text, metadata = self.index.get_document(doc_id)
         raw_keywords = metadata.get("keywords", [])
         keywords = [str(item) for item in raw_keywords] if isinstance(raw_keywords, list) else []
         return BM25SearchResult(
@@ -595,16 +1291,16 @@ class LexicalSearchEngine:
             text=text,
             metadata=metadata,
             matched_terms=matched_terms,
-            doc_title=_payload_value(metadata, ("doc_title", "document_title", "filename")),
-            doc_path=_payload_value(metadata, ("doc_path", "source")),
-            doc_type=_payload_value(metadata, ("doc_type", "file_type")),
+            doc_title=payload_value(metadata, ("doc_title", "document_title", "filename")),
+            doc_path=payload_value(metadata, ("doc_path", "source")),
+            doc_type=payload_value(metadata, ("doc_type", "file_type")),
             page_number=metadata.get("page_number") or metadata.get("page"),
             chunk_index=metadata.get("chunk_index"),
             chunk_total=metadata.get("chunk_total"),
             chunk_tokens=metadata.get("chunk_tokens"),
-            section_header=_payload_value(metadata, ("section_header",)),
-            doc_language=_payload_value(metadata, ("doc_language", "language")),
-            category=_payload_value(metadata, ("category",)),
+            section_header=payload_value(metadata, ("section_header",)),
+            doc_language=payload_value(metadata, ("doc_language", "language")),
+            category=payload_value(metadata, ("category",)),
             keywords=keywords,
-            ingestion_version=_payload_value(metadata, ("ingestion_version",)),
+            ingestion_version=payload_value(metadata, ("ingestion_version",)),
         )
@@ -0,0 +1,186 @@
+"""Compact integer-id postings for the BM25 index.
+
+Chunks and terms are interned to dense integer ids. Postings of the
+merged base live in one CSR layout (``offsets`` per term id into parallel
+``docs``/``tfs`` arrays, doc ids ascending within a term); documents added
+since the last merge go to an append-only :class:`DeltaPostings` of
+``array('I')`` lists. Deleted documents are tombstoned by the index and
+dropped at the next merge. Segments loaded from disk beyond the first keep
+their own term and doc ids and are read through a :class:`SegmentView`.
+"""
+
+from __future__ import annotations
+
+from array import array
+
+import numpy as np
+
+_EMPTY = np.zeros(0, dtype=np.uint32)
+
+
+class PostingsSegment:
+    """Immutable CSR postings indexed by term id.
+
+    ``max_tf`` and ``min_len`` hold, per term, the largest term frequency
+    and the shortest document length among its postings: BM25 grows with
+    tf and shrinks with length, so together they bound any score the term
+    can contribute.
+    """
+
+    __slots__ = ("offsets", "docs", "tfs", "max_tf", "min_len")
+
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        docs: np.ndarray,
+        tfs: np.ndarray,
+        max_tf: np.ndarray,
+        min_len: np.ndarray,
+    ):
+        self.offsets = offsets
+        self.docs = docs
+        self.tfs = tfs
+        self.max_tf = max_tf
+        self.min_len = min_len
+
+    @classmethod
+    def empty(cls) -> "PostingsSegment":
+        return cls(np.zeros(1, dtype=np.int64), _EMPTY, _EMPTY, _EMPTY, _EMPTY)
+
+    @classmethod
+    def from_triples(
+        cls,
+        terms: np.ndarray,
+        docs: np.ndarray,
+        tfs: np.ndarray,
+        num_terms: int,
+        lengths: np.ndarray,
+    ) -> "PostingsSegment":
+        order = np.lexsort((docs, terms))
+        counts = np.bincount(terms, minlength=num_terms)
+        offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        docs, tfs = docs[order].astype(np.uint32), tfs[order].astype(np.uint32)
+        max_tf = np.zeros(num_terms, dtype=np.uint32)
+        min_len = np.zeros(num_terms, dtype=np.uint32)
+        used = counts > 0
+        if docs.size:
+            starts = offsets[:-1][used]
+            max_tf[used] = np.maximum.reduceat(tfs, starts)
+            min_len[used] = np.minimum.reduceat(lengths[docs], starts)
+        return cls(offsets, docs, tfs, max_tf, min_len)
+
+    @property
+    def num_terms(self) -> int:
+        return self.offsets.size - 1
+
+    @property
+    def num_postings(self) -> int:
+        return int(self.docs.size)
+
+    def postings(self, term_id: int) -> tuple[np.ndarray, np.ndarray]:
+        if term_id >= self.num_terms:
+            return _EMPTY, _EMPTY
+        start, end = int(self.offsets[term_id]), int(self.offsets[term_id + 1])
+        return self.docs[start:end], self.tfs[start:end]
+
+    def bounds(self, term_id: int) -> tuple[int, int] | None:
+        if term_id >= self.num_terms or self.offsets[term_id] == self.offsets[term_id + 1]:
+            return None
+        return int(self.max_tf[term_id]), int(self.min_len[term_id])
+
+    def triples(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        terms = np.repeat(np.arange(self.num_terms, dtype=np.int64), np.diff(self.offsets))
+        return terms, self.docs, self.tfs
+
+
+class SegmentView:
+    """A segment with its own ids, addressed by the index's term ids and rows.
+
+    ``global_ids`` maps the segment's term ids to index term ids, and its
+    doc ids start at ``row_offset`` in the index.
+    """
+
+    __slots__ = ("segment", "global_ids", "local_ids", "row_offset")
+
+    def __init__(self, segment: PostingsSegment, global_ids: np.ndarray, row_offset: int):
+        self.segment = segment
+        self.global_ids = global_ids
+        self.local_ids = np.full(int(global_ids.max()) + 1 if global_ids.size else 0, -1, dtype=np.int64)
+        self.local_ids[global_ids] = np.arange(global_ids.size)
+        self.row_offset = row_offset
+
+    @property
+    def num_postings(self) -> int:
+        return self.segment.num_postings
+
+    def _local(self, term_id: int) -> int:
+        return int(self.local_ids[term_id]) if term_id < self.local_ids.size else -1
+
+    def postings(self, term_id: int) -> tuple[np.ndarray, np.ndarray]:
+        local = self._local(term_id)
+        if local < 0:
+            return _EMPTY, _EMPTY
+        docs, tfs = self.segment.postings(local)
+        return docs + np.uint32(self.row_offset), tfs
+
+    def bounds(self, term_id: int) -> tuple[int, int] | None:
+        local = self._local(term_id)
+        return self.segment.bounds(local) if local >= 0 else None
+
+    def triples(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        terms, docs, tfs = self.segment.triples()
+        return self.global_ids[terms], docs.astype(np.int64) + self.row_offset, tfs
+
+
+class DeltaPostings:
+    """Append-only postings for documents added since the last merge.
+
+    New documents always receive the highest doc id so far, which keeps
+    every list sorted without any insertion work.
+    """
+
+    def __init__(self) -> None:
+        self._lists: dict[int, tuple[array, array]] = {}
+        self._bounds: dict[int, tuple[int, int]] = {}
+        self.num_postings = 0
+
+    def add(self, doc: int, term_freqs: dict[int, int], length: int) -> None:
+        for term_id, tf in term_freqs.items():
+            entry = self._lists.get(term_id)
+            if entry is None:
+                entry = self._lists[term_id] = (array("I"), array("I"))
+                self._bounds[term_id] = (tf, length)
+            else:
+                max_tf, min_len = self._bounds[term_id]
+                self._bounds[term_id] = (max(max_tf, tf), min(min_len, length))
+            entry[0].append(doc)
+            entry[1].append(tf)
+        self.num_postings += len(term_freqs)
+
+    def bounds(self, term_id: int) -> tuple[int, int] | None:
+        return self._bounds.get(term_id)
+
+    def term_ids(self) -> list[int]:
+        return list(self._lists)
+
+    def postings(self, term_id: int) -> tuple[np.ndarray, np.ndarray]:
+        entry = self._lists.get(term_id)
+        if entry is None:
+            return _EMPTY, _EMPTY
+        return np.array(entry[0], dtype=np.uint32), np.array(entry[1], dtype=np.uint32)
+
+    def triples(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if not self._lists:
+            return np.zeros(0, dtype=np.int64), _EMPTY, _EMPTY
+        terms = np.concatenate(
+            [np.full(len(docs), term_id, dtype=np.int64) for term_id, (docs, _) in self._lists.items()]
+        )
+        docs = np.concatenate([np.array(docs, dtype=np.uint32) for docs, _ in self._lists.values()])
+        tfs = np.concatenate([np.array(tfs, dtype=np.uint32) for _, tfs in self._lists.values()])
+        return terms, docs, tfs
+
+    def clear(self) -> None:
+        self._lists = {}
+        self._bounds = {}
+        self.num_postings = 0
@@ -0,0 +1,241 @@
+"""On-disk segments of the BM25 index.
+
+An index directory holds a ``manifest.json`` naming its live segments and
+one ``seg_<id>/`` directory per segment, written once and never modified:
+
+- ``terms.json``: the segment's term dictionary, in local term id order
+- ``offsets.npy``, ``docs.npy``, ``tfs.npy``: CSR postings (see :class:`PostingsSegment`)
+- ``bounds.npy``: largest tf and shortest length of each term's postings
+- ``lengths.npy``: token count of every row
+- ``rows.json`` + ``codes.npy``: chunk ids, doc ids and interned filter values of every row
+- ``stored.jsonl`` + ``spans.npy``: text, metadata and language of every row (one
+  line each, at the given offsets), read on demand
+- ``deletes.<gen>.npy``: rows deleted after the segment was written
+
+Arrays are memory-mapped read-only. Removing rows only writes a new
+``deletes`` generation, and segments are combined by writing a merged
+segment; either way the switch happens by atomically replacing the
+manifest, so readers always see a complete set of segments.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ragkit.retrieval.postings import PostingsSegment
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+_MANIFEST = "manifest.json"
+_LEGACY_FILE = "bm25_index.json"
+_SEGMENT_DIR = re.compile(r"^seg_(\d+)(\.tmp)?$")
+_DELETES_FILE = re.compile(r"^deletes\.(\d+)\.npy$")
+
+
+class SegmentReader:
+    """Read-only, memory-mapped view of one segment."""
+
+    def __init__(self, directory: Path, entry: dict[str, Any]):
+        self.id = int(entry["id"])
+        self.directory = directory
+        self.rows = int(entry["rows"])
+        self.terms: list[str] = json.loads(self._file("terms.json").read_text(encoding="utf-8"))
+        bounds = self._array("bounds.npy")
+        self.postings = PostingsSegment(
+            self._array("offsets.npy"),
+            self._array("docs.npy"),
+            self._array("tfs.npy"),
+            bounds[:, 0],
+            bounds[:, 1],
+        )
+        self.lengths = self._array("lengths.npy")
+        rows = json.loads(self._file("rows.json").read_text(encoding="utf-8"))
+        self.chunk_ids: list[str] = rows["chunk_ids"]
+        self.doc_keys: list[str] = rows["doc_keys"]
+        self.filter_values: dict[str, list[str]] = rows["filter_values"]
+        self.codes = self._array("codes.npy")
+        self._spans = self._array("spans.npy")
+        deletes = entry.get("deletes")
+        self.deleted = (
+            np.load(self._file(f"deletes.{int(deletes)}.npy")) if deletes is not None else np.zeros(self.rows, dtype=bool)
+        )
+        if self.lengths.size != self.rows or len(self.chunk_ids) != self.rows or self.deleted.size != self.rows:
+            raise ValueError(f"Segment {self.id} does not match its manifest entry.")
+        stored = self._file("stored.jsonl")
+        with stored.open("rb") as handle:
+            self._stored = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if stored.stat().st_size else None
+
+    def _file(self, name: str) -> Path:
+        return self.directory / name
+
+    def _array(self, name: str) -> np.ndarray:
+        return np.load(self._file(name), mmap_mode="r")
+
+    def stored_line(self, row: int) -> bytes:
+        # Each line ends with a newline that is not part of the record.
+        start, end = int(self._spans[row]), int(self._spans[row + 1]) - 1
+        return self._stored[start:end] if self._stored is not None else b""
+
+    def document(self, row: int) -> tuple[str, dict[str, Any], str | None]:
+        value = json.loads(self.stored_line(row) or b"{}")
+        metadata = value.get("metadata")
+        language = value.get("language")
+        return (
+            str(value.get("text") or ""),
+            metadata if isinstance(metadata, dict) else {},
+            str(language) if language is not None else None,
+        )
+
+
+class SegmentDirectory:
+    """Reads and writes the manifest and segments of one index directory."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / _MANIFEST
+
+    @property
+    def legacy_path(self) -> Path:
+        return self.directory / _LEGACY_FILE
+
+    def segment_path(self, segment_id: int) -> Path:
+        return self.directory / f"seg_{segment_id:06d}"
+
+    def read_manifest(self) -> dict[str, Any] | None:
+        if not self.manifest_path.exists():
+            return None
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError) as exc:
+            logger.warning("Unreadable BM25 manifest %s: %s", self.manifest_path, exc)
+            return None
+        if not isinstance(manifest, dict) or int(manifest.get("format", 0)) != FORMAT_VERSION:
+            return None
+        return manifest
+
+    def next_segment_id(self, manifest: dict[str, Any] | None, reserved: Iterable[int] = ()) -> int:
+        """An id no segment uses, including ones left behind by an interrupted save or ``reserved`` by a merge."""
+        highest = max((int(entry["id"]) for entry in (manifest or {}).get("segments", [])), default=0)
+        highest = max(highest, *reserved, 0)
+        for entry in self.directory.iterdir():
+            match = _SEGMENT_DIR.match(entry.name)
+            if match:
+                highest = max(highest, int(match.group(1)))
+        return highest + 1
+
+    def open_segment(self, entry: dict[str, Any]) -> SegmentReader:
+        return SegmentReader(self.segment_path(int(entry["id"])), entry)
+
+    def write_segment(
+        self,
+        segment_id: int,
+        *,
+        terms: list[str],
+        postings: PostingsSegment,
+        lengths: np.ndarray,
+        chunk_ids: list[str],
+        doc_keys: list[str],
+        filter_values: dict[str, list[str]],
+        codes: np.ndarray,
+        stored_lines: Iterable[bytes],
+    ) -> None:
+        """Write a complete segment; it only becomes visible once a manifest names it."""
+        final = self.segment_path(segment_id)
+        staging = final.with_name(final.name + ".tmp")
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir(parents=True)
+        (staging / "terms.json").write_text(json.dumps(terms, ensure_ascii=False), encoding="utf-8")
+        np.save(staging / "offsets.npy", np.asarray(postings.offsets, dtype=np.int64))
+        np.save(staging / "docs.npy", np.asarray(postings.docs, dtype=np.uint32))
+        np.save(staging / "tfs.npy", np.asarray(postings.tfs, dtype=np.uint32))
+        np.save(staging / "bounds.npy", np.stack([postings.max_tf, postings.min_len], axis=1).astype(np.uint32))
+        np.save(staging / "lengths.npy", np.asarray(lengths, dtype=np.int32))
+        (staging / "rows.json").write_text(
+            json.dumps(
+                {"chunk_ids": chunk_ids, "doc_keys": doc_keys, "filter_values": filter_values},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        np.save(staging / "codes.npy", np.asarray(codes, dtype=np.int32))
+        spans = np.zeros(len(chunk_ids) + 1, dtype=np.int64)
+        position = 0
+        with (staging / "stored.jsonl").open("wb") as handle:
+            for row, line in enumerate(stored_lines):
+                handle.write(line)
+                handle.write(b"\n")
+                position += len(line) + 1
+                spans[row + 1] = position
+            handle.flush()
+            os.fsync(handle.fileno())
+        np.save(staging / "spans.npy", spans)
+        os.replace(staging, final)
+
+    def write_deletes(self, segment_id: int, generation: int, deleted: np.ndarray) -> None:
+        path = self.segment_path(segment_id) / f"deletes.{generation}.npy"
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as handle:
+            np.save(handle, np.asarray(deleted, dtype=bool))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
+
+    def write_manifest(self, manifest: dict[str, Any]) -> None:
+        tmp = self.directory / f"{_MANIFEST}.tmp"
+        tmp.write_text(json.dumps({**manifest, "format": FORMAT_VERSION}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def remove_unreferenced(self, manifest: dict[str, Any], keep: Iterable[int] = ()) -> None:
+        """Delete segments, deletion generations and legacy files the manifest no longer uses.
+
+        Segments in ``keep`` are being written by a merge and left alone.
+        """
+        live = {int(entry["id"]): entry.get("deletes") for entry in manifest.get("segments", [])}
+        keep = set(keep)
+        if self.legacy_path.exists():
+            self._remove(self.legacy_path)
+        for entry in self.directory.iterdir():
+            match = _SEGMENT_DIR.match(entry.name)
+            if not match:
+                continue
+            segment_id = int(match.group(1))
+            if segment_id in keep:
+                continue
+            if match.group(2) or segment_id not in live:
+                self._remove(entry)
+                continue
+            for child in entry.iterdir():
+                deletes = _DELETES_FILE.match(child.name)
+                if deletes and int(deletes.group(1)) != live[segment_id]:
+                    self._remove(child)
+
+    def size_bytes(self) -> int:
+        if not self.directory.exists():
+            return 0
+        return sum(entry.stat().st_size for entry in self.directory.rglob("*") if entry.is_file())
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        # Files still mapped by another reader cannot be removed on Windows; retried on the next save.
+        try:
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        except OSError:
+            pass
@@ -5,15 +5,26 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import math
+import shutil
 import threading
 import uuid
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
 
-from ragkit.config.vector_store_schema import CollectionStats, ConnectionTestResult, VectorStoreConfig
+import numpy as np
+
+from ragkit.config.retrieval_schema import FILTER_PAYLOAD_KEYS, SearchFilters
+from ragkit.config.vector_store_schema import (
+    CollectionStats,
+    ConnectionTestResult,
+    LocalIndexType,
+    VectorStoreConfig,
+)
 from ragkit.desktop import settings_store
+from ragkit.storage.local_files import LocalCollectionFiles, PayloadRef
+from ragkit.storage.local_ivf import IVFIndex
+from ragkit.storage.local_payload_index import PayloadIndex
 
 logger = logging.getLogger(__name__)
 
@@ -66,67 +77,271 @@ class BaseVectorStore(ABC):
     async def restore_snapshot(self, version: str) -> None: ...
 
     @abstractmethod
-    async def search(self, vector: list[float], top_k: int) -> list[tuple[VectorPoint, float]]: ...
+    async def search(
+        self, vector: list[float], top_k: int, filters: SearchFilters | None = None
+    ) -> list[tuple[VectorPoint, float]]:
+        """Best ``top_k`` points, restricted to points matching ``filters`` before ranking."""
 
     @abstractmethod
     async def all_points(self) -> list[VectorPoint]: ...
 
+    async def points_by_doc_id(self, doc_id: str) -> list[VectorPoint]:
+        """Stored points of ``doc_id``, with their vectors."""
+        return [point for point in await self.all_points() if (point.payload or {}).get("doc_id") == doc_id]
+
 
+_COMPACTION_MIN_RECORDS = 4096
 
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    if len(a) != len(b):
-        raise ValueError(f"Vector dimensions mismatch: {len(a)} != {len(b)}")
-    denom_a = math.sqrt(sum(x * x for x in a))
-    denom_b = math.sqrt(sum(x * x for x in b))
-    if denom_a == 0 or denom_b == 0:
-        return 0.0
-    return max(-1.0, min(1.0, sum(x * y for x, y in zip(a, b)) / (denom_a * denom_b)))
+def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the ``top_k`` best scores, highest first, ties kept in row order."""
+    if top_k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if top_k < scores.size:
+        kth = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(scores.size)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:top_k]
 
 
 class LocalJsonVectorStore(BaseVectorStore):
+    """Embedded store keeping a float32 matrix of unit vectors for brute-force search.
+
+    Row ``i`` of the matrix holds the normalized vector of ``_ids[i]``; rows are
+    kept in insertion order so that ties rank exactly like the original dict scan.
+    The base matrix is memory-mapped from disk and payloads are read on demand;
+    writes go to an append-only log that is folded into a new base generation
+    in the background (see :mod:`ragkit.storage.local_files`). With
+    ``local_index.index_type = "ivf"``, collections of at least ``min_points``
+    rows are searched through an IVF index (see :mod:`ragkit.storage.local_ivf`).
+    Search filters are resolved to a row mask through a payload index (see
+    :mod:`ragkit.storage.local_payload_index`) before any row is scored.
+    """
+
     def __init__(self, config: VectorStoreConfig):
         super().__init__(config)
         self._dimensions = 0
-        self._points: dict[str, VectorPoint] = {}
+        self._files = LocalCollectionFiles(self._store_dir)
+        self._loaded = False
+        self._log_records = 0
+        self._compaction_task: asyncio.Task | None = None
+        index_cfg = config.local_index
+        self._ivf = IVFIndex(nlist=index_cfg.nlist) if index_cfg.index_type == LocalIndexType.IVF else None
+        self._payload_index = PayloadIndex()
+        self._reset_rows()
 
     @property
     def _root(self) -> Path:
         base = Path(self.config.path).expanduser()
         return base if self.config.mode.value == "persistent" else settings_store.get_data_dir() / "memory"
 
+    @property
+    def _persistent(self) -> bool:
+        return self.config.mode.value == "persistent"
+
+    @property
+    def _store_dir(self) -> Path:
+        return self._root / f"{self.config.collection_name}.store"
+
     @property
     def _db_file(self) -> Path:
+        """Legacy single-file JSON collection, migrated on first load."""
         return self._root / f"{self.config.collection_name}.json"
 
+    @property
+    def _matrix(self) -> np.ndarray:
+        return self._vectors[: self._size]
+
+    # ------------------------------------------------------------------ #
+    #  Loading                                                             #
+    # ------------------------------------------------------------------ #
+
+    def _reset_rows(self) -> None:
+        self._ids: list[str] = []
+        self._doc_ids: list[str | None] = []
+        self._payloads: list[dict | PayloadRef] = []
+        self._row_by_id: dict[str, int] = {}
+        self._vectors = np.zeros((0, self._dimensions), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._size = 0
+        self._payload_index.reset()
+        if self._ivf is not None:
+            self._ivf.reset()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
     def _load(self) -> None:
-        if not self._db_file.exists():
+        self._loaded = True
+        if not self._files.exists():
+            if self._db_file.exists():
+                self._migrate_legacy_file()
             return
+        base = self._files.load_base()
+        self._reset_rows()
+        self._dimensions = base.dimensions
+        if base.vectors is not None and base.norms is not None:
+            self._ids = base.ids
+            self._doc_ids = base.doc_ids
+            self._payloads = list(base.payload_refs)
+            self._row_by_id = {point_id: row for row, point_id in enumerate(self._ids)}
+            self._vectors = base.vectors
+            self._norms = base.norms
+            self._size = len(self._ids)
+            if self._ivf is not None and base.ivf is not None:
+                self._ivf.restore(base.ivf, self._size)
+            # Generations written before the payload index existed get it on the first filtered search.
+            if base.payload_index is None or not self._payload_index.restore(base.payload_index, self._size):
+                self._payload_index.invalidate()
+        self._log_records = 0
+        run: list = []
+        for record in self._files.replay_log():
+            self._log_records += 1
+            if run and run[-1].op != record.op:
+                self._replay(run)
+                run = []
+            run.append(record)
+        if run:
+            self._replay(run)
+
+    def _replay(self, records: list) -> None:
+        if records[0].op == "d":
+            self._apply_deletes([record.point_id for record in records])
+            return
+        if not self._dimensions:
+            self._dimensions = int(records[0].vector.size)
+        self._apply_upserts(
+            [record.point_id for record in records],
+            np.stack([record.vector for record in records]),
+            [record.payload for record in records],
+        )
+
+    def _migrate_legacy_file(self) -> None:
         payload = json.loads(self._db_file.read_text(encoding="utf-8"))
+        self._reset_rows()
         self._dimensions = payload.get("dimensions", 0)
-        self._points = {
-            p["id"]: VectorPoint(id=p["id"], vector=p["vector"], payload=p.get("payload", {}))
-            for p in payload.get("points", [])
-        }
-
-    def _save(self) -> None:
-        if self.config.mode.value != "persistent":
+        points = payload.get("points", [])
+        if points:
+            if not self._dimensions:
+                self._dimensions = len(points[0]["vector"])
+            self._apply_upserts(
+                [p["id"] for p in points],
+                np.asarray([p["vector"] for p in points], dtype=np.float32),
+                [p.get("payload", {}) for p in points],
+            )
+        if not self._persistent:
             return
-        self._root.mkdir(parents=True, exist_ok=True)
-        self._db_file.write_text(
-            json.dumps(
-                {
-                    "dimensions": self._dimensions,
-                    "points": [
-                        {"id": p.id, "vector": p.vector, "payload": p.payload}
-                        for p in self._points.values()
-                    ],
-                },
-                ensure_ascii=False,
-                indent=2,
-            ),
-            encoding="utf-8",
-        )
+        self._write_generation(self._snapshot_rows())
+        self._db_file.replace(self._db_file.with_name(self._db_file.name + ".migrated"))
+        logger.info("Migrated %s (%d points) to %s", self._db_file.name, self._size, self._store_dir)
+
+    # ------------------------------------------------------------------ #
+    #  Matrix bookkeeping                                                  #
+    # ------------------------------------------------------------------ #
+
+    def _reserve(self, rows: int) -> None:
+        if self._vectors.shape[1] != self._dimensions and self._size == 0:
+            self._vectors = np.zeros((0, self._dimensions), dtype=np.float32)
+        capacity = self._vectors.shape[0]
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 64)
+        vectors = np.empty((capacity, self._dimensions), dtype=np.float32)
+        vectors[: self._size] = self._vectors[: self._size]
+        norms = np.empty(capacity, dtype=np.float32)
+        norms[: self._size] = self._norms[: self._size]
+        self._vectors, self._norms = vectors, norms
+
+    def _apply_upserts(self, ids: list[str], raw: np.ndarray, payloads: list[dict]) -> None:
+        raw = np.asarray(raw, dtype=np.float32)
+        norms = np.linalg.norm(raw, axis=1)
+        unit = raw / np.where(norms == 0, 1.0, norms)[:, None]
+        # Collapse repeated ids the way dict assignment does: last value, first position.
+        latest: dict[str, int] = {}
+        for index, point_id in enumerate(ids):
+            latest[point_id] = index
+        fresh: list[tuple[str, int]] = []
+        updated_rows: list[int] = []
+        updated_indices: list[int] = []
+        for point_id, index in latest.items():
+            row = self._row_by_id.get(point_id)
+            if row is None:
+                fresh.append((point_id, index))
+                continue
+            self._vectors[row] = unit[index]
+            self._norms[row] = norms[index]
+            self._payloads[row] = payloads[index]
+            self._doc_ids[row] = payloads[index].get("doc_id")
+            updated_rows.append(row)
+            updated_indices.append(index)
+        if self._ivf is not None and updated_rows:
+            self._ivf.assign(np.asarray(updated_rows), unit[updated_indices])
+        self._payload_index.update(updated_rows, [payloads[index] for index in updated_indices])
+        if not fresh:
+            return
+        start = self._size
+        self._reserve(start + len(fresh))
+        indices = [index for _, index in fresh]
+        self._vectors[start : start + len(fresh)] = unit[indices]
+        self._norms[start : start + len(fresh)] = norms[indices]
+        for offset, (point_id, index) in enumerate(fresh):
+            self._row_by_id[point_id] = start + offset
+            self._ids.append(point_id)
+            self._payloads.append(payloads[index])
+            self._doc_ids.append(payloads[index].get("doc_id"))
+        self._size += len(fresh)
+        self._payload_index.append([payloads[index] for index in indices])
+        if self._ivf is not None:
+            self._ivf.assign(np.arange(start, self._size), unit[indices])
+
+    def _apply_deletes(self, point_ids: list[str]) -> list[str]:
+        rows = sorted({self._row_by_id[pid] for pid in point_ids if pid in self._row_by_id})
+        if not rows:
+            return []
+        removed = [self._ids[row] for row in rows]
+        keep = np.ones(self._size, dtype=bool)
+        keep[rows] = False
+        remaining = self._size - len(rows)
+        # Compact in place so surviving rows keep their relative (insertion) order.
+        self._vectors[:remaining] = self._vectors[: self._size][keep]
+        self._norms[:remaining] = self._norms[: self._size][keep]
+        if self._ivf is not None:
+            self._ivf.compact(keep)
+        self._payload_index.compact(keep)
+        first = rows[0]
+        tail = keep[first:]
+        self._ids[first:] = [v for v, kept in zip(self._ids[first:], tail) if kept]
+        self._doc_ids[first:] = [v for v, kept in zip(self._doc_ids[first:], tail) if kept]
+        self._payloads[first:] = [v for v, kept in zip(self._payloads[first:], tail) if kept]
+        self._size = remaining
+        for point_id in removed:
+            self._row_by_id.pop(point_id, None)
+        for row in range(first, remaining):
+            self._row_by_id[self._ids[row]] = row
+        return removed
+
+    def _payload_at(self, row: int) -> dict:
+        payload = self._payloads[row]
+        if isinstance(payload, tuple):
+            payload = self._files.read_payload(payload)
+            self._payloads[row] = payload
+        return payload
+
+    def _filter_mask(self, filters: SearchFilters | None) -> np.ndarray | None:
+        if not self._payload_index.is_built and filters is not None and filters.active():
+            # Payloads not read yet are decoded without being cached on the rows.
+            self._payload_index.build([
+                payload if isinstance(payload, dict) else self._files.read_payload(payload)
+                for payload in self._payloads
+            ])
+        return self._payload_index.mask(filters)
+
+    def _point_at(self, row: int) -> VectorPoint:
+        vector = (self._vectors[row] * self._norms[row]).tolist()
+        return VectorPoint(id=self._ids[row], vector=vector, payload=self._payload_at(row))
 
     def _ensure_vector_dimensions(self, vector: list[float]) -> None:
         if not vector:
@@ -137,10 +352,77 @@ class LocalJsonVectorStore(BaseVectorStore):
         if len(vector) != self._dimensions:
             raise ValueError(f"Vector dimensions mismatch: expected {self._dimensions}, got {len(vector)}")
 
+    # ------------------------------------------------------------------ #
+    #  Compaction                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _snapshot_rows(self) -> dict:
+        return {
+            "generation": self._files.next_generation(),
+            "dimensions": self._dimensions,
+            "ids": list(self._ids),
+            "doc_ids": list(self._doc_ids),
+            "vectors": self._matrix.copy(),
+            "norms": self._norms[: self._size].copy(),
+            "payloads": list(self._payloads),
+            "ivf": self._ivf.state() if self._ivf is not None else None,
+            "payload_index": self._payload_index.state(),
+            "source_generation": self._files.generation,
+            "log_offset": self._files.log_size(),
+        }
+
+    def _write_generation(self, snapshot: dict, written: list[PayloadRef] | None = None) -> None:
+        """Switch to a generation written from *snapshot* and re-point lazy payloads."""
+        if written is None:
+            written = self._files.write_generation(**self._generation_args(snapshot))
+        tail = self._files.read_log_tail(snapshot["log_offset"])
+        self._files.switch_generation(snapshot["generation"], snapshot["dimensions"], len(snapshot["ids"]), tail)
+        self._log_records = tail.count(b"\n")
+        new_refs = dict(zip(snapshot["ids"], written))
+        for row, payload in enumerate(self._payloads):
+            if isinstance(payload, tuple):
+                self._payloads[row] = new_refs[self._ids[row]]
+
+    @staticmethod
+    def _generation_args(snapshot: dict) -> dict:
+        return {key: snapshot[key] for key in (
+            "generation", "ids", "doc_ids", "vectors", "norms", "payloads", "ivf", "payload_index",
+            "source_generation",
+        )}
+
+    async def _compact(self) -> None:
+        snapshot = self._snapshot_rows()
+        written = await asyncio.to_thread(self._files.write_generation, **self._generation_args(snapshot))
+        self._write_generation(snapshot, written)
+
+    def _schedule_compaction(self) -> None:
+        if self._log_records < max(_COMPACTION_MIN_RECORDS, self._size // 2):
+            return
+        if self._compaction_task is not None and not self._compaction_task.done():
+            return
+        self._compaction_task = asyncio.create_task(self._compact())
+
+    async def compact(self) -> None:
+        """Fold the write log into a fresh base generation now."""
+        if self._compaction_task is not None and not self._compaction_task.done():
+            await self._compaction_task
+        self._ensure_loaded()
+        if self._persistent and (self._log_records or not self._files.exists()):
+            await self._compact()
+
+    async def _wait_for_compaction(self) -> None:
+        task, self._compaction_task = self._compaction_task, None
+        if task is not None and not task.done():
+            await task
+
+    # ------------------------------------------------------------------ #
+    #  BaseVectorStore                                                     #
+    # ------------------------------------------------------------------ #
+
     async def initialize(self, dimensions: int) -> None:
         if dimensions < 0:
             raise ValueError("Vector dimensions must be >= 0.")
-        self._load()
+        self._ensure_loaded()
         if self._dimensions:
             if dimensions and self._dimensions != dimensions:
                 raise ValueError(
@@ -155,29 +437,45 @@ class LocalJsonVectorStore(BaseVectorStore):
     async def upsert(self, points: list[VectorPoint]) -> int:
         if not points:
             return 0
+        self._ensure_loaded()
         for point in points:
             self._ensure_vector_dimensions(point.vector)
-            self._points[point.id] = point
-        self._save()
+        ids = [point.id for point in points]
+        raw = np.asarray([point.vector for point in points], dtype=np.float32)
+        payloads = [point.payload for point in points]
+        self._apply_upserts(ids, raw, payloads)
+        if self._persistent:
+            self._files.append_upserts(ids, raw, payloads, self._dimensions)
+            self._log_records += len(ids)
+            self._schedule_compaction()
         return len(points)
 
     async def delete_by_doc_id(self, doc_id: str) -> int:
-        to_delete = [pid for pid, point in self._points.items() if point.payload.get("doc_id") == doc_id]
-        for pid in to_delete:
-            self._points.pop(pid, None)
-        self._save()
-        return len(to_delete)
+        self._ensure_loaded()
+        to_delete = [self._ids[row] for row, value in enumerate(self._doc_ids) if value == doc_id]
+        removed = self._apply_deletes(to_delete)
+        if self._persistent and removed:
+            self._files.append_tombstones(removed, self._dimensions)
+            self._log_records += len(removed)
+            self._schedule_compaction()
+        return len(removed)
 
     async def delete_collection(self) -> None:
-        self._points = {}
+        await self._wait_for_compaction()
+        self._reset_rows()
+        self._log_records = 0
+        self._loaded = True
+        self._files.close()
+        shutil.rmtree(self._store_dir, ignore_errors=True)
         if self._db_file.exists():
             self._db_file.unlink()
 
     async def collection_stats(self) -> CollectionStats:
-        size_bytes = self._db_file.stat().st_size if self._db_file.exists() else 0
+        self._ensure_loaded()
+        size_bytes = self._files.size_bytes()
         return CollectionStats(
             name=self.config.collection_name,
-            vectors_count=len(self._points),
+            vectors_count=self._size,
             dimensions=self._dimensions,
             size_bytes=size_bytes,
             status="ready",
@@ -193,41 +491,78 @@ class LocalJsonVectorStore(BaseVectorStore):
     async def create_snapshot(self, version: str) -> str:
         snap_root = settings_store.get_data_dir() / "snapshots" / version
         snap_root.mkdir(parents=True, exist_ok=True)
-        if self._db_file.exists():
-            target = snap_root / self._db_file.name
-            target.write_bytes(self._db_file.read_bytes())
+        await self.compact()
+        if self._files.exists():
+            target = snap_root / self._store_dir.name
+            self._files.copy_generation(target)
             return str(target)
         return str(snap_root)
 
     async def restore_snapshot(self, version: str) -> None:
-        snap_file = settings_store.get_data_dir() / "snapshots" / version / self._db_file.name
-        if not snap_file.exists():
+        snap_root = settings_store.get_data_dir() / "snapshots" / version
+        snap_dir = snap_root / self._store_dir.name
+        legacy_file = snap_root / self._db_file.name
+        if not snap_dir.exists() and not legacy_file.exists():
             raise FileNotFoundError(f"Snapshot {version} not found")
+        await self.delete_collection()
         self._root.mkdir(parents=True, exist_ok=True)
-        self._db_file.write_bytes(snap_file.read_bytes())
+        if snap_dir.exists():
+            shutil.copytree(snap_dir, self._store_dir)
+        else:
+            self._db_file.write_bytes(legacy_file.read_bytes())
+        self._loaded = False
         self._load()
 
-    async def search(self, vector: list[float], top_k: int) -> list[tuple[VectorPoint, float]]:
-        if not self._points:
-            self._load()
+    async def search(
+        self, vector: list[float], top_k: int, filters: SearchFilters | None = None
+    ) -> list[tuple[VectorPoint, float]]:
+        self._ensure_loaded()
         if not vector:
             raise ValueError("Query vector must not be empty.")
-        if self._dimensions == 0 and self._points:
-            first_point = next(iter(self._points.values()))
-            self._dimensions = len(first_point.vector)
         if self._dimensions and len(vector) != self._dimensions:
             raise ValueError(
                 f"Query vector dimensions mismatch: expected {self._dimensions}, got {len(vector)}. "
                 "Verify document/query embedding models and dimensions."
             )
-        scored = [(point, _cosine_similarity(vector, point.vector)) for point in self._points.values()]
-        scored.sort(key=lambda item: item[1], reverse=True)
-        return scored[:top_k]
+        if not self._size:
+            return []
+        mask = self._filter_mask(filters)
+        allowed = np.flatnonzero(mask) if mask is not None else None
+        if allowed is not None and not allowed.size:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            rows = allowed if allowed is not None else np.arange(self._size)
+            return [(self._point_at(int(rows[i])), 0.0) for i in _top_k_indices(np.zeros(rows.size), top_k)]
+        query = query / norm
+        index_cfg = self.config.local_index
+        if self._ivf is not None and self._size >= max(index_cfg.min_points, 1):
+            if self._ivf.needs_training(self._size):
+                self._ivf.train(self._matrix)
+            rows = self._ivf.candidates(query, index_cfg.nprobe)
+            if mask is not None:
+                rows = rows[mask[rows]]
+            eligible = self._size if allowed is None else allowed.size
+            if rows.size >= min(top_k, eligible):
+                return self._ranked(rows, query, top_k)
+        if allowed is not None:
+            return self._ranked(allowed, query, top_k)
+        scores = np.clip(self._matrix @ query, -1.0, 1.0)
+        return [(self._point_at(row), float(scores[row])) for row in _top_k_indices(scores, top_k)]
+
+    def _ranked(self, rows: np.ndarray, query: np.ndarray, top_k: int) -> list[tuple[VectorPoint, float]]:
+        """Best ``top_k`` of the given rows (ascending), ties kept in row order."""
+        scores = np.clip(self._matrix[rows] @ query, -1.0, 1.0)
+        return [(self._point_at(int(rows[i])), float(scores[i])) for i in _top_k_indices(scores, top_k)]
 
     async def all_points(self) -> list[VectorPoint]:
-        if not self._points:
-            self._load()
-        return list(self._points.values())
+        self._ensure_loaded()
+        return [self._point_at(row) for row in range(self._size)]
+
+    async def points_by_doc_id(self, doc_id: str) -> list[VectorPoint]:
+        self._ensure_loaded()
+        return [self._point_at(row) for row, value in enumerate(self._doc_ids) if value == doc_id]
 
 
 def _directory_size(path: Path) -> int:
@@ -509,7 +844,23 @@ class QdrantVectorStore(BaseVectorStore):
         await self.initialize(init_dimensions)
         await self.upsert(points)
 
-    def _sync_search(self, vector: list[float], top_k: int) -> list[tuple[VectorPoint, float]]:
+    @staticmethod
+    def _search_filter(filters: SearchFilters | None):
+        """Qdrant filter requiring, per active field, one of its payload keys to hold an accepted value."""
+        from qdrant_client.models import FieldCondition, Filter, MatchAny
+
+        wanted = filters.active() if filters is not None else {}
+        if not wanted:
+            return None
+        must = []
+        for name, values in wanted.items():
+            conditions = [FieldCondition(key=key, match=MatchAny(any=values)) for key in FILTER_PAYLOAD_KEYS[name]]
+            must.append(conditions[0] if len(conditions) == 1 else Filter(should=conditions))
+        return Filter(must=must)
+
+    def _sync_search(
+        self, vector: list[float], top_k: int, filters: SearchFilters | None = None
+    ) -> list[tuple[VectorPoint, float]]:
         client = self._ensure_client()
         if not client.collection_exists(self.config.collection_name):
             return []
@@ -518,6 +869,7 @@ class QdrantVectorStore(BaseVectorStore):
             response = client.query_points(
                 collection_name=self.config.collection_name,
                 query=[float(value) for value in vector],
+                query_filter=self._search_filter(filters),
                 limit=top_k,
                 with_payload=True,
                 with_vectors=True,
@@ -539,7 +891,9 @@ class QdrantVectorStore(BaseVectorStore):
             hits.append((VectorPoint(id=point_id, vector=point_vector, payload=payload), score))
         return hits
 
-    async def search(self, vector: list[float], top_k: int) -> list[tuple[VectorPoint, float]]:
+    async def search(
+        self, vector: list[float], top_k: int, filters: SearchFilters | None = None
+    ) -> list[tuple[VectorPoint, float]]:
         if not vector:
             raise ValueError("Query vector must not be empty.")
         if self._dimensions and len(vector) != self._dimensions:
@@ -547,10 +901,10 @@ class QdrantVectorStore(BaseVectorStore):
                 f"Query vector dimensions mismatch: expected {self._dimensions}, got {len(vector)}. "
                 "Verify document/query embedding models and dimensions."
             )
-        return await asyncio.to_thread(self._sync_search, vector, top_k)
+        return await asyncio.to_thread(self._sync_search, vector, top_k, filters)
 
-    def _sync_all_points(self) -> list[VectorPoint]:
-        points = self._scroll(with_vectors=True)
+    def _sync_all_points(self, query_filter=None) -> list[VectorPoint]:
+        points = self._scroll(query_filter=query_filter, with_vectors=True)
         result: list[VectorPoint] = []
         for point in points:
             payload = dict(point.payload or {})
@@ -564,6 +918,12 @@ class QdrantVectorStore(BaseVectorStore):
     async def all_points(self) -> list[VectorPoint]:
         return await asyncio.to_thread(self._sync_all_points)
 
+    async def points_by_doc_id(self, doc_id: str) -> list[VectorPoint]:
+        from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+        query_filter = Filter(must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))])
+        return await asyncio.to_thread(self._sync_all_points, query_filter)
+
 
 class ChromaVectorStore(BaseVectorStore):
     def __init__(self, config: VectorStoreConfig):
@@ -653,8 +1013,11 @@ class ChromaVectorStore(BaseVectorStore):
         for field in (
             "doc_id",
             "doc_type",
+            "file_type",
             "doc_language",
+            "language",
             "category",
+            "source_id",
             "doc_path",
             "doc_title",
             "filename",
@@ -803,7 +1166,21 @@ class ChromaVectorStore(BaseVectorStore):
         await self.initialize(init_dimensions)
         await self.upsert(points)
 
-    async def search(self, vector: list[float], top_k: int) -> list[tuple[VectorPoint, float]]:
+    @staticmethod
+    def _search_where(filters: SearchFilters | None) -> dict | None:
+        """Chroma ``where`` clause requiring, per active field, one of its metadata keys to hold an accepted value."""
+        wanted = filters.active() if filters is not None else {}
+        clauses: list[dict] = []
+        for name, values in wanted.items():
+            options = [{key: {"$in": values}} for key in FILTER_PAYLOAD_KEYS[name]]
+            clauses.append(options[0] if len(options) == 1 else {"$or": options})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    async def search(
+        self, vector: list[float], top_k: int, filters: SearchFilters | None = None
+    ) -> list[tuple[VectorPoint, float]]:
         if not vector:
             raise ValueError("Query vector must not be empty.")
         if self._dimensions and len(vector) != self._dimensions:
@@ -819,6 +1196,7 @@ class ChromaVectorStore(BaseVectorStore):
         result = collection.query(
             query_embeddings=[[float(value) for value in vector]],
             n_results=top_k,
+            where=self._search_where(filters),
             include=["metadatas", "documents", "distances", "embeddings"],
         )
         ids = result.get("ids", [[]])[0]
@@ -849,8 +1227,13 @@ class ChromaVectorStore(BaseVectorStore):
         return hits[:top_k]
 
     async def all_points(self) -> list[VectorPoint]:
+        return self._points(self._ensure_collection().get(include=["metadatas", "documents", "embeddings"]))
+
+    async def points_by_doc_id(self, doc_id: str) -> list[VectorPoint]:
         collection = self._ensure_collection()
-        result = collection.get(include=["metadatas", "documents", "embeddings"])
+        return self._points(collection.get(where={"doc_id": doc_id}, include=["metadatas", "documents", "embeddings"]))
+
+    def _points(self, result: dict) -> list[VectorPoint]:
         ids = result.get("ids", [])
         metadatas = result.get("metadatas", [])
         documents = result.get("documents", [])
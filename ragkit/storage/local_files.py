@@ -0,0 +1,334 @@
+"""On-disk layout for the embedded local vector store.
+
+A collection lives in ``<root>/<collection>.store/`` and is made of one
+immutable base generation plus an append-only write log:
+
+- ``manifest.json``: current generation, dimensions and row count
+- ``vectors.<gen>.npy``: float32 matrix of L2-normalized rows, memory-mapped on load
+- ``norms.<gen>.npy``: original L2 norm of every row
+- ``ids.<gen>.json``: point ids and their ``doc_id`` in row order
+- ``payloads.<gen>.jsonl`` + ``offsets.<gen>.npy``: one payload per line, read lazily
+- ``ivf.<gen>.npz``: trained IVF centroids and row assignments, when enabled
+- ``filters.<gen>.npz``: payload index columns (see :mod:`ragkit.storage.local_payload_index`)
+- ``wal.<gen>.log``: upserts and tombstones written since the base was built
+
+Generations are never rewritten in place: compaction writes ``<gen + 1>``
+files next to the current ones and switches over by atomically replacing
+the manifest, which keeps memory-mapped files untouched (Windows cannot
+replace a mapped file). Every file of a generation, and the manifest, is
+fsynced before the switch, so a crash never leaves the manifest pointing at
+truncated files once the previous generation is removed.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+_MANIFEST = "manifest.json"
+_GENERATION_FILE = re.compile(r"^(vectors|norms|ids|payloads|offsets|ivf|filters|wal)\.(\d+)\.(npy|npz|json|jsonl|log)$")
+
+PayloadRef = tuple[int, int]
+"""``(offset, length)`` of a payload line inside the base ``payloads`` file."""
+
+
+@dataclass
+class BaseGeneration:
+    """Rows of the immutable base generation, as loaded from disk."""
+
+    generation: int = 0
+    dimensions: int = 0
+    ids: list[str] = field(default_factory=list)
+    doc_ids: list[str | None] = field(default_factory=list)
+    vectors: np.ndarray | None = None
+    norms: np.ndarray | None = None
+    payload_refs: list[PayloadRef] = field(default_factory=list)
+    ivf: dict[str, np.ndarray] | None = None
+    payload_index: dict[str, np.ndarray] | None = None
+
+
+@dataclass
+class LogRecord:
+    op: str
+    point_id: str
+    vector: np.ndarray | None = None
+    payload: dict | None = None
+
+
+class LocalCollectionFiles:
+    """Reads and writes one collection directory."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.generation = 0
+        self._payload_handle = None
+
+    # ------------------------------------------------------------------ #
+    #  Paths                                                               #
+    # ------------------------------------------------------------------ #
+
+    def _path(self, kind: str, generation: int, suffix: str) -> Path:
+        return self.directory / f"{kind}.{generation}.{suffix}"
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / _MANIFEST
+
+    @property
+    def wal_path(self) -> Path:
+        return self._path("wal", self.generation, "log")
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def next_generation(self) -> int:
+        """A generation number no file on disk uses yet, even an abandoned compaction's."""
+        highest = self.generation
+        if self.directory.exists():
+            for entry in self.directory.iterdir():
+                match = _GENERATION_FILE.match(entry.name)
+                if match:
+                    highest = max(highest, int(match.group(2)))
+        return highest + 1
+
+    # ------------------------------------------------------------------ #
+    #  Reading                                                             #
+    # ------------------------------------------------------------------ #
+
+    def read_manifest(self) -> dict[str, Any]:
+        return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+
+    def load_base(self) -> BaseGeneration:
+        manifest = self.read_manifest()
+        generation = int(manifest.get("generation", 0))
+        dimensions = int(manifest.get("dimensions", 0))
+        self.generation = generation
+        self.close()
+        base = BaseGeneration(generation=generation, dimensions=dimensions)
+        if int(manifest.get("count", 0)) > 0:
+            index = json.loads(self._path("ids", generation, "json").read_text(encoding="utf-8"))
+            base.ids = [str(value) for value in index.get("ids", [])]
+            base.doc_ids = list(index.get("doc_ids", [None] * len(base.ids)))
+            # Copy-on-write mapping: pages are read on demand and local edits never reach the file.
+            base.vectors = np.load(self._path("vectors", generation, "npy"), mmap_mode="c")
+            base.norms = np.load(self._path("norms", generation, "npy"))
+            offsets = np.load(self._path("offsets", generation, "npy"))
+            # Each line ends with a newline that is not part of the payload.
+            base.payload_refs = [
+                (int(start), int(end - start - 1)) for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+            self._payload_handle = open(self._path("payloads", generation, "jsonl"), "rb")
+            ivf_path = self._path("ivf", generation, "npz")
+            if ivf_path.exists():
+                with np.load(ivf_path) as data:
+                    base.ivf = {key: data[key] for key in data.files}
+            filters_path = self._path("filters", generation, "npz")
+            if filters_path.exists():
+                with np.load(filters_path) as data:
+                    base.payload_index = {key: data[key] for key in data.files}
+        self._remove_stale_generations(generation)
+        return base
+
+    def read_payload(self, ref: PayloadRef) -> dict:
+        if self._payload_handle is None:
+            self._payload_handle = open(self._path("payloads", self.generation, "jsonl"), "rb")
+        offset, length = ref
+        self._payload_handle.seek(offset)
+        value = json.loads(self._payload_handle.read(length))
+        return value if isinstance(value, dict) else {}
+
+    def replay_log(self) -> Iterator[LogRecord]:
+        if not self.wal_path.exists():
+            return
+        with self.wal_path.open("rb") as handle:
+            for line in handle:
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn trailing record from an interrupted write: everything before it is valid.
+                    logger.warning("Ignoring truncated record in %s", self.wal_path)
+                    break
+                if raw.get("op") == "u":
+                    vector = np.frombuffer(base64.b64decode(raw["vector"]), dtype=np.float32)
+                    yield LogRecord(op="u", point_id=str(raw["id"]), vector=vector, payload=raw.get("payload") or {})
+                elif raw.get("op") == "d":
+                    yield LogRecord(op="d", point_id=str(raw["id"]))
+
+    def log_size(self) -> int:
+        return self.wal_path.stat().st_size if self.wal_path.exists() else 0
+
+    # ------------------------------------------------------------------ #
+    #  Writing                                                             #
+    # ------------------------------------------------------------------ #
+
+    def append_upserts(self, ids: list[str], vectors: np.ndarray, payloads: list[dict], dimensions: int) -> None:
+        lines = [
+            json.dumps(
+                {
+                    "op": "u",
+                    "id": point_id,
+                    "vector": base64.b64encode(np.ascontiguousarray(vector, dtype=np.float32).tobytes()).decode("ascii"),
+                    "payload": payload,
+                },
+                ensure_ascii=False,
+            )
+            for point_id, vector, payload in zip(ids, vectors, payloads)
+        ]
+        self._append_lines(lines, dimensions)
+
+    def append_tombstones(self, ids: list[str], dimensions: int) -> None:
+        self._append_lines([json.dumps({"op": "d", "id": point_id}) for point_id in ids], dimensions)
+
+    def _append_lines(self, lines: list[str], dimensions: int) -> None:
+        if not lines:
+            return
+        if not self.exists():
+            # The log only counts once a manifest names its generation.
+            self.switch_generation(self.next_generation(), dimensions, 0)
+        with self.wal_path.open("ab") as handle:
+            handle.write(("\n".join(lines) + "\n").encode("utf-8"))
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def write_generation(
+        self,
+        generation: int,
+        ids: list[str],
+        doc_ids: list[str | None],
+        vectors: np.ndarray,
+        norms: np.ndarray,
+        payloads: list[dict | PayloadRef],
+        source_generation: int,
+        ivf: dict[str, np.ndarray] | None = None,
+        payload_index: dict[str, np.ndarray] | None = None,
+    ) -> list[PayloadRef]:
+        """Write a complete base generation; the manifest is switched separately.
+
+        Payloads still held as references into *source_generation* are copied
+        byte for byte instead of being decoded and re-encoded. Safe to call
+        from a worker thread: it only touches files of *generation*.
+        """
+        self._ensure_directory()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        _write_synced(self._path("vectors", generation, "npy"), lambda handle: np.save(handle, vectors))
+        norms = np.asarray(norms, dtype=np.float32)
+        _write_synced(self._path("norms", generation, "npy"), lambda handle: np.save(handle, norms))
+        ids_json = json.dumps({"ids": ids, "doc_ids": doc_ids}, ensure_ascii=False).encode("utf-8")
+        _write_synced(self._path("ids", generation, "json"), lambda handle: handle.write(ids_json))
+        offsets = np.zeros(len(payloads) + 1, dtype=np.int64)
+        refs: list[PayloadRef] = []
+        position = 0
+        source_path = self._path("payloads", source_generation, "jsonl")
+        source = source_path.open("rb") if any(isinstance(p, tuple) for p in payloads) else None
+        try:
+            with self._path("payloads", generation, "jsonl").open("wb") as handle:
+                for row, payload in enumerate(payloads):
+                    if isinstance(payload, tuple):
+                        source.seek(payload[0])
+                        line = source.read(payload[1])
+                    else:
+                        line = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                    handle.write(line)
+                    handle.write(b"\n")
+                    refs.append((position, len(line)))
+                    position += len(line) + 1
+                    offsets[row + 1] = position
+                handle.flush()
+                os.fsync(handle.fileno())
+        finally:
+            if source is not None:
+                source.close()
+        _write_synced(self._path("offsets", generation, "npy"), lambda handle: np.save(handle, offsets))
+        if ivf is not None:
+            _write_synced(self._path("ivf", generation, "npz"), lambda handle: np.savez(handle, **ivf))
+        if payload_index is not None:
+            _write_synced(self._path("filters", generation, "npz"), lambda handle: np.savez(handle, **payload_index))
+        return refs
+
+    def switch_generation(self, generation: int, dimensions: int, count: int, log_tail: bytes = b"") -> None:
+        """Point the manifest at *generation*, carrying over log records written meanwhile."""
+        self._ensure_directory()
+        _write_synced(self._path("wal", generation, "log"), lambda handle: handle.write(log_tail))
+        tmp_manifest = self.directory / f"{_MANIFEST}.tmp"
+        manifest = json.dumps(
+            {"format": FORMAT_VERSION, "generation": generation, "dimensions": dimensions, "count": count}
+        ).encode("utf-8")
+        _write_synced(tmp_manifest, lambda handle: handle.write(manifest))
+        os.replace(tmp_manifest, self.manifest_path)
+        previous = self.generation
+        self.generation = generation
+        self.close()
+        self._remove_stale_generations(generation, exclude=previous)
+
+    def read_log_tail(self, offset: int) -> bytes:
+        if not self.wal_path.exists():
+            return b""
+        with self.wal_path.open("rb") as handle:
+            handle.seek(offset)
+            return handle.read()
+
+    def copy_generation(self, target: Path) -> None:
+        """Copy the manifest and current generation files into *target*."""
+        if target.exists():
+            shutil.rmtree(target)
+        target.mkdir(parents=True)
+        for entry in self.directory.iterdir():
+            match = _GENERATION_FILE.match(entry.name)
+            if entry.name == _MANIFEST or (match and int(match.group(2)) == self.generation):
+                shutil.copy2(entry, target / entry.name)
+
+    # ------------------------------------------------------------------ #
+    #  Housekeeping                                                        #
+    # ------------------------------------------------------------------ #
+
+    def close(self) -> None:
+        if self._payload_handle is not None:
+            try:
+                self._payload_handle.close()
+            finally:
+                self._payload_handle = None
+
+    def size_bytes(self) -> int:
+        if not self.directory.exists():
+            return 0
+        return sum(entry.stat().st_size for entry in self.directory.iterdir() if entry.is_file())
+
+    def _ensure_directory(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _remove_stale_generations(self, current: int, exclude: int | None = None) -> None:
+        # Only older generations are removed: a newer one may be mid-compaction.
+        if not self.directory.exists():
+            return
+        for entry in self.directory.iterdir():
+            match = _GENERATION_FILE.match(entry.name)
+            if not match:
+                continue
+            generation = int(match.group(2))
+            if generation >= current or generation == exclude:
+                continue
+            try:
+                entry.unlink()
+            except OSError:
+                # Still mapped by another store instance (Windows); retried on the next load.
+                pass
+
+
+def _write_synced(path: Path, write: Callable[[BinaryIO], Any]) -> None:
+    """Write *path* through ``write`` and fsync it before returning."""
+    with path.open("wb") as handle:
+        write(handle)
+        handle.flush()
+        os.fsync(handle.fileno())
@@ -0,0 +1,144 @@
+"""Inverted-file (IVF-Flat) index for the embedded local vector store.
+
+Rows are bucketed by their nearest centroid (spherical k-means on unit
+vectors); a query only scores the rows of its ``nprobe`` closest buckets.
+The index stores one bucket id per store row, so it follows the row
+order of the store matrix and is compacted with it on delete.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+_ASSIGN_CHUNK = 65536
+_UNASSIGNED = -1
+
+
+class IVFIndex:
+    """Coarse quantizer over a matrix of L2-normalized rows."""
+
+    def __init__(self, nlist: int = 0, seed: int = 0):
+        self.nlist = nlist
+        self.seed = seed
+        self.centroids: np.ndarray | None = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.trained_size = 0
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def needs_training(self, size: int) -> bool:
+        # Centroids drift as the corpus grows; retrain once it has quadrupled.
+        return not self.is_trained or size > 4 * self.trained_size
+
+    def _list_count(self, size: int) -> int:
+        if self.nlist > 0:
+            return min(self.nlist, size)
+        return max(1, min(4096, int(round(math.sqrt(size)))))
+
+    # ------------------------------------------------------------------ #
+    #  Training and assignment                                             #
+    # ------------------------------------------------------------------ #
+
+    def train(self, matrix: np.ndarray, iterations: int = 10) -> None:
+        size = matrix.shape[0]
+        if size == 0:
+            return
+        nlist = self._list_count(size)
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(size, max(nlist * 64, 20000))
+        sample = np.asarray(matrix[np.sort(rng.choice(size, sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = self._nearest(sample, centroids)
+            order = np.argsort(labels, kind="stable")
+            counts = np.bincount(labels, minlength=nlist)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            non_empty = counts > 0
+            sums = np.add.reduceat(sample[order], starts[non_empty], axis=0)
+            centroids[non_empty] = sums
+            empty = np.flatnonzero(~non_empty)
+            if empty.size:
+                centroids[empty] = sample[rng.choice(sample_size, empty.size, replace=False)]
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.where(norms == 0, 1.0, norms)
+        self.centroids = centroids
+        self.trained_size = size
+        self.assignments = self._nearest(matrix, centroids)
+
+    @staticmethod
+    def _nearest(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        labels = np.empty(matrix.shape[0], dtype=np.int32)
+        for start in range(0, matrix.shape[0], _ASSIGN_CHUNK):
+            block = np.asarray(matrix[start : start + _ASSIGN_CHUNK], dtype=np.float32)
+            labels[start : start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+        return labels
+
+    def resize(self, size: int) -> None:
+        if size > self.assignments.size:
+            extra = np.full(size - self.assignments.size, _UNASSIGNED, dtype=np.int32)
+            self.assignments = np.concatenate([self.assignments, extra])
+        elif size < self.assignments.size:
+            self.assignments = self.assignments[:size]
+
+    def assign(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """Record the bucket of updated or appended ``rows`` (called as upserts land)."""
+        if rows.size == 0:
+            return
+        self.resize(max(self.assignments.size, int(rows.max()) + 1))
+        if self.centroids is None:
+            self.assignments[rows] = _UNASSIGNED
+            return
+        self.assignments[rows] = self._nearest(vectors, self.centroids)
+
+    def compact(self, keep: np.ndarray) -> None:
+        self.assignments = self.assignments[: keep.size][keep]
+
+    def reset(self) -> None:
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.trained_size = 0
+
+    # ------------------------------------------------------------------ #
+    #  Search                                                              #
+    # ------------------------------------------------------------------ #
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Rows in the ``nprobe`` buckets closest to ``query``, in row order."""
+        if self.centroids is None:
+            return np.arange(self.assignments.size)
+        nlist = self.centroids.shape[0]
+        nprobe = min(max(1, nprobe), nlist)
+        similarity = self.centroids @ query
+        probes = np.argpartition(-similarity, nprobe - 1)[:nprobe] if nprobe < nlist else np.arange(nlist)
+        # Last slot stands for unassigned rows, which are always scanned.
+        selected = np.zeros(nlist + 1, dtype=bool)
+        selected[probes] = True
+        selected[nlist] = True
+        lookup = np.where(self.assignments == _UNASSIGNED, nlist, self.assignments)
+        return np.flatnonzero(selected[lookup])
+
+    # ------------------------------------------------------------------ #
+    #  Persistence                                                         #
+    # ------------------------------------------------------------------ #
+
+    def state(self) -> dict[str, np.ndarray] | None:
+        if self.centroids is None:
+            return None
+        return {
+            "centroids": self.centroids.copy(),
+            "assignments": self.assignments.copy(),
+            "trained_size": np.asarray(self.trained_size, dtype=np.int64),
+        }
+
+    def restore(self, state: dict[str, np.ndarray], size: int) -> bool:
+        assignments = np.asarray(state["assignments"], dtype=np.int32)
+        if assignments.size != size:
+            return False
+        self.centroids = np.asarray(state["centroids"], dtype=np.float32)
+        self.assignments = assignments.copy()
+        self.trained_size = int(state["trained_size"])
+        return True
@@ -0,0 +1,117 @@
+"""Payload index for the embedded local vector store.
+
+Every filterable payload field (see ``FILTER_PAYLOAD_KEYS``) is kept as a
+column of integer codes, one per store row, plus the vocabulary mapping
+each distinct value to its code. A filter turns into a boolean row mask
+with one ``np.isin`` per field, so search only scores matching rows. Like
+the IVF assignments, the columns follow the row order of the store matrix
+and are compacted with it on delete.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from ragkit.config.retrieval_schema import FILTER_PAYLOAD_KEYS, SearchFilters, payload_value
+
+_NO_VALUE = -1
+
+
+class PayloadIndex:
+    """Interned filter values of every row, in store row order."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.values: dict[str, dict[str, int]] = {name: {} for name in FILTER_PAYLOAD_KEYS}
+        self.codes = {name: np.zeros(0, dtype=np.int32) for name in FILTER_PAYLOAD_KEYS}
+        self.is_built = True
+
+    def invalidate(self) -> None:
+        """Forget the columns; they are rebuilt from the payloads on the next filtered search."""
+        self.reset()
+        self.is_built = False
+
+    @property
+    def size(self) -> int:
+        return next(iter(self.codes.values())).size
+
+    # ------------------------------------------------------------------ #
+    #  Maintenance                                                         #
+    # ------------------------------------------------------------------ #
+
+    def _encode(self, name: str, payloads: list[dict]) -> np.ndarray:
+        keys = FILTER_PAYLOAD_KEYS[name]
+        vocabulary = self.values[name]
+        codes = np.empty(len(payloads), dtype=np.int32)
+        for position, payload in enumerate(payloads):
+            value = payload_value(payload, keys)
+            codes[position] = _NO_VALUE if value is None else vocabulary.setdefault(value, len(vocabulary))
+        return codes
+
+    def build(self, payloads: list[dict]) -> None:
+        self.reset()
+        self.append(payloads)
+
+    def append(self, payloads: list[dict]) -> None:
+        if not self.is_built or not payloads:
+            return
+        for name in self.codes:
+            self.codes[name] = np.concatenate([self.codes[name], self._encode(name, payloads)])
+
+    def update(self, rows: list[int], payloads: list[dict]) -> None:
+        """Record the new payloads of existing ``rows``."""
+        if not self.is_built or not rows:
+            return
+        for name in self.codes:
+            self.codes[name][rows] = self._encode(name, payloads)
+
+    def compact(self, keep: np.ndarray) -> None:
+        if not self.is_built:
+            return
+        for name in self.codes:
+            self.codes[name] = self.codes[name][: keep.size][keep]
+
+    # ------------------------------------------------------------------ #
+    #  Search                                                              #
+    # ------------------------------------------------------------------ #
+
+    def mask(self, filters: SearchFilters | None) -> np.ndarray | None:
+        """Rows passing ``filters``, or ``None`` when nothing is filtered."""
+        wanted = filters.active() if filters is not None else {}
+        if not wanted:
+            return None
+        mask = np.ones(self.size, dtype=bool)
+        for name, accepted in wanted.items():
+            vocabulary = self.values[name]
+            codes = [vocabulary[value] for value in accepted if value in vocabulary]
+            mask &= np.isin(self.codes[name], codes)
+        return mask
+
+    # ------------------------------------------------------------------ #
+    #  Persistence                                                         #
+    # ------------------------------------------------------------------ #
+
+    def state(self) -> dict[str, np.ndarray] | None:
+        if not self.is_built:
+            return None
+        state: dict[str, np.ndarray] = {}
+        for name, vocabulary in self.values.items():
+            state[f"{name}.codes"] = self.codes[name].copy()
+            state[f"{name}.values"] = np.asarray(list(vocabulary), dtype=np.str_)
+        return state
+
+    def restore(self, state: dict[str, np.ndarray], size: int) -> bool:
+        if any(f"{name}.codes" not in state for name in FILTER_PAYLOAD_KEYS):
+            return False
+        codes = {name: np.asarray(state[f"{name}.codes"], dtype=np.int32) for name in FILTER_PAYLOAD_KEYS}
+        if any(column.size != size for column in codes.values()):
+            return False
+        self.codes = {name: column.copy() for name, column in codes.items()}
+        self.values = {
+            name: {str(value): code for code, value in enumerate(state[f"{name}.values"].tolist())}
+            for name in FILTER_PAYLOAD_KEYS
+        }
+        self.is_built = True
+        return True
@@ -0,0 +1,162 @@
+"""Write batching in front of a vector store."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from typing import Awaitable, Callable
+
+from ragkit.config.retrieval_schema import SearchFilters
+from ragkit.config.vector_store_schema import CollectionStats, ConnectionTestResult
+from ragkit.storage.base import BaseVectorStore, VectorPoint
+
+FlushHook = Callable[[], Awaitable[None] | None]
+
+
+class BufferedVectorStore(BaseVectorStore):
+    """Buffer upserts and deletes and forward them to ``inner`` in batches.
+
+    Deletes are keyed by ``doc_id``: buffering a delete drops the pending points
+    of that document, and a flush runs all deletes before one batched upsert,
+    which leaves the store exactly as if every call had been applied in order.
+
+    A flush happens when ``max_points`` points are pending, when the oldest
+    pending write is ``max_delay_seconds`` old (checked on each write), on
+    reads, and on explicit :meth:`flush`. ``on_flush`` runs after every
+    successful flush so callers can commit bookkeeping (e.g. the ingestion
+    registry) only once the vectors it describes are durable.
+    """
+
+    def __init__(
+        self,
+        inner: BaseVectorStore,
+        *,
+        max_points: int = 2048,
+        max_delay_seconds: float = 5.0,
+        on_flush: FlushHook | None = None,
+    ):
+        super().__init__(inner.config)
+        self.inner = inner
+        self.max_points = max(1, max_points)
+        self.max_delay_seconds = max_delay_seconds
+        self.on_flush = on_flush
+        self.flush_count = 0
+        self._pending_points: dict[str, VectorPoint] = {}
+        self._pending_deletes: dict[str, None] = {}
+        self._oldest_pending: float | None = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def pending_points(self) -> int:
+        return len(self._pending_points)
+
+    def _mark_pending(self) -> None:
+        if self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+
+    def _flush_due(self) -> bool:
+        if len(self._pending_points) >= self.max_points:
+            return True
+        return self._oldest_pending is not None and time.monotonic() - self._oldest_pending >= self.max_delay_seconds
+
+    def _drop_pending_doc(self, points: dict[str, VectorPoint], doc_id: str) -> int:
+        stale = [pid for pid, point in points.items() if (point.payload or {}).get("doc_id") == doc_id]
+        for pid in stale:
+            del points[pid]
+        return len(stale)
+
+    def _clear(self) -> None:
+        self._pending_points = {}
+        self._pending_deletes = {}
+        self._oldest_pending = None
+
+    async def flush(self) -> int:
+        """Send pending deletes and points to the inner store; returns points written."""
+        async with self._flush_lock:
+            deletes, points = list(self._pending_deletes), self._pending_points
+            self._clear()
+            try:
+                for doc_id in deletes:
+                    await self.inner.delete_by_doc_id(doc_id)
+                if points:
+                    await self.inner.upsert(list(points.values()))
+            except Exception:
+                self._restore(deletes, points)
+                raise
+            self.flush_count += 1
+            if self.on_flush is not None:
+                result = self.on_flush()
+                if inspect.isawaitable(result):
+                    await result
+            return len(points)
+
+    def _restore(self, deletes: list[str], points: dict[str, VectorPoint]) -> None:
+        # Writes buffered while the failed flush was running are newer: replay them on top.
+        newer_deletes, newer_points = self._pending_deletes, self._pending_points
+        for doc_id in newer_deletes:
+            self._drop_pending_doc(points, doc_id)
+        points.update(newer_points)
+        self._pending_deletes = dict.fromkeys([*deletes, *newer_deletes])
+        self._pending_points = points
+        self._mark_pending()
+
+    async def initialize(self, dimensions: int) -> None:
+        await self.inner.initialize(dimensions)
+
+    async def upsert(self, points: list[VectorPoint]) -> int:
+        if not points:
+            return 0
+        for point in points:
+            self._pending_points[point.id] = point
+        self._mark_pending()
+        if self._flush_due():
+            await self.flush()
+        return len(points)
+
+    async def delete_by_doc_id(self, doc_id: str) -> int:
+        """Buffer a delete; returns how many pending (not yet written) points it discarded."""
+        dropped = self._drop_pending_doc(self._pending_points, doc_id)
+        self._pending_deletes[doc_id] = None
+        self._mark_pending()
+        if self._flush_due():
+            await self.flush()
+        return dropped
+
+    async def delete_collection(self) -> None:
+        self._clear()
+        await self.inner.delete_collection()
+
+    async def collection_stats(self) -> CollectionStats:
+        await self.flush()
+        return await self.inner.collection_stats()
+
+    async def test_connection(self) -> ConnectionTestResult:
+        return await self.inner.test_connection()
+
+    async def create_snapshot(self, version: str) -> str:
+        await self.flush()
+        return await self.inner.create_snapshot(version)
+
+    async def restore_snapshot(self, version: str) -> None:
+        self._clear()
+        await self.inner.restore_snapshot(version)
+
+    async def search(
+        self, vector: list[float], top_k: int, filters: SearchFilters | None = None
+    ) -> list[tuple[VectorPoint, float]]:
+        await self.flush()
+        return await self.inner.search(vector, top_k, filters)
+
+    async def all_points(self) -> list[VectorPoint]:
+        await self.flush()
+        return await self.inner.all_points()
+
+    async def points_by_doc_id(self, doc_id: str) -> list[VectorPoint]:
+        # Answered from the buffer and the inner store, so reading one document does not force a flush.
+        stored = [] if doc_id in self._pending_deletes else await self.inner.points_by_doc_id(doc_id)
+        points = {point.id: point for point in stored}
+        for point in self._pending_points.values():
+            if (point.payload or {}).get("doc_id") == doc_id:
+                points[point.id] = point
+        return list(points.values())
@@ -0,0 +1,122 @@
+"""Tests for the per-run connector session."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from ragkit.connectors.base import BaseConnector, ConnectorDocument
+from ragkit.connectors.session import ConnectorSession
+from ragkit.desktop import settings_store
+from ragkit.desktop.models import SourceEntry, SourceType
+
+
+def _doc(doc_id: str, content_hash: str) -> ConnectorDocument:
+    return ConnectorDocument(
+        id=doc_id,
+        source_id="src",
+        title=doc_id,
+        content="",
+        content_hash=content_hash,
+    )
+
+
+def test_diff_listing_reports_added_modified_and_removed() -> None:
+    delta = BaseConnector.diff_listing(
+        [_doc("a", "1"), _doc("b", "2"), _doc("c", "3")],
+        {"a": "1", "b": "old", "gone": "9"},
+    )
+
+    assert [doc.id for doc in delta.added] == ["c"]
+    assert [doc.id for doc in delta.modified] == ["b"]
+    assert delta.removed_ids == ["gone"]
+
+
+def test_session_lists_each_source_once(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    root = tmp_path / "docs"
+    root.mkdir()
+    for index in range(3):
+        (root / f"f{index}.txt").write_text(f"file {index}", encoding="utf-8")
+    source = SourceEntry(
+        id="src",
+        name="Docs",
+        type=SourceType.LOCAL_DIRECTORY,
+        config={"path": str(root), "file_types": ["txt"]},
+    )
+    session = ConnectorSession([source])
+
+    async def scenario():
+        delta = await session.detect_changes("src", {})
+        count = await session.count("src")
+        doc = await session.document("src", delta.added[0].id)
+        texts = await session.fetch_many("src", [d.id for d in delta.added] + ["missing"])
+        return delta, count, doc, texts
+
+    delta, count, doc, texts = asyncio.run(scenario())
+
+    assert session.listings == 1
+    assert count == 3
+    assert doc is delta.added[0]
+    assert sorted(text for text in texts.values() if isinstance(text, str)) == ["file 0", "file 1", "file 2"]
+    assert isinstance(texts["missing"], Exception)
+
+
+def test_planned_fetches_are_read_in_bulk_windows_per_source(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    root = tmp_path / "docs"
+    root.mkdir()
+    for index in range(20):
+        (root / f"f{index:02d}.txt").write_text(f"file {index}", encoding="utf-8")
+    source = SourceEntry(
+        id="src",
+        name="Docs",
+        type=SourceType.LOCAL_DIRECTORY,
+        config={"path": str(root), "file_types": ["txt"]},
+    )
+    session = ConnectorSession([source])
+    connector = session.connector("src")
+    bulk_calls: list[int] = []
+    fetch_many = connector.fetch_documents_content
+
+    async def recording(doc_ids):
+        bulk_calls.append(len(doc_ids))
+        return await fetch_many(doc_ids)
+
+    monkeypatch.setattr(connector, "fetch_documents_content", recording)
+
+    async def scenario():
+        delta = await session.detect_changes("src", {})
+        ids = [doc.id for doc in sorted(delta.added, key=lambda doc: doc.file_path)] + ["missing"]
+        session.plan_fetches([("src", doc_id) for doc_id in ids])
+        texts = await asyncio.gather(*(session.fetch_content("src", doc_id) for doc_id in ids), return_exceptions=True)
+        return texts
+
+    texts = asyncio.run(scenario())
+
+    assert bulk_calls == [16, 5]
+    assert texts[:20] == [f"file {index}" for index in range(20)]
+    assert isinstance(texts[20], Exception)
+
+
+def test_unplanned_fetch_reads_the_single_document(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "only.txt").write_text("only", encoding="utf-8")
+    source = SourceEntry(
+        id="src",
+        name="Docs",
+        type=SourceType.LOCAL_DIRECTORY,
+        config={"path": str(root), "file_types": ["txt"]},
+    )
+    session = ConnectorSession([source])
+
+    async def scenario():
+        delta = await session.detect_changes("src", {})
+        return await session.fetch_content("src", delta.added[0].id)
+
+    assert asyncio.run(scenario()) == "only"
+    with pytest.raises(Exception):
+        asyncio.run(session.fetch_content("src", "missing"))
@@ -0,0 +1,20 @@
+"""Tests for the shared SQLite stores of the app data directory."""
+
+from __future__ import annotations
+
+from ragkit.connectors.file_hashes import FileHashCache, file_hash_cache
+from ragkit.connectors.web_crawl_state import web_crawl_state
+from ragkit.desktop import settings_store
+
+
+def test_one_instance_per_file_reopened_when_the_data_directory_moves(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "first")
+    cache = file_hash_cache()
+    assert isinstance(cache, FileHashCache)
+    assert file_hash_cache() is cache
+    assert web_crawl_state() is not cache
+
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "second")
+    moved = file_hash_cache()
+    assert moved is not cache
+    assert moved.path.is_relative_to(tmp_path / "second")
@@ -0,0 +1,48 @@
+"""Tests for the local directory connector's scan index and hash cache."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+from ragkit.connectors import file_hashes
+from ragkit.connectors.local_directory import LocalDirectoryConnector
+from ragkit.desktop import settings_store
+
+
+def test_fetch_uses_scan_index_and_unchanged_files_are_not_rehashed(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    root = tmp_path / "docs"
+    root.mkdir()
+    for index in range(3):
+        (root / f"f{index}.txt").write_text(f"file {index}", encoding="utf-8")
+
+    hashed: list[str] = []
+    real_sha256_file = file_hashes.sha256_file
+
+    def counting_sha256_file(path, *args):
+        hashed.append(path.name)
+        return real_sha256_file(path, *args)
+
+    monkeypatch.setattr(file_hashes, "sha256_file", counting_sha256_file)
+    connector = LocalDirectoryConnector("src", {"path": str(root), "file_types": ["txt"]})
+
+    async def scenario():
+        docs = await connector.list_documents()
+        texts = await asyncio.gather(*(connector.fetch_document_content(doc.id) for doc in docs))
+        return docs, texts
+
+    docs, texts = asyncio.run(scenario())
+    assert sorted(texts) == ["file 0", "file 1", "file 2"]
+    assert sorted(hashed) == ["f0.txt", "f1.txt", "f2.txt"]
+
+    changed = root / "f1.txt"
+    changed.write_text("file 1, edited", encoding="utf-8")
+    os.utime(changed, ns=(changed.stat().st_atime_ns, changed.stat().st_mtime_ns + 10**9))
+    hashed.clear()
+    fresh = LocalDirectoryConnector("src", {"path": str(root), "file_types": ["txt"]})
+    delta = asyncio.run(fresh.detect_changes({doc.id: doc.content_hash for doc in docs}))
+
+    assert hashed == ["f1.txt"]
+    assert [doc.file_path for doc in delta.modified] == ["f1.txt"]
+    assert delta.added == [] and delta.removed_ids == []
@@ -0,0 +1,119 @@
+"""Tests for the incremental sync of SQL sources."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+
+from ragkit.connectors.session import ConnectorSession
+from ragkit.connectors.sql_database import SqlDatabaseConnector
+from ragkit.desktop import settings_store
+
+
+def _database(path) -> None:
+    with sqlite3.connect(path) as con:
+        con.execute("CREATE TABLE docs (id INTEGER PRIMARY KEY, body TEXT, updated_at INTEGER)")
+        con.executemany("INSERT INTO docs VALUES (?, ?, ?)", [(i, f"body {i}", i) for i in range(1, 6)])
+
+
+def _connector(path) -> SqlDatabaseConnector:
+    return SqlDatabaseConnector(
+        "sql",
+        {
+            "db_type": "sqlite",
+            "sqlite_path": str(path),
+            "query": "SELECT id, body, updated_at FROM docs;",
+            "id_column": "id",
+            "content_column": "body",
+            "incremental_column": "updated_at",
+        },
+    )
+
+
+def _recording(connector: SqlDatabaseConnector) -> list[dict]:
+    streamed: list[dict] = []
+    stream = connector._stream_rows
+
+    async def recording(query, params=()):
+        async for rows in stream(query, params):
+            streamed.extend(rows)
+            yield rows
+
+    connector._stream_rows = recording  # type: ignore[method-assign]
+    return streamed
+
+
+def test_incremental_sync_reads_rows_from_the_mark_and_finds_deletions_by_id(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    path = tmp_path / "source.db"
+    _database(path)
+
+    connector = _connector(path)
+    assert not connector.lists_for_changes
+    first = asyncio.run(connector.detect_changes({}))
+    assert len(first.added) == 5 and not first.modified and not first.removed_ids
+    known = {doc.id: doc.content_hash for doc in first.added}
+    by_row = {doc.file_path: doc.id for doc in first.added}
+
+    with sqlite3.connect(path) as con:
+        con.execute("UPDATE docs SET body = 'edited', updated_at = 10 WHERE id = 2")
+        con.execute("INSERT INTO docs VALUES (6, 'body 6', 11)")
+        con.execute("DELETE FROM docs WHERE id = 4")
+
+    connector = _connector(path)
+    streamed = _recording(connector)
+    second = asyncio.run(connector.detect_changes(known))
+    assert [doc.file_path for doc in second.added] == ["6"]
+    assert [doc.file_path for doc in second.modified] == ["2"]
+    assert second.removed_ids == [by_row["4"]]
+    # Besides the id-only query, only the rows from the mark (5) on were read.
+    assert sorted(row["id"] for row in streamed if "body" in row) == [2, 5, 6]
+    assert asyncio.run(connector.fetch_documents_content([by_row["2"]])) == {by_row["2"]: "edited"}
+
+    # Changes that were not ingested are reported again.
+    again = asyncio.run(_connector(path).detect_changes(known))
+    assert sorted(doc.file_path for doc in [*again.added, *again.modified]) == ["2", "6"]
+
+    for doc in [*second.added, *second.modified]:
+        known[doc.id] = doc.content_hash
+    del known[by_row["4"]]
+    connector = _connector(path)
+    streamed = _recording(connector)
+    settled = asyncio.run(connector.detect_changes(known))
+    assert not (settled.added or settled.modified or settled.removed_ids)
+    assert [row["id"] for row in streamed if "body" in row] == [6]
+    assert asyncio.run(connector.count_documents()) == 5
+
+
+def test_rows_updated_to_the_value_of_the_mark_are_not_missed(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    path = tmp_path / "source.db"
+    with sqlite3.connect(path) as con:
+        con.execute("CREATE TABLE docs (id INTEGER PRIMARY KEY, body TEXT, updated_at INTEGER)")
+        con.executemany("INSERT INTO docs VALUES (?, ?, ?)", [(1, "a", 100), (2, "b", 100)])
+
+    first = asyncio.run(_connector(path).detect_changes({}))
+    known = {doc.id: doc.content_hash for doc in first.added}
+    assert len(known) == 2
+    settled = asyncio.run(_connector(path).detect_changes(known))
+    assert not (settled.added or settled.modified or settled.removed_ids)
+
+    # The edit keeps the timestamp equal to the mark.
+    with sqlite3.connect(path) as con:
+        con.execute("UPDATE docs SET body = 'b, edited' WHERE id = 2")
+    changed = asyncio.run(_connector(path).detect_changes(known))
+    assert not changed.added
+    assert [doc.file_path for doc in changed.modified] == ["2"]
+
+
+def test_session_counts_incremental_sources_without_listing(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    path = tmp_path / "source.db"
+    _database(path)
+    connector = _connector(path)
+    session = ConnectorSession([])
+    session._connectors["sql"] = connector
+
+    assert asyncio.run(session.count("sql")) == 5
+    assert session.listings == 0
+    assert len(asyncio.run(connector.list_documents())) == 5
@@ -0,0 +1,242 @@
+"""Tests for the concurrent web crawler behind the web URL connector."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections import Counter
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from ragkit.connectors.web_crawler import HostThrottle, RobotsCache, WebCrawler
+from ragkit.desktop import settings_store
+
+pytest.importorskip("bs4")
+
+from ragkit.connectors.web_url import WebUrlConnector  # noqa: E402
+
+
+def _site(pages: int) -> dict[str, str]:
+    site = {}
+    for index in range(pages):
+        links = "".join(f'<a href="/page/{target}">p{target}</a>' for target in (2 * index + 1, 2 * index + 2) if target < pages)
+        site[f"/page/{index}"] = (
+            f"<html><head><title>Page {index}</title><script>var x = {index};</script></head>"
+            f"<body><p>Content of page {index}.</p>{links}<a href='/private/{index}'>secret</a></body></html>"
+        )
+    return site
+
+
+def test_crawl_is_concurrent_polite_and_parses_each_page_once() -> None:
+    site = _site(40)
+    requests: Counter[str] = Counter()
+    active = {"now": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        requests[path] += 1
+        if path == "/robots.txt":
+            return httpx.Response(200, text="User-agent: *\nDisallow: /private/\n")
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if path not in site:
+            return httpx.Response(404)
+        return httpx.Response(200, text=site[path], headers={"content-type": "text/html"})
+
+    connector = WebUrlConnector("src", {"urls": ["https://docs.example/page/0"], "crawl_depth": 10})
+    parsed: Counter[str] = Counter()
+
+    def parse(html: str, url: str):
+        parsed[url] += 1
+        return connector._parse_page(html, url)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            crawler = WebCrawler(
+                client,
+                fetch=connector._fetch_url,
+                parse=parse,
+                accept=lambda url: True,
+                follow=lambda url: True,
+                max_pages=100,
+                max_depth=10,
+                concurrency=8,
+                throttle=HostThrottle(3, 0.0),
+                robots=RobotsCache("test-agent"),
+            )
+            return await crawler.crawl(["https://docs.example/page/0"])
+
+    pages = asyncio.run(scenario())
+
+    assert [page.url for page in pages] == [f"https://docs.example/page/{index}" for index in range(40)]
+    assert pages[5].title == "Page 5"
+    assert pages[5].content == "Page 5 Content of page 5. p11 p12 secret"
+    assert requests["/robots.txt"] == 1
+    assert not any(path.startswith("/private/") for path in requests)
+    assert set(parsed.values()) == {1}
+    assert 1 < active["peak"] <= 3
+
+
+def test_max_pages_and_per_host_delay_are_respected() -> None:
+    site = _site(30)
+    started: list[float] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.append(asyncio.get_running_loop().time())
+        return httpx.Response(200, text=site[request.url.path], headers={"content-type": "text/html"})
+
+    connector = WebUrlConnector("src", {"urls": ["https://docs.example/page/0"], "crawl_depth": 10})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            crawler = WebCrawler(
+                client,
+                fetch=connector._fetch_url,
+                parse=connector._parse_page,
+                accept=lambda url: "/private/" not in url,
+                follow=lambda url: True,
+                max_pages=5,
+                max_depth=10,
+                concurrency=4,
+                throttle=HostThrottle(4, 0.05),
+            )
+            return await crawler.crawl(["https://docs.example/page/0"])
+
+    pages = asyncio.run(scenario())
+
+    assert len(pages) == 5
+    assert len(started) == 5
+    gaps = [later - earlier for earlier, later in zip(started, started[1:])]
+    assert min(gaps) >= 0.045
+
+
+def test_recrawl_uses_conditional_requests_stored_links_and_sitemap(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    site = {
+        "/": '<html><title>Home</title><body>Home <a href="/a">a</a> <a href="/b">b</a></body></html>',
+        "/a": "<html><title>A</title><body>Page A</body></html>",
+        "/b": "<html><title>B</title><body>Page B</body></html>",
+    }
+    sitemap: dict[str, str] = {}
+    downloads: Counter[str] = Counter()
+    requests: Counter[str] = Counter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        requests[path] += 1
+        if path == "/sitemap.xml":
+            if not sitemap:
+                return httpx.Response(404)
+            entries = "".join(f"<url><loc>https://docs.example{p}</loc><lastmod>{d}</lastmod></url>" for p, d in sitemap.items())
+            return httpx.Response(
+                200, text=f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+            )
+        if path not in site:
+            return httpx.Response(404)
+        etag = '"' + hashlib.sha256(site[path].encode()).hexdigest()[:16] + '"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        downloads[path] += 1
+        return httpx.Response(200, text=site[path], headers={"content-type": "text/html", "etag": etag})
+
+    connector = WebUrlConnector(
+        "src", {"urls": ["https://docs.example/"], "crawl_depth": 2, "respect_robots_txt": False}
+    )
+    monkeypatch.setattr(connector, "_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    first = asyncio.run(connector.list_documents())
+    assert sorted(doc.title for doc in first) == ["A", "B", "Home"]
+    assert downloads == {"/": 1, "/a": 1, "/b": 1}
+
+    # Nothing changed: every page answers 304 and the crawl still reaches /a and /b through stored links.
+    second = asyncio.run(connector.list_documents())
+    assert downloads == {"/": 1, "/a": 1, "/b": 1}
+    assert {doc.id: doc.content_hash for doc in second} == {doc.id: doc.content_hash for doc in first}
+    assert all(doc.metadata["not_modified"] and doc.content == "" for doc in second)
+    delta = connector.diff_listing(second, {doc.id: doc.content_hash for doc in first})
+    assert not (delta.added or delta.modified or delta.removed_ids)
+    page_a = next(doc for doc in second if doc.title == "A")
+    assert asyncio.run(connector.fetch_document_content(page_a.id)) == "A Page A"
+
+    site["/b"] = '<html><title>B</title><body>Page B, edited <a href="/c">c</a></body></html>'
+    site["/c"] = "<html><title>C</title><body>Page C</body></html>"
+    third = asyncio.run(connector.list_documents())
+    assert sorted(doc.title for doc in third) == ["A", "B", "C", "Home"]
+    assert downloads == {"/": 1, "/a": 2, "/b": 2, "/c": 1}
+
+    # A sitemap older than the last check spares even the conditional requests.
+    sitemap.update({path: "2000-01-01" for path in site})
+    before = sum(requests[path] for path in site)
+    fourth = asyncio.run(connector.list_documents())
+    assert sorted(doc.title for doc in fourth) == ["A", "B", "C", "Home"]
+    assert sum(requests[path] for path in site) == before
+
+
+def test_changed_extract_mode_extracts_every_page_again(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    page = '<html><title>Home</title><body><h1>Home</h1><p>Some <b>bold</b> text</p></body></html>'
+    downloads: Counter[str] = Counter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/":
+            return httpx.Response(404)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        downloads[request.url.path] += 1
+        return httpx.Response(200, text=page, headers={"content-type": "text/html", "etag": '"v1"'})
+
+    def connector(mode: str) -> WebUrlConnector:
+        web = WebUrlConnector(
+            "src", {"urls": ["https://docs.example/"], "respect_robots_txt": False, "extract_mode": mode}
+        )
+        monkeypatch.setattr(web, "_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return web
+
+    first = asyncio.run(connector("text").list_documents())
+    assert downloads == {"/": 1}
+    assert asyncio.run(connector("text").list_documents())[0].metadata["not_modified"]
+    assert downloads == {"/": 1}
+
+    # The stored hash was computed from the text extraction, so it is not reused for another mode.
+    second = asyncio.run(connector("markdown").list_documents())
+    assert downloads == {"/": 2}
+    assert not second[0].metadata["not_modified"]
+    assert second[0].content_hash != first[0].content_hash
+    assert asyncio.run(connector("markdown").list_documents())[0].metadata["not_modified"]
+    assert downloads == {"/": 2}
+
+
+def test_same_day_sitemap_date_does_not_hide_an_edit(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    site = {"/": "<html><title>Home</title><body>First version</body></html>"}
+    downloads: Counter[str] = Counter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/sitemap.xml":
+            # A date-only lastmod for today, as many sitemaps publish it.
+            today = datetime.now(timezone.utc).date().isoformat()
+            entry = f"<url><loc>https://docs.example/</loc><lastmod>{today}</lastmod></url>"
+            return httpx.Response(
+                200, text=f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entry}</urlset>'
+            )
+        if path not in site:
+            return httpx.Response(404)
+        etag = '"' + hashlib.sha256(site[path].encode()).hexdigest()[:16] + '"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        downloads[path] += 1
+        return httpx.Response(200, text=site[path], headers={"content-type": "text/html", "etag": etag})
+
+    connector = WebUrlConnector("src", {"urls": ["https://docs.example/"], "respect_robots_txt": False})
+    monkeypatch.setattr(connector, "_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    first = asyncio.run(connector.list_documents())
+    site["/"] = "<html><title>Home</title><body>Edited later the same day</body></html>"
+    second = asyncio.run(connector.list_documents())
+    assert downloads == {"/": 2}
+    assert second[0].content_hash != first[0].content_hash
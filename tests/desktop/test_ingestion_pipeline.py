@@ -0,0 +1,213 @@
+"""Tests for the staged ingestion pipeline and its use by the ingestion runtime."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from ragkit.config.vector_store_schema import VectorStoreConfig
+from ragkit.connectors.local_directory import LocalDirectoryConnector
+from ragkit.desktop import settings_store
+from ragkit.desktop.ingestion_pipeline import PipelineStage, run_pipeline
+from ragkit.desktop.ingestion_runtime import IngestionRuntime
+from ragkit.desktop.models import IngestionConfig, SettingsPayload, SourceConfig, SourceEntry, SourceType
+from ragkit.storage.base import VectorPoint, create_vector_store
+
+
+def test_stages_overlap_with_bounded_queues_and_isolate_errors() -> None:
+    active = {"parse": 0, "embed": 0}
+    peak = {"parse": 0, "embed": 0}
+    stored: list[int] = []
+    failures: list[tuple[int, str]] = []
+
+    def stage(name: str, fail_on: int | None = None):
+        async def handler(item: int) -> int:
+            active[name] += 1
+            peak[name] = max(peak[name], active[name])
+            await asyncio.sleep(0.01)
+            active[name] -= 1
+            if item == fail_on:
+                raise ValueError("boom")
+            return item
+
+        return handler
+
+    async def store(item: int) -> None:
+        stored.append(item)
+
+    async def on_error(item: int, stage_name: str, exc: Exception) -> None:
+        failures.append((item, stage_name))
+
+    asyncio.run(
+        run_pipeline(
+            range(12),
+            [
+                PipelineStage("parse", stage("parse", fail_on=3), 4),
+                PipelineStage("embed", stage("embed"), 2),
+                PipelineStage("store", store, 1),
+            ],
+            queue_size=2,
+            on_error=on_error,
+        )
+    )
+
+    assert sorted(stored) == [i for i in range(12) if i != 3]
+    assert failures == [(3, "parse")]
+    assert peak == {"parse": 4, "embed": 2}
+
+
+def test_pipeline_stops_starting_items_once_cancelled() -> None:
+    seen: list[int] = []
+
+    async def handler(item: int) -> None:
+        seen.append(item)
+
+    asyncio.run(
+        run_pipeline(
+            range(100),
+            [PipelineStage("only", handler, 1)],
+            queue_size=1,
+            on_error=lambda *args: asyncio.sleep(0),
+            should_stop=lambda: len(seen) >= 5,
+        )
+    )
+
+    assert len(seen) == 5
+
+
+@dataclass
+class _FolderRuntime:
+    runtime: IngestionRuntime
+    docs: Path
+    source: SourceEntry
+    store_path: str
+
+    async def run(self, **kwargs) -> None:
+        await self.runtime.start(**kwargs)
+        await self.runtime._task
+        assert self.runtime.progress.status == "completed", [log.message for log in self.runtime.logs]
+
+    async def points(self) -> list[VectorPoint]:
+        store = create_vector_store(VectorStoreConfig(path=self.store_path))
+        await store.initialize(64)
+        return await store.all_points()
+
+
+@pytest.fixture
+def runtime_with_folder(tmp_path, monkeypatch):
+    """Build an ``IngestionRuntime`` whose settings ingest one local folder holding ``files``."""
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+
+    def build(files: dict[str, str], embedding: dict | None = None) -> _FolderRuntime:
+        docs = tmp_path / "docs"
+        for name, text in files.items():
+            (docs / name).parent.mkdir(parents=True, exist_ok=True)
+            (docs / name).write_text(text, encoding="utf-8")
+        source = SourceEntry(name="docs", type=SourceType.LOCAL_DIRECTORY, config={"path": str(docs), "file_types": ["txt"]})
+        store_path = str(tmp_path / "vectors")
+        settings_store.save_settings(
+            SettingsPayload(
+                ingestion=IngestionConfig(source=SourceConfig(path=str(docs)), sources=[source]),
+                embedding={
+                    "provider": "openai",
+                    "model": "text-embedding-3-small",
+                    "dimensions": 64,
+                    **(embedding or {"cache_backend": "memory"}),
+                },
+                vector_store={"path": store_path},
+            )
+        )
+        return _FolderRuntime(IngestionRuntime(), docs, source, store_path)
+
+    return build
+
+
+def test_runtime_ingests_folder_through_pipeline(runtime_with_folder) -> None:
+    files = {f"note{index}.txt": f"Document {index} about topic {index}. " * 20 for index in range(6)}
+    folder = runtime_with_folder({**files, "copy.txt": files["note0.txt"]})
+    runtime = folder.runtime
+
+    async def scenario():
+        await folder.run()
+        return await folder.points()
+
+    points = asyncio.run(scenario())
+
+    assert runtime.progress.doc_index == 7
+    assert runtime.progress.docs_succeeded == 6
+    assert len({point.payload["doc_id"] for point in points}) == 6
+    assert len(runtime._load_registry()) == 6  # the duplicate is skipped, not registered
+
+
+def test_incremental_run_reuses_vectors_of_unchanged_chunks(runtime_with_folder) -> None:
+    paragraphs = [
+        " ".join(f"Sentence {p}.{i} describes item {p * 13 + i} of the catalogue." for i in range(12)) for p in range(30)
+    ]
+    folder = runtime_with_folder(
+        {
+            "long.txt": "\n\n".join(paragraphs),
+            "short.txt": "A short and stable note about nothing in particular.",
+        },
+        embedding={"cache_enabled": False},
+    )
+    runtime = folder.runtime
+
+    async def points_of(name: str) -> dict[str, list[float]]:
+        return {
+            point.payload["chunk_text"]: point.vector
+            for point in await folder.points()
+            if point.payload["filename"] == name
+        }
+
+    async def scenario():
+        await folder.run(incremental=False)
+        first = await points_of("long.txt")
+        assert runtime.progress.chunks_reused == 0
+        assert len(first) > 2
+
+        (folder.docs / "long.txt").write_text("\n\n".join([*paragraphs, "One more closing paragraph."]), encoding="utf-8")
+        await folder.run(incremental=True)
+        second = await points_of("long.txt")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert runtime.progress.chunks_reused == len(set(first) & set(second)) > 0
+    assert runtime.progress.chunks_embedded == len(second) - runtime.progress.chunks_reused
+    for text in set(first) & set(second):
+        assert second[text] == pytest.approx(first[text], abs=1e-6)
+    assert runtime.get_history(1)[0].chunks_reused == runtime.progress.chunks_reused
+
+
+def test_watched_run_scans_only_dirty_paths(runtime_with_folder, monkeypatch) -> None:
+    files = {f"note{index}.txt": f"Document {index} about topic {index}. " * 20 for index in range(4)}
+    folder = runtime_with_folder({**files, "old/archived.txt": "An archived document about history. " * 20})
+    runtime, docs = folder.runtime, folder.docs
+
+    asyncio.run(folder.run())
+    assert len(runtime._load_registry()) == 5
+
+    (docs / "note1.txt").write_text("Document 1, rewritten entirely. " * 20, encoding="utf-8")
+    (docs / "old" / "archived.txt").unlink()
+    (docs / "old").rmdir()
+    (docs / "note9.txt").write_text("A brand new document. " * 20, encoding="utf-8")
+
+    async def no_full_listing(self):
+        raise AssertionError("the whole source was listed")
+
+    monkeypatch.setattr(LocalDirectoryConnector, "list_documents", no_full_listing)
+    asyncio.run(folder.run(incremental=True, dirty_paths={folder.source.id: {"note1.txt", "old", "note9.txt"}}))
+
+    history = runtime.get_history(1)[0]
+    assert (history.docs_added, history.docs_modified, history.docs_removed) == (1, 1, 1)
+    assert sorted(info["file_path"] for info in runtime._load_registry().values()) == [
+        "note0.txt",
+        "note1.txt",
+        "note2.txt",
+        "note3.txt",
+        "note9.txt",
+    ]
+    assert runtime.progress.coverage_percent == 100.0
@@ -0,0 +1,96 @@
+"""Tests for the persistent parsed-content cache."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from ragkit.connectors.file_hashes import sha256_file
+from ragkit.desktop import documents, settings_store
+from ragkit.desktop.documents import ParsedContent
+from ragkit.desktop.parsed_cache import ParsedContentCache
+from ragkit.desktop.parsing_executor import ParsingExecutor
+
+
+def _refuse_parse(path: Path) -> ParsedContent:
+    raise AssertionError(f"{path.name} should have come from the cache")
+
+
+def _parsed(text: str) -> ParsedContent:
+    return ParsedContent(text=text, page_count=3, title="T", author=None, creation_date=None, encoding="utf-8", has_tables=True)
+
+
+def test_entries_round_trip_compressed_and_miss_on_parser_upgrade(tmp_path: Path, monkeypatch) -> None:
+    cache = ParsedContentCache(tmp_path / "parsed.db")
+    parsed = _parsed("the same sentence again. " * 400)
+    cache.put("digest", parsed)
+
+    assert cache.get("digest") == parsed
+    assert cache.get("other") is None
+    stored = cache._conn.execute("SELECT size FROM parsed_content").fetchone()[0]
+    assert stored < len(parsed.text) / 10
+    assert cache.stats()["hit_rate"] == 0.5
+
+    monkeypatch.setattr(documents, "PARSER_VERSION", documents.PARSER_VERSION + 1)
+    assert cache.get("digest") is None
+
+
+def test_least_recently_used_entries_are_evicted_by_size(tmp_path: Path) -> None:
+    cache = ParsedContentCache(tmp_path / "parsed.db", max_mb=0.05)
+    texts = {f"d{index}": os.urandom(8000).hex() for index in range(6)}  # incompressible, ~8 KB each stored
+    for digest in ("d0", "d1", "d2", "d3"):
+        cache.put(digest, _parsed(texts[digest]))
+    assert cache.get("d0") is not None  # d0 becomes the most recently used
+    for digest in ("d4", "d5"):
+        cache.put(digest, _parsed(texts[digest]))
+
+    assert cache.evictions > 0
+    assert cache.get("d0") is not None
+    assert cache.get("d1") is None
+    assert cache.get("d5") is not None
+    # The running size follows inserts, replacements and evictions without summing the table.
+    cache.put("d5", _parsed(texts["d5"][:4000]))
+    assert cache.bytes_used == cache._total_size() == ParsedContentCache(tmp_path / "parsed.db").bytes_used
+
+
+def test_executor_serves_unchanged_files_from_the_cache(tmp_path: Path) -> None:
+    paths = []
+    for index in range(5):
+        path = tmp_path / f"doc_{index}.txt"
+        path.write_text(f"Document {index} body.\n" * 20, encoding="utf-8")
+        paths.append(path)
+    digests = [sha256_file(path) for path in paths]
+    cache = ParsedContentCache(tmp_path / "parsed.db")
+
+    with ParsingExecutor(workers=1, timeout_seconds=60, cache=cache) as executor:
+        first = list(executor.parse_all(paths, digests=digests))
+    assert executor.cache_misses == 5
+
+    with ParsingExecutor(workers=2, timeout_seconds=60, parser=_refuse_parse, cache=cache) as executor:
+        again = list(executor.parse_all(paths, digests=digests))
+    assert again == first
+    assert executor.cache_hit_rate() == 1.0
+
+    paths[2].write_text("Edited.", encoding="utf-8")
+    digests[2] = sha256_file(paths[2])
+    with ParsingExecutor(workers=2, timeout_seconds=60, cache=cache) as executor:
+        edited = dict(executor.parse_all(paths, digests=digests))
+    assert edited[paths[2]].text.strip() == "Edited."
+    assert (executor.cache_hits, executor.cache_misses) == (4, 1)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_unreadable_file_is_its_own_result_with_the_cache_on(tmp_path: Path, monkeypatch, workers) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    present = tmp_path / "a.txt"
+    present.write_text("Still here.", encoding="utf-8")
+    gone = tmp_path / "gone.txt"
+    cache = ParsedContentCache(tmp_path / "parsed.db")
+
+    with ParsingExecutor(workers=workers, timeout_seconds=60, cache=cache) as executor:
+        results = dict(executor.parse_all([present, gone]))
+
+    assert results[present].text.strip() == "Still here."
+    assert isinstance(results[gone], FileNotFoundError)
@@ -0,0 +1,79 @@
+"""Tests for process-pool document parsing."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from ragkit.desktop import documents, settings_store
+from ragkit.desktop.documents import analyze_documents
+from ragkit.desktop.models import IngestionConfig, PipelineConfig, SourceConfig
+from ragkit.desktop.parsing_executor import ParseTimeoutError, ParsingExecutor
+
+
+def _slow_parse(path: Path) -> documents.ParsedContent:
+    if "slow" in path.name:
+        time.sleep(60)
+    return documents._extract_content(path)
+
+
+def _write_corpus(root: Path) -> list[Path]:
+    paths = []
+    for index in range(6):
+        path = root / f"note_{index}.txt"
+        path.write_text(f"Note {index} about topic {index * 7} and nothing else.\n" * (index + 1), encoding="utf-8")
+        paths.append(path)
+    html = root / "page.html"
+    html.write_text("<html><head><title>Page</title></head><body><p>Hello <b>pool</b></p></body></html>", encoding="utf-8")
+    paths.append(html)
+    return paths
+
+
+def test_parse_all_matches_serial_parsing_in_input_order(tmp_path: Path) -> None:
+    paths = _write_corpus(tmp_path)
+    done: list[Path] = []
+
+    with ParsingExecutor(workers=2, timeout_seconds=60) as executor:
+        results = list(executor.parse_all(paths, on_done=lambda path, _result: done.append(path)))
+
+    assert [path for path, _ in results] == paths
+    assert [result for _, result in results] == [documents._extract_content(path) for path in paths]
+    assert sorted(done) == sorted(paths)
+
+
+def test_runaway_parse_is_stopped_without_losing_other_files(tmp_path: Path) -> None:
+    paths = _write_corpus(tmp_path)
+    slow = tmp_path / "slow.txt"
+    slow.write_text("never parsed", encoding="utf-8")
+    paths.insert(2, slow)
+
+    started = time.monotonic()
+    with ParsingExecutor(workers=2, timeout_seconds=3, parser=_slow_parse) as executor:
+        results = dict(executor.parse_all(paths))
+        assert asyncio.run(executor.parse(paths[0])) == documents._extract_content(paths[0])
+        with pytest.raises(ParseTimeoutError):
+            asyncio.run(executor.parse(slow))
+    assert time.monotonic() - started < 30
+
+    assert isinstance(results.pop(slow), ParseTimeoutError)
+    assert results == {path: documents._extract_content(path) for path in results}
+
+
+def test_analyze_documents_is_unchanged_by_parse_workers(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_root", lambda: tmp_path / "home")
+    _write_corpus(tmp_path)
+    (tmp_path / "copy.txt").write_text((tmp_path / "note_3.txt").read_text(encoding="utf-8"), encoding="utf-8")
+
+    def analyze(workers: int) -> list[tuple[str, str | None, int]]:
+        config = IngestionConfig(source=SourceConfig(path=str(tmp_path)), pipeline=PipelineConfig(parse_workers=workers))
+        analyzed, errors = analyze_documents(config)
+        assert errors == []
+        return [(doc.file_path, doc.title, doc.word_count) for doc in analyzed]
+
+    serial = analyze(1)
+    assert analyze(3) == serial
+    # Scan order decides which of the two identical files is kept, in both runs.
+    assert len({path for path, _, _ in serial} & {"copy.txt", "note_3.txt"}) == 1
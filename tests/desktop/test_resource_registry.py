@@ -0,0 +1,63 @@
+"""Tests for the shared store/embedder registry."""
+
+from __future__ import annotations
+
+import asyncio
+
+from ragkit.config.embedding_schema import EmbeddingConfig
+from ragkit.config.vector_store_schema import VectorStoreConfig
+from ragkit.desktop.resource_registry import ResourceRegistry
+
+
+def test_instances_are_reused_until_config_changes(tmp_path) -> None:
+    registry = ResourceRegistry()
+    config = VectorStoreConfig(path=str(tmp_path / "store"), collection_name="warm")
+    calls: list[int] = []
+
+    async def scenario():
+        first = await registry.vector_store(config, 4)
+        original = first.initialize
+
+        async def counting_initialize(dimensions: int) -> None:
+            calls.append(dimensions)
+            await original(dimensions)
+
+        first.initialize = counting_initialize
+        second = await registry.vector_store(config.model_copy(deep=True), 4)
+        changed = await registry.vector_store(config.model_copy(update={"collection_name": "other"}), 4)
+        return first, second, changed
+
+    first, second, changed = asyncio.run(scenario())
+
+    assert second is first
+    assert calls == []
+    assert changed is not first
+    embed_cfg = EmbeddingConfig()
+    assert registry.embedder(embed_cfg) is registry.embedder(embed_cfg.model_copy(deep=True))
+
+
+def test_invalidate_stores_keeps_embedders(tmp_path) -> None:
+    registry = ResourceRegistry()
+    config = VectorStoreConfig(path=str(tmp_path / "store"), collection_name="warm")
+    embedder = registry.embedder(EmbeddingConfig())
+    store = asyncio.run(registry.vector_store(config, 4))
+
+    registry.invalidate_stores()
+
+    assert asyncio.run(registry.vector_store(config, 4)) is not store
+    assert registry.embedder(EmbeddingConfig()) is embedder
+
+
+def test_document_and_query_embedders_stay_warm_together() -> None:
+    registry = ResourceRegistry()
+    document_cfg = EmbeddingConfig()
+    query_cfg = EmbeddingConfig(model="query-model")
+
+    document = registry.embedder(document_cfg)
+    query = registry.embedder(query_cfg)
+
+    assert registry.embedder(document_cfg) is document
+    assert registry.embedder(query_cfg) is query
+    for index in range(4):
+        registry.embedder(EmbeddingConfig(model=f"stale-{index}"))
+    assert registry.embedder(document_cfg) is not document
@@ -0,0 +1,79 @@
+"""Tests for cross-document embedding request batching."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from ragkit.embedding.batcher import EmbeddingBatcher
+from ragkit.embedding.engine import EmbedOutput
+
+
+class _Provider:
+    def __init__(self, fail_on: str | None = None):
+        self.requests: list[list[str]] = []
+        self.fail_on = fail_on
+
+    def __call__(self, texts: list[str]) -> list[EmbedOutput]:
+        self.requests.append(list(texts))
+        if self.fail_on in texts:
+            raise RuntimeError("provider down")
+        return [EmbedOutput(vector=[float(len(text))], latency_ms=1) for text in texts]
+
+
+def test_chunks_from_many_documents_share_full_requests() -> None:
+    provider = _Provider()
+
+    async def scenario():
+        batcher = EmbeddingBatcher(provider, batch_size=8, max_wait_seconds=10.0)
+        docs = [[f"doc{d}-chunk{c}" + "x" * d for c in range(3)] for d in range(8)]
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.embed(doc) for doc in docs)), timeout=5)
+        return docs, results
+
+    docs, results = asyncio.run(scenario())
+
+    assert [len(request) for request in provider.requests] == [8, 8, 8]
+    for doc, outputs in zip(docs, results):
+        assert [output.vector[0] for output in outputs] == [float(len(text)) for text in doc]
+
+
+def test_token_budget_and_max_wait_bound_requests() -> None:
+    provider = _Provider()
+
+    async def scenario():
+        batcher = EmbeddingBatcher(provider, batch_size=100, max_tokens=10, max_wait_seconds=0.02)
+        started = time.perf_counter()
+        await batcher.embed(["a", "b", "c"], tokens=[4, 4, 4])
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(scenario())
+
+    assert provider.requests == [["a", "b"], ["c"]]
+    assert elapsed < 1.0
+
+
+def test_failed_request_is_retried_per_caller() -> None:
+    provider = _Provider(fail_on="bad")
+
+    async def scenario():
+        batcher = EmbeddingBatcher(provider, batch_size=4, max_wait_seconds=0.01)
+        return await asyncio.gather(batcher.embed(["ok", "fine"]), batcher.embed(["bad"]), return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+
+    assert [output.vector[0] for output in first] == [2.0, 4.0]
+    assert isinstance(second, RuntimeError)
+    assert provider.requests == [["ok", "fine", "bad"], ["ok", "fine"], ["bad"]]
+
+
+def test_failed_request_of_a_single_caller_is_not_retried() -> None:
+    provider = _Provider(fail_on="bad")
+
+    async def scenario():
+        batcher = EmbeddingBatcher(provider, batch_size=4, max_wait_seconds=0.01)
+        return await asyncio.gather(batcher.embed(["ok", "bad"]), return_exceptions=True)
+
+    (result,) = asyncio.run(scenario())
+
+    assert isinstance(result, RuntimeError)
+    assert provider.requests == [["ok", "bad"]]
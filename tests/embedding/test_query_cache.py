@@ -0,0 +1,125 @@
+"""Tests for the embedding caches and their use in EmbeddingEngine."""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from ragkit.config.embedding_schema import CacheDtype, EmbeddingConfig, EmbeddingProvider
+from ragkit.embedding.cache import BaseEmbeddingCache, DiskEmbeddingCache, MemoryEmbeddingCache
+from ragkit.embedding.engine import EmbeddingEngine
+
+
+class _CountingEngine(EmbeddingEngine):
+    def __init__(self, config: EmbeddingConfig, cache: BaseEmbeddingCache):
+        super().__init__(config, cache=cache)
+        self.provider_texts: list[str] = []
+
+    def _embed_text_uncached(self, text: str):
+        self.provider_texts.append(text)
+        return super()._embed_text_uncached(text)
+
+
+def _config(**updates) -> EmbeddingConfig:
+    values = {"provider": EmbeddingProvider.OPENAI, "model": "text-embedding-3-small", "dimensions": 64, **updates}
+    return EmbeddingConfig(**values)
+
+
+def test_lru_evicts_by_entries_and_bytes() -> None:
+    cache = MemoryEmbeddingCache(max_entries=2, max_bytes=10_000)
+    cache.put("a", "m", [1.0] * 8)
+    cache.put("b", "m", [2.0] * 8)
+    assert cache.get("a", "m") == [1.0] * 8  # "a" becomes most recent
+    cache.put("c", "m", [3.0] * 8)
+
+    assert cache.get("b", "m") is None
+    assert cache.get("a", "m") is not None
+    cache.resize(10, 700)
+    cache.put("big", "m", [0.0] * 64)
+    stats = cache.stats()
+    assert stats.entries == 1
+    assert stats.evictions == 3
+    assert (stats.hits, stats.misses) == (2, 1)
+
+
+def test_engine_serves_repeats_from_cache_per_model_namespace() -> None:
+    cache = MemoryEmbeddingCache()
+    engine = _CountingEngine(_config(), cache)
+
+    first = engine.embed_text("what is ragkit?")
+    batch = engine.embed_texts(["what is ragkit?", "new text", "new text"])
+
+    assert engine.provider_texts == ["what is ragkit?", "new text"]
+    assert batch[0].vector == first.vector
+    assert batch[1].vector == batch[2].vector
+
+    other_model = _CountingEngine(_config(dimensions=128), cache)
+    assert len(other_model.embed_text("what is ragkit?").vector) == 128
+    assert other_model.provider_texts == ["what is ragkit?"]
+
+    disabled = _CountingEngine(_config(cache_enabled=False), cache)
+    disabled.embed_text("what is ragkit?")
+    assert disabled.provider_texts == ["what is ragkit?"]
+
+
+def test_disk_cache_batches_blobs_and_evicts_least_recent(tmp_path) -> None:
+    cache = DiskEmbeddingCache(path=tmp_path / "e.db", dtype=CacheDtype.FLOAT16, max_mb=1)
+    cache.put_many(["a", "b"], "m", [[0.1, 0.2, 0.3], [1.0, 2.0, 3.0]])
+
+    found = cache.get_many(["b", "missing", "a"], "m")
+    assert found[1] is None
+    assert found[0] == pytest.approx([1.0, 2.0, 3.0], abs=1e-3)
+    assert found[2] == pytest.approx([0.1, 0.2, 0.3], abs=1e-3)
+    assert cache.get("a", "other-model") is None
+
+    cache.max_bytes = 3 * 6  # room for three float16 vectors of three values
+    cache.put_many(["c", "d"], "m", [[4.0] * 3, [5.0] * 3])
+    stats = cache.stats("m")
+    assert stats.entries == 2
+    assert stats.evictions == 2
+    assert cache.get("c", "m") is not None
+    assert cache.purge_model("m") == 2
+
+
+def test_disk_cache_tracks_its_size_without_summing_the_table(tmp_path) -> None:
+    cache = DiskEmbeddingCache(path=tmp_path / "e.db", dtype=CacheDtype.FLOAT32)
+    statements: list[str] = []
+    cache._conn.set_trace_callback(statements.append)
+    cache.put_many(["a", "b", "a"], "m", [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    cache.put("b", "m", [7.0, 8.0, 9.0])
+    assert cache.bytes_used == 8 + 12
+    assert not [statement for statement in statements if "SUM(" in statement]
+
+    cache.put("c", "other", [1.0])
+    assert DiskEmbeddingCache(path=tmp_path / "e.db").bytes_used == cache.bytes_used == 24
+    cache.purge_model("other")
+    assert cache.bytes_used == 20
+    cache.clear()
+    assert cache.bytes_used == 0
+
+
+def test_disk_cache_drops_legacy_json_table(tmp_path) -> None:
+    path = tmp_path / "e.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE embeddings (key TEXT PRIMARY KEY, model_id TEXT, vector TEXT, created_at TEXT)")
+    conn.execute("INSERT INTO embeddings VALUES ('k', 'm', '[1.0]', 'now')")
+    conn.commit()
+    conn.close()
+
+    cache = DiskEmbeddingCache(path=path)
+    assert cache.stats().entries == 0
+    cache.put("a", "m", [1.0, 2.0])
+    assert cache.get("a", "m") == [1.0, 2.0]
+
+
+def test_engine_only_embeds_texts_missing_from_disk_cache(tmp_path) -> None:
+    cache = DiskEmbeddingCache(path=tmp_path / "e.db")
+    warm = _CountingEngine(_config(), cache)
+    warm.embed_texts(["one", "two"])
+
+    engine = _CountingEngine(_config(), cache)
+    outputs = engine.embed_texts(["two", "three", "one"])
+
+    assert engine.provider_texts == ["three"]
+    assert [len(out.vector) for out in outputs] == [64, 64, 64]
@@ -0,0 +1,66 @@
+"""Tests for the file watcher feeding auto-ingestion."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from ragkit.ingestion import file_watcher
+from ragkit.ingestion.file_watcher import DirectoryWatcher, FileWatcherState
+
+
+def _collect(state: FileWatcherState, source_id: str, expected: set[str], timeout: float = 10.0) -> set[str]:
+    dirty: set[str] = set()
+    deadline = time.monotonic() + timeout
+    while not expected <= dirty and time.monotonic() < deadline:
+        if state.poll().ready_to_trigger:
+            dirty |= state.take().get(source_id) or set()
+        time.sleep(0.05)
+    return dirty
+
+
+def test_dirty_paths_are_debounced_and_handed_over_once() -> None:
+    state = FileWatcherState(debounce_seconds=30)
+    state.mark("a", "x.txt")
+    state.mark("a", "sub/y.txt")
+    state.mark("b", "z.txt")
+    state.mark("b")
+
+    decision = state.poll()
+    assert decision.changed and not decision.ready_to_trigger
+
+    state.debounce_seconds = 0
+    state.mark("a", "x.txt")
+    assert state.poll().ready_to_trigger
+    assert state.take() == {"a": {"x.txt", "sub/y.txt"}, "b": None}
+    assert not state.poll().ready_to_trigger
+
+
+@pytest.mark.parametrize("use_polling", [False, True])
+def test_watcher_reports_changed_paths_relative_to_the_source_root(tmp_path, use_polling) -> None:
+    if not use_polling and file_watcher.Observer is None:
+        pytest.skip("watchdog is not installed")
+    root = tmp_path / "docs"
+    (root / "sub").mkdir(parents=True)
+    (root / "keep.txt").write_text("unchanged", encoding="utf-8")
+    (root / "sub" / "edit.txt").write_text("before", encoding="utf-8")
+    state = FileWatcherState()
+    state.debounce_seconds = 0
+    watcher = DirectoryWatcher(state, poll_interval=0.1, use_polling=use_polling)
+    try:
+        watcher.sync({"src": (root, True)})
+        # A newly watched source is rescanned once, for changes made while it was not watched.
+        assert state.poll().ready_to_trigger and state.take() == {"src": None}
+
+        (root / "sub" / "edit.txt").write_text("after, and longer", encoding="utf-8")
+        (root / "new.txt").write_text("new", encoding="utf-8")
+        dirty = _collect(state, "src", {"sub/edit.txt", "new.txt"})
+
+        assert {"sub/edit.txt", "new.txt"} <= dirty
+        assert "keep.txt" not in dirty
+
+        watcher.sync({})
+        assert watcher.sources == set()
+    finally:
+        watcher.stop()
@@ -0,0 +1,86 @@
+"""Tests for MinHash-LSH near-duplicate detection."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from ragkit.desktop import documents
+from ragkit.desktop.models import DeduplicationStrategy, IngestionConfig, SourceConfig
+from ragkit.ingestion.near_duplicates import NearDuplicateIndex
+
+
+def _words(rng: random.Random, count: int) -> set[str]:
+    return {f"w{rng.randrange(1_000_000)}" for _ in range(count)}
+
+
+def _variant(rng: random.Random, tokens: set[str], changed: int) -> set[str]:
+    kept = set(rng.sample(sorted(tokens), len(tokens) - changed))
+    return kept | _words(rng, changed)
+
+
+def test_duplicates_follow_the_jaccard_threshold() -> None:
+    rng = random.Random(4)
+    index = NearDuplicateIndex(threshold=0.8)
+    originals = [_words(rng, 400) for _ in range(200)]
+    for position, tokens in enumerate(originals):
+        assert not index.check_and_add(f"d{position}", tokens)
+
+    for position in range(0, 200, 10):
+        close = _variant(rng, originals[position], 10)  # Jaccard ~0.95
+        far = _variant(rng, originals[position], 120)  # Jaccard ~0.54
+        assert index.query(index.signature(close)) == f"d{position}"
+        assert index.query(index.signature(far)) is None
+    assert not index.check_and_add("fresh", _words(rng, 400))
+    assert len(index) == 201
+    assert index.bands * index.rows <= index.num_perm
+
+
+def test_index_survives_reload_and_forgets_removed_documents(tmp_path) -> None:
+    rng = random.Random(8)
+    path = tmp_path / "near_duplicates.npz"
+    first, second = _words(rng, 300), _words(rng, 300)
+    index = NearDuplicateIndex(threshold=0.9)
+    index.check_and_add("a", first)
+    index.check_and_add("b", second)
+    index.save(path)
+
+    reloaded = NearDuplicateIndex.load(path, threshold=0.9)
+    assert len(reloaded) == 2
+    assert np.array_equal(reloaded.signature(first), index.signature(first))
+    assert reloaded.check_and_add("copy", _variant(rng, first, 3))
+    assert reloaded.remove("a") and "a" not in reloaded
+    assert not reloaded.check_and_add("copy", _variant(rng, first, 3))
+
+    assert len(NearDuplicateIndex.load(path, threshold=0.9, num_perm=64)) == 0
+    assert len(NearDuplicateIndex.load(tmp_path / "missing.npz", threshold=0.9)) == 0
+
+
+def test_a_document_never_duplicates_its_own_entry(tmp_path) -> None:
+    rng = random.Random(12)
+    path = tmp_path / "near_duplicates.npz"
+    tokens = _words(rng, 300)
+    index = NearDuplicateIndex(threshold=0.8)
+    assert not index.check_and_add("doc1", tokens)
+    # A run cancelled after parsing saved the entry but never registered the document.
+    index.save(path)
+
+    reloaded = NearDuplicateIndex.load(path, threshold=0.8)
+    assert not reloaded.check_and_add("doc1", tokens)
+    assert reloaded.query(reloaded.signature(tokens), exclude="doc1") is None
+    assert reloaded.check_and_add("doc2", tokens)
+    assert not NearDuplicateIndex(threshold=0.0).check_and_add("only", tokens)
+
+
+def test_fuzzy_deduplication_uses_the_shared_index() -> None:
+    config = IngestionConfig(source=SourceConfig(path="."))
+    config.preprocessing.deduplication_strategy = DeduplicationStrategy.FUZZY
+    config.preprocessing.deduplication_threshold = 0.7
+    index = NearDuplicateIndex(config.preprocessing.deduplication_threshold)
+    text = " ".join(f"term{i}" for i in range(60))
+
+    assert not documents._is_duplicate(text, config, set(), index, "d1")
+    assert documents._is_duplicate(text + " extra words", config, set(), index, "d2")
+    assert not documents._is_duplicate("something else entirely", config, set(), index, "d3")
+    assert sorted(index._signatures) == ["d1", "d3"]
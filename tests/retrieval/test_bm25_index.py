@@ -0,0 +1,139 @@
+"""Tests for the array-backed BM25 index."""
+
+from __future__ import annotations
+
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from ragkit.config.retrieval_schema import BM25Algorithm, LexicalSearchConfig, SearchFilters
+from ragkit.retrieval.lexical_engine import BM25Index
+
+_CONFIG = LexicalSearchConfig(remove_stopwords=False, stemming=False)
+
+
+def _reference_scores(corpus, tokens, algorithm, k1=1.5, b=0.75, delta=0.5, allowed=None):
+    """Straightforward BM25 over {chunk_id: (tokens, doc_type)}, as the index used to compute it."""
+    avgdl = sum(len(toks) for toks, _ in corpus.values()) / len(corpus)
+    scores: dict[str, float] = {}
+    for term, qf in Counter(tokens).items():
+        holders = {cid: Counter(toks)[term] for cid, (toks, _) in corpus.items() if term in toks}
+        df = len(holders)
+        if not df:
+            continue
+        idf = math.log(1.0 + ((len(corpus) - df + 0.5) / (df + 0.5)))
+        for cid, tf in holders.items():
+            if allowed is not None and corpus[cid][1] not in allowed:
+                continue
+            dl = max(len(corpus[cid][0]), 1)
+            base = (tf * (k1 + 1.0)) / (tf + k1 * (1.0 - b + b * dl / avgdl))
+            scores[cid] = scores.get(cid, 0.0) + idf * ((base + delta) if algorithm == BM25Algorithm.BM25_PLUS else base) * qf
+    return scores
+
+
+def _build(seed: int = 7):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(60)]
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    index = BM25Index(_CONFIG)
+    corpus: dict[str, tuple[list[str], str]] = {}
+
+    def add(cid: str, doc: str) -> None:
+        toks = rng.choices(vocab, weights, k=rng.randint(3, 40))
+        doc_type = rng.choice(["pdf", "md"])
+        corpus[cid] = (toks, doc_type)
+        index.add_document(cid, " ".join(toks), {"doc_id": doc, "doc_type": doc_type})
+
+    for i in range(400):
+        add(f"c{i}", f"d{i // 4}")
+        if i == 250:
+            index.merge()
+    for doc in range(0, 100, 7):
+        assert index.remove_document_chunks(f"d{doc}") == 4
+        for part in range(4):
+            corpus.pop(f"c{doc * 4 + part}")
+    for i in range(10, 20):
+        add(f"c{i}", f"d{i // 4}")  # re-indexed chunk: replaces the previous version
+    return index, corpus
+
+
+@pytest.mark.parametrize("algorithm", [BM25Algorithm.BM25, BM25Algorithm.BM25_PLUS])
+def test_scores_match_reference_through_delta_tombstones_and_merge(algorithm) -> None:
+    index, corpus = _build()
+    query = ["w0", "w3", "w17", "w17", "w59"]
+
+    for filters, allowed in [(None, None), (SearchFilters(doc_types=["md"]), {"md"})]:
+        expected = _reference_scores(corpus, query, algorithm, allowed=allowed)
+        results = index.score_tokens(query, algorithm, 1.5, 0.75, 0.5, filters=filters)
+        assert index.num_documents == len(corpus)
+        assert {cid: score for cid, score, _ in results} == pytest.approx(expected)
+        scores = [score for _, score, _ in results]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_save_load_round_trip_and_unique_terms(tmp_path) -> None:
+    index, corpus = _build()
+    query = ["w1", "w2", "w40"]
+    before = index.score_tokens(query, BM25Algorithm.BM25, 1.5, 0.75, 0.5)
+
+    index.save(tmp_path)
+    loaded = BM25Index(_CONFIG)
+    assert loaded.load(tmp_path)
+
+    assert loaded.score_tokens(query, BM25Algorithm.BM25, 1.5, 0.75, 0.5) == before
+    assert loaded.num_unique_terms == len({tok for toks, _ in corpus.values() for tok in toks})
+    text, metadata = loaded.get_document("c12")
+    assert text == " ".join(corpus["c12"][0]) and metadata["doc_id"] == "d3"
+
+
+def test_unique_terms_are_counted_without_merging_tombstones() -> None:
+    index, corpus = _build()
+    dead = index._dead_count
+    assert dead
+
+    assert index.num_unique_terms == len({tok for toks, _ in corpus.values() for tok in toks})
+    assert index._dead_count == dead
+
+
+@pytest.mark.parametrize("strategy", ["auto", "exhaustive", "maxscore"])
+@pytest.mark.parametrize("algorithm", [BM25Algorithm.BM25, BM25Algorithm.BM25_PLUS])
+def test_top_k_strategies_equal_full_ranking(algorithm, strategy) -> None:
+    index, _ = _build(seed=11)
+    rng = random.Random(3)
+    for _ in range(60):
+        query = [f"w{rng.choice([0, 1, 2, 5, 9, 20, 33, 58, 59])}" for _ in range(rng.randint(1, 5))]
+        filters = rng.choice([None, SearchFilters(doc_types=["pdf"])])
+        k = rng.choice([1, 3, 10, 50])
+        expected = index.score_tokens(query, algorithm, 1.2, 0.75, 0.5, filters=filters)[:k]
+        results, scored = index.score_top_k(query, algorithm, 1.2, 0.75, 0.5, k, filters=filters, strategy=strategy)
+        assert results == expected
+        assert scored >= len(results)
+
+
+def test_filter_masks_match_payload_values_across_merges() -> None:
+    index = BM25Index(_CONFIG)
+    payloads = [
+        {"doc_id": "a", "file_type": "pdf", "language": "fr", "category": "legal", "source_id": "s1"},
+        {"doc_id": "b", "doc_type": "md", "doc_language": "en", "source_id": "s2"},
+        {"doc_id": "c", "doc_type": " pdf ", "category": "hr"},
+        {"doc_id": "d", "doc_type": "", "file_type": "txt", "language": "fr", "category": "legal"},
+    ]
+    for row, payload in enumerate(payloads):
+        index.add_document(f"c{row}", "alpha beta", payload)
+
+    def hits(**kwargs) -> list[str]:
+        return [cid for cid, _, _ in index.score_tokens(["alpha"], BM25Algorithm.BM25, 1.5, 0.75, 0.0, SearchFilters(**kwargs))]
+
+    assert hits(doc_types=["pdf"]) == ["c0", "c2"]
+    assert hits(languages=["fr"], categories=["legal"]) == ["c0", "c3"]
+    assert hits(categories=["legal", "hr"], doc_types=["txt", "md"]) == ["c3"]
+    assert hits(doc_ids=["zzz"]) == []
+    assert hits(source_ids=["s1", "s2"], doc_types=["md"]) == ["c1"]
+
+    index.remove_document_chunks("a")
+    index.merge()
+    index.add_document("c4", "alpha", {"doc_id": "e", "doc_type": "pdf", "category": "legal"})
+    assert hits(doc_types=["pdf"], categories=["legal"]) == ["c4"]
+    assert hits(languages=["fr"]) == ["c3"]
@@ -0,0 +1,142 @@
+"""Tests for segmented BM25 index persistence."""
+
+from __future__ import annotations
+
+import json
+import random
+
+from ragkit.config.retrieval_schema import BM25Algorithm, LexicalSearchConfig, SearchFilters
+from ragkit.retrieval.lexical_engine import BM25Index, merge_segments, wait_for_merges
+
+_CONFIG = LexicalSearchConfig(remove_stopwords=False, stemming=False)
+_QUERIES = [["w0"], ["w1", "w7", "w7"], ["w3", "w25", "w49"]]
+
+
+def _add(index: BM25Index, rng: random.Random, chunk: int) -> None:
+    text = " ".join(f"w{rng.randint(0, 49)}" for _ in range(rng.randint(2, 20)))
+    metadata = {"doc_id": f"d{chunk // 3}", "doc_type": rng.choice(["pdf", "md"]), "chunk_text": text}
+    index.add_document(f"c{chunk}", text, metadata, language="en")
+
+
+def _snapshot(index: BM25Index) -> list:
+    results = [index.score_tokens(query, BM25Algorithm.BM25_PLUS, 1.2, 0.75, 0.5) for query in _QUERIES]
+    results.append(index.score_tokens(["w2"], BM25Algorithm.BM25, 1.2, 0.75, 0.0, SearchFilters(doc_types=["md"])))
+    return results
+
+
+def _segments(directory) -> list[dict]:
+    return json.loads((directory / "manifest.json").read_text(encoding="utf-8"))["segments"]
+
+
+def test_incremental_save_writes_one_segment_and_deletion_bitmaps(tmp_path) -> None:
+    rng = random.Random(5)
+    index = BM25Index(_CONFIG)
+    for chunk in range(90):
+        _add(index, rng, chunk)
+    index.save(tmp_path)
+    first = tmp_path / "seg_000001"
+    written = {path.name: path.stat().st_mtime_ns for path in first.iterdir()}
+
+    reopened = BM25Index(_CONFIG)
+    assert reopened.load(tmp_path)
+    assert _snapshot(reopened) == _snapshot(index)
+    for chunk in range(90, 120):
+        _add(reopened, rng, chunk)
+    assert reopened.remove_document_chunks("d4") == 3
+    reopened.save(tmp_path)
+
+    segments = _segments(tmp_path)
+    assert [(entry["id"], entry["rows"], entry["deleted"]) for entry in segments] == [(1, 90, 3), (2, 30, 0)]
+    assert (first / f"deletes.{segments[0]['deletes']}.npy").exists()
+    assert {path.name: path.stat().st_mtime_ns for path in first.iterdir() if path.name in written} == written
+
+    loaded = BM25Index(_CONFIG)
+    assert loaded.load(tmp_path)
+    assert loaded.num_documents == 117
+    assert _snapshot(loaded) == _snapshot(reopened)
+    text, metadata = loaded.get_document("c100")
+    assert text == metadata["chunk_text"] and metadata["doc_id"] == "d33"
+    assert loaded.get_document("c13") == ("", {})
+
+
+def test_segments_merge_in_the_background_and_unreferenced_files_are_removed(tmp_path) -> None:
+    rng = random.Random(9)
+    chunk = 0
+    for _ in range(9):
+        index = BM25Index(_CONFIG)
+        index.load(tmp_path)
+        for _ in range(5):
+            _add(index, rng, chunk)
+            chunk += 1
+        index.save(tmp_path)
+        assert wait_for_merges(tmp_path, timeout=30)
+        assert len(_segments(tmp_path)) <= 8
+
+    # The ninth segment scheduled a merge of all of them.
+    assert [entry["rows"] for entry in _segments(tmp_path)] == [45]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["manifest.json", "seg_000010"]
+
+    reloaded = BM25Index(_CONFIG)
+    assert reloaded.load(tmp_path)
+    assert _snapshot(reloaded) == _snapshot(index)
+
+
+def test_merge_gives_way_to_deletions_saved_meanwhile(tmp_path, monkeypatch) -> None:
+    rng = random.Random(4)
+    writer = BM25Index(_CONFIG)
+    for chunk in range(12):
+        _add(writer, rng, chunk)
+        if chunk % 4 == 3:
+            writer.save(tmp_path)
+    write_segment = BM25Index._write_segment
+
+    def racing(self, files, segment_id, rows):
+        write_segment(self, files, segment_id, rows)
+        if self is not writer:
+            writer.remove_document_chunks("d1")
+            writer.save(tmp_path)
+
+    monkeypatch.setattr(BM25Index, "_write_segment", racing)
+    assert not merge_segments(tmp_path)
+    assert [(entry["rows"], entry["deleted"]) for entry in _segments(tmp_path)] == [(4, 1), (4, 2), (4, 0)]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["manifest.json", "seg_000001", "seg_000002", "seg_000003"]
+
+    monkeypatch.setattr(BM25Index, "_write_segment", write_segment)
+    assert merge_segments(tmp_path)
+    assert [(entry["rows"], entry["deleted"]) for entry in _segments(tmp_path)] == [(9, 0)]
+    reloaded = BM25Index(_CONFIG)
+    assert reloaded.load(tmp_path)
+    assert _snapshot(reloaded) == _snapshot(writer)
+
+
+def test_legacy_json_is_converted_and_other_writers_force_a_full_rewrite(tmp_path) -> None:
+    rng = random.Random(2)
+    reference = BM25Index(_CONFIG)
+    for chunk in range(20):
+        _add(reference, rng, chunk)
+    legacy = {
+        "schema_version": 1,
+        "doc_lengths": {"a": 2, "b": 2},
+        "doc_term_freqs": {"a": {"w1": 2}, "b": {"w1": 1, "w2": 1}},
+        "doc_texts": {"a": "w1 w1", "b": "w1 w2"},
+        "doc_metadata": {"a": {"doc_id": "x"}, "b": {"doc_id": "y"}},
+        "doc_languages": {},
+        "last_updated_version": "v1",
+    }
+    (tmp_path / "bm25_index.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    index = BM25Index(_CONFIG)
+    assert index.load(tmp_path)
+    assert [cid for cid, _, _ in index.score_tokens(["w1"], BM25Algorithm.BM25, 1.2, 0.75, 0.0)] == ["a", "b"]
+    index.save(tmp_path)
+    assert not (tmp_path / "bm25_index.json").exists()
+
+    # Another writer replaces the index; saving the stale copy must not reuse its old segment rows.
+    reference.save(tmp_path)
+    _add(index, rng, 99)
+    index.save(tmp_path)
+    loaded = BM25Index(_CONFIG)
+    assert loaded.load(tmp_path)
+    assert loaded.last_updated_version == "v1"
+    assert [loaded.get_document(cid)[1].get("doc_id") for cid in ("a", "b", "c99")] == ["x", "y", "d33"]
+    assert loaded.num_documents == 3
@@ -0,0 +1,45 @@
+"""Tests for lexical tokenization caches."""
+
+from __future__ import annotations
+
+from nltk.stem.snowball import SnowballStemmer
+
+from ragkit.config.retrieval_schema import LexicalSearchConfig
+from ragkit.retrieval import lexical_engine
+from ragkit.retrieval.lexical_engine import BM25Index, LexicalSearchEngine, TextPreprocessor
+
+
+def test_single_pass_stopwords_and_memoized_stems_match_plain_stemming(monkeypatch) -> None:
+    monkeypatch.setattr(lexical_engine, "_ensure_nltk_resources", lambda: None)
+    config = LexicalSearchConfig(stopwords_lang="en", stemmer_lang="en", ngram_range=(1, 2))
+    preprocessor = TextPreprocessor(config)
+    text = "The runners were running and the runner runs; running is what runners do."
+
+    stopwords = preprocessor._resolve_stopwords(None)
+    stemmer = SnowballStemmer("english")
+    words = [stemmer.stem(word) for word in text.lower().replace(";", "").replace(".", "").split() if word not in stopwords]
+    expected = words + [f"{left} {right}" for left, right in zip(words, words[1:])]
+
+    assert preprocessor.tokenize(text) == expected
+    assert preprocessor.tokenize(text, "fr") == expected  # configured language wins over the document's
+    stats = preprocessor.cache_stats()
+    assert stats["stem_misses"] == len(set(text.lower().replace(";", "").replace(".", "").split()) - stopwords)
+    assert stats["stem_hits"] == 2 * len(words) - stats["stem_misses"]
+
+
+def test_query_cache_survives_scoring_changes_and_reports_hit_rates() -> None:
+    config = LexicalSearchConfig(remove_stopwords=False, stemmer_lang="en", debug_default=True)
+    index = BM25Index(config)
+    index.add_document("c1", "Connecting connected connectors", {"doc_id": "d1"})
+    engine = LexicalSearchEngine(index)
+
+    first = engine.search("connecting connectors", config)
+    second = engine.search("connecting connectors", config.model_copy(update={"bm25_k1": 1.2, "top_k": 5}))
+    assert second.query_tokens == first.query_tokens == ["connect", "connector"]
+    assert second.tokenizer_cache["query_hits"] == 1
+    assert second.tokenizer_cache["query_hit_rate"] == 0.5
+    assert second.tokenizer_cache["stem_hit_rate"] > 0
+
+    engine.search("connecting connectors", config.model_copy(update={"stemming": False}))
+    assert index.preprocessor.cache_stats()["query_misses"] == 1
+    assert index.preprocessor.tokenize_query("connecting connectors") == ["connecting", "connectors"]
@@ -0,0 +1,340 @@
+"""Tests for the embedded NumPy-backed vector store."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import random
+
+import numpy as np
+
+from ragkit.config.retrieval_schema import SearchFilters
+from ragkit.config.vector_store_schema import LocalIndexConfig, LocalIndexType, VectorStoreConfig
+from ragkit.desktop import settings_store
+from ragkit.storage.base import LocalJsonVectorStore, VectorPoint
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    denom_a = math.sqrt(sum(x * x for x in a))
+    denom_b = math.sqrt(sum(x * x for x in b))
+    if denom_a == 0 or denom_b == 0:
+        return 0.0
+    return max(-1.0, min(1.0, sum(x * y for x, y in zip(a, b)) / (denom_a * denom_b)))
+
+
+def _make_store(tmp_path) -> LocalJsonVectorStore:
+    config = VectorStoreConfig(path=str(tmp_path / "store"), collection_name="test_collection")
+    return LocalJsonVectorStore(config)
+
+
+def _random_points(count: int, dims: int, rng: random.Random, prefix: str = "p") -> list[VectorPoint]:
+    return [
+        VectorPoint(
+            id=f"{prefix}{i}",
+            vector=[rng.uniform(-1.0, 1.0) for _ in range(dims)],
+            payload={"doc_id": f"doc{i % 7}", "chunk_text": f"chunk {i}"},
+        )
+        for i in range(count)
+    ]
+
+
+def test_search_matches_reference_ranking(tmp_path) -> None:
+    rng = random.Random(7)
+    store = _make_store(tmp_path)
+    points = _random_points(200, 16, rng)
+
+    async def scenario():
+        await store.initialize(16)
+        await store.upsert(points)
+        query = [rng.uniform(-1.0, 1.0) for _ in range(16)]
+        return query, await store.search(query, 10)
+
+    query, hits = asyncio.run(scenario())
+    expected = sorted(((p, _cosine(query, p.vector)) for p in points), key=lambda item: item[1], reverse=True)[:10]
+
+    assert [point.id for point, _ in hits] == [point.id for point, _ in expected]
+    for (_, score), (_, ref) in zip(hits, expected):
+        assert math.isclose(score, ref, abs_tol=1e-5)
+
+
+def test_upsert_and_delete_keep_matrix_in_sync(tmp_path) -> None:
+    rng = random.Random(3)
+    store = _make_store(tmp_path)
+    points = _random_points(30, 8, rng)
+
+    async def scenario():
+        await store.initialize(8)
+        await store.upsert(points)
+        removed = await store.delete_by_doc_id("doc1")
+        replacement = VectorPoint(id="p0", vector=[1.0] + [0.0] * 7, payload={"doc_id": "doc0"})
+        await store.upsert([replacement])
+        return removed, await store.search([1.0] + [0.0] * 7, 3)
+
+    removed, hits = asyncio.run(scenario())
+
+    assert removed == sum(1 for p in points if p.payload["doc_id"] == "doc1")
+    assert hits[0][0].id == "p0"
+    assert math.isclose(hits[0][1], 1.0, abs_tol=1e-6)
+    assert all(point.payload.get("doc_id") != "doc1" for point, _ in hits)
+    assert len(asyncio.run(store.all_points())) == 30 - removed
+
+
+def test_reload_from_disk_restores_search(tmp_path) -> None:
+    rng = random.Random(11)
+    points = _random_points(20, 4, rng)
+    store = _make_store(tmp_path)
+    asyncio.run(store.initialize(4))
+    asyncio.run(store.upsert(points))
+
+    reopened = _make_store(tmp_path)
+    hits = asyncio.run(reopened.search(points[5].vector, 1))
+
+    assert hits[0][0].id == "p5"
+
+
+def test_zero_query_scores_zero_and_keeps_insertion_order(tmp_path) -> None:
+    store = _make_store(tmp_path)
+    points = [VectorPoint(id=f"z{i}", vector=[float(i + 1), 0.0], payload={}) for i in range(5)]
+    asyncio.run(store.initialize(2))
+    asyncio.run(store.upsert(points))
+
+    hits = asyncio.run(store.search([0.0, 0.0], 3))
+
+    assert [point.id for point, _ in hits] == ["z0", "z1", "z2"]
+    assert all(score == 0.0 for _, score in hits)
+
+
+def test_legacy_json_collection_is_migrated(tmp_path) -> None:
+    root = tmp_path / "store"
+    root.mkdir()
+    legacy = {
+        "dimensions": 2,
+        "points": [
+            {"id": "a", "vector": [1.0, 0.0], "payload": {"doc_id": "d1", "chunk_text": "alpha"}},
+            {"id": "b", "vector": [0.0, 2.0], "payload": {"doc_id": "d2", "chunk_text": "beta"}},
+        ],
+    }
+    (root / "test_collection.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    store = _make_store(tmp_path)
+    hits = asyncio.run(store.search([0.0, 1.0], 1))
+
+    assert hits[0][0].id == "b"
+    assert hits[0][0].payload["chunk_text"] == "beta"
+    assert hits[0][0].vector == [0.0, 2.0]
+    assert not (root / "test_collection.json").exists()
+    assert (root / "test_collection.store" / "manifest.json").exists()
+
+    reopened = _make_store(tmp_path)
+    assert [point.id for point in asyncio.run(reopened.all_points())] == ["a", "b"]
+
+
+def test_log_replay_and_compaction_round_trip(tmp_path) -> None:
+    rng = random.Random(5)
+    points = _random_points(40, 6, rng)
+    store = _make_store(tmp_path)
+
+    async def write():
+        await store.initialize(6)
+        await store.upsert(points[:30])
+        await store.compact()
+        await store.upsert(points[30:])
+        await store.delete_by_doc_id("doc2")
+        await store.upsert([VectorPoint(id="p3", vector=points[3].vector, payload={"doc_id": "doc3", "chunk_text": "new"})])
+
+    asyncio.run(write())
+    expected = {point.id: point.payload for point in asyncio.run(store.all_points())}
+
+    replayed = _make_store(tmp_path)
+    assert {point.id: point.payload for point in asyncio.run(replayed.all_points())} == expected
+    asyncio.run(replayed.compact())
+    asyncio.run(replayed.compact())
+
+    compacted = _make_store(tmp_path)
+    restored = asyncio.run(compacted.all_points())
+    assert {point.id: point.payload for point in restored} == expected
+    assert expected["p3"]["chunk_text"] == "new"
+    assert all(payload["doc_id"] != "doc2" for payload in expected.values())
+    original = {point.id: point.vector for point in points}
+    for point in restored:
+        assert all(math.isclose(a, b, rel_tol=1e-5, abs_tol=1e-6) for a, b in zip(point.vector, original[point.id]))
+
+
+def test_snapshot_restore(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings_store, "get_data_dir", lambda: tmp_path / "data")
+    store = _make_store(tmp_path)
+    asyncio.run(store.initialize(2))
+    asyncio.run(store.upsert([VectorPoint(id="keep", vector=[1.0, 0.0], payload={"doc_id": "d1"})]))
+    asyncio.run(store.create_snapshot("v1"))
+    asyncio.run(store.upsert([VectorPoint(id="later", vector=[0.0, 1.0], payload={"doc_id": "d2"})]))
+
+    asyncio.run(store.restore_snapshot("v1"))
+
+    assert [point.id for point in asyncio.run(store.all_points())] == ["keep"]
+    assert asyncio.run(store.collection_stats()).vectors_count == 1
+
+
+def _clustered_points(count: int, dims: int, seed: int) -> list[VectorPoint]:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, dims))
+    data = centers[rng.integers(0, 20, size=count)] + 0.3 * rng.normal(size=(count, dims))
+    return [VectorPoint(id=f"c{i}", vector=row.tolist(), payload={"doc_id": f"doc{i % 50}"}) for i, row in enumerate(data)]
+
+
+def test_ivf_index_tracks_exact_search_and_persists(tmp_path) -> None:
+    points = _clustered_points(3000, 8, seed=1)
+    queries = [point.vector for point in points[::300]]
+    exact = _make_store(tmp_path / "exact")
+    ivf_config = VectorStoreConfig(
+        path=str(tmp_path / "ivf"),
+        collection_name="test_collection",
+        local_index=LocalIndexConfig(index_type=LocalIndexType.IVF, nprobe=8, min_points=1000),
+    )
+    ivf = LocalJsonVectorStore(ivf_config)
+
+    async def scenario():
+        for store in (exact, ivf):
+            await store.initialize(8)
+            await store.upsert(points)
+        truth = [[p.id for p, _ in await exact.search(q, 5)] for q in queries]
+        found = [[p.id for p, _ in await ivf.search(q, 5)] for q in queries]
+        await ivf.compact()
+        return truth, found
+
+    truth, found = asyncio.run(scenario())
+    recall = sum(len(set(a) & set(b)) for a, b in zip(truth, found)) / (5 * len(queries))
+    assert recall >= 0.9
+    assert ivf._ivf.is_trained
+
+    reopened = LocalJsonVectorStore(ivf_config)
+    asyncio.run(reopened.initialize(8))
+    assert reopened._ivf.is_trained
+    assert [[p.id for p, _ in asyncio.run(reopened.search(q, 5))] for q in queries] == found
+
+
+def test_ivf_falls_back_to_exact_below_min_points(tmp_path) -> None:
+    points = _clustered_points(200, 4, seed=2)
+    config = VectorStoreConfig(
+        path=str(tmp_path / "ivf"),
+        collection_name="test_collection",
+        local_index=LocalIndexConfig(index_type=LocalIndexType.IVF, nprobe=1, min_points=500),
+    )
+    ivf = LocalJsonVectorStore(config)
+    exact = _make_store(tmp_path)
+    for store in (ivf, exact):
+        asyncio.run(store.initialize(4))
+        asyncio.run(store.upsert(points))
+
+    query = points[17].vector
+    assert [p.id for p, _ in asyncio.run(ivf.search(query, 10))] == [p.id for p, _ in asyncio.run(exact.search(query, 10))]
+    assert not ivf._ivf.is_trained
+
+
+def _tagged_points(count: int, dims: int, rng: random.Random) -> list[VectorPoint]:
+    points = _random_points(count, dims, rng)
+    for i, point in enumerate(points):
+        point.payload.update({"source_id": f"src{i % 3}", "category": "rare" if i % 17 == 0 else "common"})
+        point.payload["doc_type" if i % 2 else "file_type"] = "pdf" if i % 5 else "md"
+    return points
+
+
+def test_filtered_search_ranks_only_matching_points(tmp_path) -> None:
+    rng = random.Random(13)
+    points = _tagged_points(120, 6, rng)
+    store = _make_store(tmp_path)
+    filters = [
+        SearchFilters(categories=["rare"]),
+        SearchFilters(doc_types=["md"], source_ids=["src1", "src2"]),
+        SearchFilters(doc_ids=["doc3"], categories=["common"]),
+        SearchFilters(source_ids=["missing"]),
+    ]
+
+    def expected(query, current, active):
+        def passes(payload):
+            doc_type = payload.get("doc_type") or payload.get("file_type")
+            return (
+                (not active.doc_ids or payload["doc_id"] in active.doc_ids)
+                and (not active.doc_types or doc_type in active.doc_types)
+                and (not active.categories or payload["category"] in active.categories)
+                and (not active.source_ids or payload["source_id"] in active.source_ids)
+            )
+
+        ranked = sorted(
+            ((p.id, _cosine(query, p.vector)) for p in current.values() if passes(p.payload)),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        return [point_id for point_id, _ in ranked[:8]]
+
+    async def scenario():
+        await store.initialize(6)
+        await store.upsert(points)
+        await store.delete_by_doc_id("doc4")
+        moved = VectorPoint(id="p3", vector=points[3].vector, payload={**points[3].payload, "category": "rare"})
+        await store.upsert([moved])
+        return moved
+
+    moved = asyncio.run(scenario())
+    current = {p.id: p for p in points if p.payload["doc_id"] != "doc4"}
+    current["p3"] = moved
+    query = [rng.uniform(-1.0, 1.0) for _ in range(6)]
+    for active in filters:
+        assert [p.id for p, _ in asyncio.run(store.search(query, 8, active))] == expected(query, current, active)
+
+    # Reopened from the write log, then from a compacted generation carrying the payload index.
+    for step in range(2):
+        reopened = _make_store(tmp_path)
+        for active in filters:
+            assert [p.id for p, _ in asyncio.run(reopened.search(query, 8, active))] == expected(query, current, active)
+        assert reopened._payload_index.is_built
+        if step == 0:
+            asyncio.run(reopened.compact())
+    assert list((tmp_path / "store" / "test_collection.store").glob("filters.*.npz"))
+
+
+def test_payload_index_is_rebuilt_for_generations_without_one(tmp_path) -> None:
+    rng = random.Random(17)
+    points = _tagged_points(40, 4, rng)
+    store = _make_store(tmp_path)
+    asyncio.run(store.initialize(4))
+    asyncio.run(store.upsert(points))
+    asyncio.run(store.compact())
+    for path in (tmp_path / "store" / "test_collection.store").glob("filters.*.npz"):
+        path.unlink()
+
+    reopened = _make_store(tmp_path)
+    query = points[10].vector
+    unfiltered = asyncio.run(reopened.search(query, 5))
+    assert not reopened._payload_index.is_built
+    rare = SearchFilters(categories=["rare"])
+    hits = asyncio.run(reopened.search(query, 5, rare))
+
+    assert reopened._payload_index.is_built
+    assert [p.id for p, _ in hits] == [p.id for p, _ in asyncio.run(store.search(query, 5, rare))]
+    assert {p.id for p, _ in hits} == {p.id for p in points if p.payload["category"] == "rare"}
+    # Building the index does not keep the payloads of rows that were not returned.
+    returned = {reopened._row_by_id[p.id] for p, _ in hits + unfiltered}
+    assert all(isinstance(payload, tuple) for row, payload in enumerate(reopened._payloads) if row not in returned)
+
+
+def test_ivf_search_applies_filters_before_top_k(tmp_path) -> None:
+    points = _clustered_points(2000, 8, seed=3)
+    for i, point in enumerate(points):
+        point.payload["category"] = "rare" if i % 97 == 0 else "common"
+    config = VectorStoreConfig(
+        path=str(tmp_path / "ivf"),
+        collection_name="test_collection",
+        local_index=LocalIndexConfig(index_type=LocalIndexType.IVF, nprobe=1, min_points=500),
+    )
+    ivf = LocalJsonVectorStore(config)
+    exact = _make_store(tmp_path)
+    for store in (ivf, exact):
+        asyncio.run(store.initialize(8))
+        asyncio.run(store.upsert(points))
+
+    rare = SearchFilters(categories=["rare"])
+    hits = asyncio.run(ivf.search(points[0].vector, 10, rare))
+    assert len(hits) == 10
+    assert all(point.payload["category"] == "rare" for point, _ in hits)
+    assert [p.id for p, _ in asyncio.run(exact.search(points[0].vector, 10, rare))][0] == "c0"
@@ -0,0 +1,123 @@
+"""Tests for the batching vector store wrapper."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from ragkit.config.vector_store_schema import VectorStoreConfig
+from ragkit.storage.base import LocalJsonVectorStore, VectorPoint
+from ragkit.storage.write_buffer import BufferedVectorStore
+
+
+class _CountingStore(LocalJsonVectorStore):
+    def __init__(self, config: VectorStoreConfig):
+        super().__init__(config)
+        self.upsert_calls = 0
+        self.fail_next_upsert = False
+
+    async def upsert(self, points: list[VectorPoint]) -> int:
+        if self.fail_next_upsert:
+            self.fail_next_upsert = False
+            raise RuntimeError("disk full")
+        self.upsert_calls += 1
+        return await super().upsert(points)
+
+
+def _inner(tmp_path) -> _CountingStore:
+    return _CountingStore(VectorStoreConfig(path=str(tmp_path / "store"), collection_name="buffered"))
+
+
+def _doc_points(doc_id: str, count: int, start: float = 1.0) -> list[VectorPoint]:
+    return [
+        VectorPoint(id=f"{doc_id}-{i}", vector=[start + i, 1.0], payload={"doc_id": doc_id, "chunk_index": i})
+        for i in range(count)
+    ]
+
+
+def test_writes_are_batched_and_hook_runs_after_flush(tmp_path) -> None:
+    inner = _inner(tmp_path)
+    committed: list[int] = []
+    store = BufferedVectorStore(inner, max_points=5, max_delay_seconds=3600)
+
+    async def on_flush() -> None:
+        committed.append(len(await inner.all_points()))
+
+    store.on_flush = on_flush
+
+    async def scenario():
+        await store.initialize(2)
+        for index in range(4):
+            await store.upsert(_doc_points(f"doc{index}", 2))
+        await store.flush()
+
+    asyncio.run(scenario())
+
+    assert inner.upsert_calls == 2
+    assert committed == [6, 8]
+
+
+def test_buffered_deletes_match_sequential_semantics(tmp_path) -> None:
+    inner = _inner(tmp_path)
+    store = BufferedVectorStore(inner, max_points=100, max_delay_seconds=3600)
+
+    async def scenario():
+        await store.initialize(2)
+        await store.upsert(_doc_points("a", 3) + _doc_points("b", 2))
+        await store.flush()
+        # Modified document: old chunks deleted, new ones written, all within one batch.
+        await store.delete_by_doc_id("a")
+        await store.upsert(_doc_points("a", 1, start=5.0))
+        await store.upsert(_doc_points("c", 2))
+        dropped = await store.delete_by_doc_id("c")
+        return dropped, await store.all_points()
+
+    dropped, points = asyncio.run(scenario())
+
+    assert dropped == 2
+    assert sorted(point.id for point in points) == ["a-0", "b-0", "b-1"]
+    assert next(point for point in points if point.id == "a-0").vector[0] == pytest.approx(5.0)
+
+
+def test_failed_flush_keeps_pending_writes(tmp_path) -> None:
+    inner = _inner(tmp_path)
+    hook_calls: list[None] = []
+    store = BufferedVectorStore(inner, max_points=100, on_flush=lambda: hook_calls.append(None))
+
+    async def scenario():
+        await store.initialize(2)
+        await store.upsert(_doc_points("a", 2))
+        inner.fail_next_upsert = True
+        with pytest.raises(RuntimeError):
+            await store.flush()
+        assert store.pending_points == 2
+        await store.flush()
+        return await inner.all_points()
+
+    points = asyncio.run(scenario())
+
+    assert len(points) == 2
+    assert len(hook_calls) == 1
+
+
+def test_points_by_doc_id_sees_pending_writes_without_flushing(tmp_path) -> None:
+    inner = _inner(tmp_path)
+    store = BufferedVectorStore(inner, max_points=100, max_delay_seconds=3600)
+
+    async def scenario():
+        await store.initialize(2)
+        await store.upsert(_doc_points("a", 2) + _doc_points("b", 1))
+        await store.flush()
+        await store.upsert(_doc_points("b", 2, start=7.0))
+        pending_b = await store.points_by_doc_id("b")
+        await store.delete_by_doc_id("a")
+        deleted_a = await store.points_by_doc_id("a")
+        return pending_b, deleted_a
+
+    pending_b, deleted_a = asyncio.run(scenario())
+
+    assert inner.upsert_calls == 1
+    assert sorted(point.id for point in pending_b) == ["b-0", "b-1"]
+    assert pending_b[0].vector[0] == pytest.approx(7.0)
+    assert deleted_a == []